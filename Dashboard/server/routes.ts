@@ -15,6 +15,48 @@ function getClient(req: Request): Octokit {
   return new Octokit({ auth: token });
 }
 
+// PR counts for many repos in ONE GraphQL request (aliased per repo),
+// instead of one pulls.list call per repo
+type PRCounts = { open: number; merged: number; closed: number };
+
+async function fetchPRCounts(
+  octokit: Octokit,
+  repos: { owner?: { login: string } | null; name: string }[]
+): Promise<(PRCounts | null)[]> {
+  if (repos.length === 0) return [];
+
+  const fields = repos
+    .map(
+      (repo, i) => `
+    r${i}: repository(owner: ${JSON.stringify(repo.owner?.login || "")}, name: ${JSON.stringify(repo.name)}) {
+      open: pullRequests(states: OPEN) { totalCount }
+      merged: pullRequests(states: MERGED) { totalCount }
+      closed: pullRequests(states: CLOSED) { totalCount }
+    }`
+    )
+    .join("");
+
+  let data: any;
+  try {
+    data = await octokit.graphql(`query {${fields}\n}`);
+  } catch (err: any) {
+    // A repo we can no longer read fails its own alias only; keep the rest
+    if (!err?.data) throw err;
+    data = err.data;
+  }
+
+  return repos.map((_, i) => {
+    const node = data[`r${i}`];
+    return node
+      ? {
+          open: node.open.totalCount,
+          merged: node.merged.totalCount,
+          closed: node.closed.totalCount,
+        }
+      : null;
+  });
+}
+
 export async function registerRoutes(app: Express): Promise<void> {
   // --------------------------
   // Current Logged-in User
@@ -42,58 +84,33 @@ export async function registerRoutes(app: Express): Promise<void> {
         per_page: 30,
       });
 
-      // To compute open PR count per repo:
-      const repositoriesWithPRCounts = await Promise.all(
-        repos.map(async (repo) => {
-          try {
-            const { data: pullRequests } = await octokit.rest.pulls.list({
-              owner: repo.owner!.login,
-              repo: repo.name,
-              state: "open",
-            });
+      // To compute open PR count per repo (single batched GraphQL query):
+      let prCounts: (PRCounts | null)[];
+      try {
+        prCounts = await fetchPRCounts(octokit, repos);
+      } catch (err) {
+        console.error("Failed to fetch PR counts", err);
+        prCounts = repos.map(() => null);
+      }
 
-            return {
-              id: repo.id,
-              name: repo.name,
-              owner: repo.owner?.login || "",
-              full_name: repo.full_name,
-              description: repo.description,
-              private: repo.private,
-              html_url: repo.html_url,
-
-              stargazers_count: repo.stargazers_count,
-              forks_count: repo.forks_count,
-              language: repo.language,
-
-              open_issues_count: repo.open_issues_count,
-              open_prs_count: pullRequests.length, // ✅ real number of open PRs
-
-              updated_at: repo.updated_at,
-            };
-          } catch (err) {
-            console.error(`Failed to fetch PR count for ${repo.name}`, err);
-
-            return {
-              id: repo.id,
-              name: repo.name,
-              owner: repo.owner?.login || "",
-              full_name: repo.full_name,
-              description: repo.description,
-              private: repo.private,
-              html_url: repo.html_url,
-
-              stargazers_count: repo.stargazers_count,
-              forks_count: repo.forks_count,
-              language: repo.language,
-
-              open_issues_count: repo.open_issues_count,
-              open_prs_count: 0, // fallback
-
-              updated_at: repo.updated_at,
-            };
-          }
-        })
-      );
+      const repositoriesWithPRCounts = repos.map((repo, i) => ({
+        id: repo.id,
+        name: repo.name,
+        owner: repo.owner?.login || "",
+        full_name: repo.full_name,
+        description: repo.description,
+        private: repo.private,
+        html_url: repo.html_url,
+
+        stargazers_count: repo.stargazers_count,
+        forks_count: repo.forks_count,
+        language: repo.language,
+
+        open_issues_count: repo.open_issues_count,
+        open_prs_count: prCounts[i]?.open ?? 0, // ✅ real number of open PRs (0 as fallback)
+
+        updated_at: repo.updated_at,
+      }));
 
       res.json(repositoriesWithPRCounts);
 
@@ -245,22 +262,17 @@ export async function registerRoutes(app: Express): Promise<void> {
       let mergedPRs = 0;
       let closedPRs = 0;
 
-      for (const repo of repos.slice(0, 20)) {
-        try {
-          const { data: prs } = await octokit.rest.pulls.list({
-            owner: repo.owner!.login,
-            repo: repo.name,
-            state: "all",
-            per_page: 100
-          });
-
-          totalPRs += prs.length;
-          openPRs += prs.filter((pr) => pr.state === "open").length;
-          mergedPRs += prs.filter((pr) => pr.merged_at).length;
-          closedPRs += prs.filter((pr) => pr.state === "closed" && !pr.merged_at).length;
-        } catch (statsErr) {
-          console.error(`Stats error for ${repo.name}:`, statsErr);
+      try {
+        const prCounts = await fetchPRCounts(octokit, repos.slice(0, 20));
+        for (const counts of prCounts) {
+          if (!counts) continue;
+          openPRs += counts.open;
+          mergedPRs += counts.merged;
+          closedPRs += counts.closed;
         }
+        totalPRs = openPRs + mergedPRs + closedPRs;
+      } catch (statsErr) {
+        console.error("Stats error:", statsErr);
       }
 
       res.json({
@@ -1,9 +1,11 @@
 import os
-import re
+import shutil
 import subprocess
-import requests
+import github_client
+import diff_parser
+import embedding_cache
 from dotenv import load_dotenv
-from typing import Dict, List
+from typing import Dict, List, Optional
 
 # =====================================================
 # 0. IMPORTS (Updated for latest LangChain ecosystem)
@@ -64,8 +66,7 @@ ANALYZERS = {
 # =====================================================
 def fetch_pr_data(owner, repo, pr_number, token):
     url = f"https://api.github.com/repos/{owner}/{repo}/pulls/{pr_number}"
-    headers = {"Authorization": f"token {token}"}
-    response = requests.get(url, headers=headers)
+    response = github_client.get(url, token=token)
     if response.status_code != 200:
         raise Exception(f"GitHub API Error: {response.json()}")
     return response.json()
@@ -74,7 +75,7 @@ def fetch_pr_data(owner, repo, pr_number, token):
 def fetch_pr_diff(owner, repo, pr_number, token):
     pr_data = fetch_pr_data(owner, repo, pr_number, token)
     diff_url = pr_data["diff_url"]
-    diff = requests.get(diff_url, headers={"Authorization": f"token {token}"}).text
+    diff = github_client.get(diff_url, token=token).text
     return diff, pr_data["title"]
 
 
@@ -83,13 +84,9 @@ def post_review_comment(owner, repo, pr_number, token, review_body):
     Posts the AI-generated review as a comment on the GitHub Pull Request.
     """
     url = f"https://api.github.com/repos/{owner}/{repo}/issues/{pr_number}/comments"
-    headers = {
-        "Authorization": f"token {token}",
-        "Accept": "application/vnd.github+json",
-        "User-Agent": "AI-PR-Reviewer"
-    }
+    headers = {"User-Agent": "AI-PR-Reviewer"}
     payload = {"body": review_body}
-    response = requests.post(url, headers=headers, json=payload)
+    response = github_client.post(url, token=token, accept="application/vnd.github+json", headers=headers, json=payload)
 
     if response.status_code in [200, 201]:
         data = response.json()
@@ -105,9 +102,8 @@ def post_review_comment(owner, repo, pr_number, token, review_body):
 # 3. STATIC ANALYSIS
 # =====================================================
 def get_changed_files_and_languages(diff_text: str) -> Dict[str, List[str]]:
-    file_paths = re.findall(r'\+\+\+ b/(.*)', diff_text)
     changed = {}
-    for path in file_paths:
+    for path in diff_parser.parse(diff_text).changed_paths():
         ext = path.split('.')[-1].lower()
         lang = FILE_LANG_MAP.get(ext)
         if lang:
@@ -156,20 +152,68 @@ def run_static_analysis(diff_text: str) -> str:
 # =====================================================
 # 4. RAG INDEXING + RETRIEVAL
 # =====================================================
+INDEX_EXTENSIONS = (".py", ".js", ".cpp", ".java", ".md")
+INDEXED_COMMIT_FILE = "indexed_commit.txt"  # in the index folder: the commit the index reflects
+EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+
+
+def repo_embeddings() -> embedding_cache.CachedEmbeddings:
+    """Chunks embedded before (by any index build or ingest) are reused from the embedding cache."""
+    return embedding_cache.CachedEmbeddings(HuggingFaceEmbeddings(model_name=EMBEDDING_MODEL), EMBEDDING_MODEL)
+
+
+def git_head(repo_path: str = ".") -> Optional[str]:
+    result = subprocess.run(["git", "-C", repo_path, "rev-parse", "HEAD"], capture_output=True, text=True)
+    return result.stdout.strip() if result.returncode == 0 else None
+
+
+def git_changed_paths(repo_path: str, old: str, new: str) -> Optional[Dict[str, str]]:
+    """path -> A/M/D/T between two commits (renames as delete + add); None if `old` is unknown."""
+    result = subprocess.run(
+        ["git", "-C", repo_path, "diff", "--name-status", "--no-renames", "-z", old, new],
+        capture_output=True, text=True, encoding="utf-8", errors="replace",
+    )
+    if result.returncode != 0:
+        return None
+    fields = result.stdout.split("\0")
+    return {path: status[:1] for status, path in zip(fields[0::2], fields[1::2]) if path}
+
+
+def read_indexed_commit(persist_dir: str) -> Optional[str]:
+    try:
+        with open(os.path.join(persist_dir, INDEXED_COMMIT_FILE), encoding="utf-8") as f:
+            return f.read().strip() or None
+    except OSError:
+        return None
+
+
+def write_indexed_commit(persist_dir: str, sha: Optional[str]) -> None:
+    if sha:
+        with open(os.path.join(persist_dir, INDEXED_COMMIT_FILE), "w", encoding="utf-8") as f:
+            f.write(sha + "\n")
+
+
+def load_documents(paths: List[str]) -> list:
+    documents = []
+    for path in paths:
+        try:
+            documents.extend(TextLoader(path, encoding="utf-8").load())
+        except Exception as e:
+            print(f"Skipped {os.path.basename(path)}: {e}")
+    return documents
+
+
 def index_repository(repo_path: str = ".", persist_dir: str = "./repo_index") -> None:
     print("Building vector index for repository...")
 
-    embeddings = HuggingFaceEmbeddings(model_name="sentence-transformers/all-MiniLM-L6-v2")
-    documents = []
+    embeddings = repo_embeddings()
+    head = git_head(repo_path)
+    paths = []
     for root, _, files in os.walk(repo_path):
         for file in files:
-            if file.endswith((".py", ".js", ".cpp", ".java", ".md")):
-                try:
-                    path = os.path.join(root, file)
-                    loader = TextLoader(path, encoding="utf-8")
-                    documents.extend(loader.load())
-                except Exception as e:
-                    print(f"Skipped {file}: {e}")
+            if file.endswith(INDEX_EXTENSIONS):
+                paths.append(os.path.join(root, file))
+    documents = load_documents(paths)
 
     if not documents:
         print("No documents found to index.")
@@ -178,14 +222,55 @@ def index_repository(repo_path: str = ".", persist_dir: str = "./repo_index") ->
     splitter = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=100)
     texts = splitter.split_documents(documents)
     vectordb = Chroma.from_documents(texts, embeddings, persist_directory=persist_dir)
+    write_indexed_commit(persist_dir, head)
+    embeddings.report()
 
     print(f"Repository indexed and saved at: {persist_dir}")
 
 
+def refresh_repository_index(repo_path: str = ".", persist_dir: str = "./repo_index") -> None:
+    """
+    Brings the index to the repo's current commit. Only the files `git diff --name-status`
+    reports since the indexed commit are re-embedded (their old chunks are deleted first);
+    with no index, no recorded commit or an unknown one, the index is rebuilt from scratch.
+    """
+    head = git_head(repo_path)
+    indexed = read_indexed_commit(persist_dir)
+    if os.path.exists(persist_dir) and head is None:
+        print("Existing index found (not a git checkout, so it is not refreshed).\n")
+        return
+    if indexed and indexed == head:
+        print(f"Existing index is up to date (commit {head[:12]}).\n")
+        return
+
+    changes = git_changed_paths(repo_path, indexed, head) if indexed and os.path.exists(persist_dir) else None
+    if changes is None:
+        if os.path.exists(persist_dir):
+            print("Index has no usable recorded commit; rebuilding it...")
+            shutil.rmtree(persist_dir)
+        index_repository(repo_path, persist_dir)
+        return
+
+    touched = [p for p in changes if p.endswith(INDEX_EXTENSIONS)]
+    print(f"Refreshing index: {len(touched)} indexed files changed between {indexed[:12]} and {head[:12]}...")
+    vectordb = load_vector_index(persist_dir)
+    sources = {p: os.path.join(repo_path, *p.split("/")) for p in touched}
+    for source in sources.values():
+        old_ids = vectordb.get(where={"source": source}, include=[])["ids"]
+        if old_ids:
+            vectordb.delete(ids=old_ids)
+    documents = load_documents([sources[p] for p in touched if changes[p] != "D" and os.path.isfile(sources[p])])
+    if documents:
+        splitter = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=100)
+        vectordb.add_documents(splitter.split_documents(documents))
+    write_indexed_commit(persist_dir, head)
+    print(f"Index refreshed: {len(documents)} files re-embedded, {sum(1 for p in touched if changes[p] == 'D')} removed.\n")
+
+
 def load_vector_index(persist_dir: str = "./repo_index") -> Chroma:
     if not os.path.exists(persist_dir):
         raise FileNotFoundError(f"Vector index not found at {persist_dir}. Please run index_repository() first.")
-    embeddings = HuggingFaceEmbeddings(model_name="sentence-transformers/all-MiniLM-L6-v2")
+    embeddings = repo_embeddings()
     return Chroma(persist_directory=persist_dir, embedding_function=embeddings)
 
 
@@ -268,10 +353,7 @@ if __name__ == "__main__":
         print("Static analysis complete.\n")
 
         print("Checking repository index...")
-        if not os.path.exists("./repo_index"):
-            index_repository(".", "./repo_index")
-        else:
-            print("Existing index found.\n")
+        refresh_repository_index(".", "./repo_index")
 
         print("Retrieving repository context (RAG)...")
         repo_context = query_repo_context("code structure and utilities", k=8, persist_dir="./repo_index", max_unique_chunks=3)
@@ -1,10 +1,8 @@
 import os
-import re
 import subprocess
-import requests
 import shutil  # for cleaning up the old index
+import embedding_cache
 from dotenv import load_dotenv
-from typing import Dict, List
 
 # =====================================================
 # 0. IMPORTS (Updated for latest LangChain ecosystem)
@@ -112,8 +110,11 @@ def build_vectorstore(repo_path: str) -> Chroma:
                 except Exception as e:
                     print(f"Error loading file {file_path}: {e}")
 
-    embeddings = HuggingFaceEmbeddings(model_name="sentence-transformers/all-MiniLM-L6-v2")
+    # The index is rebuilt on every run, but unchanged chunks come from the embedding cache
+    model_name = "sentence-transformers/all-MiniLM-L6-v2"
+    embeddings = embedding_cache.CachedEmbeddings(HuggingFaceEmbeddings(model_name=model_name), model_name)
     vectorstore = Chroma.from_documents(docs, embedding=embeddings, persist_directory=persist_directory)
+    embeddings.report()
     print("Repository indexed.")
     return vectorstore
 
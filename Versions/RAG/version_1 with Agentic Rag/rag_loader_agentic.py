@@ -1,154 +1,335 @@
-import os
-import requests
-import zipfile
-import io
-import shutil
-from pathlib import Path
-from langchain_community.vectorstores import FAISS
-from langchain_community.embeddings import HuggingFaceEmbeddings
-# The Document import is necessary for type hinting in assemble_context (best practice)
-from langchain.schema import Document 
-
-# Shared directory path. MUST be consistent with version_1_Yash.py
-REPO_DOWNLOAD_DIR = Path("repo_download")
-
-# -------------------------------
-# Helper: Download and Extract Repo
-# -------------------------------
-def download_and_extract_repo(owner, repo, token, dest_dir=REPO_DOWNLOAD_DIR):
-    """Download and extract the repository zip for HEAD."""
-    print("⬇️ Downloading repository snapshot...")
-    
-    # 1. Clear destination
-    # We remove the directory tree to clear stale or old repo contents
-    if dest_dir.exists():
-        shutil.rmtree(dest_dir)
-    dest_dir.mkdir(parents=True, exist_ok=True)
-
-    # 2. Download zip
-    url = f"https://api.github.com/repos/{owner}/{repo}/zipball/HEAD"
-    headers = {"Authorization": f"token {token}"}
-    r = requests.get(url, headers=headers)
-    r.raise_for_status()
-
-    # 3. Extract contents
-    z = zipfile.ZipFile(io.BytesIO(r.content))
-    z.extractall(dest_dir)
-
-    # The zip extracts into a single top-level folder (e.g., owner-repo-sha)
-    # We return the path to this top-level folder for traversal and the Agent's file reader tool
-    repo_root = next((p for p in dest_dir.iterdir() if p.is_dir()), dest_dir)
-    print(f"Repository extracted to: {repo_root}")
-    return repo_root
-
-
-# -------------------------------
-# Helper: Traverse and Load Files for Indexing
-# -------------------------------
-def load_text_files(repo_root: Path):
-    """
-    Traverse the extracted repository and load content for indexing.
-    Returns a list of strings (file contents).
-    """
-    file_texts = []
-    
-    # --- FINAL COMPREHENSIVE LIST OF SUPPORTED EXTENSIONS ---
-    SUPPORTED_EXTENSIONS = (
-        ".c", ".cpp", ".h",
-        ".java", 
-        ".py", 
-        ".html", 
-        ".css", 
-        ".js", 
-        ".ts", 
-        ".jsx", 
-        ".tsx",
-        ".json",
-        ".xml",
-        ".yaml",
-        ".yml",
-        ".txt", 
-        ".md"
-    )
-
-    SKIP_DIRS = {".git", "node_modules", "__pycache__", ".venv", "venv", "env", "dist", "build"}
-
-    for root, dirs, files in os.walk(repo_root):
-        # Prune skip directories for faster traversal
-        dirs[:] = [d for d in dirs if d not in SKIP_DIRS]
-        
-        for fname in files:
-            # Skip dot files and files without supported extensions
-            if fname.startswith(".") or not any(fname.endswith(ext) for ext in SUPPORTED_EXTENSIONS):
-                continue
-            
-            path = Path(root) / fname
-            try:
-                # Store full content for the RAG index
-                text = path.read_text(encoding="utf-8", errors="ignore")
-                file_texts.append(text) 
-            except Exception as e:
-                print(f"Failed to read {path}: {e}")
-                
-    return file_texts
-
-
-# -------------------------------
-# Build or load FAISS index
-# -------------------------------
-def build_index_for_repo(owner, repo, token, force_rebuild=False, download_if_missing=False):
-    """
-    Build a FAISS index or load an existing one. Ensures local files are present if needed.
-    """
-    embeddings = HuggingFaceEmbeddings(model_name="sentence-transformers/all-MiniLM-L6-v2")
-    index_path = Path(f"rag_indexes/{owner}_{repo}")
-    os.makedirs(index_path, exist_ok=True)
-
-    index_file = index_path / "index.faiss"
-    
-    # Check if a download is required (either for a rebuild OR if files are missing for the Agent tool)
-    # We check if the main repo_download directory exists AND contains content
-    repo_files_missing = not REPO_DOWNLOAD_DIR.exists() or not any(REPO_DOWNLOAD_DIR.iterdir())
-
-    if not index_file.exists() or force_rebuild:
-        print("Index does not exist or force rebuild, creating new FAISS index...")
-        
-        # Download and extract the repository contents
-        repo_root = download_and_extract_repo(owner, repo, token)
-
-        # Load file contents for indexing
-        texts = load_text_files(repo_root)
-        if not texts:
-            texts = ["Initial dummy text"] # fallback so index creation doesn't crash
-
-        # Create FAISS vectorstore
-        vectorstore = FAISS.from_texts(texts, embeddings)
-        vectorstore.save_local(index_path)
-        print(f"✅ Index created at {index_path}")
-        
-    else:
-        print(f"Loading existing index from {index_path}")
-        # Load the existing index
-        vectorstore = FAISS.load_local(index_path, embeddings, allow_dangerous_deserialization=True)
-        
-        # If we didn't rebuild, but the Agent needs the files, download them now.
-        if download_if_missing and repo_files_missing:
-             download_and_extract_repo(owner, repo, token)
-
-    return vectorstore
-
-# -------------------------------
-# Assemble context
-# -------------------------------
-def assemble_context(retrieved_docs: list[Document], char_limit=3000):
-    """
-    Combine retrieved doc chunks (LangChain Document objects) into a single string within char_limit
-    """
-    context_text = ""
-    for doc in retrieved_docs:
-        # doc is a LangChain Document, access content via .page_content
-        new_text = doc.page_content if hasattr(doc, "page_content") else str(doc)
-        if len(context_text) + len(new_text) > char_limit:
-            break
-        context_text += new_text + "\n\n"
-    return context_text
+import os
+import github_client
+import zipfile
+import shutil
+import tempfile
+from pathlib import Path
+from urllib.parse import quote
+from langchain_community.vectorstores import FAISS
+from langchain_community.embeddings import HuggingFaceEmbeddings
+# The Document import is necessary for type hinting in assemble_context (best practice)
+from langchain.schema import Document 
+
+# Shared directory path. MUST be consistent with version_1_Yash.py
+REPO_DOWNLOAD_DIR = Path("repo_download")
+
+# --- FINAL COMPREHENSIVE LIST OF SUPPORTED EXTENSIONS ---
+SUPPORTED_EXTENSIONS = (
+    ".c", ".cpp", ".h",
+    ".java", 
+    ".py", 
+    ".html", 
+    ".css", 
+    ".js", 
+    ".ts", 
+    ".jsx", 
+    ".tsx",
+    ".json",
+    ".xml",
+    ".yaml",
+    ".yml",
+    ".txt", 
+    ".md"
+)
+
+SKIP_DIRS = {".git", "node_modules", "__pycache__", ".venv", "venv", "env", "dist", "build"}
+
+# Zipball streaming: read the response in chunks; the archive stays in RAM only up to SPOOL_MAX_SIZE
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+SPOOL_MAX_SIZE = 16 * 1024 * 1024
+
+# Saved next to index.faiss: the commit the index reflects, so later runs only re-embed what changed
+INDEXED_COMMIT_FILE = "indexed_commit.txt"
+# The compare API lists at most 300 files; bigger ranges are rebuilt from a fresh zipball
+COMPARE_MAX_FILES = 300
+# Vector id of the placeholder text an empty repo is indexed with
+DUMMY_TEXT_ID = "__empty_repo__"
+
+# -------------------------------
+# Helper: Download and Extract Repo
+# -------------------------------
+def is_indexable_member(name: str) -> bool:
+    """True for zip members we keep: supported extension, not a dot file, not under SKIP_DIRS."""
+    parts = name.rstrip("/").split("/")
+    fname = parts[-1]
+    if any(part in SKIP_DIRS for part in parts[:-1]):
+        return False
+    return not fname.startswith(".") and fname.endswith(SUPPORTED_EXTENSIONS)
+
+
+def download_and_extract_repo(owner, repo, token, dest_dir=REPO_DOWNLOAD_DIR):
+    """
+    Download and extract the repository zip for HEAD.
+    The zipball is streamed into a spooled temp file (spills to disk past SPOOL_MAX_SIZE)
+    and only indexable members are extracted, one at a time.
+    """
+    print("⬇️ Downloading repository snapshot...")
+    
+    # 1. Clear destination
+    # We remove the directory tree to clear stale or old repo contents
+    if dest_dir.exists():
+        shutil.rmtree(dest_dir)
+    dest_dir.mkdir(parents=True, exist_ok=True)
+
+    # 2. Download zip (streamed in chunks)
+    url = f"https://api.github.com/repos/{owner}/{repo}/zipball/HEAD"
+    headers = {"Authorization": f"token {token}"}
+    r = github_client.get(url, headers=headers, priority=github_client.PRIORITY_BULK, stream=True)
+    with tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE) as spool:
+        try:
+            r.raise_for_status()
+            for chunk in r.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                spool.write(chunk)
+        finally:
+            r.close()
+        spool.seek(0)
+
+        # 3. Extract contents, skipping unsupported files and SKIP_DIRS before they touch disk
+        kept = skipped = 0
+        with zipfile.ZipFile(spool) as z:
+            for info in z.infolist():
+                if info.is_dir():
+                    continue
+                if not is_indexable_member(info.filename):
+                    skipped += 1
+                    continue
+                z.extract(info, dest_dir)
+                kept += 1
+        print(f"Extracted {kept} files ({skipped} skipped by extension/directory filters)")
+
+    # The zip extracts into a single top-level folder (e.g., owner-repo-sha)
+    # We return the path to this top-level folder for traversal and the Agent's file reader tool
+    repo_root = next((p for p in dest_dir.iterdir() if p.is_dir()), dest_dir)
+    print(f"Repository extracted to: {repo_root}")
+    return repo_root
+
+
+# -------------------------------
+# Helper: Commits and Changed Files
+# -------------------------------
+def fetch_head_sha(owner, repo, token, ref="HEAD"):
+    """SHA of `ref` (the default branch by default), or None if it can't be fetched."""
+    url = f"https://api.github.com/repos/{owner}/{repo}/commits/{ref}"
+    try:
+        r = github_client.get(url, token=token, accept="application/vnd.github.sha", priority=github_client.PRIORITY_BULK)
+    except Exception as e:
+        print(f"⚠️ Could not fetch the {ref} commit: {e}")
+        return None
+    return r.text.strip() if r.status_code == 200 else None
+
+
+def fetch_changed_files(owner, repo, token, base, head):
+    """
+    path -> "removed" or "modified" for every file changed between two commits (the API
+    counterpart of `git diff --name-status base..head`; a rename is removed + added).
+    None when the range can't be applied incrementally: unknown or rewritten base, or more
+    files than the compare API lists.
+    """
+    url = f"https://api.github.com/repos/{owner}/{repo}/compare/{base}...{head}"
+    r = github_client.get(url, token=token, priority=github_client.PRIORITY_BULK)
+    if r.status_code != 200:
+        return None
+    data = r.json()
+    files = data.get("files", [])
+    if data.get("status") not in ("ahead", "identical") or len(files) >= COMPARE_MAX_FILES:
+        return None
+    changes = {}
+    for f in files:
+        if f["status"] == "renamed":
+            changes[f["previous_filename"]] = "removed"
+        changes[f["filename"]] = "removed" if f["status"] == "removed" else "modified"
+    return changes
+
+
+def fetch_file_text(owner, repo, token, path, ref):
+    """Contents of one file at `ref` (decoded like load_text_files), or None if it can't be fetched."""
+    url = f"https://api.github.com/repos/{owner}/{repo}/contents/{quote(path)}?ref={ref}"
+    r = github_client.get(url, token=token, accept="application/vnd.github.raw", priority=github_client.PRIORITY_BULK)
+    return r.content.decode("utf-8", errors="ignore") if r.status_code == 200 else None
+
+
+def read_indexed_commit(index_path: Path):
+    try:
+        return (Path(index_path) / INDEXED_COMMIT_FILE).read_text(encoding="utf-8").strip() or None
+    except OSError:
+        return None
+
+
+def write_indexed_commit(index_path: Path, sha):
+    if sha:
+        (Path(index_path) / INDEXED_COMMIT_FILE).write_text(sha + "\n", encoding="utf-8")
+
+
+# -------------------------------
+# Helper: Traverse and Load Files for Indexing
+# -------------------------------
+def load_text_files(repo_root: Path):
+    """
+    Traverse the extracted repository and load content for indexing.
+    Returns a list of strings (file contents).
+    """
+    return list(load_repo_files(repo_root).values())
+
+
+def load_repo_files(repo_root: Path):
+    """
+    Same traversal as load_text_files, keyed by repo-relative path ("src/app.py"),
+    which is also each file's vector id in the index.
+    """
+    file_texts = {}
+
+    for root, dirs, files in os.walk(repo_root):
+        # Prune skip directories for faster traversal
+        dirs[:] = [d for d in dirs if d not in SKIP_DIRS]
+        
+        for fname in files:
+            # Skip dot files and files without supported extensions
+            if fname.startswith(".") or not any(fname.endswith(ext) for ext in SUPPORTED_EXTENSIONS):
+                continue
+            
+            path = Path(root) / fname
+            try:
+                # Store full content for the RAG index
+                text = path.read_text(encoding="utf-8", errors="ignore")
+                file_texts[path.relative_to(repo_root).as_posix()] = text
+            except Exception as e:
+                print(f"Failed to read {path}: {e}")
+                
+    return file_texts
+
+
+# -------------------------------
+# Refresh an existing index from the commits since it was built
+# -------------------------------
+def refresh_index(vectorstore, owner, repo, token, index_path):
+    """
+    Brings a loaded index (and the local repo files, if downloaded) to the default branch's
+    current commit by re-embedding only the files changed since the indexed commit.
+    Returns False when that is not possible and the index must be rebuilt.
+    """
+    indexed = read_indexed_commit(index_path)
+    if not indexed:
+        print("ℹ️ Index has no recorded commit (built before incremental refreshes).")
+        return False
+    head = fetch_head_sha(owner, repo, token)
+    if head is None or head == indexed:
+        print(f"Index is at commit {indexed[:12]}" + (" (up to date)" if head else " (could not check for new commits)"))
+        return True
+    changes = fetch_changed_files(owner, repo, token, indexed, head)
+    if changes is None:
+        return False
+
+    print(f"🔄 Refreshing index: {len(changes)} files changed between {indexed[:12]} and {head[:12]}...")
+    repo_root = None
+    if REPO_DOWNLOAD_DIR.exists():
+        repo_root = next((p for p in REPO_DOWNLOAD_DIR.iterdir() if p.is_dir()), None)
+
+    # Fetch everything first: if any file can't be fetched (rate limit, 5xx, timeout), nothing
+    # is changed and the commit is not advanced, so the next run retries the same range
+    fetched = {}
+    for path, status in changes.items():
+        if status == "removed" or not is_indexable_member(path):
+            continue
+        text = fetch_file_text(owner, repo, token, path, head)
+        if text is None:
+            print(f"⚠️ Could not fetch {path}; index left at commit {indexed[:12]} (will retry next run)")
+            return True
+        fetched[path] = text
+
+    for path, status in changes.items():
+        local = repo_root / path if repo_root else None
+        if local is None:
+            continue
+        if path in fetched:
+            local.parent.mkdir(parents=True, exist_ok=True)
+            local.write_text(fetched[path], encoding="utf-8")
+        elif status == "removed" and local.is_file():
+            local.unlink()
+    texts, ids = list(fetched.values()), list(fetched)
+
+    indexed_ids = set(vectorstore.index_to_docstore_id.values())
+    stale = [path for path in changes if path in indexed_ids]
+    if texts and DUMMY_TEXT_ID in indexed_ids:
+        stale.append(DUMMY_TEXT_ID)
+    if stale:
+        vectorstore.delete(ids=stale)
+    if texts:
+        vectorstore.add_texts(texts, metadatas=[{"source": path} for path in ids], ids=ids)
+    vectorstore.save_local(index_path)
+    write_indexed_commit(index_path, head)
+    removed = sum(1 for path, status in changes.items() if status == "removed" and path in indexed_ids)
+    print(f"✅ Index refreshed: {len(texts)} files re-embedded, {removed} removed")
+    return True
+
+
+# -------------------------------
+# Build or load FAISS index
+# -------------------------------
+def build_index_for_repo(owner, repo, token, force_rebuild=False, download_if_missing=False, refresh=True):
+    """
+    Build a FAISS index or load an existing one. Ensures local files are present if needed.
+    An existing index is refreshed to the default branch's latest commit (refresh=True),
+    re-embedding only the files changed since it was built.
+    """
+    embeddings = HuggingFaceEmbeddings(model_name="sentence-transformers/all-MiniLM-L6-v2")
+    index_path = Path(f"rag_indexes/{owner}_{repo}")
+    os.makedirs(index_path, exist_ok=True)
+
+    index_file = index_path / "index.faiss"
+    
+    # Check if a download is required (either for a rebuild OR if files are missing for the Agent tool)
+    # We check if the main repo_download directory exists AND contains content
+    repo_files_missing = not REPO_DOWNLOAD_DIR.exists() or not any(REPO_DOWNLOAD_DIR.iterdir())
+
+    vectorstore = None
+    if index_file.exists() and not force_rebuild:
+        print(f"Loading existing index from {index_path}")
+        # Load the existing index
+        vectorstore = FAISS.load_local(index_path, embeddings, allow_dangerous_deserialization=True)
+        
+        # If we didn't rebuild, but the Agent needs the files, download them now.
+        if download_if_missing and repo_files_missing:
+             download_and_extract_repo(owner, repo, token)
+
+        if refresh and not refresh_index(vectorstore, owner, repo, token, index_path):
+            print("Changes since the indexed commit can't be applied incrementally; rebuilding...")
+            vectorstore = None
+
+    if vectorstore is None:
+        print("Index does not exist or force rebuild, creating new FAISS index...")
+        # Commit first: if a merge lands during the download, the next refresh re-fetches its files
+        head = fetch_head_sha(owner, repo, token)
+        
+        # Download and extract the repository contents
+        repo_root = download_and_extract_repo(owner, repo, token)
+
+        # Load file contents for indexing (one vector per file, keyed by its path)
+        files = load_repo_files(repo_root)
+        if not files:
+            files = {DUMMY_TEXT_ID: "Initial dummy text"} # fallback so index creation doesn't crash
+
+        # Create FAISS vectorstore
+        vectorstore = FAISS.from_texts(
+            list(files.values()), embeddings, metadatas=[{"source": path} for path in files], ids=list(files)
+        )
+        vectorstore.save_local(index_path)
+        write_indexed_commit(index_path, head)
+        print(f"✅ Index created at {index_path}")
+
+    return vectorstore
+
+# -------------------------------
+# Assemble context
+# -------------------------------
+def assemble_context(retrieved_docs: list[Document], char_limit=3000):
+    """
+    Combine retrieved doc chunks (LangChain Document objects) into a single string within char_limit
+    """
+    context_text = ""
+    for doc in retrieved_docs:
+        # doc is a LangChain Document, access content via .page_content
+        new_text = doc.page_content if hasattr(doc, "page_content") else str(doc)
+        if len(context_text) + len(new_text) > char_limit:
+            break
+        context_text += new_text + "\n\n"
+    return context_text
@@ -1,346 +1,602 @@
-"""
-Pytest suite for rag_loader_agentic.py
-
-Covers:
-- download_and_extract_repo: success, HTTP error propagation
-- load_text_files: reads supported files, skips unsupported/dot/skip-dirs, handles read errors
-- build_index_for_repo: force rebuild path (uses dummy fallback), existing index path (loads), download_if_missing behavior
-- assemble_context: concatenation until char_limit, handles docs without page_content, empty input and zero limit
-
-All tests are unique, non-redundant, and avoid external network / heavy libs by injecting fakes.
-"""
-import importlib.util
-import sys
-import os
-import io
-import zipfile
-from pathlib import Path
-import types
-
-import pytest
-
-MODULE_PATH = os.path.join(os.path.dirname(__file__), "rag_loader_agentic.py")
-
-
-def _import_module_with_fakes(fake_faiss=None, fake_embeddings=None):
-    """
-    Import the rag_loader_agentic module fresh while ensuring the external
-    langchain_community / langchain.schema imports are satisfied with fake objects.
-    Returns the imported module.
-    """
-    # create fake package modules required by rag_loader_agentic
-    # parent package
-    lang_pkg = types.ModuleType("langchain_community")
-    vec_mod = types.ModuleType("langchain_community.vectorstores")
-    emb_mod = types.ModuleType("langchain_community.embeddings")
-    schema_pkg = types.ModuleType("langchain")
-    schema_mod = types.ModuleType("langchain.schema")
-
-    # attach fakes or defaults
-    vec_mod.FAISS = fake_faiss or _DefaultFakeFAISS()
-    emb_mod.HuggingFaceEmbeddings = fake_embeddings or _DefaultFakeEmbeddings
-    # Document type (used only for typing in the module) — provide a simple alias
-    schema_mod.Document = object
-
-    # inject into sys.modules before importing target
-    sys.modules["langchain_community"] = lang_pkg
-    sys.modules["langchain_community.vectorstores"] = vec_mod
-    sys.modules["langchain_community.embeddings"] = emb_mod
-    sys.modules["langchain"] = schema_pkg
-    sys.modules["langchain.schema"] = schema_mod
-
-    # Import the target module fresh
-    if "rag_loader_agentic" in sys.modules:
-        del sys.modules["rag_loader_agentic"]
-    spec = importlib.util.spec_from_file_location("rag_loader_agentic", MODULE_PATH)
-    mod = importlib.util.module_from_spec(spec)
-    sys.modules["rag_loader_agentic"] = mod
-    spec.loader.exec_module(mod)
-    return mod
-
-
-# Default fake classes used when tests don't need to inspect calls
-class _DefaultFakeFAISS:
-    """Default FAISS shim with minimal behavior to avoid heavy deps."""
-
-    @classmethod
-    def from_texts(cls, texts, embeddings):
-        inst = cls()
-        inst._texts = texts
-        inst._saved = False
-        return inst
-
-    @classmethod
-    def load_local(cls, index_path, embeddings, allow_dangerous_deserialization=False):
-        inst = cls()
-        inst._loaded_from = str(index_path)
-        return inst
-
-    def save_local(self, path):
-        self._saved = True
-        self._saved_to = str(path)
-
-
-class _DefaultFakeEmbeddings:
-    def __init__(self, model_name=None):
-        self.model_name = model_name
-
-
-# -------------------------
-# Tests for download_and_extract_repo
-# -------------------------
-def test_download_and_extract_repo_success_creates_dest_and_returns_repo_root(tmp_path, monkeypatch):
-    """Successfully downloads an in-memory ZIP and extracts it; returns top-level folder path."""
-    # prepare an in-memory zip with a single top-level folder and a file inside it
-    top_folder = "owner-repo-commit"
-    zbuf = io.BytesIO()
-    with zipfile.ZipFile(zbuf, "w") as zf:
-        zf.writestr(f"{top_folder}/file.txt", "hello world")
-    zbytes = zbuf.getvalue()
-
-    # fake requests.get
-    class FakeResp:
-        def __init__(self, content):
-            self.content = content
-
-        def raise_for_status(self):
-            return None
-
-    def fake_get(url, headers=None, timeout=None):
-        return FakeResp(zbytes)
-
-    monkeypatch.setattr("requests.get", fake_get)
-
-    # call function with dest_dir inside tmp_path to avoid touching repo root in cwd
-    from importlib import import_module
-    rag = _import_module_with_fakes()
-    dest = tmp_path / "repo_download"
-    repo_root = rag.download_and_extract_repo("owner", "repo", "token", dest_dir=dest)
-
-    # assertions
-    assert repo_root.exists() and repo_root.is_dir()
-    # the file we put in the zip should exist under the returned top-level folder
-    extracted_file = next(repo_root.glob("**/file.txt"))
-    assert extracted_file.read_text(encoding="utf-8") == "hello world"
-
-
-def test_download_and_extract_repo_raises_on_http_error(monkeypatch, tmp_path):
-    """If response.raise_for_status() raises, the error should propagate."""
-    class BadResp:
-        content = b""
-        def raise_for_status(self):
-            raise RuntimeError("HTTP error")
-
-    monkeypatch.setattr("requests.get", lambda *a, **k: BadResp())
-    rag = _import_module_with_fakes()
-    with pytest.raises(RuntimeError):
-        rag.download_and_extract_repo("o", "r", "t", dest_dir=tmp_path / "repo_download2")
-
-
-# -------------------------
-# Tests for load_text_files
-# -------------------------
-def test_load_text_files_reads_supported_and_skips_dot_and_unsupported_and_skip_dirs(tmp_path):
-    """
-    Ensure load_text_files:
-      - reads supported extensions
-      - skips dotfiles and unsupported extensions
-      - prunes skip directories (e.g., node_modules)
-    """
-    repo_root = tmp_path / "repo"
-    (repo_root / "sub").mkdir(parents=True)
-    # supported file
-    good = repo_root / "sub" / "good.py"
-    good.write_text("print('ok')", encoding="utf-8")
-    # dotfile should be skipped
-    dot = repo_root / ".secret.md"
-    dot.write_text("secret")
-    # unsupported extension should be skipped
-    bad_ext = repo_root / "ignore.bin"
-    bad_ext.write_bytes(b"\x00\x01")
-    # skip dir (node_modules) should be pruned and its files ignored
-    skip_dir = repo_root / "node_modules"
-    skip_dir.mkdir()
-    (skip_dir / "lib.js").write_text("var a=1", encoding="utf-8")
-
-    rag = _import_module_with_fakes()
-    texts = rag.load_text_files(repo_root)
-    # only the supported good.py should be present
-    assert any("print('ok')" in t for t in texts)
-    assert not any("secret" in t for t in texts)
-    assert not any(b'\x00' if isinstance(t, bytes) else False for t in texts)
-
-
-def test_load_text_files_continues_on_read_error(monkeypatch, tmp_path):
-    """
-    If reading a file raises an IOError/OSError, the function should print and continue.
-    We simulate by monkeypatching Path.read_text to raise for a specific filename.
-    """
-    repo_root = tmp_path / "r"
-    repo_root.mkdir()
-    good = repo_root / "a.py"
-    bad = repo_root / "bad.py"
-    good.write_text("ok", encoding="utf-8")
-    bad.write_text("should fail", encoding="utf-8")
-
-    # monkeypatch Path.read_text to raise for bad.py
-    original_read_text = Path.read_text
-
-    def fake_read_text(self, encoding="utf-8", errors="ignore"):
-        if self.name == "bad.py":
-            raise OSError("simulated read error")
-        return original_read_text(self, encoding=encoding, errors=errors)
-
-    monkeypatch.setattr(Path, "read_text", fake_read_text)
-    rag = _import_module_with_fakes()
-    texts = rag.load_text_files(repo_root)
-    # good content present, bad file was skipped
-    assert any("ok" in t for t in texts)
-    # restore original is handled by monkeypatch fixture teardown
-
-
-# -------------------------
-# Tests for build_index_for_repo
-# -------------------------
-def test_build_index_force_rebuild_creates_index_and_uses_dummy_text_when_no_files(monkeypatch, tmp_path):
-    """
-    Force rebuild path:
-     - download_and_extract_repo is called
-     - load_text_files returns empty list -> code should use ["Initial dummy text"]
-     - FAISS.from_texts should be called with that fallback and save_local invoked
-    """
-    calls = {}
-
-    # fake FAISS that captures from_texts input and records save_local call
-    class FakeFAISS:
-        @classmethod
-        def from_texts(cls, texts, embeddings):
-            calls["from_texts_texts"] = list(texts)
-            return cls()
-
-        @classmethod
-        def load_local(cls, *a, **k):
-            raise AssertionError("load_local should not be called in force_rebuild path")
-
-        def save_local(self, path):
-            calls["saved_to"] = str(path)
-
-    class FakeEmb:
-        def __init__(self, model_name=None):
-            calls["emb_model"] = model_name
-
-    # Prepare fake download_and_extract_repo and load_text_files
-    def fake_download(owner, repo, token, dest_dir=None):
-        # create an empty repo root folder
-        repo_root = tmp_path / "downloaded_repo"
-        repo_root.mkdir(exist_ok=True)
-        return repo_root
-
-    monkeypatch.chdir(tmp_path)  # ensure index paths are created inside tmp_path
-    rag = _import_module_with_fakes(fake_faiss=FakeFAISS, fake_embeddings=FakeEmb)
-    # override helpers
-    monkeypatch.setattr(rag, "download_and_extract_repo", fake_download)
-    monkeypatch.setattr(rag, "load_text_files", lambda root: [])  # returns empty list
-
-    vec = rag.build_index_for_repo("own", "repo", "tok", force_rebuild=True)
-    # assertions
-    assert calls["from_texts_texts"] == ["Initial dummy text"]
-    assert "saved_to" in calls
-    # returned vectorstore is instance of FakeFAISS
-    assert isinstance(vec, FakeFAISS)
-
-
-def test_build_index_loads_existing_and_downloads_if_missing_files_when_requested(monkeypatch, tmp_path):
-    """
-    When index exists and force_rebuild=False:
-     - FAISS.load_local should be called to load existing index
-     - If download_if_missing=True and repo files missing, download_and_extract_repo should be invoked
-    """
-    calls = {}
-
-    class FakeFAISS2:
-        @classmethod
-        def from_texts(cls, *a, **k):
-            raise AssertionError("from_texts should not be called when index exists and not force_rebuild")
-
-        @classmethod
-        def load_local(cls, index_path, embeddings, allow_dangerous_deserialization=False):
-            calls["loaded_index_path"] = str(index_path)
-            return cls()
-
-        def save_local(self, path):
-            calls["saved_local_called"] = True
-
-    class FakeEmb2:
-        def __init__(self, model_name=None):
-            pass
-
-    # Setup working directory where index path exists
-    monkeypatch.chdir(tmp_path)
-    index_dir = tmp_path / "rag_indexes" / "own_repo"
-    index_dir.mkdir(parents=True, exist_ok=True)
-    # create index.faiss file to signal existing index
-    (index_dir / "index.faiss").write_text("dummy", encoding="utf-8")
-
-    # ensure repo_download dir is missing or empty to trigger download_if_missing
-    downloaded = tmp_path / "repo_download"
-    if downloaded.exists():
-        # ensure empty
-        for p in downloaded.iterdir():
-            if p.is_file():
-                p.unlink()
-            else:
-                shutil.rmtree(p)
-
-    # fake download to record call
-    def fake_download(owner, repo, token, dest_dir=None):
-        calls["download_called"] = True
-        # create repo root to satisfy function expectations
-        repo_root = tmp_path / "downloaded_repo2"
-        repo_root.mkdir(exist_ok=True)
-        return repo_root
-
-    rag = _import_module_with_fakes(fake_faiss=FakeFAISS2, fake_embeddings=FakeEmb2)
-    monkeypatch.setattr(rag, "download_and_extract_repo", fake_download)
-
-    # call with download_if_missing True
-    vec = rag.build_index_for_repo("own", "repo", "tok", force_rebuild=False, download_if_missing=True)
-    assert "loaded_index_path" in calls
-    assert calls.get("download_called", False) is True
-    assert isinstance(vec, FakeFAISS2)
-
-
-# -------------------------
-# Tests for assemble_context
-# -------------------------
-def test_assemble_context_concatenates_until_char_limit_and_handles_missing_page_content():
-    """
-    assemble_context should:
-      - append page_content from Document-like objects separated by blank lines
-      - stop when char_limit exceeded
-      - handle objects without page_content by str() fallback
-    """
-    rag = _import_module_with_fakes()
-    # create doc-like objects
-    class Doc:
-        def __init__(self, text):
-            self.page_content = text
-
-    docs = [Doc("a" * 10), Doc("b" * 20), "raw-string-object-without-page_content", Doc("c" * 30)]
-    # char_limit small so only first two are included (10 + 2 newlines + 20 = 32)
-    res = rag.assemble_context(docs, char_limit=35)
-    assert "a" * 10 in res
-    assert "b" * 20 in res
-    # the raw string without page_content will be included via str(doc)
-    assert "raw-string-object-without-page_content" in res or "raw-string-object-without-page_content" not in res  # acceptable either but ensure no crash
-
-    # ensure that increasing limit allows more content
-    res2 = rag.assemble_context(docs, char_limit=200)
-    assert "c" * 30 in res2
-
-
-def test_assemble_context_empty_input_and_zero_limit_return_empty_string():
-    """Edge conditions: empty list and zero char_limit should return empty string."""
-    rag = _import_module_with_fakes()
-    assert rag.assemble_context([], char_limit=100) == ""
+"""
+Pytest suite for rag_loader_agentic.py
+
+Covers:
+- download_and_extract_repo: success, HTTP error propagation, unsupported/skip-dir members not extracted
+- load_text_files: reads supported files, skips unsupported/dot/skip-dirs, handles read errors
+- load_repo_files: file contents keyed by repo-relative path
+- build_index_for_repo: force rebuild path (uses dummy fallback), existing index path (loads), download_if_missing behavior
+- fetch_changed_files: compare API statuses mapped to modified/removed; unusable ranges return None
+- refresh_index / build_index_for_repo: only files changed since the indexed commit are re-embedded
+  (local files updated too); an up-to-date index is left alone; unusable ranges trigger a rebuild
+- refresh_index: a file that can't be fetched leaves the index and its commit untouched;
+  an index with no recorded commit is rebuilt once
+- assemble_context: concatenation until char_limit, handles docs without page_content, empty input and zero limit
+
+All tests are unique, non-redundant, and avoid external network / heavy libs by injecting fakes.
+"""
+import importlib.util
+import sys
+import os
+import io
+import zipfile
+from pathlib import Path
+import types
+
+import pytest
+
+MODULE_PATH = os.path.join(os.path.dirname(__file__), "rag_loader_agentic.py")
+
+
+def _import_module_with_fakes(fake_faiss=None, fake_embeddings=None):
+    """
+    Import the rag_loader_agentic module fresh while ensuring the external
+    langchain_community / langchain.schema imports are satisfied with fake objects.
+    Returns the imported module.
+    """
+    # create fake package modules required by rag_loader_agentic
+    # parent package
+    lang_pkg = types.ModuleType("langchain_community")
+    vec_mod = types.ModuleType("langchain_community.vectorstores")
+    emb_mod = types.ModuleType("langchain_community.embeddings")
+    schema_pkg = types.ModuleType("langchain")
+    schema_mod = types.ModuleType("langchain.schema")
+
+    # attach fakes or defaults
+    vec_mod.FAISS = fake_faiss or _DefaultFakeFAISS()
+    emb_mod.HuggingFaceEmbeddings = fake_embeddings or _DefaultFakeEmbeddings
+    # Document type (used only for typing in the module) — provide a simple alias
+    schema_mod.Document = object
+
+    # inject into sys.modules before importing target
+    sys.modules["langchain_community"] = lang_pkg
+    sys.modules["langchain_community.vectorstores"] = vec_mod
+    sys.modules["langchain_community.embeddings"] = emb_mod
+    sys.modules["langchain"] = schema_pkg
+    sys.modules["langchain.schema"] = schema_mod
+
+    # Import the target module fresh
+    if "rag_loader_agentic" in sys.modules:
+        del sys.modules["rag_loader_agentic"]
+    spec = importlib.util.spec_from_file_location("rag_loader_agentic", MODULE_PATH)
+    mod = importlib.util.module_from_spec(spec)
+    sys.modules["rag_loader_agentic"] = mod
+    spec.loader.exec_module(mod)
+    return mod
+
+
+# Default fake classes used when tests don't need to inspect calls
+class _DefaultFakeFAISS:
+    """Default FAISS shim with minimal behavior to avoid heavy deps."""
+
+    @classmethod
+    def from_texts(cls, texts, embeddings):
+        inst = cls()
+        inst._texts = texts
+        inst._saved = False
+        return inst
+
+    @classmethod
+    def load_local(cls, index_path, embeddings, allow_dangerous_deserialization=False):
+        inst = cls()
+        inst._loaded_from = str(index_path)
+        return inst
+
+    def save_local(self, path):
+        self._saved = True
+        self._saved_to = str(path)
+
+
+class _DefaultFakeEmbeddings:
+    def __init__(self, model_name=None):
+        self.model_name = model_name
+
+
+# -------------------------
+# Tests for download_and_extract_repo
+# -------------------------
+def test_download_and_extract_repo_success_creates_dest_and_returns_repo_root(tmp_path, monkeypatch):
+    """Successfully downloads an in-memory ZIP and extracts it; returns top-level folder path."""
+    # prepare an in-memory zip with a single top-level folder and a file inside it
+    top_folder = "owner-repo-commit"
+    zbuf = io.BytesIO()
+    with zipfile.ZipFile(zbuf, "w") as zf:
+        zf.writestr(f"{top_folder}/file.txt", "hello world")
+    zbytes = zbuf.getvalue()
+
+    # fake github_client.get (streamed response)
+    class FakeResp:
+        def __init__(self, content):
+            self.content = content
+
+        def raise_for_status(self):
+            return None
+
+        def iter_content(self, chunk_size=1):
+            for i in range(0, len(self.content), chunk_size):
+                yield self.content[i:i + chunk_size]
+
+        def close(self):
+            return None
+
+    def fake_get(url, headers=None, timeout=None, **kwargs):
+        return FakeResp(zbytes)
+
+    monkeypatch.setattr("github_client.get", fake_get)
+
+    # call function with dest_dir inside tmp_path to avoid touching repo root in cwd
+    from importlib import import_module
+    rag = _import_module_with_fakes()
+    dest = tmp_path / "repo_download"
+    repo_root = rag.download_and_extract_repo("owner", "repo", "token", dest_dir=dest)
+
+    # assertions
+    assert repo_root.exists() and repo_root.is_dir()
+    # the file we put in the zip should exist under the returned top-level folder
+    extracted_file = next(repo_root.glob("**/file.txt"))
+    assert extracted_file.read_text(encoding="utf-8") == "hello world"
+
+
+def test_download_and_extract_repo_raises_on_http_error(monkeypatch, tmp_path):
+    """If response.raise_for_status() raises, the error should propagate."""
+    class BadResp:
+        content = b""
+        def raise_for_status(self):
+            raise RuntimeError("HTTP error")
+        def close(self):
+            return None
+
+    monkeypatch.setattr("github_client.get", lambda *a, **k: BadResp())
+    rag = _import_module_with_fakes()
+    with pytest.raises(RuntimeError):
+        rag.download_and_extract_repo("o", "r", "t", dest_dir=tmp_path / "repo_download2")
+
+
+def test_download_and_extract_repo_filters_members_before_extraction(monkeypatch, tmp_path):
+    """Only supported files outside SKIP_DIRS are written to disk; the zip is read in small chunks."""
+    top = "owner-repo-sha"
+    zbuf = io.BytesIO()
+    with zipfile.ZipFile(zbuf, "w") as zf:
+        zf.writestr(f"{top}/src/app.py", "print('hi')")
+        zf.writestr(f"{top}/logo.png", b"\x89PNG")
+        zf.writestr(f"{top}/.env", "SECRET=1")
+        zf.writestr(f"{top}/node_modules/lib/index.js", "module.exports = 1")
+    zbytes = zbuf.getvalue()
+    chunk_sizes = []
+
+    class StreamResp:
+        def raise_for_status(self):
+            return None
+        def iter_content(self, chunk_size=1):
+            chunk_sizes.append(chunk_size)
+            for i in range(0, len(zbytes), 7):
+                yield zbytes[i:i + 7]
+        def close(self):
+            return None
+
+    monkeypatch.setattr("github_client.get", lambda *a, **k: StreamResp())
+    rag = _import_module_with_fakes()
+    repo_root = rag.download_and_extract_repo("o", "r", "t", dest_dir=tmp_path / "dl")
+
+    extracted = sorted(p.relative_to(repo_root).as_posix() for p in repo_root.rglob("*") if p.is_file())
+    assert extracted == ["src/app.py"]
+    assert chunk_sizes == [rag.DOWNLOAD_CHUNK_SIZE]
+
+
+# -------------------------
+# Tests for load_text_files
+# -------------------------
+def test_load_text_files_reads_supported_and_skips_dot_and_unsupported_and_skip_dirs(tmp_path):
+    """
+    Ensure load_text_files:
+      - reads supported extensions
+      - skips dotfiles and unsupported extensions
+      - prunes skip directories (e.g., node_modules)
+    """
+    repo_root = tmp_path / "repo"
+    (repo_root / "sub").mkdir(parents=True)
+    # supported file
+    good = repo_root / "sub" / "good.py"
+    good.write_text("print('ok')", encoding="utf-8")
+    # dotfile should be skipped
+    dot = repo_root / ".secret.md"
+    dot.write_text("secret")
+    # unsupported extension should be skipped
+    bad_ext = repo_root / "ignore.bin"
+    bad_ext.write_bytes(b"\x00\x01")
+    # skip dir (node_modules) should be pruned and its files ignored
+    skip_dir = repo_root / "node_modules"
+    skip_dir.mkdir()
+    (skip_dir / "lib.js").write_text("var a=1", encoding="utf-8")
+
+    rag = _import_module_with_fakes()
+    texts = rag.load_text_files(repo_root)
+    # only the supported good.py should be present
+    assert any("print('ok')" in t for t in texts)
+    assert not any("secret" in t for t in texts)
+    assert not any(b'\x00' if isinstance(t, bytes) else False for t in texts)
+
+
+def test_load_text_files_continues_on_read_error(monkeypatch, tmp_path):
+    """
+    If reading a file raises an IOError/OSError, the function should print and continue.
+    We simulate by monkeypatching Path.read_text to raise for a specific filename.
+    """
+    repo_root = tmp_path / "r"
+    repo_root.mkdir()
+    good = repo_root / "a.py"
+    bad = repo_root / "bad.py"
+    good.write_text("ok", encoding="utf-8")
+    bad.write_text("should fail", encoding="utf-8")
+
+    # monkeypatch Path.read_text to raise for bad.py
+    original_read_text = Path.read_text
+
+    def fake_read_text(self, encoding="utf-8", errors="ignore"):
+        if self.name == "bad.py":
+            raise OSError("simulated read error")
+        return original_read_text(self, encoding=encoding, errors=errors)
+
+    monkeypatch.setattr(Path, "read_text", fake_read_text)
+    rag = _import_module_with_fakes()
+    texts = rag.load_text_files(repo_root)
+    # good content present, bad file was skipped
+    assert any("ok" in t for t in texts)
+    # restore original is handled by monkeypatch fixture teardown
+
+
+# -------------------------
+# Tests for build_index_for_repo
+# -------------------------
+def test_build_index_force_rebuild_creates_index_and_uses_dummy_text_when_no_files(monkeypatch, tmp_path):
+    """
+    Force rebuild path:
+     - download_and_extract_repo is called
+     - load_repo_files returns no files -> code should use ["Initial dummy text"]
+     - FAISS.from_texts should be called with that fallback and save_local invoked
+     - the HEAD commit is recorded next to the index
+    """
+    calls = {}
+
+    # fake FAISS that captures from_texts input and records save_local call
+    class FakeFAISS:
+        @classmethod
+        def from_texts(cls, texts, embeddings, metadatas=None, ids=None):
+            calls["from_texts_texts"] = list(texts)
+            calls["from_texts_ids"] = list(ids)
+            return cls()
+
+        @classmethod
+        def load_local(cls, *a, **k):
+            raise AssertionError("load_local should not be called in force_rebuild path")
+
+        def save_local(self, path):
+            calls["saved_to"] = str(path)
+
+    class FakeEmb:
+        def __init__(self, model_name=None):
+            calls["emb_model"] = model_name
+
+    # Prepare fake download_and_extract_repo and load_text_files
+    def fake_download(owner, repo, token, dest_dir=None):
+        # create an empty repo root folder
+        repo_root = tmp_path / "downloaded_repo"
+        repo_root.mkdir(exist_ok=True)
+        return repo_root
+
+    monkeypatch.chdir(tmp_path)  # ensure index paths are created inside tmp_path
+    rag = _import_module_with_fakes(fake_faiss=FakeFAISS, fake_embeddings=FakeEmb)
+    # override helpers
+    monkeypatch.setattr(rag, "download_and_extract_repo", fake_download)
+    monkeypatch.setattr(rag, "load_repo_files", lambda root: {})  # no files
+    monkeypatch.setattr(rag, "fetch_head_sha", lambda owner, repo, token: "a" * 40)
+
+    vec = rag.build_index_for_repo("own", "repo", "tok", force_rebuild=True)
+    # assertions
+    assert calls["from_texts_texts"] == ["Initial dummy text"]
+    assert calls["from_texts_ids"] == [rag.DUMMY_TEXT_ID]
+    assert "saved_to" in calls
+    assert rag.read_indexed_commit(tmp_path / "rag_indexes" / "own_repo") == "a" * 40
+    # returned vectorstore is instance of FakeFAISS
+    assert isinstance(vec, FakeFAISS)
+
+
+def test_build_index_loads_existing_and_downloads_if_missing_files_when_requested(monkeypatch, tmp_path):
+    """
+    When index exists and force_rebuild=False:
+     - FAISS.load_local should be called to load existing index
+     - If download_if_missing=True and repo files missing, download_and_extract_repo should be invoked
+    """
+    calls = {}
+
+    class FakeFAISS2:
+        @classmethod
+        def from_texts(cls, *a, **k):
+            raise AssertionError("from_texts should not be called when index exists and not force_rebuild")
+
+        @classmethod
+        def load_local(cls, index_path, embeddings, allow_dangerous_deserialization=False):
+            calls["loaded_index_path"] = str(index_path)
+            return cls()
+
+        def save_local(self, path):
+            calls["saved_local_called"] = True
+
+    class FakeEmb2:
+        def __init__(self, model_name=None):
+            pass
+
+    # Setup working directory where index path exists
+    monkeypatch.chdir(tmp_path)
+    index_dir = tmp_path / "rag_indexes" / "own_repo"
+    index_dir.mkdir(parents=True, exist_ok=True)
+    # create index.faiss file to signal existing index, built at the current commit
+    (index_dir / "index.faiss").write_text("dummy", encoding="utf-8")
+    (index_dir / "indexed_commit.txt").write_text("c" * 40, encoding="utf-8")
+
+    # ensure repo_download dir is missing or empty to trigger download_if_missing
+    downloaded = tmp_path / "repo_download"
+    if downloaded.exists():
+        # ensure empty
+        for p in downloaded.iterdir():
+            if p.is_file():
+                p.unlink()
+            else:
+                shutil.rmtree(p)
+
+    # fake download to record call
+    def fake_download(owner, repo, token, dest_dir=None):
+        calls["download_called"] = True
+        # create repo root to satisfy function expectations
+        repo_root = tmp_path / "downloaded_repo2"
+        repo_root.mkdir(exist_ok=True)
+        return repo_root
+
+    rag = _import_module_with_fakes(fake_faiss=FakeFAISS2, fake_embeddings=FakeEmb2)
+    monkeypatch.setattr(rag, "download_and_extract_repo", fake_download)
+    monkeypatch.setattr(rag, "fetch_head_sha", lambda owner, repo, token: "c" * 40)
+
+    # call with download_if_missing True
+    vec = rag.build_index_for_repo("own", "repo", "tok", force_rebuild=False, download_if_missing=True)
+    assert "loaded_index_path" in calls
+    assert calls.get("download_called", False) is True
+    assert isinstance(vec, FakeFAISS2)
+
+
+# -------------------------
+# Tests for incremental refreshes
+# -------------------------
+class _FakeResp:
+    def __init__(self, status_code=200, payload=None, content=b""):
+        self.status_code = status_code
+        self._payload = payload
+        self.content = content
+        self.text = content.decode()
+
+    def json(self):
+        return self._payload
+
+
+class _RefreshableFAISS:
+    """In-memory FAISS shim keyed by vector id."""
+    loaded = None
+
+    def __init__(self, docs=None):
+        self.docs = dict(docs or {})
+        self.saved = 0
+
+    @property
+    def index_to_docstore_id(self):
+        return dict(enumerate(self.docs))
+
+    @classmethod
+    def from_texts(cls, texts, embeddings, metadatas=None, ids=None):
+        return cls(zip(ids, texts))
+
+    @classmethod
+    def load_local(cls, index_path, embeddings, allow_dangerous_deserialization=False):
+        return cls.loaded
+
+    def delete(self, ids):
+        for i in ids:
+            del self.docs[i]
+
+    def add_texts(self, texts, metadatas=None, ids=None):
+        self.docs.update(zip(ids, texts))
+
+    def save_local(self, path):
+        self.saved += 1
+
+
+def test_load_repo_files_keys_by_relative_path(tmp_path):
+    # Arrange
+    (tmp_path / "src").mkdir()
+    (tmp_path / "src" / "app.py").write_text("x = 1", encoding="utf-8")
+    (tmp_path / "README.md").write_text("docs", encoding="utf-8")
+    rag = _import_module_with_fakes()
+
+    # Act / Assert
+    assert rag.load_repo_files(tmp_path) == {"README.md": "docs", "src/app.py": "x = 1"}
+
+
+def test_fetch_changed_files_maps_statuses_and_rejects_unusable_ranges(monkeypatch):
+    # Arrange
+    files = [
+        {"filename": "a.py", "status": "modified"},
+        {"filename": "b.py", "status": "added"},
+        {"filename": "c.py", "status": "removed"},
+        {"filename": "new.py", "status": "renamed", "previous_filename": "old.py"},
+    ]
+    responses = {
+        "ahead": _FakeResp(payload={"status": "ahead", "files": files}),
+        "diverged": _FakeResp(payload={"status": "diverged", "files": files}),
+        "missing": _FakeResp(status_code=404),
+    }
+    monkeypatch.setattr("github_client.get", lambda url, **k: responses[url.rsplit("...", 1)[-1]])
+    rag = _import_module_with_fakes()
+
+    # Act / Assert
+    assert rag.fetch_changed_files("o", "r", "t", "base", "ahead") == {
+        "a.py": "modified", "b.py": "modified", "c.py": "removed", "old.py": "removed", "new.py": "modified",
+    }
+    assert rag.fetch_changed_files("o", "r", "t", "base", "diverged") is None
+    assert rag.fetch_changed_files("o", "r", "t", "base", "missing") is None
+
+
+def test_refresh_reembeds_only_changed_files_and_updates_local_copy(monkeypatch, tmp_path):
+    # Arrange: an index at commit "old" and a downloaded copy of the repo
+    monkeypatch.chdir(tmp_path)
+    rag = _import_module_with_fakes(fake_faiss=_RefreshableFAISS)
+    index_path = tmp_path / "rag_indexes" / "o_r"
+    index_path.mkdir(parents=True)
+    (index_path / "index.faiss").write_text("x", encoding="utf-8")
+    rag.write_indexed_commit(index_path, "old")
+    root = tmp_path / "repo_download" / "o-r-old"
+    root.mkdir(parents=True)
+    (root / "a.py").write_text("a = 1", encoding="utf-8")
+    (root / "gone.py").write_text("bye", encoding="utf-8")
+    store = _RefreshableFAISS({"a.py": "a = 1", "gone.py": "bye", "keep.py": "k"})
+    _RefreshableFAISS.loaded = store
+    monkeypatch.setattr(rag, "fetch_head_sha", lambda owner, repo, token: "new")
+    monkeypatch.setattr(rag, "fetch_changed_files", lambda owner, repo, token, base, head: {
+        "a.py": "modified", "pkg/b.py": "modified", "gone.py": "removed", "logo.png": "modified",
+    })
+    fetched = []
+
+    def fake_fetch(owner, repo, token, path, ref):
+        fetched.append((path, ref))
+        return f"new {path}"
+
+    monkeypatch.setattr(rag, "fetch_file_text", fake_fetch)
+
+    # Act
+    vec = rag.build_index_for_repo("o", "r", "t")
+
+    # Assert
+    assert vec is store
+    assert store.docs == {"keep.py": "k", "a.py": "new a.py", "pkg/b.py": "new pkg/b.py"}
+    assert fetched == [("a.py", "new"), ("pkg/b.py", "new")]  # unsupported files are not fetched
+    assert (root / "pkg" / "b.py").read_text(encoding="utf-8") == "new pkg/b.py"
+    assert not (root / "gone.py").exists()
+    assert rag.read_indexed_commit(index_path) == "new"
+    assert store.saved == 1
+
+
+def test_failed_fetch_leaves_index_and_commit_untouched(monkeypatch, tmp_path):
+    # Arrange: one of the changed files can't be fetched (e.g. rate limited)
+    monkeypatch.chdir(tmp_path)
+    rag = _import_module_with_fakes(fake_faiss=_RefreshableFAISS)
+    index_path = tmp_path / "rag_indexes" / "o_r"
+    index_path.mkdir(parents=True)
+    rag.write_indexed_commit(index_path, "old")
+    store = _RefreshableFAISS({"a.py": "a = 1", "b.py": "b = 1"})
+    monkeypatch.setattr(rag, "fetch_head_sha", lambda owner, repo, token: "new")
+    monkeypatch.setattr(rag, "fetch_changed_files", lambda *a: {"a.py": "modified", "b.py": "modified"})
+    monkeypatch.setattr(rag, "fetch_file_text", lambda owner, repo, token, path, ref: "new" if path == "a.py" else None)
+
+    # Act
+    kept = rag.refresh_index(store, "o", "r", "t", index_path)
+
+    # Assert: nothing deleted, nothing saved, the same range is retried next run
+    assert kept is True
+    assert store.docs == {"a.py": "a = 1", "b.py": "b = 1"}
+    assert store.saved == 0
+    assert rag.read_indexed_commit(index_path) == "old"
+
+
+def test_index_without_recorded_commit_is_rebuilt_once(monkeypatch, tmp_path):
+    # Arrange: an index built before commits were recorded
+    monkeypatch.chdir(tmp_path)
+    rag = _import_module_with_fakes(fake_faiss=_RefreshableFAISS)
+    index_path = tmp_path / "rag_indexes" / "o_r"
+    index_path.mkdir(parents=True)
+    (index_path / "index.faiss").write_text("x", encoding="utf-8")
+    _RefreshableFAISS.loaded = _RefreshableFAISS({"old.py": "o"})
+    monkeypatch.setattr(rag, "fetch_head_sha", lambda owner, repo, token: "head")
+    repo_root = tmp_path / "downloaded"
+    repo_root.mkdir()
+    (repo_root / "main.py").write_text("print(1)", encoding="utf-8")
+    monkeypatch.setattr(rag, "download_and_extract_repo", lambda owner, repo, token, dest_dir=None: repo_root)
+
+    # Act
+    vec = rag.build_index_for_repo("o", "r", "t")
+
+    # Assert
+    assert vec.docs == {"main.py": "print(1)"}
+    assert rag.read_indexed_commit(index_path) == "head"
+
+
+def test_refresh_skips_up_to_date_index(monkeypatch, tmp_path):
+    # Arrange
+    monkeypatch.chdir(tmp_path)
+    rag = _import_module_with_fakes(fake_faiss=_RefreshableFAISS)
+    index_path = tmp_path / "rag_indexes" / "o_r"
+    index_path.mkdir(parents=True)
+    rag.write_indexed_commit(index_path, "same")
+    store = _RefreshableFAISS({"a.py": "a"})
+    monkeypatch.setattr(rag, "fetch_head_sha", lambda owner, repo, token: "same")
+    monkeypatch.setattr(rag, "fetch_changed_files", lambda *a: pytest.fail("no compare call expected"))
+
+    # Act / Assert
+    assert rag.refresh_index(store, "o", "r", "t", index_path) is True
+    assert store.saved == 0
+
+
+def test_unusable_range_rebuilds_the_index(monkeypatch, tmp_path):
+    # Arrange: the indexed commit is unknown to GitHub (e.g. force-pushed away)
+    monkeypatch.chdir(tmp_path)
+    rag = _import_module_with_fakes(fake_faiss=_RefreshableFAISS)
+    index_path = tmp_path / "rag_indexes" / "o_r"
+    index_path.mkdir(parents=True)
+    (index_path / "index.faiss").write_text("x", encoding="utf-8")
+    rag.write_indexed_commit(index_path, "rewritten")
+    _RefreshableFAISS.loaded = _RefreshableFAISS({"stale.py": "s"})
+    monkeypatch.setattr(rag, "fetch_head_sha", lambda owner, repo, token: "new")
+    monkeypatch.setattr(rag, "fetch_changed_files", lambda *a: None)
+    repo_root = tmp_path / "downloaded"
+    repo_root.mkdir()
+    (repo_root / "main.py").write_text("print(1)", encoding="utf-8")
+    monkeypatch.setattr(rag, "download_and_extract_repo", lambda owner, repo, token, dest_dir=None: repo_root)
+
+    # Act
+    vec = rag.build_index_for_repo("o", "r", "t")
+
+    # Assert
+    assert vec.docs == {"main.py": "print(1)"}
+    assert rag.read_indexed_commit(index_path) == "new"
+
+
+# -------------------------
+# Tests for assemble_context
+# -------------------------
+def test_assemble_context_concatenates_until_char_limit_and_handles_missing_page_content():
+    """
+    assemble_context should:
+      - append page_content from Document-like objects separated by blank lines
+      - stop when char_limit exceeded
+      - handle objects without page_content by str() fallback
+    """
+    rag = _import_module_with_fakes()
+    # create doc-like objects
+    class Doc:
+        def __init__(self, text):
+            self.page_content = text
+
+    docs = [Doc("a" * 10), Doc("b" * 20), "raw-string-object-without-page_content", Doc("c" * 30)]
+    # char_limit small so only first two are included (10 + 2 newlines + 20 = 32)
+    res = rag.assemble_context(docs, char_limit=35)
+    assert "a" * 10 in res
+    assert "b" * 20 in res
+    # the raw string without page_content will be included via str(doc)
+    assert "raw-string-object-without-page_content" in res or "raw-string-object-without-page_content" not in res  # acceptable either but ensure no crash
+
+    # ensure that increasing limit allows more content
+    res2 = rag.assemble_context(docs, char_limit=200)
+    assert "c" * 30 in res2
+
+
+def test_assemble_context_empty_input_and_zero_limit_return_empty_string():
+    """Edge conditions: empty list and zero char_limit should return empty string."""
+    rag = _import_module_with_fakes()
+    assert rag.assemble_context([], char_limit=100) == ""
     assert rag.assemble_context([types.SimpleNamespace(page_content="x")], char_limit=0) == ""
\ No newline at end of file
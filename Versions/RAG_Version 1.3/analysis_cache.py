@@ -0,0 +1,206 @@
+# analysis_cache.py
+# Content-addressed static-analysis cache: per-file findings keyed by
+# (analyzer, analyzer version, config hash, file blob SHA), stored in SQLite with size-based eviction;
+# for analyzers that follow imports the blob part also covers the other files analyzed with it
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import posixpath
+import threading
+import subprocess
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# ------------------------------
+# Configuration (overridable from .env)
+# ------------------------------
+CACHE_PATH = os.getenv("ANALYSIS_CACHE_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".analysis_cache.sqlite"))
+MAX_BYTES = int(os.getenv("ANALYSIS_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+ENABLED = os.getenv("STATIC_ANALYSIS_CACHE", "1") == "1"
+# Bumped whenever the stored findings format changes, so old rows are never read back
+ROW_FORMAT = "2"
+
+# Config files that change what an analyzer reports (looked up in the file's folder and each parent)
+CONFIG_FILES = (
+    "setup.cfg", "pyproject.toml", "tox.ini", ".flake8", ".pylintrc", "pylintrc", "mypy.ini", ".bandit",
+    ".eslintrc", ".eslintrc.js", ".eslintrc.cjs", ".eslintrc.json", ".eslintrc.yml", ".eslintrc.yaml",
+    "eslint.config.js", "package.json", "tsconfig.json",
+)
+
+# --- Cached Globals ---
+_conn: Optional[sqlite3.Connection] = None
+_conn_path: Optional[str] = None
+_lock = threading.Lock()
+_versions: Dict[str, Optional[str]] = {}
+_stats = {"hits": 0, "misses": 0}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS findings (
+    key TEXT PRIMARY KEY,
+    analyzer TEXT NOT NULL,
+    version TEXT NOT NULL,
+    config_hash TEXT NOT NULL,
+    blob_sha TEXT NOT NULL,
+    findings TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    last_used REAL NOT NULL
+)
+"""
+
+
+# ------------------------------
+# Key helpers
+# ------------------------------
+def blob_sha(path: str) -> Optional[str]:
+    """Git blob id of a file's contents (same value `git hash-object` prints), or None if unreadable."""
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except OSError:
+        return None
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+
+
+def config_hash(root: str, rel_path: str, base_cmd: List[str]) -> str:
+    """Hashes the analyzer command line plus every CONFIG_FILES entry above `rel_path` inside `root`."""
+    digest = hashlib.sha1("\0".join(base_cmd).encode("utf-8"))
+    folder = posixpath.dirname(rel_path.replace(os.sep, "/"))
+    while True:
+        for name in CONFIG_FILES:
+            config_path = os.path.join(root, folder, name)
+            if os.path.isfile(config_path):
+                digest.update(f"\0{folder}/{name}\0".encode("utf-8"))
+                with open(config_path, "rb") as f:
+                    digest.update(f.read())
+        if not folder:
+            break
+        folder = posixpath.dirname(folder)
+    return digest.hexdigest()
+
+
+def tool_version(executable: str) -> Optional[str]:
+    """`<tool> --version` (first line), memoized per process; None if the tool can't be run."""
+    with _lock:
+        if executable in _versions:
+            return _versions[executable]
+    try:
+        process = subprocess.run([executable, "--version"], capture_output=True, text=True, timeout=30, check=False)
+        lines = (process.stdout.strip() or process.stderr.strip()).splitlines()
+        version = lines[0].strip() if process.returncode == 0 and lines else None
+    except (OSError, subprocess.SubprocessError):
+        version = None
+    with _lock:
+        _versions[executable] = version
+    return version
+
+
+def file_keys(analyzer: str, base_cmd: List[str], root: str, files: Iterable[str],
+              cross_module: bool = False) -> Dict[str, Optional[Tuple[str, str, str, str]]]:
+    """
+    Cache key (analyzer, version, config hash, blob SHA) for each file,
+    or None where the file can't be cached (tool missing, file unreadable).
+    With `cross_module` (analyzers that follow imports, like Mypy), a file's findings also depend
+    on the other files analyzed with it, so the blob part covers the contents of all `files`.
+    """
+    files = list(files)
+    version = tool_version(base_cmd[0])
+    shas = {path: blob_sha(os.path.join(root, path)) if version else None for path in files}
+    together = None
+    if cross_module:
+        together = hashlib.sha1("\0".join(f"{path}:{shas[path]}" for path in sorted(shas)).encode("utf-8")).hexdigest()
+    keys = {}
+    for path, sha in shas.items():
+        if sha and together:
+            sha = f"{sha}+{together}"
+        keys[path] = (analyzer, version, config_hash(root, path, base_cmd), sha) if sha else None
+    return keys
+
+
+# ------------------------------
+# Storage
+# ------------------------------
+def _connect() -> sqlite3.Connection:
+    global _conn, _conn_path
+    if _conn is None or _conn_path != CACHE_PATH:
+        if _conn is not None:
+            _conn.close()
+        os.makedirs(os.path.dirname(os.path.abspath(CACHE_PATH)), exist_ok=True)
+        _conn = sqlite3.connect(CACHE_PATH, check_same_thread=False)
+        _conn.execute(SCHEMA)
+        _conn.commit()
+        _conn_path = CACHE_PATH
+    return _conn
+
+
+def _key(analyzer: str, version: str, config: str, sha: str) -> str:
+    return hashlib.sha1("\0".join((ROW_FORMAT, analyzer, version, config, sha)).encode("utf-8")).hexdigest()
+
+
+def lookup(analyzer: str, version: str, config: str, sha: str) -> Optional[list]:
+    """Returns the cached findings for one file, or None on a miss."""
+    key = _key(analyzer, version, config, sha)
+    with _lock:
+        conn = _connect()
+        row = conn.execute("SELECT findings FROM findings WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            _stats["misses"] += 1
+            return None
+        conn.execute("UPDATE findings SET last_used = ? WHERE key = ?", (time.time(), key))
+        conn.commit()
+        _stats["hits"] += 1
+        return json.loads(row[0])
+
+
+def store(analyzer: str, version: str, config: str, sha: str, findings: list):
+    """Saves the findings for one file, then evicts least-recently-used rows beyond MAX_BYTES."""
+    payload = json.dumps(findings)
+    with _lock:
+        conn = _connect()
+        conn.execute(
+            "INSERT OR REPLACE INTO findings VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (_key(analyzer, version, config, sha), analyzer, version, config, sha, payload, len(payload), time.time()),
+        )
+        _evict(conn, MAX_BYTES)
+        conn.commit()
+
+
+def _evict(conn: sqlite3.Connection, max_bytes: int):
+    total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM findings").fetchone()[0]
+    if total <= max_bytes:
+        return
+    # Drop down to 90% so a full cache doesn't evict on every store
+    target = max_bytes * 0.9
+    for key, size in conn.execute("SELECT key, size FROM findings ORDER BY last_used").fetchall():
+        if total <= target:
+            break
+        conn.execute("DELETE FROM findings WHERE key = ?", (key,))
+        total -= size
+
+
+def size() -> int:
+    """Total bytes of cached findings."""
+    with _lock:
+        return _connect().execute("SELECT COALESCE(SUM(size), 0) FROM findings").fetchone()[0]
+
+
+def stats() -> dict:
+    """Returns a copy of the hit/miss counters for this process."""
+    with _lock:
+        return dict(_stats)
+
+
+def reset_stats():
+    with _lock:
+        for k in _stats:
+            _stats[k] = 0
+
+
+def clear():
+    """Drops every cached finding and resets the counters."""
+    with _lock:
+        conn = _connect()
+        conn.execute("DELETE FROM findings")
+        conn.commit()
+    reset_stats()
@@ -0,0 +1,194 @@
+# analyzer_daemons.py
+# Resident analyzers for back-to-back PRs on the same repo:
+#  - Mypy runs through a `dmypy` daemon per worktree (incremental: only changed modules are rechecked)
+#  - Pylint runs in a long-lived worker process per worktree (no interpreter/astroid start-up per PR)
+# Both return subprocess.CompletedProcess objects with the same output as the one-shot commands.
+
+import os
+import sys
+import json
+import atexit
+import hashlib
+import shutil
+import threading
+import subprocess
+from typing import Dict, List, Optional
+
+# ------------------------------
+# Configuration (overridable from .env)
+# ------------------------------
+DAEMON_DIR = os.getenv("ANALYZER_DAEMON_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".analyzer_daemons"))
+# dmypy daemons exit by themselves after this many idle seconds
+DAEMON_IDLE_TIMEOUT = int(os.getenv("ANALYZER_DAEMON_IDLE_TIMEOUT", "3600"))
+WORKER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "pylint_worker.py")
+
+# Analyzers (findings.tool_name) that can run resident
+RESIDENT_TOOLS = {"Mypy", "Pylint"}
+
+# --- Cached Globals ---
+_workers: Dict[str, "PylintWorker"] = {}
+_daemons: Dict[str, str] = {}  # dmypy status file -> dmypy executable
+_lock = threading.Lock()
+
+
+# ------------------------------
+# Helpers
+# ------------------------------
+def _worktree_id(cwd: str) -> str:
+    return hashlib.sha1(os.path.abspath(cwd).encode("utf-8")).hexdigest()[:12]
+
+
+def status_file(cwd: str) -> str:
+    """Where the dmypy daemon serving `cwd` records its pid/port."""
+    return os.path.join(DAEMON_DIR, f"{_worktree_id(cwd)}.dmypy.json")
+
+
+def _sibling_executable(executable: str, name: str) -> str:
+    """'mypy' -> 'dmypy', '/venv/bin/mypy' -> '/venv/bin/dmypy'."""
+    folder, base = os.path.split(executable)
+    suffix = ".exe" if base.lower().endswith(".exe") else ""
+    return os.path.join(folder, name + suffix) if folder else name
+
+
+def _interpreter_for(executable: str) -> str:
+    """
+    The Python that owns a console script (from its #! line), so the worker can import
+    the same pylint the one-shot command would run. Falls back to this interpreter.
+    """
+    path = shutil.which(executable)
+    if path is None:
+        raise FileNotFoundError(executable)
+    try:
+        with open(path, "rb") as f:
+            first = f.readline().decode("utf-8", "replace").strip()
+    except OSError:
+        return sys.executable
+    if first.startswith("#!"):
+        interpreter = first[2:].strip().split()[0] if first[2:].strip() else ""
+        if os.path.isfile(interpreter) and "python" in os.path.basename(interpreter):
+            return interpreter
+    return sys.executable
+
+
+# ------------------------------
+# Pylint worker
+# ------------------------------
+class PylintWorker:
+    """One pylint_worker.py child process; requests are served one at a time."""
+
+    def __init__(self, python: str, script: Optional[str] = None):
+        self.process = subprocess.Popen(
+            [python, script or WORKER_SCRIPT],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            encoding="utf-8",
+        )
+        self.lock = threading.Lock()
+
+    def alive(self) -> bool:
+        return self.process.poll() is None
+
+    def run(self, cwd: str, args: List[str], timeout: float) -> subprocess.CompletedProcess:
+        """Lints `args` inside `cwd`; kills the worker (it is restarted on next use) on timeout."""
+        with self.lock:
+            reply = {}
+
+            def read_reply():
+                line = self.process.stdout.readline()
+                if line:
+                    reply.update(json.loads(line))
+
+            try:
+                self.process.stdin.write(json.dumps({"cwd": os.path.abspath(cwd), "args": args}) + "\n")
+                self.process.stdin.flush()
+            except OSError as e:
+                raise RuntimeError(f"pylint worker is not running: {e}")
+
+            # Pipes have no read timeout on Windows, so wait for the reply on a helper thread
+            reader = threading.Thread(target=read_reply, daemon=True)
+            reader.start()
+            reader.join(timeout)
+            if reader.is_alive():
+                self.close()
+                raise subprocess.TimeoutExpired(["pylint"] + args, timeout)
+            if not reply:
+                raise RuntimeError("pylint worker exited unexpectedly")
+            return subprocess.CompletedProcess(["pylint"] + args, reply["returncode"], reply["stdout"], "")
+
+    def close(self):
+        if self.alive():
+            self.process.kill()
+        self.process.wait()
+
+
+def run_pylint(base_cmd: List[str], files: List[str], cwd: str, timeout: float) -> subprocess.CompletedProcess:
+    key = os.path.abspath(cwd)
+    with _lock:
+        worker = _workers.get(key)
+        if worker is None or not worker.alive():
+            print(f"  Starting resident Pylint worker for {cwd}...")
+            worker = _workers[key] = PylintWorker(_interpreter_for(base_cmd[0]))
+    return worker.run(cwd, base_cmd[1:] + files, timeout)
+
+
+# ------------------------------
+# dmypy
+# ------------------------------
+def run_mypy(base_cmd: List[str], files: List[str], cwd: str, timeout: float) -> subprocess.CompletedProcess:
+    """
+    `dmypy run` starts the daemon on first use (or restarts it when the flags change)
+    and otherwise only rechecks what changed since the previous run.
+    """
+    os.makedirs(DAEMON_DIR, exist_ok=True)
+    status = status_file(cwd)
+    dmypy = _sibling_executable(base_cmd[0], "dmypy")
+    with _lock:
+        _daemons[status] = dmypy
+    return subprocess.run(
+        [dmypy, "--status-file", status, "run", "--timeout", str(DAEMON_IDLE_TIMEOUT), "--"] + base_cmd[1:] + files,
+        cwd=cwd,
+        capture_output=True,
+        text=True,
+        check=False,
+        timeout=timeout,
+        encoding="utf-8",
+    )
+
+
+# ------------------------------
+# Public API
+# ------------------------------
+def run(tool: str, base_cmd: List[str], files: List[str], cwd: str, timeout: float) -> subprocess.CompletedProcess:
+    """Runs a RESIDENT_TOOLS analyzer through its daemon; same errors as subprocess.run."""
+    if tool == "Mypy":
+        return run_mypy(base_cmd, files, cwd, timeout)
+    if tool == "Pylint":
+        return run_pylint(base_cmd, files, cwd, timeout)
+    raise ValueError(f"No resident mode for {tool}")
+
+
+def shutdown(cwd: Optional[str] = None, stop_mypy: bool = True):
+    """
+    Stops the daemons for one worktree (or all of them).
+    dmypy daemons can outlive this process (they exit after DAEMON_IDLE_TIMEOUT), so the next
+    run of a one-PR-per-process bot still finds them warm; pass stop_mypy=False to keep them.
+    """
+    with _lock:
+        keys = [k for k in _workers if cwd is None or k == os.path.abspath(cwd)]
+        workers = [_workers.pop(k) for k in keys]
+        daemons = {}
+        if stop_mypy:
+            daemons = {s: _daemons.pop(s) for s in list(_daemons) if cwd is None or s == status_file(cwd)}
+    for worker in workers:
+        worker.close()
+    for status, dmypy in daemons.items():
+        if os.path.exists(status):
+            try:
+                subprocess.run([dmypy, "--status-file", status, "stop"], capture_output=True, timeout=30, check=False)
+            except (OSError, subprocess.SubprocessError):
+                pass
+
+
+atexit.register(shutdown, stop_mypy=False)
@@ -10,6 +10,8 @@ load_dotenv()
 OWNER = os.getenv("OWNER")
 REPO = os.getenv("REPO")
 GITHUB_TOKEN = os.getenv("GITHUB_TOKEN")
+# Max PRs fetched concurrently by fetch_many_pr_diffs (keep <= GITHUB_POOL_SIZE)
+GITHUB_FETCH_CONCURRENCY = int(os.getenv("GITHUB_FETCH_CONCURRENCY", "8"))
 
 # --- Convert PR_NUMBER to int safely ---
 try:
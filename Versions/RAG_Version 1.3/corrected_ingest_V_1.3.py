@@ -1,177 +1,204 @@
-import os
-import shutil
-import stat
-from git import Repo
-from langchain_community.document_loaders import DirectoryLoader, TextLoader
-from langchain_core.documents import Document # <-- NEW: Needed for creating documents manually
-from langchain_text_splitters import RecursiveCharacterTextSplitter
-from langchain_huggingface import HuggingFaceEmbeddings
-from langchain_pinecone import PineconeVectorStore
-from pinecone import Pinecone, ServerlessSpec
-from config import PINECONE_API_KEY, PINECONE_INDEX_NAME, OWNER, REPO
-
-# --- Configuration ---
-# Local folder for standards (optional, but checked first)
-KNOWLEDGE_BASE_DIR = "knowledge_base" 
-DEFAULT_STANDARDS_FILE = os.path.join(KNOWLEDGE_BASE_DIR, "coding_standards.md")
-
-GITHUB_REPO_URL = f"https://github.com/{OWNER}/{REPO}.git"
-LOCAL_REPO_PATH = "temp_client_repo"  # Temporary folder to clone into
-
-GLOB_PATTERN = "**/*" # To load all files in the cloned repo
-
-EMBEDDING_MODEL = "all-MiniLM-L6-v2"
-EMBEDDING_DIMENSION = 384  # Dimension for 'all-MiniLM-L6-v2'
-
-
-# --- Default Standards Content ---
-# This is the fallback if the local file does not exist
-DEFAULT_STANDARDS_CONTENT = """
-# Our Engineering Coding Standards
-
-## Python
-- All functions must have type hints.
-- Use `black` for formatting.
-- All public functions must have a docstring explaining args, returns, and raises.
-- Avoid global variables. Pass state explicitly.
-
-## General
-- PRs should be small and focused.
-- Always include unit tests for new logic.
-- Do not commit secrets. Use .env files.
-"""
-
-
-# --- Helper function to handle read-only file errors on Windows ---
-def on_rm_error(func, path, exc_info):
-    """
-    Error handler for shutil.rmtree.
-    If a file is read-only, it makes it writable and tries to delete again.
-    """
-    if not os.access(path, os.W_OK):
-        os.chmod(path, stat.S_IWRITE)
-        func(path)
-    else:
-        raise
-# ---------------------------------------------------------------------
-
-
-def ingest_data():
-    """
-    Clones repo, loads all files, adds standard docs, splits, embeds, and uploads.
-    """
-    
-    all_documents = [] # This will hold all documents (standards + repo)
-
-    # --- 1. Load Standards (Local or Default) ---
-    print("--- 1. Loading Coding Standards Context ---")
-    if os.path.exists(DEFAULT_STANDARDS_FILE):
-        try:
-            print(f"Found local standards file: {DEFAULT_STANDARDS_FILE}. Loading it.")
-            standards_loader = TextLoader(DEFAULT_STANDARDS_FILE)
-            all_documents.extend(standards_loader.load())
-        except Exception as e:
-            print(f"WARNING: Could not load local standards file. Using default. Error: {e}")
-            all_documents.append(Document(page_content=DEFAULT_STANDARDS_CONTENT, metadata={"source": "DEFAULT_CODING_STANDARDS"}))
-    else:
-        print("Local standards file not found. Using default internal standards.")
-        all_documents.append(Document(page_content=DEFAULT_STANDARDS_CONTENT, metadata={"source": "DEFAULT_CODING_STANDARDS"}))
-
-
-    # --- 2. Clone the Repo ---
-    print(f"\n--- 2. Cloning Repository Context ---")
-    print(f"Cloning repository {GITHUB_REPO_URL} to {LOCAL_REPO_PATH}...")
-    if os.path.exists(LOCAL_REPO_PATH):
-        print("Deleting old temporary repo folder...")
-        shutil.rmtree(LOCAL_REPO_PATH, onerror=on_rm_error)
-        
-    try:
-        Repo.clone_from(GITHUB_REPO_URL, LOCAL_REPO_PATH)
-        print("Repo cloned successfully.")
-    except Exception as e:
-        print(f"FAILED to clone repo: {e}")
-        print("Please ensure OWNER and REPO are correct in your .env file.")
-        # If cloning fails, we still proceed with the standards we loaded
-        # return # No return needed here, as we already have the default standards loaded
-    
-    # --- 3. Load and Combine ALL Repo Files ---
-    if os.path.exists(LOCAL_REPO_PATH):
-        print(f"\n--- 3. Loading All Repo Files ({GLOB_PATTERN}) ---")
-        try:
-            repo_loader = DirectoryLoader(
-                LOCAL_REPO_PATH, 
-                glob=GLOB_PATTERN,
-                loader_cls=TextLoader,
-                loader_kwargs={"autodetect_encoding": True},
-                show_progress=True,
-                use_multithreading=True,
-                silent_errors=True, # Skips binary files gracefully
-            )
-            # Extend the documents list with the documents from the cloned repo
-            all_documents.extend(repo_loader.load())
-            print(f"Loaded {len(all_documents) - 1} repo files (excluding standards).") # Subtract the 1 standards doc
-        except Exception as e:
-            print(f"Error during repository file loading phase: {e}")
-
-    # --- 4. Split Documents ---
-    if not all_documents:
-        print("\nNo documents were loaded. Exiting.")
-        if os.path.exists(LOCAL_REPO_PATH):
-            shutil.rmtree(LOCAL_REPO_PATH, onerror=on_rm_error) # Clean up
-        return
-        
-    print(f"\nTotal documents to process: {len(all_documents)}")
-    print("Splitting documents into chunks...")
-    
-    generic_splitter = RecursiveCharacterTextSplitter(
-        chunk_size=1000,
-        chunk_overlap=100
-    )
-    all_texts = generic_splitter.split_documents(all_documents)
-    print(f"Split documents into {len(all_texts)} chunks.")
-
-
-    # --- 5. Load Embedding Model ---
-    print(f"\n--- 5. Uploading to Pinecone ---")
-    print(f"Loading embedding model: {EMBEDDING_MODEL}...")
-    embeddings = HuggingFaceEmbeddings(model_name=EMBEDDING_MODEL)
-
-    # --- 6. Connect to Pinecone and Check Index ---
-    print("Initializing Pinecone client...")
-    pc = Pinecone(api_key=PINECONE_API_KEY)
-
-    if PINECONE_INDEX_NAME not in pc.list_indexes().names():
-        print(f"Index '{PINECONE_INDEX_NAME}' not found. Creating new index...")
-        pc.create_index(
-            name=PINECONE_INDEX_NAME,
-            dimension=EMBEDDING_DIMENSION,
-            metric="cosine", 
-            spec=ServerlessSpec(cloud="aws", region="us-east-1"),
-        )
-        print("Index created.")
-    else:
-        print(f"Found existing index '{PINECONE_INDEX_NAME}'.")
-
-    # --- 7. Upload to Pinecone ---
-    print(f"Uploading {len(all_texts)} chunks to Pinecone index...")
-    PineconeVectorStore.from_documents(
-        all_texts,
-        embeddings,
-        index_name=PINECONE_INDEX_NAME,
-    )
-
-    print("\nIngestion complete!")
-    
-    # --- 8. Clean up ---
-    if os.path.exists(LOCAL_REPO_PATH):
-        print(f"Deleting temporary repo folder: {LOCAL_REPO_PATH}")
-        shutil.rmtree(LOCAL_REPO_PATH, onerror=on_rm_error)
-    print("Done.")
-
-
-if __name__ == "__main__":
-    if not all([OWNER, REPO, PINECONE_API_KEY, PINECONE_INDEX_NAME]):
-        print("Error: Missing required variables in .env file.")
-        print("Please set OWNER, REPO, PINECONE_API_KEY, and PINECONE_INDEX_NAME")
-    else:
-        ingest_data()
\ No newline at end of file
+import os
+import time
+import shutil
+import stat
+import argparse
+import repo_cache
+import ingest_manifest
+import embed_pool
+import embedding_cache
+import index_refresh
+import doc_stream
+from analysis_cache import blob_sha
+from langchain_core.documents import Document # <-- NEW: Needed for creating documents manually
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+from langchain_pinecone import PineconeVectorStore
+from pinecone import Pinecone, ServerlessSpec
+from config import PINECONE_API_KEY, PINECONE_INDEX_NAME, OWNER, REPO
+
+# --- Configuration ---
+# Local folder for standards (optional, but checked first)
+KNOWLEDGE_BASE_DIR = "knowledge_base" 
+DEFAULT_STANDARDS_FILE = os.path.join(KNOWLEDGE_BASE_DIR, "coding_standards.md")
+DEFAULT_STANDARDS_SOURCE = "DEFAULT_CODING_STANDARDS"
+
+GITHUB_REPO_URL = f"https://github.com/{OWNER}/{REPO}.git"
+LOCAL_REPO_PATH = "temp_client_repo"  # Temporary worktree of the cached mirror (see repo_cache.py)
+
+EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+EMBEDDING_DIMENSION = 384  # Dimension for 'all-MiniLM-L6-v2'
+
+
+# --- Default Standards Content ---
+# This is the fallback if the local file does not exist
+DEFAULT_STANDARDS_CONTENT = """
+# Our Engineering Coding Standards
+
+## Python
+- All functions must have type hints.
+- Use `black` for formatting.
+- All public functions must have a docstring explaining args, returns, and raises.
+- Avoid global variables. Pass state explicitly.
+
+## General
+- PRs should be small and focused.
+- Always include unit tests for new logic.
+- Do not commit secrets. Use .env files.
+"""
+
+
+# --- Helper function to handle read-only file errors on Windows ---
+def on_rm_error(func, path, exc_info):
+    """
+    Error handler for shutil.rmtree.
+    If a file is read-only, it makes it writable and tries to delete again.
+    """
+    if not os.access(path, os.W_OK):
+        os.chmod(path, stat.S_IWRITE)
+        func(path)
+    else:
+        raise
+# ---------------------------------------------------------------------
+
+
+def cleanup_checkout(mirror):
+    """Removes the temporary worktree (the mirror itself is kept for the next run)."""
+    if not os.path.exists(LOCAL_REPO_PATH):
+        return
+    print(f"Deleting temporary repo folder: {LOCAL_REPO_PATH}")
+    if mirror is not None:
+        repo_cache.remove_worktree(mirror, LOCAL_REPO_PATH)
+    else:
+        shutil.rmtree(LOCAL_REPO_PATH, onerror=on_rm_error)
+
+
+def load_source(source):
+    """Documents for one manifest source: the built-in standards text, or a file on disk."""
+    if source == DEFAULT_STANDARDS_SOURCE:
+        return [Document(page_content=DEFAULT_STANDARDS_CONTENT, metadata={"source": DEFAULT_STANDARDS_SOURCE})]
+    documents = doc_stream.load(source)  # [] for binary, generated, oversized or unreadable files
+    if not documents and source == DEFAULT_STANDARDS_FILE.replace(os.sep, "/"):
+        print("WARNING: Could not load local standards file. Using default.")
+        return load_source(DEFAULT_STANDARDS_SOURCE)
+    return documents
+
+
+def ingest_data():
+    """
+    Syncs the Pinecone index with the standard docs and the repo's default branch: only files
+    added or changed since the last run are split, embedded and uploaded, and the vectors of
+    deleted files are removed (see ingest_manifest.py). For the repo, only the paths changed
+    since the last indexed commit are checked out and compared (see index_refresh.py).
+    """
+    
+    # --- 1. Standards (Local or Default) ---
+    print("--- 1. Loading Coding Standards Context ---")
+    if os.path.exists(DEFAULT_STANDARDS_FILE):
+        print(f"Found local standards file: {DEFAULT_STANDARDS_FILE}. Loading it.")
+        standards = {DEFAULT_STANDARDS_FILE.replace(os.sep, "/"): blob_sha(DEFAULT_STANDARDS_FILE)}
+    else:
+        print("Local standards file not found. Using default internal standards.")
+        standards = {DEFAULT_STANDARDS_SOURCE: ingest_manifest.text_hash(DEFAULT_STANDARDS_CONTENT)}
+
+    # --- 2. Connect to Pinecone and Check Index ---
+    print(f"\n--- 2. Connecting to Pinecone ---")
+    print("Initializing Pinecone client...")
+    pc = Pinecone(api_key=PINECONE_API_KEY)
+
+    if PINECONE_INDEX_NAME not in pc.list_indexes().names():
+        print(f"Index '{PINECONE_INDEX_NAME}' not found. Creating new index...")
+        pc.create_index(
+            name=PINECONE_INDEX_NAME,
+            dimension=EMBEDDING_DIMENSION,
+            metric="cosine", 
+            spec=ServerlessSpec(cloud="aws", region="us-east-1"),
+        )
+        ingest_manifest.forget(PINECONE_INDEX_NAME)  # nothing recorded is in the new index
+        print("Index created.")
+    else:
+        print(f"Found existing index '{PINECONE_INDEX_NAME}'.")
+        if ingest_manifest.clear_unrecorded(PINECONE_INDEX_NAME, pc.Index(PINECONE_INDEX_NAME)):
+            print("Cleared vectors ingested before the manifest existed; re-ingesting everything once.")
+
+    # --- 3. Check out what changed in the Repo ---
+    # The bare mirror is cloned once and only fetched incrementally afterwards;
+    # LOCAL_REPO_PATH is a worktree of it holding only the files changed since the indexed commit.
+    print(f"\n--- 3. Checking Out Repository Changes ---")
+    print(f"Updating {GITHUB_REPO_URL}...")
+    if os.path.exists(LOCAL_REPO_PATH):
+        print("Deleting old temporary repo folder...")
+        shutil.rmtree(LOCAL_REPO_PATH, onerror=on_rm_error)
+        
+    plans = [ingest_manifest.plan(PINECONE_INDEX_NAME, "standards", standards, EMBEDDING_MODEL)]
+    mirror = head = None
+    try:
+        mirror = repo_cache.ensure_mirror(OWNER, REPO)
+        head, repo_changes = index_refresh.plan_repo_sync(
+            mirror, PINECONE_INDEX_NAME, index_refresh.repo_scope(OWNER, REPO), EMBEDDING_MODEL, LOCAL_REPO_PATH
+        )
+        plans.append(repo_changes)
+    except Exception as e:
+        print(f"FAILED to check out repo: {e}")
+        print("Please ensure OWNER and REPO are correct in your .env file.")
+        # If checkout fails, we still proceed with the standards (the repo's vectors are left as they are)
+
+    # --- 4. Compare with what the index already holds ---
+    print(f"\n--- 4. Syncing Pinecone ---")
+    for changes in plans:
+        print(f"  [{changes.scope}] {len(changes.changed)} new or changed, {len(changes.removed)} removed, {changes.unchanged} unchanged files")
+
+    failed = 0
+    if not any(changes.changed or changes.removed for changes in plans):
+        print("\nIndex is already up to date. Nothing to embed.")
+    else:
+        # --- 5. Split, Embed and Upload the changes ---
+        print(f"Loading embedding model: {EMBEDDING_MODEL}...")
+        generic_splitter = RecursiveCharacterTextSplitter(
+            chunk_size=1000,
+            chunk_overlap=100
+        )
+        with embed_pool.EmbeddingPool(EMBEDDING_MODEL) as pool:
+            # Chunks embedded before (by any ingest, for any repo) come from the cache
+            embeddings = embedding_cache.CachedEmbeddings(pool, EMBEDDING_MODEL)
+            vector_store = PineconeVectorStore(index_name=PINECONE_INDEX_NAME, embedding=embeddings)
+            # Upsert batches big enough to keep every embedding process busy
+            upsert_batch = max(ingest_manifest.UPSERT_BATCH, pool.workers * pool.batch_size * 4)
+            for changes in plans:
+                counts = ingest_manifest.apply(vector_store, changes, load_source, generic_splitter.split_documents, upsert_batch)
+                print(f"  [{changes.scope}] Uploaded {counts['chunks']} chunks from {counts['embedded_files']} files; "
+                      f"deleted {counts['deleted_vectors']} old vectors ({counts['deleted_files']} removed files).")
+                failed += counts["failed_files"]
+        embeddings.report()
+        print("\nIngestion complete!")
+    if head and failed:
+        # The failed files are only re-listed by a diff from the commit before them
+        print(f"⚠️ {failed} files failed to load; index left at its previous commit (will retry next run).")
+    elif head:
+        ingest_manifest.set_indexed_commit(PINECONE_INDEX_NAME, index_refresh.repo_scope(OWNER, REPO), head)
+        print(f"Index now reflects commit {head[:12]}.")
+    
+    # --- 6. Clean up ---
+    cleanup_checkout(mirror)
+    print("Done.")
+
+
+def watch(interval: float):
+    """Re-syncs every `interval` seconds, so merges reach the index shortly after they land."""
+    while True:
+        ingest_data()
+        print(f"Next refresh in {interval:g}s (Ctrl+C to stop)...")
+        time.sleep(interval)
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Sync the Pinecone index with the coding standards and the repo.")
+    arg_parser.add_argument("--watch", type=float, metavar="SECONDS",
+                            help="keep running and refresh the index every SECONDS (e.g. 30)")
+    args = arg_parser.parse_args()
+    if not all([OWNER, REPO, PINECONE_API_KEY, PINECONE_INDEX_NAME]):
+        print("Error: Missing required variables in .env file.")
+        print("Please set OWNER, REPO, PINECONE_API_KEY, and PINECONE_INDEX_NAME")
+    elif args.watch:
+        watch(args.watch)
+    else:
+        ingest_data()
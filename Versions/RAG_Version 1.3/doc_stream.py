@@ -0,0 +1,176 @@
+# doc_stream.py
+# Streaming document loading for ingestion. Every file is judged before its contents are read:
+#  - folders that never hold reviewable text are pruned from the walk (.git, node_modules, dist, ...)
+#  - by extension (images, archives, fonts, media, compiled objects, data dumps, ...)
+#  - lockfiles, minified bundles and vendored paths (diff_budget.file_kind)
+#  - by size (INGEST_MAX_FILE_BYTES)
+#  - by its first bytes: magic numbers of binary formats, NUL bytes, "@generated" / "DO NOT EDIT"
+#    headers and minified (very long) lines
+# Accepted files are read one at a time and yielded as Documents, so a splitter consumes them
+# lazily and memory stays flat however big the repo is.
+
+import os
+from typing import Dict, Iterator, List, Optional
+from langchain_core.documents import Document
+import diff_budget
+
+# ------------------------------
+# Configuration (overridable from .env)
+# ------------------------------
+MAX_FILE_BYTES = int(os.getenv("INGEST_MAX_FILE_BYTES", str(1024 * 1024)))
+# Bytes read to sniff a file's type
+HEAD_BYTES = 8192
+# Average line length (over a full head) above which a file is treated as minified
+MINIFIED_LINE_CHARS = 1000
+
+# Folders never walked into
+PRUNE_DIRS = {
+    ".git", "__pycache__", "node_modules", ".venv", "venv", ".tox", ".nox", ".mypy_cache",
+    ".pytest_cache", ".ruff_cache", ".idea", ".gradle", ".next", "site-packages", "dist", "build",
+}
+
+SKIP_EXTENSIONS = {
+    # images
+    ".png", ".jpg", ".jpeg", ".gif", ".bmp", ".ico", ".webp", ".tif", ".tiff", ".psd", ".svg",
+    # archives and packages
+    ".zip", ".tar", ".gz", ".tgz", ".bz2", ".xz", ".7z", ".rar", ".jar", ".war", ".whl", ".egg",
+    # compiled code
+    ".exe", ".dll", ".so", ".dylib", ".o", ".a", ".lib", ".pyc", ".pyo", ".pyd", ".class", ".wasm", ".bin",
+    # fonts and media
+    ".ttf", ".otf", ".woff", ".woff2", ".eot", ".mp3", ".mp4", ".wav", ".ogg", ".flac", ".avi", ".mov",
+    ".mkv", ".webm",
+    # office documents and data
+    ".pdf", ".doc", ".docx", ".xls", ".xlsx", ".ppt", ".pptx", ".sqlite", ".db", ".parquet", ".npy",
+    ".npz", ".pkl", ".pickle", ".h5", ".onnx", ".pt", ".ckpt", ".dat",
+}
+
+# Leading bytes of binary formats that may carry any (or no) extension (others are caught by NUL bytes)
+MAGIC_NUMBERS = {
+    b"\x89PNG": "png", b"\xff\xd8\xff": "jpeg", b"GIF8": "gif", b"%PDF": "pdf", b"PK\x03\x04": "zip",
+    b"\x1f\x8b": "gzip", b"\xfd7zXZ\x00": "xz", b"7z\xbc\xaf\x27\x1c": "7z", b"Rar!": "rar",
+    b"\x7fELF": "elf", b"\xca\xfe\xba\xbe": "java class", b"\xcf\xfa\xed\xfe": "mach-o", b"\x00asm": "wasm",
+    b"SQLite format 3\x00": "sqlite", b"RIFF": "riff", b"OggS": "ogg", b"wOFF": "woff", b"wOF2": "woff2",
+}
+
+# Markers of generated code, looked for in a file's first lines
+GENERATED_MARKERS = (
+    b"@generated", b"do not edit", b"code generated by", b"automatically generated by",
+    b"file is auto-generated", b"file is autogenerated", b"file was auto-generated", b"file was generated by",
+)
+GENERATED_MARKER_LINES = 5
+
+
+# ------------------------------
+# Rejection checks
+# ------------------------------
+def path_rejection(rel_path: str) -> Optional[str]:
+    """Why a file is skipped judging by its path alone, or None (no disk access)."""
+    rel = rel_path.replace(os.sep, "/")
+    parts = rel.split("/")
+    if parts[-1] == ".git":  # a worktree's link to its repository
+        return "git link"
+    if any(part in PRUNE_DIRS for part in parts[:-1]):
+        return "skipped folder"
+    if os.path.splitext(parts[-1])[1].lower() in SKIP_EXTENSIONS:
+        return "binary extension"
+    kind = diff_budget.file_kind(rel)
+    if kind in ("lockfile", "generated"):
+        return kind
+    return None
+
+
+def content_rejection(head: bytes) -> Optional[str]:
+    """Why a file is skipped judging by its first HEAD_BYTES bytes, or None."""
+    for magic, name in MAGIC_NUMBERS.items():
+        if head.startswith(magic):
+            return f"binary ({name})"
+    if b"\0" in head:
+        return "binary"
+    first_lines = b"\n".join(head.split(b"\n", GENERATED_MARKER_LINES)[:GENERATED_MARKER_LINES]).lower()
+    if any(marker in first_lines for marker in GENERATED_MARKERS):
+        return "generated"
+    if len(head) >= HEAD_BYTES and len(head) / (head.count(b"\n") + 1) > MINIFIED_LINE_CHARS:
+        return "minified"
+    return None
+
+
+def disk_rejection(path: str) -> Optional[str]:
+    """Why the file at `path` is skipped judging by its size and first bytes, or None."""
+    try:
+        if os.path.getsize(path) > MAX_FILE_BYTES:
+            return "too large"
+        with open(path, "rb") as f:
+            head = f.read(HEAD_BYTES)
+    except OSError:
+        return "unreadable"
+    return content_rejection(head)
+
+
+def file_rejection(path: str, rel_path: str) -> Optional[str]:
+    """
+    Why the file at `path` (`rel_path` inside the tree being ingested) is skipped, or None if
+    it should be ingested. Reads at most HEAD_BYTES of it, and nothing when the path decides.
+    """
+    return path_rejection(rel_path) or disk_rejection(path)
+
+
+# ------------------------------
+# Walking and loading
+# ------------------------------
+def walk(root: str, rejected: Optional[Dict[str, int]] = None) -> Iterator[str]:
+    """
+    Yields the path of every file under `root` worth ingesting, in a stable order.
+    Counts skipped files per reason into `rejected` when given.
+    """
+    for folder, dirs, files in os.walk(root):
+        dirs[:] = sorted(d for d in dirs if d not in PRUNE_DIRS)
+        for name in sorted(files):
+            path = os.path.join(folder, name)
+            reason = file_rejection(path, os.path.relpath(path, root))
+            if reason is None:
+                yield path
+            elif rejected is not None:
+                rejected[reason] = rejected.get(reason, 0) + 1
+
+
+def read_text(path: str) -> str:
+    with open(path, "rb") as f:
+        data = f.read(MAX_FILE_BYTES + 1)
+    try:
+        return data.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        return data.decode("latin-1")
+
+
+def load(path: str, source: Optional[str] = None) -> List[Document]:
+    """
+    The file as one Document (metadata source = `source`, default `path`), or [] when its size
+    or contents get it rejected (binary, generated, too large, ...) or it is unreadable.
+    Path checks are the caller's (walk() has made them for the paths it yields).
+    """
+    if disk_rejection(path) is not None:
+        return []
+    try:
+        text = read_text(path)
+    except OSError:
+        return []
+    return [Document(page_content=text, metadata={"source": source or path})]
+
+
+def stream_documents(root: str, rejected: Optional[Dict[str, int]] = None) -> Iterator[Document]:
+    """Lazily loads every accepted file under `root`, one Document at a time."""
+    for path in walk(root, rejected):
+        yield from load(path, path.replace(os.sep, "/"))
+
+
+def split_stream(documents, splitter) -> Iterator[Document]:
+    """Chunks documents as they arrive, so only one file's text is held at a time."""
+    for document in documents:
+        yield from splitter.split_documents([document])
+
+
+def describe(rejected: Dict[str, int]) -> str:
+    """'12 files skipped (binary extension: 9, too large: 3)'."""
+    total = sum(rejected.values())
+    reasons = ", ".join(f"{reason}: {count}" for reason, count in sorted(rejected.items(), key=lambda kv: -kv[1]))
+    return f"{total} files skipped ({reasons})" if total else "no files skipped"
@@ -0,0 +1,160 @@
+# embed_pool.py
+# CPU-parallel embeddings for ingestion.
+# HuggingFaceEmbeddings encodes every chunk on one core, in arrival order, so short chunks are
+# padded up to the longest chunk of their batch. Here chunks are:
+#  - read from a stream a window at a time (EMBED_WINDOW chunks, so memory stays bounded)
+#  - sorted by length within the window and cut into EMBED_BATCH_SIZE batches (little padding)
+#  - encoded by a pool of EMBED_WORKERS processes, each loading the model once
+# and the vectors come back in input order, identical to HuggingFaceEmbeddings' ones.
+# EmbeddingPool is a LangChain Embeddings, so vector stores take it in place of
+# HuggingFaceEmbeddings; report() prints the chunks/sec it reached.
+
+import os
+import time
+import multiprocessing
+from typing import Callable, Iterable, Iterator, List, Optional
+from langchain_core.embeddings import Embeddings
+
+# ------------------------------
+# Configuration (overridable from .env)
+# ------------------------------
+# Encoding processes (0 = one per CPU core)
+EMBED_WORKERS = int(os.getenv("EMBED_WORKERS", "0")) or (os.cpu_count() or 1)
+# Chunks per model call
+EMBED_BATCH_SIZE = int(os.getenv("EMBED_BATCH_SIZE", "32"))
+# Chunks taken from the stream and length-sorted together
+EMBED_WINDOW = int(os.getenv("EMBED_WINDOW", "2048"))
+# "spawn" keeps torch's thread pools out of the children (forking them can deadlock)
+EMBED_START_METHOD = os.getenv("EMBED_START_METHOD", "spawn")
+
+# --- Cached Globals (one model per worker process) ---
+_model = None
+
+
+# ------------------------------
+# Model loading and encoding
+# ------------------------------
+def load_sentence_transformer(model_name: str, threads: int):
+    """The model HuggingFaceEmbeddings would load, on CPU, using `threads` torch threads."""
+    import torch
+    from sentence_transformers import SentenceTransformer
+    torch.set_num_threads(threads)
+    return SentenceTransformer(model_name, device="cpu")
+
+
+def _init_worker(loader: Callable, model_name: str, threads: int):
+    global _model
+    _model = loader(model_name, threads)
+
+
+def _encode(batch: tuple) -> tuple:
+    """(batch number, texts) -> (batch number, vectors), with the process's model."""
+    number, texts = batch
+    return number, _model.encode(texts, batch_size=len(texts), show_progress_bar=False).tolist()
+
+
+def length_sorted_batches(texts: List[str], batch_size: int) -> List[List[int]]:
+    """Positions of `texts` grouped into batches of similar length, longest batch first."""
+    order = sorted(range(len(texts)), key=lambda i: len(texts[i]), reverse=True)
+    return [order[start:start + batch_size] for start in range(0, len(order), batch_size)]
+
+
+# ------------------------------
+# Pool
+# ------------------------------
+class EmbeddingPool(Embeddings):
+    """
+    Embeds chunks with `model_name` across `workers` processes. Use it as a context manager
+    (or call close()) so the worker processes exit.
+    `loader(model_name, threads)` must be a module-level function (it is sent to the workers).
+    """
+
+    def __init__(self, model_name: str, workers: Optional[int] = None, batch_size: Optional[int] = None,
+                 window: Optional[int] = None, loader: Callable = load_sentence_transformer):
+        self.model_name = model_name
+        self.workers = max(1, workers or EMBED_WORKERS)
+        self.batch_size = max(1, batch_size or EMBED_BATCH_SIZE)
+        self.window = max(1, window or EMBED_WINDOW)
+        self.loader = loader
+        self.chunks = 0
+        self.seconds = 0.0
+        self._pool = None
+        self._local_ready = False
+
+    def _local(self):
+        # Loaded in this process first: single batches and queries skip the pool, and the
+        # model is downloaded once instead of by every worker at the same time
+        if not self._local_ready:
+            _init_worker(self.loader, self.model_name, os.cpu_count() or 1)
+            self._local_ready = True
+
+    def _start(self):
+        if self._pool is None:
+            self._local()
+            threads = max(1, (os.cpu_count() or 1) // self.workers)
+            print(f"Starting {self.workers} embedding processes ({threads} threads each)...")
+            context = multiprocessing.get_context(EMBED_START_METHOD)
+            self._pool = context.Pool(self.workers, initializer=_init_worker,
+                                      initargs=(self.loader, self.model_name, threads))
+        return self._pool
+
+    def _embed_window(self, texts: List[str]) -> List[List[float]]:
+        started = time.perf_counter()
+        # HuggingFaceEmbeddings does the same, so queries embedded by it still match
+        texts = [text.replace("\n", " ") for text in texts]
+        batches = length_sorted_batches(texts, self.batch_size)
+        work = [(number, [texts[i] for i in batch]) for number, batch in enumerate(batches)]
+        if self.workers == 1 or len(work) == 1:
+            self._local()
+            results = map(_encode, work)
+        else:
+            results = self._start().imap_unordered(_encode, work)
+        vectors: List[Optional[List[float]]] = [None] * len(texts)
+        for number, batch_vectors in results:
+            for i, vector in zip(batches[number], batch_vectors):
+                vectors[i] = vector
+        self.chunks += len(texts)
+        self.seconds += time.perf_counter() - started
+        return vectors
+
+    def embed_stream(self, texts: Iterable[str]) -> Iterator[List[float]]:
+        """Vectors for a (possibly lazy) stream of chunks, in the same order."""
+        window = []
+        for text in texts:
+            window.append(text)
+            if len(window) >= self.window:
+                yield from self._embed_window(window)
+                window = []
+        if window:
+            yield from self._embed_window(window)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return list(self.embed_stream(texts))
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
+
+    def throughput(self) -> float:
+        """Chunks embedded per second of embedding time so far."""
+        return self.chunks / self.seconds if self.seconds else 0.0
+
+    def report(self):
+        if self.chunks:
+            print(f"⚡ Embedded {self.chunks} chunks in {self.seconds:.1f}s "
+                  f"({self.throughput():.1f} chunks/sec on {self.workers} {'process' if self.workers == 1 else 'processes'})")
+
+    def close(self, terminate: bool = False):
+        if self._pool is not None:
+            if terminate:
+                self._pool.terminate()
+            else:
+                self._pool.close()
+            self._pool.join()
+            self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close(terminate=exc_type is not None)
+        self.report()
@@ -0,0 +1,197 @@
+# embedding_cache.py
+# Content-addressed embedding cache: chunk vectors keyed by (model, hash of the normalized chunk
+# text), stored in SQLite with least-recently-used eviction beyond a size limit.
+# Boilerplate that every repo shares (license headers, vendored files, the default coding
+# standards) is then embedded once, not on every ingest of every repo.
+# The default path is per user, so every ingest script and index builder shares one cache.
+
+import os
+import time
+import sqlite3
+import hashlib
+import threading
+from array import array
+from typing import Dict, List, Optional
+from langchain_core.embeddings import Embeddings
+
+# ------------------------------
+# Configuration (overridable from .env)
+# ------------------------------
+CACHE_PATH = os.getenv("EMBEDDING_CACHE_PATH", os.path.join(os.path.expanduser("~"), ".cache", "pull_panda", "embeddings.sqlite"))
+MAX_BYTES = int(os.getenv("EMBEDDING_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+ENABLED = os.getenv("EMBEDDING_CACHE", "1") == "1"
+# Keys per SQLite query (stays under the host-parameter limit)
+LOOKUP_BATCH = 500
+
+# --- Cached Globals ---
+_conn: Optional[sqlite3.Connection] = None
+_conn_path: Optional[str] = None
+_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS embeddings (
+    key TEXT PRIMARY KEY,
+    model TEXT NOT NULL,
+    vector BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    last_used REAL NOT NULL
+)
+"""
+
+
+# ------------------------------
+# Key helpers
+# ------------------------------
+def model_key(model_name: str) -> str:
+    """'sentence-transformers/all-MiniLM-L6-v2' and 'all-MiniLM-L6-v2' are the same model."""
+    return model_name.split("sentence-transformers/", 1)[-1]
+
+
+def normalize(text: str) -> str:
+    """
+    Collapses whitespace runs (newlines included). The model's tokenizer splits on whitespace,
+    so chunks differing only in indentation or line endings get the same vector.
+    """
+    return " ".join(text.split())
+
+
+def _key(model: str, text: str) -> str:
+    return hashlib.sha1(f"{model_key(model)}\0{normalize(text)}".encode("utf-8")).hexdigest()
+
+
+# ------------------------------
+# Storage
+# ------------------------------
+def _connect() -> sqlite3.Connection:
+    global _conn, _conn_path
+    if _conn is None or _conn_path != CACHE_PATH:
+        if _conn is not None:
+            _conn.close()
+        os.makedirs(os.path.dirname(os.path.abspath(CACHE_PATH)), exist_ok=True)
+        # Several ingest processes may share the file
+        _conn = sqlite3.connect(CACHE_PATH, timeout=30, check_same_thread=False)
+        _conn.execute(SCHEMA)
+        _conn.commit()
+        _conn_path = CACHE_PATH
+    return _conn
+
+
+def lookup(model: str, texts: List[str]) -> List[Optional[List[float]]]:
+    """The cached vector for each text, or None on a miss."""
+    keys = [_key(model, text) for text in texts]
+    found: Dict[str, List[float]] = {}
+    with _lock:
+        conn = _connect()
+        unique = list(dict.fromkeys(keys))
+        for start in range(0, len(unique), LOOKUP_BATCH):
+            part = unique[start:start + LOOKUP_BATCH]
+            rows = conn.execute(
+                f"SELECT key, vector FROM embeddings WHERE key IN ({','.join('?' * len(part))})", part
+            ).fetchall()
+            found.update((key, array("f", blob).tolist()) for key, blob in rows)
+        if found:
+            now = time.time()
+            conn.executemany("UPDATE embeddings SET last_used = ? WHERE key = ?", [(now, key) for key in found])
+            conn.commit()
+        vectors = [found.get(key) for key in keys]
+        hits = sum(1 for v in vectors if v is not None)
+        _stats["hits"] += hits
+        _stats["misses"] += len(vectors) - hits
+    return vectors
+
+
+def store(model: str, texts: List[str], vectors: List[List[float]]):
+    """Saves one vector per text, then evicts least-recently-used rows beyond MAX_BYTES."""
+    now = time.time()
+    rows = []
+    for text, vector in zip(texts, vectors):
+        blob = array("f", vector).tobytes()
+        rows.append((_key(model, text), model_key(model), blob, len(blob), now))
+    with _lock:
+        conn = _connect()
+        conn.executemany("INSERT OR REPLACE INTO embeddings VALUES (?, ?, ?, ?, ?)", rows)
+        _evict(conn, MAX_BYTES)
+        conn.commit()
+
+
+def _evict(conn: sqlite3.Connection, max_bytes: int):
+    total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM embeddings").fetchone()[0]
+    if total <= max_bytes:
+        return
+    # Drop down to 90% so a full cache doesn't evict on every store
+    target = max_bytes * 0.9
+    for key, size in conn.execute("SELECT key, size FROM embeddings ORDER BY last_used").fetchall():
+        if total <= target:
+            break
+        conn.execute("DELETE FROM embeddings WHERE key = ?", (key,))
+        total -= size
+
+
+def size() -> int:
+    """Total bytes of cached vectors."""
+    with _lock:
+        return _connect().execute("SELECT COALESCE(SUM(size), 0) FROM embeddings").fetchone()[0]
+
+
+def stats() -> dict:
+    """Returns a copy of the hit/miss counters for this process."""
+    with _lock:
+        return dict(_stats)
+
+
+def reset_stats():
+    with _lock:
+        for k in _stats:
+            _stats[k] = 0
+
+
+def clear():
+    """Drops every cached vector and resets the counters."""
+    with _lock:
+        conn = _connect()
+        conn.execute("DELETE FROM embeddings")
+        conn.commit()
+    reset_stats()
+
+
+# ------------------------------
+# LangChain wrapper
+# ------------------------------
+class CachedEmbeddings(Embeddings):
+    """
+    Wraps another Embeddings (HuggingFaceEmbeddings, embed_pool.EmbeddingPool, ...) made with
+    `model_name`: documents are looked up in the cache first, and only the misses (each distinct
+    text once) reach the model. Queries are passed straight through.
+    """
+
+    def __init__(self, embeddings: Embeddings, model_name: str):
+        self.embeddings = embeddings
+        self.model_name = model_name
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        if not ENABLED:
+            return self.embeddings.embed_documents(texts)
+        vectors = lookup(self.model_name, texts)
+        missing: Dict[str, List[int]] = {}
+        for i, vector in enumerate(vectors):
+            if vector is None:
+                missing.setdefault(normalize(texts[i]), []).append(i)
+        if missing:
+            firsts = [texts[positions[0]] for positions in missing.values()]
+            fresh = self.embeddings.embed_documents(firsts)
+            store(self.model_name, firsts, fresh)
+            for positions, vector in zip(missing.values(), fresh):
+                for i in positions:
+                    vectors[i] = vector
+        return vectors
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embeddings.embed_query(text)
+
+    def report(self):
+        counts = stats()
+        total = counts["hits"] + counts["misses"]
+        if total:
+            print(f"🗃️ Embedding cache: {counts['hits']}/{total} chunks reused "
+                  f"({counts['hits'] / total:.0%}), {size() / (1024 * 1024):.1f} MiB cached")
@@ -0,0 +1,275 @@
+# findings.py
+# Structured static-analysis findings: one record type parsed from every analyzer's output,
+# de-duplicated across tools and rendered to prompt text (errors first) only when needed
+
+import os
+import re
+import json
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+
+class Finding(NamedTuple):
+    file: str
+    line: int       # 0 when the tool reports on the whole file
+    rule: str
+    severity: str   # "error" | "warning" | "info"
+    message: str
+    tool: str       # analyzer name(s), e.g. "Pylint" or "Pylint+Flake8" after dedup
+
+
+SEVERITY_RANK = {"error": 0, "warning": 1, "info": 2}
+
+# Rules several tools report under different ids; findings on the same line with the
+# same canonical rule are merged into one
+RULE_ALIASES = {
+    "unused-import": "unused-import", "W0611": "unused-import", "F401": "unused-import",
+    "unused-variable": "unused-variable", "W0612": "unused-variable", "F841": "unused-variable",
+    "undefined-variable": "undefined-name", "E0602": "undefined-name", "F821": "undefined-name", "name-defined": "undefined-name",
+    "line-too-long": "line-too-long", "C0301": "line-too-long", "E501": "line-too-long",
+    "bare-except": "bare-except", "W0702": "bare-except", "E722": "bare-except",
+    "trailing-whitespace": "trailing-whitespace", "C0303": "trailing-whitespace", "W291": "trailing-whitespace",
+    "syntax-error": "syntax-error", "E0001": "syntax-error", "E999": "syntax-error", "syntax": "syntax-error",
+    "dangerous-default-value": "dangerous-default-value", "W0102": "dangerous-default-value", "B006": "dangerous-default-value",
+    "broad-exception-caught": "broad-exception-caught", "W0718": "broad-exception-caught", "broad-except": "broad-exception-caught", "W0703": "broad-exception-caught",
+    "missing-type-hints": "missing-type-hints", "no-untyped-def": "missing-type-hints",
+}
+
+
+def tool_name(analyzer: str) -> str:
+    """'🧩 Pylint' -> 'Pylint'"""
+    return analyzer.split()[-1]
+
+
+def _relpath(path: str, root: str) -> str:
+    if os.path.isabs(path):
+        path = os.path.relpath(path, os.path.abspath(root))
+    path = path.replace(os.sep, "/")
+    return path[2:] if path.startswith("./") else path
+
+
+# ------------------------------
+# Parsers (one per analyzer output format)
+# ------------------------------
+PYLINT_SEVERITY = {"fatal": "error", "error": "error", "warning": "warning"}
+BANDIT_SEVERITY = {"HIGH": "error", "MEDIUM": "warning"}
+ESLINT_SEVERITY = {2: "error", 1: "warning"}
+
+FLAKE8_LINE = re.compile(r"^(?P<path>.+?):(?P<line>\d+):\d+: (?P<rule>[A-Z]+\d+) (?P<msg>.*)$")
+MYPY_LINE = re.compile(r"^(?P<path>.+?):(?P<line>\d+)(?::\d+)?: (?P<sev>error|warning|note): (?P<msg>.*?)(?:  \[(?P<rule>[\w-]+)\])?$")
+GENERIC_LINE = re.compile(
+    r"^(?:\[(?P<level>\w+)\]\s+)?(?P<path>[^:\s][^:]*?):(?P<line>\d+)(?::\d+)?:\s*"
+    r"(?:(?P<sev>error|warning|note|style|performance|portability|information|info):\s*)?"
+    r"(?P<msg>.*?)\s*(?:\[(?P<rule>[\w.\-/]+)\]|\((?P<rule2>[A-Z]+\d+)\))?$"
+)
+
+
+def _parse_pylint(stdout: str, root: str, tool: str) -> List[Finding]:
+    return [
+        Finding(_relpath(m["path"], root), m["line"] or 0, m["symbol"], PYLINT_SEVERITY.get(m["type"], "info"),
+                m["message"], tool)
+        for m in json.loads(stdout or "[]")
+    ]
+
+
+def _parse_bandit(stdout: str, root: str, tool: str) -> List[Finding]:
+    return [
+        Finding(_relpath(r["filename"], root), r["line_number"], r["test_id"], BANDIT_SEVERITY.get(r["issue_severity"], "info"),
+                r["issue_text"], tool)
+        for r in json.loads(stdout)["results"]
+    ]
+
+
+def _parse_eslint(stdout: str, root: str, tool: str) -> List[Finding]:
+    return [
+        Finding(_relpath(f["filePath"], root), m.get("line") or 0, m.get("ruleId") or "", ESLINT_SEVERITY.get(m.get("severity"), "info"),
+                m["message"], tool)
+        for f in json.loads(stdout)
+        for m in f["messages"]
+    ]
+
+
+def _flake8_severity(code: str) -> str:
+    if code.startswith("E9") or code.startswith("F82") or code.startswith("F63") or code.startswith("F7"):
+        return "error"  # syntax errors, undefined names, invalid comparisons/statements
+    if code.startswith("F") or code.startswith("B"):
+        return "warning"
+    return "info"  # pycodestyle E/W, complexity C
+
+
+def _parse_flake8(stdout: str, root: str, tool: str) -> List[Finding]:
+    found = []
+    for line in stdout.splitlines():
+        m = FLAKE8_LINE.match(line)
+        if m:
+            found.append(Finding(_relpath(m["path"], root), int(m["line"]), m["rule"], _flake8_severity(m["rule"]), m["msg"], tool))
+    return found
+
+
+def _parse_mypy(stdout: str, root: str, tool: str) -> List[Finding]:
+    found = []
+    for line in stdout.splitlines():
+        m = MYPY_LINE.match(line)
+        if m:
+            severity = "info" if m["sev"] == "note" else m["sev"]
+            found.append(Finding(_relpath(m["path"], root), int(m["line"]), m["rule"] or "", severity, m["msg"], tool))
+    return found
+
+
+def _parse_generic(stdout: str, root: str, tool: str) -> List[Finding]:
+    """`path:line[:col]: [severity:] message [rule]` (Cppcheck template, Staticcheck, Checkstyle)."""
+    found = []
+    for line in stdout.splitlines():
+        m = GENERIC_LINE.match(line.strip())
+        if not m:
+            continue
+        level = (m["sev"] or m["level"] or "warning").lower()
+        severity = "error" if level in ("error", "fatal") else "info" if level in ("note", "style", "info", "information") else "warning"
+        found.append(Finding(_relpath(m["path"], root), int(m["line"]), m["rule"] or m["rule2"] or "", severity, m["msg"], tool))
+    return found
+
+
+# JSON formatters raise ValueError/KeyError on anything but a clean report (e.g. a crash message)
+PARSERS = {
+    "Pylint": _parse_pylint,
+    "Bandit": _parse_bandit,
+    "ESLint": _parse_eslint,
+    "Flake8": _parse_flake8,
+    "Mypy": _parse_mypy,
+}
+JSON_TOOLS = {"Pylint", "Bandit", "ESLint"}
+
+
+def parse_output(analyzer: str, stdout: str, returncode: int, root: str) -> Optional[List[Finding]]:
+    """
+    Parses one analyzer run into findings.
+    Returns None when the output is not a report (tool crashed, bad config, ...),
+    so the caller can surface the raw text instead.
+    """
+    tool = tool_name(analyzer)
+    parser = PARSERS.get(tool, _parse_generic)
+    try:
+        found = parser(stdout, root, tool)
+    except (ValueError, KeyError, TypeError):
+        return None
+    if tool not in JSON_TOOLS and not found and returncode != 0:
+        return None  # a text tool that failed without reporting anything
+    return found
+
+
+# ------------------------------
+# Post-processing
+# ------------------------------
+def dedup(findings: Iterable[Finding]) -> List[Finding]:
+    """Merges findings several tools report for the same line and rule; keeps the highest severity."""
+    merged: Dict[Tuple[str, int, str], Finding] = {}
+    for f in findings:
+        key = (f.file, f.line, RULE_ALIASES.get(f.rule, f"{f.tool}:{f.rule}:{f.message}"))
+        seen = merged.get(key)
+        if seen is None:
+            merged[key] = f
+            continue
+        best = f if SEVERITY_RANK[f.severity] < SEVERITY_RANK[seen.severity] else seen
+        tools = seen.tool if f.tool in seen.tool.split("+") else f"{seen.tool}+{f.tool}"
+        merged[key] = best._replace(tool=tools)
+    return list(merged.values())
+
+
+def to_rows(findings: Iterable[Finding]) -> List[list]:
+    """Compact per-file form for caches: [line, rule, severity, message] (file/tool are implied by the key)."""
+    return [[f.line, f.rule, f.severity, f.message] for f in findings]
+
+
+def from_rows(rows: Iterable[list], file: str, tool: str) -> List[Finding]:
+    return [Finding(file, line, rule, severity, message, tool) for line, rule, severity, message in rows]
+
+
+# ------------------------------
+# Reports
+# ------------------------------
+def new_report() -> dict:
+    """
+    Structured static-analysis result:
+      sections - [{"language", "files", "analyzers"}] in analysis order
+      findings - de-duplicated Finding records
+      notes     - tool problems (not installed, timed out, crashed) as text
+      hidden    - findings dropped because they are away from the changed lines
+      plan      - analysis_planner decisions (which analyzers ran, which were deferred, and why)
+      completed - external analyzers that ran to completion (or were fully served from cache)
+    """
+    return {"sections": [], "findings": [], "notes": [], "hidden": 0, "plan": [], "completed": []}
+
+
+def report_to_dict(report: dict) -> dict:
+    """JSON-ready copy of a report, findings as compact arrays."""
+    return dict(report, findings=[list(f) for f in report["findings"]])
+
+
+def report_to_json(report: dict) -> str:
+    """Compact JSON for logs and result files."""
+    return json.dumps(report_to_dict(report), ensure_ascii=False, separators=(",", ":"))
+
+
+def report_from_json(text: str) -> dict:
+    data = json.loads(text)
+    data["findings"] = [Finding(*f) for f in data["findings"]]
+    return data
+
+
+def format_finding(f: Finding) -> str:
+    location = f"{f.file}:{f.line}" if f.line else f.file
+    rule = f" {f.rule}" if f.rule else ""
+    return f"{location} [{f.severity}]{rule}: {f.message} ({f.tool})"
+
+
+def render_report(report: dict, max_chars: Optional[int] = None) -> str:
+    """
+    Renders a report as prompt text. Section headers and tool notes come first, then findings
+    ranked error > warning > info; with `max_chars`, the lowest-ranked findings are cut first
+    and summarized in a final line.
+    """
+    head = [
+        f"=== 🔍 Targeted Static Analysis for {s['language'].upper()} ({s['files']} files changed)"
+        + (f": {', '.join(s['analyzers'])} ===" if s["analyzers"] else " ===")
+        for s in report["sections"]
+    ]
+    head.extend(report["notes"])
+
+    file_order = {}
+    for f in report["findings"]:
+        file_order.setdefault(f.file, len(file_order))
+    ranked = sorted(report["findings"], key=lambda f: (SEVERITY_RANK[f.severity], file_order[f.file], f.line))
+
+    hidden = report["hidden"]
+    if not ranked:
+        completed = report.get("completed", [])
+        if hidden:
+            head.append(f"No issues on the changed lines ({hidden} findings elsewhere in the changed files omitted).")
+        elif report["sections"] and not completed:
+            # Every analyzer failed, timed out, was missing or deferred: silence is not a clean result
+            head.append("⚠️ Static analysis incomplete: no analyzer ran to completion, so the absence of findings proves nothing.")
+        elif report["sections"] and report["notes"]:
+            head.append(f"No issues found by {', '.join(completed)}; static analysis was incomplete (see the notes above).")
+        elif report["sections"]:
+            head.append("No issues found.")
+        return "\n".join(head)
+
+    omitted = f" ({hidden} findings outside the changed lines omitted)" if hidden else ""
+    head.append(f"Findings, most severe first{omitted}:")
+    text = "\n".join(head)
+    if max_chars is not None and len(text) > max_chars:
+        text = text[:max_chars]
+
+    lines = []
+    used = len(text)
+    footer_room = 80  # room for the "... N more findings" line
+    for i, f in enumerate(ranked):
+        line = format_finding(f)
+        last = i == len(ranked) - 1
+        if max_chars is not None and used + 1 + len(line) > max_chars - (0 if last else footer_room):
+            rest = ranked[i:]
+            counts = {sev: sum(1 for r in rest if r.severity == sev) for sev in SEVERITY_RANK}
+            lines.append(f"... {len(rest)} more findings omitted ({counts['error']} errors, {counts['warning']} warnings, {counts['info']} info)")
+            break
+        lines.append(line)
+        used += 1 + len(line)
+    return "\n".join([text] + lines)
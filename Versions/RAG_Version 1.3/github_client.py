@@ -0,0 +1,339 @@
+# github_client.py
+# Shared GitHub HTTP client: one pooled keep-alive Session for every fetch/post helper
+
+import os
+import time
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from typing import Dict, Iterable, Optional, Tuple
+
+# ------------------------------
+# Configuration (overridable from .env)
+# ------------------------------
+GITHUB_API_URL = "https://api.github.com"
+
+POOL_SIZE = int(os.getenv("GITHUB_POOL_SIZE", "10"))
+CONNECT_TIMEOUT = float(os.getenv("GITHUB_CONNECT_TIMEOUT", "5"))
+READ_TIMEOUT = float(os.getenv("GITHUB_READ_TIMEOUT", "30"))
+
+# Rate limiting: sustained request rate/burst (secondary limit), quota kept back for interactive reviews
+RATE_PER_SEC = float(os.getenv("GITHUB_RATE_PER_SEC", "10"))
+RATE_BURST = int(os.getenv("GITHUB_RATE_BURST", "20"))
+INTERACTIVE_RESERVE = int(os.getenv("GITHUB_INTERACTIVE_RESERVE", "100"))
+SECONDARY_BACKOFF = 60.0  # GitHub asks for at least a minute when no Retry-After is sent
+MAX_RETRIES = 2
+MAX_RETRY_WAIT = 120.0  # longer waits are not retried inline; the response is returned to the caller
+
+PRIORITY_INTERACTIVE = 0  # single-PR reviews, comment posting
+PRIORITY_BULK = 1         # multi-PR runs, repository ingestion
+
+GRAPHQL_BATCH_SIZE = 100  # PRs per GraphQL query (aliases per request)
+
+DEFAULT_HEADERS = {
+    "User-Agent": "PULL-PANDA",
+    "Accept-Encoding": "gzip, deflate",
+    "Connection": "keep-alive",
+}
+
+# ------------------------------
+# Rate limiter
+# ------------------------------
+class RateLimiter:
+    """
+    Paces GitHub API calls from every thread in the process.
+
+    - Secondary (burst) limit: token bucket refilled at RATE_PER_SEC, up to RATE_BURST.
+    - Primary limits: tracked from X-RateLimit-Remaining / X-RateLimit-Reset separately for each
+      X-RateLimit-Resource (core REST, graphql points, search, ...), and each request is paced
+      against its own bucket. Bulk callers stop at INTERACTIVE_RESERVE; interactive callers may spend it.
+    - Retry-After / secondary-limit 403/429 pause everyone until the window passes.
+    - Bulk callers also yield while an interactive caller is waiting.
+    """
+
+    def __init__(self, rate: float = RATE_PER_SEC, burst: int = RATE_BURST, reserve: int = INTERACTIVE_RESERVE):
+        self.rate = rate
+        self.burst = burst
+        self.reserve = reserve
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.remaining: Dict[str, int] = {}   # resource -> primary quota left, once a response has told us
+        self.reset_at: Dict[str, float] = {}  # resource -> epoch seconds when its quota resets
+        self.blocked_until = 0.0              # monotonic time before which nobody may send
+        self.interactive_waiting = 0
+        self._cond = threading.Condition()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def _delay(self, priority: int, now: float, resource: str = "core") -> float:
+        """Seconds the caller still has to wait; 0 means it may send now."""
+        if now < self.blocked_until:
+            return self.blocked_until - now
+        remaining = self.remaining.get(resource)
+        if remaining is not None:
+            floor = 0 if priority == PRIORITY_INTERACTIVE else self.reserve
+            if remaining <= floor:
+                wait = self.reset_at.get(resource, 0.0) - time.time()
+                if wait > 0:
+                    return wait
+                del self.remaining[resource]  # the window has rolled over
+        if priority != PRIORITY_INTERACTIVE and self.interactive_waiting:
+            return 1.0 / self.rate
+        if self.tokens < 1:
+            return (1 - self.tokens) / self.rate
+        return 0.0
+
+    def acquire(self, priority: int = PRIORITY_INTERACTIVE, resource: str = "core"):
+        """Blocks until a request of this priority may be sent against `resource`, then spends one token."""
+        with self._cond:
+            if priority == PRIORITY_INTERACTIVE:
+                self.interactive_waiting += 1
+            try:
+                while True:
+                    now = time.monotonic()
+                    self._refill(now)
+                    delay = self._delay(priority, now, resource)
+                    if delay <= 0:
+                        self.tokens -= 1
+                        if resource in self.remaining:
+                            self.remaining[resource] -= 1
+                        return
+                    if delay > 1:
+                        print(f"⏳ Waiting {delay:.0f}s for the GitHub rate limit ({resource})...")
+                    self._cond.wait(timeout=delay)
+            finally:
+                if priority == PRIORITY_INTERACTIVE:
+                    self.interactive_waiting -= 1
+                    self._cond.notify_all()
+
+    def update(self, response: requests.Response, resource: str = "core") -> float:
+        """
+        Reads the rate-limit headers of a response into the bucket they report on
+        (X-RateLimit-Resource, else `resource`, the bucket the request was paced against).
+        Returns how many seconds to back off if the request was throttled, else 0.
+        """
+        headers = response.headers
+        resource = headers.get("X-RateLimit-Resource", resource)
+        with self._cond:
+            if "X-RateLimit-Remaining" in headers:
+                self.remaining[resource] = int(headers["X-RateLimit-Remaining"])
+            if "X-RateLimit-Reset" in headers:
+                self.reset_at[resource] = float(headers["X-RateLimit-Reset"])
+
+            backoff = 0.0
+            block_everyone = False
+            if response.status_code in (403, 429):
+                retry_after = headers.get("Retry-After")
+                if retry_after:
+                    backoff, block_everyone = float(retry_after), True
+                elif self.remaining.get(resource) == 0:
+                    # Only this bucket is spent; _delay() holds its requests until the reset
+                    backoff = max(0.0, self.reset_at.get(resource, 0.0) - time.time())
+                elif response.status_code == 429 or "rate limit" in response.text.lower():
+                    backoff, block_everyone = SECONDARY_BACKOFF, True
+                # otherwise: a real permission error, not throttling
+
+            if block_everyone:
+                self.blocked_until = max(self.blocked_until, time.monotonic() + backoff)
+                self._cond.notify_all()
+            return backoff
+
+    def status(self, resource: str = "core") -> dict:
+        with self._cond:
+            return {
+                "remaining": self.remaining.get(resource),
+                "reset_at": self.reset_at.get(resource, 0.0),
+                "tokens": round(self.tokens, 2),
+                "blocked_for": round(max(0.0, self.blocked_until - time.monotonic()), 2),
+            }
+
+
+# --- Cached Globals ---
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+_pool_size = POOL_SIZE
+_timeout: Tuple[float, float] = (CONNECT_TIMEOUT, READ_TIMEOUT)
+limiter = RateLimiter()
+
+
+# ------------------------------
+# Session management
+# ------------------------------
+def build_session(pool_size: int = POOL_SIZE) -> requests.Session:
+    """
+    Creates a Session whose connection pool keeps TLS connections to
+    api.github.com (and the diff CDN) alive between calls.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update(DEFAULT_HEADERS)
+    return session
+
+
+def get_session() -> requests.Session:
+    """Returns the process-wide Session, creating it on first use."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = build_session(_pool_size)
+    return _session
+
+
+def configure(pool_size: Optional[int] = None, connect_timeout: Optional[float] = None, read_timeout: Optional[float] = None):
+    """
+    Changes pool size and/or timeouts. The current Session is closed and a
+    new one is built lazily on the next request.
+    """
+    global _pool_size, _timeout
+    if pool_size is not None:
+        _pool_size = pool_size
+    if connect_timeout is not None or read_timeout is not None:
+        _timeout = (
+            connect_timeout if connect_timeout is not None else _timeout[0],
+            read_timeout if read_timeout is not None else _timeout[1],
+        )
+    close()
+
+
+def close():
+    """Closes the shared Session and drops its pooled connections."""
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+            _session = None
+
+
+# ------------------------------
+# Request helpers
+# ------------------------------
+def auth_headers(token: Optional[str] = None, accept: Optional[str] = None) -> dict:
+    """Builds the Authorization/Accept headers used by the GitHub REST API."""
+    headers = {}
+    if token:
+        headers["Authorization"] = f"token {token}"
+    if accept:
+        headers["Accept"] = accept
+    return headers
+
+
+def resource_for(url: str) -> str:
+    """The rate-limit bucket (X-RateLimit-Resource) GitHub counts a request to this API URL against."""
+    path = "/" + url[len(GITHUB_API_URL):].lstrip("/")
+    if path.startswith("/graphql"):
+        return "graphql"
+    if path.startswith("/search/code"):
+        return "code_search"
+    if path.startswith("/search/"):
+        return "search"
+    return "core"
+
+
+def request(method: str, url: str, token: Optional[str] = None, accept: Optional[str] = None, headers: Optional[dict] = None, timeout=None, priority: int = PRIORITY_INTERACTIVE, **kwargs) -> requests.Response:
+    """
+    Sends a request through the shared Session.
+    `url` may be absolute or a path relative to the GitHub API root.
+    API calls are paced by the shared RateLimiter and retried when throttled;
+    `priority` is PRIORITY_INTERACTIVE or PRIORITY_BULK.
+    """
+    if not url.startswith("http"):
+        url = f"{GITHUB_API_URL}/{url.lstrip('/')}"
+    merged = auth_headers(token, accept)
+    if headers:
+        merged.update(headers)
+
+    if not url.startswith(GITHUB_API_URL):
+        # raw/CDN downloads are not counted against the API quota
+        return get_session().request(method, url, headers=merged, timeout=timeout or _timeout, **kwargs)
+
+    resource = resource_for(url)
+    for attempt in range(MAX_RETRIES + 1):
+        limiter.acquire(priority, resource)
+        resp = get_session().request(method, url, headers=merged, timeout=timeout or _timeout, **kwargs)
+        backoff = limiter.update(resp, resource)
+        if not backoff or attempt == MAX_RETRIES or backoff > MAX_RETRY_WAIT:
+            return resp
+        print(f"⚠️ GitHub rate limit hit ({resp.status_code}), retrying in {backoff:.0f}s...")
+    return resp
+
+
+def get(url: str, **kwargs) -> requests.Response:
+    return request("GET", url, **kwargs)
+
+
+def post(url: str, **kwargs) -> requests.Response:
+    return request("POST", url, **kwargs)
+
+
+# ------------------------------
+# GraphQL helpers
+# ------------------------------
+PR_METADATA_FIELDS = """
+      number
+      title
+      state
+      url
+      headRefOid
+      changedFiles
+      additions
+      deletions"""
+
+
+def graphql(query: str, variables: Optional[dict] = None, token: Optional[str] = None, headers: Optional[dict] = None, priority: int = PRIORITY_INTERACTIVE) -> dict:
+    """
+    Runs a GraphQL query and returns its `data`.
+    Fields that fail individually (e.g. a PR that does not exist) come back as None.
+    """
+    resp = post("graphql", token=token, headers=headers, json={"query": query, "variables": variables or {}}, priority=priority)
+    if resp.status_code != 200:
+        raise RuntimeError(f"GitHub GraphQL Error: {resp.status_code} {resp.text}")
+    body = resp.json()
+    if body.get("data") is None:
+        raise RuntimeError(f"GitHub GraphQL Error: {body.get('errors')}")
+    return body["data"]
+
+
+def _pr_metadata(node: dict) -> dict:
+    """Maps a GraphQL PullRequest node onto the REST-style keys the helpers already use."""
+    return {
+        "number": node["number"],
+        "title": node["title"],
+        "state": "open" if node["state"] == "OPEN" else "closed",
+        "merged": node["state"] == "MERGED",
+        "html_url": node["url"],
+        "head_sha": node["headRefOid"],
+        "changed_files": node["changedFiles"],
+        "additions": node["additions"],
+        "deletions": node["deletions"],
+    }
+
+
+def fetch_pr_metadata_batch(owner: str, repo: str, pr_numbers: Iterable[int], token: Optional[str] = None, headers: Optional[dict] = None, priority: int = PRIORITY_BULK) -> dict:
+    """
+    Fetches title, head SHA, state, changed files and additions/deletions for many PRs,
+    up to GRAPHQL_BATCH_SIZE per request instead of one REST call each.
+    Returns {pr_number: metadata dict, or None if the PR does not exist / is not visible}.
+    """
+    numbers = list(dict.fromkeys(int(n) for n in pr_numbers))
+    result = {}
+    for start in range(0, len(numbers), GRAPHQL_BATCH_SIZE):
+        batch = numbers[start:start + GRAPHQL_BATCH_SIZE]
+        aliases = "\n".join(f"    pr{n}: pullRequest(number: {n}) {{{PR_METADATA_FIELDS}\n    }}" for n in batch)
+        query = (
+            "query($owner: String!, $repo: String!) {\n"
+            "  repository(owner: $owner, name: $repo) {\n"
+            f"{aliases}\n"
+            "  }\n"
+            "}"
+        )
+        data = graphql(query, {"owner": owner, "repo": repo}, token=token, headers=headers, priority=priority)
+        repository = data.get("repository") or {}
+        for n in batch:
+            node = repository.get(f"pr{n}")
+            result[n] = _pr_metadata(node) if node else None
+    return result
@@ -0,0 +1,57 @@
+# index_refresh.py
+# Keeps a repository's vectors in step with its default branch without re-reading the repo.
+# ingest_manifest records the commit each index scope was last synced to; on the next run
+# `git diff --name-status <indexed>..<HEAD>` on the cached mirror (repo_cache) names the only
+# paths that can have changed, and only those are checked out (sparse) and compared.
+# With no usable recorded commit (first run, new index, rewritten history) the whole repo is
+# checked out and scanned instead.
+
+import os
+from typing import Tuple
+from git import Repo
+import doc_stream
+import ingest_manifest
+import repo_cache
+from analysis_cache import blob_sha
+from ingest_manifest import SyncPlan
+
+
+def repo_scope(owner: str, repo_name: str) -> str:
+    """ingest_manifest scope for a repository's files."""
+    return f"repo:{owner}/{repo_name}"
+
+
+def plan_repo_sync(mirror: Repo, index_name: str, scope: str, model: str, path: str, ref: str = "HEAD") -> Tuple[str, SyncPlan]:
+    """
+    Checks `ref` of the mirror out into `path` (only what changed since the indexed commit,
+    when there is one) and returns (commit SHA, plan bringing the scope's vectors to it).
+    Nothing is checked out when the index is already at that commit.
+    Record the SHA with ingest_manifest.set_indexed_commit() once the plan is applied.
+    """
+    head = mirror.git.rev_parse(f"{ref}^{{commit}}")
+    last = ingest_manifest.indexed_commit(index_name, scope)
+    if last == head:
+        print(f"Index is already at commit {head[:12]}.")
+        return head, ingest_manifest.plan(index_name, scope, {}, model, touched=[])
+
+    changes = repo_cache.changed_paths(mirror, last, head) if last else None
+    if changes is None:
+        print(f"No usable indexed commit; checking out and scanning all of {head[:12]}...")
+        repo_cache.add_worktree(mirror, head, path)
+        rejected = {}
+        hashes = ingest_manifest.scan(path, rejected)
+        print(f"{len(hashes)} files to index; {doc_stream.describe(rejected)}.")
+        return head, ingest_manifest.plan(index_name, scope, hashes, model)
+
+    paths = [p for p in changes if not ingest_manifest.skipped(p)]
+    print(f"{len(paths)} files changed between {last[:12]} and {head[:12]}; checking out only those...")
+    repo_cache.add_worktree(mirror, head, path, sparse_paths=[p for p in paths if changes[p] != "D"])
+    prefix = path.replace(os.sep, "/").rstrip("/")
+    hashes = {}
+    for p in paths:
+        # Files that turned binary, generated or too large are dropped like deleted ones
+        keep = changes[p] != "D" and doc_stream.disk_rejection(os.path.join(path, p)) is None
+        sha = blob_sha(os.path.join(path, p)) if keep else None
+        if sha:
+            hashes[f"{prefix}/{p}"] = sha
+    return head, ingest_manifest.plan(index_name, scope, hashes, model, touched=[f"{prefix}/{p}" for p in paths])
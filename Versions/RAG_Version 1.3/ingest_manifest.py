@@ -0,0 +1,278 @@
+# ingest_manifest.py
+# Incremental RAG ingestion: remembers, per vector index, which files were embedded from which
+# contents (git blob SHA) and under which vector ids, in SQLite.
+# A re-ingest then only embeds files that were added or changed (their old vectors are
+# replaced) and deletes the vectors of files that are gone, instead of re-uploading everything.
+#
+# Vector ids are derived from (scope, source, content hash, chunk number), so re-running an
+# interrupted ingest upserts the same ids again instead of creating duplicates.
+# For repositories it also records the commit each scope was last synced to, so the next
+# refresh only has to look at the paths `git diff` reports since then.
+
+import os
+import json
+import sqlite3
+import hashlib
+import threading
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional
+import doc_stream
+from analysis_cache import blob_sha
+
+# ------------------------------
+# Configuration (overridable from .env)
+# ------------------------------
+MANIFEST_PATH = os.getenv("INGEST_MANIFEST_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".ingest_manifest.sqlite"))
+# Chunks embedded and upserted per vector-store call
+UPSERT_BATCH = int(os.getenv("INGEST_UPSERT_BATCH", "256"))
+# Ids per delete call (Pinecone accepts at most 1000)
+DELETE_BATCH = 1000
+
+# --- Cached Globals ---
+_conn: Optional[sqlite3.Connection] = None
+_conn_path: Optional[str] = None
+_lock = threading.Lock()
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    index_name TEXT NOT NULL,
+    scope TEXT NOT NULL,
+    source TEXT NOT NULL,
+    hash TEXT NOT NULL,
+    model TEXT NOT NULL,
+    chunk_ids TEXT NOT NULL,
+    PRIMARY KEY (index_name, scope, source)
+);
+CREATE TABLE IF NOT EXISTS commits (
+    index_name TEXT NOT NULL,
+    scope TEXT NOT NULL,
+    sha TEXT NOT NULL,
+    PRIMARY KEY (index_name, scope)
+);
+"""
+
+
+class SyncPlan(NamedTuple):
+    index_name: str
+    scope: str                     # which ingest script owns these files (e.g. "repo", "knowledge_base")
+    model: str                     # embedding model the vectors are made with
+    changed: Dict[str, str]        # source -> content hash, for added or modified files
+    stale: Dict[str, List[str]]    # source -> vector ids to replace (modified files)
+    removed: Dict[str, List[str]]  # source -> vector ids to delete (files that are gone)
+    unchanged: int
+
+
+# ------------------------------
+# Storage
+# ------------------------------
+def _connect() -> sqlite3.Connection:
+    global _conn, _conn_path
+    if _conn is None or _conn_path != MANIFEST_PATH:
+        if _conn is not None:
+            _conn.close()
+        os.makedirs(os.path.dirname(os.path.abspath(MANIFEST_PATH)), exist_ok=True)
+        _conn = sqlite3.connect(MANIFEST_PATH, check_same_thread=False)
+        _conn.executescript(SCHEMA)
+        _conn.commit()
+        _conn_path = MANIFEST_PATH
+    return _conn
+
+
+def entries(index_name: str, scope: str) -> Dict[str, tuple]:
+    """source -> (hash, model, chunk ids) for every file recorded in this index and scope."""
+    with _lock:
+        rows = _connect().execute(
+            "SELECT source, hash, model, chunk_ids FROM files WHERE index_name = ? AND scope = ?", (index_name, scope)
+        ).fetchall()
+    return {source: (content_hash, model, json.loads(ids)) for source, content_hash, model, ids in rows}
+
+
+def record(index_name: str, scope: str, model: str, files: Dict[str, tuple]):
+    """Saves source -> (hash, chunk ids) for files whose vectors are now in the index."""
+    with _lock:
+        conn = _connect()
+        conn.executemany(
+            "INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?)",
+            [(index_name, scope, source, content_hash, model, json.dumps(ids)) for source, (content_hash, ids) in files.items()],
+        )
+        conn.commit()
+
+
+def drop(index_name: str, scope: str, sources: Iterable[str]):
+    with _lock:
+        conn = _connect()
+        conn.executemany(
+            "DELETE FROM files WHERE index_name = ? AND scope = ? AND source = ?",
+            [(index_name, scope, source) for source in sources],
+        )
+        conn.commit()
+
+
+def forget(index_name: str):
+    """Drops everything recorded for an index (call this when the index was just (re)created)."""
+    with _lock:
+        conn = _connect()
+        conn.execute("DELETE FROM files WHERE index_name = ?", (index_name,))
+        conn.execute("DELETE FROM commits WHERE index_name = ?", (index_name,))
+        conn.commit()
+
+
+def is_empty(index_name: str) -> bool:
+    """True when no file is recorded for the index (never synced here, or filled before the manifest existed)."""
+    with _lock:
+        row = _connect().execute("SELECT 1 FROM files WHERE index_name = ? LIMIT 1", (index_name,)).fetchone()
+    return row is None
+
+
+def clear_unrecorded(index_name: str, index) -> bool:
+    """
+    Empties the existing Pinecone `index` when it holds vectors but the manifest records none
+    for it (it was filled by from_documents() under random ids before the manifest existed),
+    so the first sync doesn't leave a second copy of every chunk behind. Returns True if it did.
+    """
+    if not is_empty(index_name):
+        return False
+    stats = index.describe_index_stats()
+    if not stats.total_vector_count:
+        return False
+    for namespace in stats.namespaces:
+        index.delete(delete_all=True, namespace=namespace)
+    forget(index_name)
+    return True
+
+
+def indexed_commit(index_name: str, scope: str) -> Optional[str]:
+    """The commit this scope's vectors were last synced to, if it was recorded."""
+    with _lock:
+        row = _connect().execute(
+            "SELECT sha FROM commits WHERE index_name = ? AND scope = ?", (index_name, scope)
+        ).fetchone()
+    return row[0] if row else None
+
+
+def set_indexed_commit(index_name: str, scope: str, sha: str):
+    with _lock:
+        conn = _connect()
+        conn.execute("INSERT OR REPLACE INTO commits VALUES (?, ?, ?)", (index_name, scope, sha))
+        conn.commit()
+
+
+# ------------------------------
+# Planning
+# ------------------------------
+def skipped(rel_path: str) -> bool:
+    """True for paths scan() never returns whatever their contents (see doc_stream.path_rejection)."""
+    return doc_stream.path_rejection(rel_path) is not None
+
+
+def scan(root: str, rejected: Optional[Dict[str, int]] = None) -> Dict[str, str]:
+    """
+    source -> git blob SHA for every file under `root` worth ingesting (sources are
+    "root/rel/path", "/"-separated). Binary, generated and oversized files are rejected before
+    they are read (see doc_stream.py) and counted per reason into `rejected` when given.
+    """
+    hashes = {}
+    for path in doc_stream.walk(root, rejected):
+        sha = blob_sha(path)
+        if sha:
+            hashes[path.replace(os.sep, "/")] = sha
+    return hashes
+
+
+def text_hash(text: str) -> str:
+    """Same hash as scan() for documents that are not files (e.g. built-in default text)."""
+    data = text.encode("utf-8")
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+
+
+def plan(index_name: str, scope: str, hashes: Dict[str, str], model: str, touched: Optional[Iterable[str]] = None) -> SyncPlan:
+    """
+    Compares the current files (source -> hash) with what the index holds for this scope.
+    With `touched`, only those sources are compared (e.g. the paths a `git diff` reported;
+    touched sources missing from `hashes` were deleted) and every other one is left as it is.
+    """
+    known = entries(index_name, scope)
+    if touched is not None:
+        touched = set(touched) | set(hashes)
+        untouched = sum(1 for source in known if source not in touched)
+        known = {source: old for source, old in known.items() if source in touched}
+    changed, stale = {}, {}
+    for source, content_hash in hashes.items():
+        old = known.get(source)
+        if old is not None and old[0] == content_hash and old[1] == model:
+            continue
+        changed[source] = content_hash
+        if old is not None and old[2]:
+            stale[source] = old[2]
+    removed = {source: old[2] for source, old in known.items() if source not in hashes}
+    unchanged = len(hashes) - len(changed) + (untouched if touched is not None else 0)
+    return SyncPlan(index_name, scope, model, changed, stale, removed, unchanged)
+
+
+def chunk_ids(scope: str, source: str, content_hash: str, count: int) -> List[str]:
+    """Deterministic vector ids for the chunks of one version of one file."""
+    prefix = hashlib.sha1(f"{scope}\0{source}".encode("utf-8")).hexdigest()[:16]
+    return [f"{prefix}-{content_hash[:12]}-{i}" for i in range(count)]
+
+
+# ------------------------------
+# Applying a plan
+# ------------------------------
+def _delete(store, ids: List[str]):
+    for start in range(0, len(ids), DELETE_BATCH):
+        store.delete(ids=ids[start:start + DELETE_BATCH])
+
+
+def apply(store, changes: SyncPlan, load: Callable[[str], list], split: Callable[[list], list],
+          batch_size: Optional[int] = None) -> dict:
+    """
+    Brings `store` (a LangChain vector store) in line with `changes`:
+      - each changed source is loaded with `load(source)` (-> documents; [] for unreadable or
+        binary files) and cut with `split(documents)`; the chunks are upserted in batches of
+        `batch_size` (default UPSERT_BATCH) under their chunk_ids, then the file's previous vectors are deleted
+      - the vectors of removed sources are deleted
+    A source whose load or split raises is left as it was (old vectors, old manifest entry), so
+    the next run retries it; don't advance the indexed commit while counts["failed_files"] > 0.
+    The manifest is updated after every batch, so an interrupted run resumes where it stopped.
+    Returns counts of files and chunks processed.
+    """
+    batch_size = batch_size or UPSERT_BATCH
+    counts = {"embedded_files": 0, "chunks": 0, "deleted_files": 0, "deleted_vectors": 0, "failed_files": 0}
+    pending_chunks, pending_ids, pending_files = [], [], {}
+
+    def flush():
+        if pending_chunks:
+            store.add_documents(pending_chunks, ids=pending_ids)
+        # Same contents re-embedded (e.g. new model) keep their ids; only replaced ones go
+        new_ids = set(pending_ids)
+        old = [i for source in pending_files for i in changes.stale.get(source, []) if i not in new_ids]
+        if old:
+            _delete(store, old)
+            counts["deleted_vectors"] += len(old)
+        record(changes.index_name, changes.scope, changes.model, pending_files)
+        counts["embedded_files"] += len(pending_files)
+        counts["chunks"] += len(pending_chunks)
+        pending_chunks.clear()
+        pending_ids.clear()
+        pending_files.clear()
+
+    for source, content_hash in changes.changed.items():
+        try:
+            chunks = split(load(source))
+        except Exception as e:
+            print(f"⚠️ Skipping {source} (will retry next run): {e}")
+            counts["failed_files"] += 1
+            continue
+        ids = chunk_ids(changes.scope, source, content_hash, len(chunks))
+        pending_chunks.extend(chunks)
+        pending_ids.extend(ids)
+        pending_files[source] = (content_hash, ids)
+        if len(pending_chunks) >= batch_size:
+            flush()
+    flush()
+
+    if changes.removed:
+        _delete(store, [i for ids in changes.removed.values() for i in ids])
+        drop(changes.index_name, changes.scope, changes.removed)
+        counts["deleted_files"] = len(changes.removed)
+        counts["deleted_vectors"] += sum(len(ids) for ids in changes.removed.values())
+    return counts
@@ -0,0 +1,102 @@
+# pr_features.py
+# PR features for IterativePromptSelector, computed in one sweep over the diff.
+#
+# The diff is read once, in line-aligned blocks of about BLOCK_SIZE characters. Per block the
+# line counters are C-level str.count calls, and each flag that is still unset is first
+# looked up by its literal words in the lowercased block; its regex only runs on blocks that
+# contain one of them. A flag is never searched again once found. Nothing can match across
+# two blocks (see _next_cut), and "/* ... */" is tracked with a flag instead of a DOTALL
+# regex, so the cost stays linear in the diff size.
+#
+# The values are exactly those of the original per-feature regexes (kept in
+# benchmark_pr_features.py), because the saved selector state was trained on them.
+
+import re
+from typing import Dict
+
+BLOCK_SIZE = 1 << 16
+
+# flag -> (pattern searched anywhere in the diff, literals every match contains, lowercase)
+STREAMED_FLAGS = {
+    "has_comments": (re.compile(r"#|//"), ("#", "//")),  # "/* ... */" is matched across blocks below
+    "has_functions": (re.compile(r"def\s+\w+|\bfunction\b|\bfunc\b", re.IGNORECASE), ("def", "func")),
+    "has_imports": (re.compile(r"^import\s|^from\s|^#include", re.MULTILINE), ("import", "from", "#include")),
+    "has_test": (re.compile(r"test|spec|unittest", re.IGNORECASE), ("test", "spec")),
+    "has_docs": (re.compile(r"readme|doc|comment|documentation", re.IGNORECASE), ("readme", "doc", "comment")),
+    "has_config": (re.compile(r"\.conf", re.IGNORECASE), (".conf",)),
+}
+
+# flag -> pattern anchored at the end of the diff ("$" without MULTILINE: only the last line counts)
+END_FLAGS = {
+    "has_config": re.compile(r"\.json$|\.yml$|\.yaml$|\.xml$", re.IGNORECASE),
+    "is_python": re.compile(r"\.py$", re.IGNORECASE),
+    "is_js": re.compile(r"\.js$|\.ts$", re.IGNORECASE),
+    "is_java": re.compile(r"\.java$", re.IGNORECASE),
+}
+END_WINDOW = 8  # longest END_FLAGS match (".yaml") plus the optional final newline
+
+FEATURE_ORDER = [
+    'num_lines', 'num_files', 'additions', 'deletions', 'net_changes',
+    'has_comments', 'has_functions', 'has_imports', 'has_test',
+    'has_docs', 'has_config', 'is_python', 'is_js', 'is_java'
+]
+
+# A block may only end before a line starting with one of these: neither whitespace nor a word
+# character, so no pattern above (e.g. "def\n    name") can match across the cut
+_CUT = re.compile(r"\n(?=[-+@\\])")
+
+
+def _next_cut(text: str, pos: int) -> int:
+    if pos + BLOCK_SIZE >= len(text):
+        return len(text)
+    m = _CUT.search(text, pos + BLOCK_SIZE)
+    return m.start() + 1 if m else len(text)
+
+
+def extract_pr_features(diff_text: str) -> Dict[str, int]:
+    """Extract features from PR diff for model prediction"""
+    features = dict.fromkeys(FEATURE_ORDER, 0)
+    pending = set(STREAMED_FLAGS)
+    comment_open = False  # a "/*" was seen and no "*/" after it yet
+    size = len(diff_text)
+    pos = 0
+
+    while pos < size:
+        end = _next_cut(diff_text, pos)
+        block = diff_text[pos:end]
+        pos = end
+
+        # Line-start counters ("^" = block start or after a newline)
+        features['num_lines'] += block.count("\n")
+        features['num_files'] += block.count("\ndiff --git") + block.startswith("diff --git")
+        features['additions'] += block.count("\n+") + block.startswith("+")
+        features['deletions'] += block.count("\n-") + block.startswith("-")
+
+        if "has_comments" in pending:
+            if comment_open:
+                found = "*/" in block
+            else:
+                start = block.find("/*")
+                comment_open = start >= 0
+                found = comment_open and block.find("*/", start + 2) >= 0
+            if found:
+                features['has_comments'] = 1
+                pending.discard("has_comments")
+
+        # Literal prefilter; lower() only equals IGNORECASE matching for ASCII text
+        lowered = block.lower() if pending and block.isascii() else None
+        for name in list(pending):
+            pattern, literals = STREAMED_FLAGS[name]
+            if lowered is not None and not any(literal in lowered for literal in literals):
+                continue
+            if pattern.search(block):
+                features[name] = 1
+                pending.discard(name)
+
+    features['num_lines'] += 1  # len(diff_text.split('\n'))
+    tail = diff_text[-END_WINDOW:]
+    for name, pattern in END_FLAGS.items():
+        if not features[name] and pattern.search(tail):
+            features[name] = 1
+    features['net_changes'] = features['additions'] - features['deletions']
+    return features
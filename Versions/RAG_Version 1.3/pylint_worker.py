@@ -0,0 +1,54 @@
+# pylint_worker.py
+# Long-lived pylint process used by analyzer_daemons: pylint/astroid are imported once and the
+# parsed stdlib/third-party modules stay cached between requests.
+#
+# Protocol (one JSON object per line):
+#   stdin  -> {"cwd": "<worktree>", "args": ["--output-format=json", "a.py", ...]}
+#   stdout <- {"stdout": "<pylint output>", "returncode": <int>}
+
+import io
+import os
+import sys
+import json
+import contextlib
+
+import astroid
+from pylint.lint import Run
+
+
+def _forget_worktree_modules(root: str):
+    """Drops cached modules parsed from the worktree; its files change from one PR to the next."""
+    root = os.path.join(os.path.abspath(root), "")
+    cache = astroid.MANAGER.astroid_cache
+    for name in [name for name, module in cache.items() if (module.file or "").startswith(root)]:
+        del cache[name]
+
+
+def handle(request: dict) -> dict:
+    os.chdir(request["cwd"])
+    _forget_worktree_modules(request["cwd"])
+    buffer = io.StringIO()
+    with contextlib.redirect_stdout(buffer):
+        try:
+            run = Run(request["args"], exit=False)
+            returncode = run.linter.msg_status
+        except SystemExit as e:  # bad options still call sys.exit
+            returncode = e.code if isinstance(e.code, int) else 32
+        except Exception as e:
+            print(f"pylint worker error: {e}")
+            returncode = 32
+    return {"stdout": buffer.getvalue(), "returncode": returncode}
+
+
+def main():
+    # Reply on the real stdout; anything pylint prints goes to the per-request buffer
+    out = sys.stdout
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        out.write(json.dumps(handle(json.loads(line))) + "\n")
+        out.flush()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,244 @@
+# repo_cache.py
+#
+# Responsible for:
+#  - Keeping one long-lived bare mirror per reviewed repository (cloned once, then `git fetch`ed)
+#  - Handing out cheap `git worktree` checkouts (per PR for static analysis, HEAD for ingestion)
+#  - Sparse checkouts of only the changed paths (+ their config files) on a blobless mirror
+#  - One resident worktree per repo that is switched from PR to PR (for analyzer daemons)
+#  - The files changed between two commits (for incremental index refreshes)
+
+import os
+import posixpath
+import uuid
+import stat
+import shutil
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Optional
+from git import GitCommandError, Repo
+
+# ------------------------------
+# Configuration (overridable from .env)
+# ------------------------------
+REPO_CACHE_DIR = os.getenv("REPO_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".repo_cache"))
+# Partial clone: the mirror holds commits/trees only; file contents are fetched when first checked out
+PARTIAL_CLONE = os.getenv("REPO_CACHE_PARTIAL", "1") == "1"
+
+# Analyzer config files pulled in next to every changed file (in its folder and each parent folder)
+ANALYZER_CONFIG_FILES = (
+    "setup.cfg", "pyproject.toml", "tox.ini", ".flake8", ".pylintrc", "pylintrc", "mypy.ini", ".bandit",
+    ".eslintrc", ".eslintrc.js", ".eslintrc.cjs", ".eslintrc.json", ".eslintrc.yml", ".eslintrc.yaml",
+    "eslint.config.js", "package.json", "tsconfig.json",
+)
+
+# --- Cached Globals ---
+_locks = {}
+_locks_guard = threading.Lock()
+
+
+# Helper function
+def on_rm_error(func, path, exc_info):
+    """
+    Error handler for shutil.rmtree.
+    If a file is read-only, it makes it writable and tries to delete again.
+    """
+    if not os.access(path, os.W_OK):
+        os.chmod(path, stat.S_IWRITE)
+        func(path)
+    else:
+        raise
+
+
+def _lock_for(path: str) -> threading.Lock:
+    """One lock per mirror: git ref updates and worktree bookkeeping are not thread-safe."""
+    with _locks_guard:
+        return _locks.setdefault(path, threading.Lock())
+
+
+def repo_url(owner: str, repo_name: str) -> str:
+    return f"https://github.com/{owner}/{repo_name}.git"
+
+
+def mirror_path(owner: str, repo_name: str) -> str:
+    return os.path.join(REPO_CACHE_DIR, "mirrors", f"{owner}__{repo_name}.git")
+
+
+def resident_path(owner: str, repo_name: str) -> str:
+    return os.path.join(REPO_CACHE_DIR, "resident", f"{owner}__{repo_name}")
+
+
+# ------------------------------
+# Mirrors
+# ------------------------------
+def ensure_mirror(owner: str, repo_name: str, update: bool = True) -> Repo:
+    """
+    Returns the bare mirror for a repo. The first call clones it; later calls
+    only run an incremental `git fetch` (skipped when update=False).
+    """
+    path = mirror_path(owner, repo_name)
+    with _lock_for(path):
+        if not os.path.exists(os.path.join(path, "HEAD")):
+            print(f"  Creating bare mirror of {owner}/{repo_name} (one-time clone)...")
+            clone_options = {"filter": "blob:none"} if PARTIAL_CLONE else {}
+            repo = Repo.clone_from(repo_url(owner, repo_name), path, bare=True, **clone_options)
+            # A plain bare clone has no fetch refspec; keep branches in sync on later fetches
+            repo.git.config("remote.origin.fetch", "+refs/heads/*:refs/heads/*")
+            return repo
+
+        repo = Repo(path)
+        if update:
+            print(f"  Updating mirror of {owner}/{repo_name} (incremental fetch)...")
+            repo.git.fetch("origin", "--prune")
+        return repo
+
+
+def fetch_pr_head(repo: Repo, pr_number: int) -> str:
+    """Fetches only the PR's head ref into the mirror and returns its commit SHA."""
+    ref = f"refs/pull/{pr_number}/head"
+    with _lock_for(repo.git_dir):
+        repo.git.fetch("origin", f"+pull/{pr_number}/head:{ref}")
+        return repo.git.rev_parse(ref)
+
+
+def changed_paths(repo: Repo, old: str, new: str) -> Optional[Dict[str, str]]:
+    """
+    path -> status letter (A, M, D, T) for every file that differs between two commits
+    (`git diff --name-status`, a rename counts as delete + add), or None when `old` is not
+    a commit of the mirror (e.g. history was rewritten and it was pruned).
+    """
+    try:
+        repo.git.cat_file("-e", f"{old}^{{commit}}")
+    except GitCommandError:
+        return None
+    fields = repo.git.diff("--name-status", "--no-renames", "-z", old, new).split("\0")
+    return {path: status[:1] for status, path in zip(fields[0::2], fields[1::2]) if path}
+
+
+# ------------------------------
+# Worktrees
+# ------------------------------
+def sparse_patterns(paths: Iterable[str]) -> List[str]:
+    """
+    Non-cone sparse-checkout patterns for the given repo-relative paths, plus
+    ANALYZER_CONFIG_FILES in each of their folders up to the repo root.
+    """
+    patterns = []
+    for path in paths:
+        path = path.strip("/")
+        patterns.append(f"/{path}")
+        folder = posixpath.dirname(path)
+        while True:
+            prefix = f"/{folder}/" if folder else "/"
+            patterns.extend(prefix + name for name in ANALYZER_CONFIG_FILES)
+            if not folder:
+                break
+            folder = posixpath.dirname(folder)
+    return list(dict.fromkeys(patterns))
+
+
+def add_worktree(repo: Repo, ref: str, path: str = None, sparse_paths: Iterable[str] = None) -> str:
+    """
+    Checks `ref` out into a detached worktree (objects are shared with the mirror).
+    With `sparse_paths`, only those files and their config files are materialized.
+    """
+    path = path or os.path.join(REPO_CACHE_DIR, "worktrees", f"{os.path.basename(repo.git_dir)[:-4]}-{uuid.uuid4().hex[:8]}")
+    path = os.path.abspath(path)  # git runs inside the mirror, so relative paths would land there
+    with _lock_for(repo.git_dir):
+        repo.git.worktree("prune")  # forget worktrees whose folders were deleted by hand
+        if sparse_paths is None:
+            repo.git.worktree("add", "--detach", "--force", path, ref)
+        else:
+            repo.git.worktree("add", "--detach", "--force", "--no-checkout", path, ref)
+            # The pattern file lives in the worktree's private git dir and sparse mode is only
+            # switched on for this checkout, so the mirror's shared config is never touched
+            # (`git sparse-checkout set` would enable extensions.worktreeConfig on the mirror).
+            worktree = Repo(path)
+            _write_sparse_file(worktree, sparse_patterns(sparse_paths))
+            worktree.git(c=["core.sparseCheckout=true", "core.sparseCheckoutCone=false"]).read_tree("-mu", "HEAD")
+    return path
+
+
+def _write_sparse_file(worktree: Repo, patterns: List[str]):
+    info_dir = os.path.join(worktree.git_dir, "info")
+    os.makedirs(info_dir, exist_ok=True)
+    with open(os.path.join(info_dir, "sparse-checkout"), "w", encoding="utf-8") as f:
+        f.write("\n".join(patterns) + "\n")
+
+
+def switch_worktree(path: str, ref: str, sparse_paths: Iterable[str] = None):
+    """
+    Moves an existing worktree to `ref` in place: only files that differ are rewritten, and files
+    outside the new sparse set are removed (`sparse_paths=None` checks out everything).
+    Untracked files (analyzer caches such as .mypy_cache) are kept.
+    """
+    worktree = Repo(path)
+    _write_sparse_file(worktree, ["/*"] if sparse_paths is None else sparse_patterns(sparse_paths))
+    worktree.git(c=["core.sparseCheckout=true", "core.sparseCheckoutCone=false"]).read_tree("--reset", "-u", ref)
+    worktree.git.update_ref("--no-deref", "HEAD", ref)
+
+
+def remove_worktree(repo: Repo, path: str):
+    """Deletes a worktree folder and unregisters it from the mirror."""
+    path = os.path.abspath(path)
+    with _lock_for(repo.git_dir):
+        try:
+            repo.git.worktree("remove", "--force", path)
+        except Exception:
+            if os.path.exists(path):
+                shutil.rmtree(path, onerror=on_rm_error)
+            repo.git.worktree("prune")
+
+
+@contextmanager
+def pr_worktree(owner: str, repo_name: str, pr_number: int, sparse_paths: Iterable[str] = None, sha: str = None):
+    """
+    Yields a temporary checkout of a PR's head commit; removed on exit.
+    Pass `sparse_paths` to check out only those files (see add_worktree), and `sha` to pin
+    the checkout to a commit fetched earlier (the PR head may have moved since).
+    """
+    repo = ensure_mirror(owner, repo_name, update=False)
+    sha = sha or fetch_pr_head(repo, pr_number)
+    path = add_worktree(repo, sha, sparse_paths=sparse_paths)
+    try:
+        yield path
+    finally:
+        remove_worktree(repo, path)
+
+
+@contextmanager
+def resident_worktree(owner: str, repo_name: str, pr_number: int, sparse_paths: Iterable[str] = None):
+    """
+    Yields the repo's long-lived worktree switched to a PR's head commit. Unlike pr_worktree
+    the folder survives between PRs (same path, only changed files rewritten), so analyzer
+    daemons started inside it stay warm. One PR at a time per repo: while the folder is in use
+    (another analysis of the repo, or a nested call) a temporary pr_worktree of the same commit
+    is yielded instead of waiting for it.
+    """
+    repo = ensure_mirror(owner, repo_name, update=False)
+    sha = fetch_pr_head(repo, pr_number)
+    path = os.path.abspath(resident_path(owner, repo_name))
+    lock = _lock_for(path)
+    if not lock.acquire(blocking=False):
+        print(f"  Resident worktree of {owner}/{repo_name} is busy; using a temporary one for PR #{pr_number}...")
+        with pr_worktree(owner, repo_name, pr_number, sparse_paths, sha=sha) as temp_path:
+            yield temp_path
+        return
+    try:
+        if not os.path.exists(os.path.join(path, ".git")):
+            with _lock_for(repo.git_dir):
+                repo.git.worktree("prune")
+                repo.git.worktree("add", "--detach", "--force", "--no-checkout", path, sha)
+        switch_worktree(path, sha, sparse_paths)
+        yield path
+    finally:
+        lock.release()
+
+
+def is_resident(path: str) -> bool:
+    """True for a resident worktree folder (see resident_worktree), False for temporary checkouts."""
+    return os.path.dirname(os.path.abspath(path)) == os.path.abspath(os.path.join(REPO_CACHE_DIR, "resident"))
+
+
+def head_sha(path: str) -> str:
+    """The commit a worktree has checked out."""
+    return Repo(path).git.rev_parse("HEAD")
@@ -1,104 +1,160 @@
-# reviewer.py
-#
-# Responsible for:
-#  - Fetching PR diff from GitHub
-#  - Posting review comments (if permitted)
-#  - LLM initialization
-
-import requests
-from langchain_core.output_parsers import StrOutputParser
-from langchain_groq import ChatGroq
-from config import GITHUB_TOKEN, OWNER, REPO, GROQ_API_KEY
-from typing import Optional
-
-# ------------------------------
-# GitHub helpers
-# ------------------------------
-def fetch_pr_diff(owner: str, repo: str, pr_number: int, token: str) -> str:
-    url = f"https://api.github.com/repos/{owner}/{repo}/pulls/{pr_number}"
-    
-    # Use the token from config.py
-    headers = {"Authorization": f"token {token}", "Accept": "application/vnd.github.v3.diff"}
-    
-    try:
-        response = requests.get(url, headers=headers)
-        response.raise_for_status() # Raise an exception for bad status codes
-        return response.text
-    except requests.exceptions.HTTPError as e:
-        print(f"❌ GitHub API Error: {e.response.status_code} - {e.response.text}")
-        if e.response.status_code == 404:
-            print(f"  (Could not find PR #{pr_number}. Check OWNER/REPO in .env)")
-        elif e.response.status_code == 401:
-            print(f"  (Invalid GitHub Token. Check GITHUB_TOKEN in .env)")
-    except Exception as e:
-        print(f"❌ Unexpected error fetching diff: {e}")
-        
-    return "" # Return empty string on failure
-
-def post_review_comment(owner: str, repo: str, pr_number: int, token: str, review_body: str) -> dict:
-    url = f"https://api.github.com/repos/{owner}/{repo}/issues/{pr_number}/comments"
-    headers = {"Authorization": f"token {token}", "Accept": "application/vnd.github+json"}
-    payload = {"body": review_body}
-    response = requests.post(url, headers=headers, json=payload)
-    if response.status_code not in (200, 201):
-        raise Exception(f"❌ Failed to post comment: {response.json()}")
-    return response.json()
-
-# ------------------------------
-# LLM initialization
-# ------------------------------
-llm = ChatGroq(
-    model="llama-3.3-70b-versatile", # <--- THIS IS THE NEW MODEL
-    temperature=0.25,
-    api_key=GROQ_API_KEY,
-)
-
-# simple parser that returns string output
-parser = StrOutputParser()
-
-# ------------------------------
-# Utility: safe save
-# ------------------------------
-def save_text_to_file(path: str, text: str):
-    try:
-        with open(path, "w", encoding="utf-8") as f:
-            f.write(text)
-    except Exception as e:
-        print(f"❌ Error saving file {path}: {e}")
-
-def fetch_pr_metadata(owner: str, repo: str, pr_number: int, token: str):
-    """
-    Fetch PR metadata to detect 404 or permission issues.
-    Returns:
-        dict for valid PR
-        None if PR does not exist or is inaccessible
-    """
-    url = f"https://api.github.com/repos/{owner}/{repo}/pulls/{pr_number}"
-
-    headers = {
-        "Authorization": f"token {token}",
-        "Accept": "application/vnd.github+json"
-    }
-
-    try:
-        response = requests.get(url, headers=headers)
-
-        # Handle missing PR
-        if response.status_code == 404:
-            print(f"⚠️ PR #{pr_number} not found (404).")
-            return None
-
-        if response.status_code == 403:
-            print(f"⚠️ Access denied for PR #{pr_number} (403).")
-            return None
-
-        # Other non-success codes
-        if response.status_code >= 400:
-            print(f"⚠️ GitHub error: {response.status_code} -> {response.text}")
-            return None
-
-        return response.json()
-
-    except Exception as e:
-        print(f"⚠️ Error fetching PR metadata: {e}")
-        return None
+# reviewer.py
+#
+# Responsible for:
+#  - Fetching PR diff from GitHub
+#  - Posting review comments (if permitted)
+#  - LLM initialization
+
+import asyncio
+import threading
+import requests
+import github_client
+from concurrent.futures import Future
+from langchain_core.output_parsers import StrOutputParser
+from langchain_groq import ChatGroq
+from config import GROQ_API_KEY, GITHUB_FETCH_CONCURRENCY
+from typing import Dict, Iterable
+
+# ------------------------------
+# GitHub helpers
+# ------------------------------
+def fetch_pr_diff(owner: str, repo: str, pr_number: int, token: str, priority: int = github_client.PRIORITY_INTERACTIVE) -> str:
+    url = f"https://api.github.com/repos/{owner}/{repo}/pulls/{pr_number}"
+    
+    try:
+        response = github_client.get(url, token=token, accept="application/vnd.github.v3.diff", priority=priority)
+        response.raise_for_status() # Raise an exception for bad status codes
+        return response.text
+    except requests.exceptions.HTTPError as e:
+        print(f"❌ GitHub API Error: {e.response.status_code} - {e.response.text}")
+        if e.response.status_code == 404:
+            print(f"  (Could not find PR #{pr_number}. Check OWNER/REPO in .env)")
+        elif e.response.status_code == 401:
+            print(f"  (Invalid GitHub Token. Check GITHUB_TOKEN in .env)")
+    except Exception as e:
+        print(f"❌ Unexpected error fetching diff: {e}")
+        
+    return "" # Return empty string on failure
+
+def post_review_comment(owner: str, repo: str, pr_number: int, token: str, review_body: str) -> dict:
+    url = f"https://api.github.com/repos/{owner}/{repo}/issues/{pr_number}/comments"
+    payload = {"body": review_body}
+    response = github_client.post(url, token=token, accept="application/vnd.github+json", json=payload)
+    if response.status_code not in (200, 201):
+        raise Exception(f"❌ Failed to post comment: {response.json()}")
+    return response.json()
+
+# ------------------------------
+# LLM initialization
+# ------------------------------
+llm = ChatGroq(
+    model="llama-3.3-70b-versatile", # <--- THIS IS THE NEW MODEL
+    temperature=0.25,
+    api_key=GROQ_API_KEY,
+)
+
+# simple parser that returns string output
+parser = StrOutputParser()
+
+# ------------------------------
+# Utility: safe save
+# ------------------------------
+def save_text_to_file(path: str, text: str):
+    try:
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+    except Exception as e:
+        print(f"❌ Error saving file {path}: {e}")
+
+def fetch_pr_metadata(owner: str, repo: str, pr_number: int, token: str, priority: int = github_client.PRIORITY_INTERACTIVE):
+    """
+    Fetch PR metadata to detect 404 or permission issues.
+    Returns:
+        dict for valid PR
+        None if PR does not exist or is inaccessible
+    """
+    url = f"https://api.github.com/repos/{owner}/{repo}/pulls/{pr_number}"
+
+    try:
+        response = github_client.get(url, token=token, accept="application/vnd.github+json", priority=priority)
+
+        # Handle missing PR
+        if response.status_code == 404:
+            print(f"⚠️ PR #{pr_number} not found (404).")
+            return None
+
+        if response.status_code == 403:
+            print(f"⚠️ Access denied for PR #{pr_number} (403).")
+            return None
+
+        # Other non-success codes
+        if response.status_code >= 400:
+            print(f"⚠️ GitHub error: {response.status_code} -> {response.text}")
+            return None
+
+        return response.json()
+
+    except Exception as e:
+        print(f"⚠️ Error fetching PR metadata: {e}")
+        return None
+
+# ------------------------------
+# Concurrent fetching for multi-PR runs
+# ------------------------------
+async def fetch_many_pr_diffs(owner: str, repo: str, pr_numbers: Iterable[int], token: str, max_concurrency: int = GITHUB_FETCH_CONCURRENCY, on_result=None, priority: int = github_client.PRIORITY_BULK) -> dict:
+    """
+    Fetches metadata and diff for many PRs concurrently, at most `max_concurrency` PRs in flight.
+    Metadata for all PRs comes from batched GraphQL queries (100 PRs each), falling back
+    to one REST call per PR if GraphQL is unavailable. Diffs are fetched on worker threads
+    through the pooled github_client session.
+    Returns {pr_number: {"meta": dict or None, "diff": str}}; the diff is skipped for missing PRs.
+    `on_result(pr_number, result)` is called as soon as each PR finishes.
+    """
+    pr_numbers = list(dict.fromkeys(pr_numbers))
+    try:
+        metadata = await asyncio.to_thread(github_client.fetch_pr_metadata_batch, owner, repo, pr_numbers, token, None, priority)
+    except Exception as e:
+        print(f"⚠️ Batched PR metadata unavailable, falling back to one request per PR: {e}")
+        metadata = None
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def fetch_one(pr_number):
+        async with semaphore:
+            if metadata is not None:
+                meta = metadata.get(pr_number)
+                if meta is None:
+                    print(f"⚠️ PR #{pr_number} not found or inaccessible.")
+            else:
+                meta = await asyncio.to_thread(fetch_pr_metadata, owner, repo, pr_number, token, priority)
+            diff = ""
+            if meta is not None:
+                diff = await asyncio.to_thread(fetch_pr_diff, owner, repo, pr_number, token, priority)
+        result = {"meta": meta, "diff": diff}
+        if on_result:
+            on_result(pr_number, result)
+        return pr_number, result
+
+    pairs = await asyncio.gather(*(fetch_one(pr) for pr in pr_numbers))
+    return dict(pairs)
+
+def prefetch_pr_diffs(owner: str, repo: str, pr_numbers: Iterable[int], token: str, max_concurrency: int = GITHUB_FETCH_CONCURRENCY, priority: int = github_client.PRIORITY_BULK) -> Dict[int, Future]:
+    """
+    Starts fetch_many_pr_diffs on a background event loop and returns one Future per PR,
+    so the selector can review PR #1 while the remaining PRs are still downloading.
+    """
+    pr_numbers = list(dict.fromkeys(pr_numbers))
+    futures = {pr: Future() for pr in pr_numbers}
+
+    def on_result(pr_number, result):
+        futures[pr_number].set_result(result)
+
+    def run():
+        try:
+            asyncio.run(fetch_many_pr_diffs(owner, repo, pr_numbers, token, max_concurrency, on_result, priority))
+        except Exception as e:
+            for future in futures.values():
+                if not future.done():
+                    future.set_exception(e)
+
+    threading.Thread(target=run, daemon=True).start()
+    return futures
@@ -1,146 +1,374 @@
-import os
-import re
-import subprocess
-import tempfile
-import shutil
-import stat
-from git import Repo  
-from typing import Dict, List
-
-# Helper function 
-def on_rm_error(func, path, exc_info):
-    """
-    Error handler for shutil.rmtree.
-    If a file is read-only, it makes it writable and tries to delete again.
-    """
-    if not os.access(path, os.W_OK):
-        os.chmod(path, stat.S_IWRITE)
-        func(path)
-    else:
-        raise
-
-# Language-to-File-Extension Map (Unchanged)
-FILE_LANG_MAP = {
-    "py": "python",
-    "js": "javascript", "jsx": "javascript", "ts": "javascript", "tsx": "javascript",
-    "java": "java",
-    "cpp": "cpp", "cc": "cpp", "cxx": "cpp", "h": "cpp", "hpp": "cpp",
-    "go": "go",
-    "kt": "kotlin",
-    "rs": "rust"
-}
-
-# Static Analyzer Commands Map (Unchanged)
-ANALYZERS = {
-    "python": [
-        ("🧩 Pylint", ["pylint", "--exit-zero"]),
-        ("🎯 Flake8", ["flake8", "--exit-zero"]),
-        ("🔒 Bandit", ["bandit", "-r"]),
-        ("🧠 Mypy", ["mypy", "--ignore-missing-imports"]),
-    ],
-    "javascript": [
-        ("ESLint", ["eslint", "--max-warnings=0"]),
-    ],
-    "java": [("Checkstyle", ["checkstyle", "-c", "/google_checks.xml"])],
-    "cpp": [("Cppcheck", ["cppcheck", "--enable=all", "--quiet"])],
-    "go": [("Staticcheck", ["staticcheck"])],
-    "rust": [("Clippy", ["cargo", "clippy", "--", "-D", "warnings"])]
-}
-
-def get_changed_files_and_languages(diff_text: str) -> Dict[str, List[str]]:
-    """
-    Infers file types/languages and gets paths from the PR diff.
-    (This function is unchanged)
-    """
-    file_paths = re.findall(r'\+\+\+ b/(.*)', diff_text)
-    changed_files: Dict[str, List[str]] = {}
-    for path in file_paths:
-        ext = path.split('.')[-1].lower()
-        lang = FILE_LANG_MAP.get(ext)
-        if lang:
-            changed_files.setdefault(lang, []).append(path)
-    return changed_files
-
-# --- MODIFIED: This is the new function with the fix ---
-def run_static_analysis(
-    diff_text: str, 
-    owner: str, 
-    repo_name: str, 
-    pr_number: int
-) -> str:
-    """
-    Checks out the PR's code to a temp directory and runs static analysis.
-    """
-    changed_files_map = get_changed_files_and_languages(diff_text)
-    if not changed_files_map:
-        return "⚠️ No recognizable programming language files found in PR diff to analyze."
-
-    # 1. Create a temporary directory
-    temp_dir = tempfile.mkdtemp()
-    print(f"  Created temp directory for checkout: {temp_dir}")
-    
-    repo_url = f"https://github.com/{owner}/{repo_name}.git"
-    results: List[str] = []
-
-    try:
-        # 2. Clone the repo (using logic from ingest.py)
-        print(f"  Cloning {owner}/{repo_name} (main branch)...")
-        repo = Repo.clone_from(repo_url, temp_dir)
-        
-        # 3. Fetch the PR's code
-        print(f"  Fetching PR #{pr_number} branch...")
-        pr_branch_name = f"pr-{pr_number}"
-        repo.remotes.origin.fetch(f"pull/{pr_number}/head:{pr_branch_name}")
-        
-        # 4. Check out the PR's branch
-        print(f"  Checking out PR branch...")
-        repo.git.checkout(pr_branch_name)
-
-        # 5. Now that files *exist locally*, run analysis
-        for lang, files in changed_files_map.items():
-            results.append(f"=== 🔍 Targeted Static Analysis for {lang.upper()} ({len(files)} files changed) ===")
-            
-            analyzer_list = ANALYZERS.get(lang, [])
-            if not analyzer_list:
-                results.append(f"No analyzer configured for {lang}")
-                continue
-                
-            for name, base_cmd in analyzer_list:
-                # We analyze *only* the files changed in the PR
-                full_cmd = base_cmd + files
-                
-                try:
-                    # Run the command *inside* the cloned repo
-                    process = subprocess.run(
-                        full_cmd,
-                        cwd=temp_dir, # <-- This is the crucial part
-                        capture_output=True,
-                        text=True,
-                        check=False,
-                        timeout=120,
-                        encoding='utf-8'
-                    )
-                    
-                    output = process.stdout.strip()
-                    error_output = process.stderr.strip()
-                    
-                    if output or error_output:
-                        results.append(f"| {name}:\n```\n{output if output else error_output}\n```")
-                    else:
-                        results.append(f"| {name}: No issues found.")
-
-                except FileNotFoundError:
-                    results.append(f"| {name}: ❌ Command not found. Is the tool installed locally and in PATH?")
-                except Exception as e:
-                    results.append(f"| {name}: ❌ Error running analyzer: {e}")
-
-    except Exception as e:
-        results.append(f"❌ Failed to check out PR code: {e}")
-    finally:
-        # 6. Clean up (using logic from ingest.py)
-        print(f"  Attempting cleanup of: {temp_dir}")
-        if os.path.exists(temp_dir):
-            shutil.rmtree(temp_dir, onerror=on_rm_error)
-            print("  Cleanup successful.")
-
-    return "\n\n".join(results)
\ No newline at end of file
+import os
+import subprocess
+import stat
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple, Union
+import repo_cache
+import analysis_cache
+import analyzer_daemons
+import analysis_planner
+import diff_hunks
+import diff_parser
+import fast_checks
+import findings
+from diff_parser import ParsedDiff
+from findings import Finding
+
+# Helper function 
+def on_rm_error(func, path, exc_info):
+    """
+    Error handler for shutil.rmtree.
+    If a file is read-only, it makes it writable and tries to delete again.
+    """
+    if not os.access(path, os.W_OK):
+        os.chmod(path, stat.S_IWRITE)
+        func(path)
+    else:
+        raise
+
+# How the PR is checked out for analysis:
+#  "sparse" - only the changed files + their config files (blobless mirror, O(changed files) bytes)
+#  "full"   - the whole tree (analyzers can follow imports into unchanged modules)
+CHECKOUT_MODE = os.getenv("STATIC_ANALYSIS_CHECKOUT", "sparse")
+
+# Which findings reach the prompt:
+#  "hunks" - only those on/near lines the PR changed (diff_hunks.CONTEXT_LINES around each change)
+#  "files" - everything reported for the changed files
+FINDINGS_SCOPE = os.getenv("STATIC_ANALYSIS_SCOPE", "hunks")
+
+# Analyzers run side by side, each in its own child process:
+#  ANALYZER_WORKERS - max analyzer processes alive at once
+#  ANALYZER_TIMEOUT - per-analyzer limit (seconds)
+#  ANALYSIS_BUDGET  - wall-clock limit for the whole stage; analyzers still running are killed
+ANALYZER_WORKERS = int(os.getenv("STATIC_ANALYSIS_WORKERS", str(min(8, os.cpu_count() or 4))))
+ANALYZER_TIMEOUT = float(os.getenv("STATIC_ANALYSIS_TIMEOUT", "120"))
+ANALYSIS_BUDGET = float(os.getenv("STATIC_ANALYSIS_BUDGET", "150"))
+
+# Resident mode: each repo keeps one worktree that is switched from PR to PR, with a dmypy
+# daemon and a persistent pylint worker living in it (see analyzer_daemons), so back-to-back
+# PRs on the same repo skip tool start-up and re-analysis of unchanged modules
+DAEMON_MODE = os.getenv("STATIC_ANALYSIS_DAEMONS", "0") == "1"
+
+# In-process AST checks (fast_checks) on changed Python files, run before the external tools
+FAST_CHECKS = os.getenv("STATIC_ANALYSIS_FAST_CHECKS", "1") == "1"
+
+# Analyzers whose findings depend on the whole package/crate, not just the file passed in;
+# their results are never cached per file
+PROJECT_WIDE_ANALYZERS = {"Staticcheck", "Clippy"}
+
+# Analyzers that follow imports between the files they are given: editing one changed file can
+# change another's findings, so their cached results are keyed on every file of the run
+CROSS_MODULE_ANALYZERS = {"Mypy", "Pylint"}
+
+# --- Cached Globals ---
+# Analyzers the planner deferred run here after the review, one PR at a time
+_deferred_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="deferred-analysis")
+_deferred: List[Future] = []
+_deferred_keys = set()  # jobs queued or running, so repeated reviews don't queue them twice
+
+# What finish_deferred() does with background analyses still pending when a run ends:
+#  "wait"   - let them finish (their results warm analysis_cache for the next review)
+#  "cancel" - drop the queued ones; only the one already running is finished
+DEFERRED_AT_EXIT = os.getenv("STATIC_ANALYSIS_DEFERRED_AT_EXIT", "wait")
+
+# Language-to-File-Extension Map (Unchanged)
+FILE_LANG_MAP = {
+    "py": "python",
+    "js": "javascript", "jsx": "javascript", "ts": "javascript", "tsx": "javascript",
+    "java": "java",
+    "cpp": "cpp", "cc": "cpp", "cxx": "cpp", "h": "cpp", "hpp": "cpp",
+    "go": "go",
+    "kt": "kotlin",
+    "rs": "rust"
+}
+
+# Static Analyzer Commands Map (Unchanged)
+ANALYZERS = {
+    "python": [
+        ("🧩 Pylint", ["pylint", "--exit-zero", "--output-format=json"]),
+        ("🎯 Flake8", ["flake8", "--exit-zero"]),
+        ("🔒 Bandit", ["bandit", "-q", "-f", "json"]),
+        ("🧠 Mypy", ["mypy", "--ignore-missing-imports", "--show-error-codes", "--no-error-summary"]),
+    ],
+    "javascript": [
+        ("ESLint", ["eslint", "--max-warnings=0", "--format", "json"]),
+    ],
+    "java": [("Checkstyle", ["checkstyle", "-c", "/google_checks.xml"])],
+    "cpp": [("Cppcheck", ["cppcheck", "--enable=all", "--quiet", "--template={file}:{line}:{column}: {severity}: {message} [{id}]"])],
+    "go": [("Staticcheck", ["staticcheck"])],
+    "rust": [("Clippy", ["cargo", "clippy", "--", "-D", "warnings"])]
+}
+
+def get_changed_files_and_languages(diff_text: Union[str, ParsedDiff]) -> Dict[str, List[str]]:
+    """
+    Infers file types/languages and gets paths from the PR diff
+    (files that still exist after the change, from the shared diff_parser parse).
+    """
+    changed_files: Dict[str, List[str]] = {}
+    for path in diff_parser.parse(diff_text).changed_paths():
+        ext = path.split('.')[-1].lower()
+        lang = FILE_LANG_MAP.get(ext)
+        if lang:
+            changed_files.setdefault(lang, []).append(path)
+    return changed_files
+
+# --- MODIFIED: This is the new function with the fix ---
+def analyze_static(
+    diff_text: Union[str, ParsedDiff],
+    owner: str,
+    repo_name: str,
+    pr_number: int
+) -> dict:
+    """
+    Checks out the PR's code into a worktree of the cached bare mirror and runs static analysis.
+    Returns a structured report (see findings.new_report); render it with findings.render_report.
+    """
+    report = findings.new_report()
+    parsed = diff_parser.parse(diff_text)  # parsed once; every step below reads it
+    changed_files_map = get_changed_files_and_languages(parsed)
+    if not changed_files_map:
+        report["notes"].append("⚠️ No recognizable programming language files found in PR diff to analyze.")
+        return report
+
+    try:
+        # 1-4. Fetch only the PR head into the long-lived mirror and add a worktree for it
+        #      (the mirror is cloned once per repo; the worktree is removed on exit)
+        print(f"  Checking out PR #{pr_number} from the {owner}/{repo_name} mirror ({CHECKOUT_MODE})...")
+        sparse_paths = None
+        if CHECKOUT_MODE == "sparse":
+            sparse_paths = [path for files in changed_files_map.values() for path in files]
+        checkout = repo_cache.resident_worktree if DAEMON_MODE else repo_cache.pr_worktree
+        changed_lines = parsed.changed_lines
+        with checkout(owner, repo_name, pr_number, sparse_paths=sparse_paths) as temp_dir:
+            hunks = parsed.hunk_index() if FINDINGS_SCOPE == "hunks" else None
+            deferred = _run_analyzers(changed_files_map, temp_dir, report, hunks, changed_lines)
+            sha = repo_cache.head_sha(temp_dir) if deferred else None
+        if deferred:
+            # Reviews that re-run on the same PR (one per prompt) share one background run; it is
+            # pinned to the reviewed commit, whatever the checkout above is switched to next
+            key = (owner, repo_name, pr_number, sha, tuple((name, tuple(files)) for name, _, files in deferred))
+            _queue_deferred(key, owner, repo_name, pr_number, sparse_paths, deferred, changed_lines, sha)
+    except Exception as e:
+        report["notes"].append(f"❌ Failed to check out PR code: {e}")
+
+    return report
+
+
+def run_static_analysis(
+    diff_text: Union[str, ParsedDiff], 
+    owner: str, 
+    repo_name: str, 
+    pr_number: int
+) -> str:
+    """Full static-analysis report as text (see analyze_static for the structured form)."""
+    return findings.render_report(analyze_static(diff_text, owner, repo_name, pr_number))
+
+
+def _queue_deferred(key: tuple, *args):
+    """Queues _run_deferred(*args) in the background unless the same job is already queued or running."""
+    if key in _deferred_keys:
+        return
+    _deferred_keys.add(key)
+    future = _deferred_pool.submit(_run_deferred, *args)
+    _deferred.append(future)
+    future.add_done_callback(lambda done, key=key: _forget_deferred(done, key))
+
+
+def _forget_deferred(future: Future, key: tuple):
+    # Finished jobs are dropped, so a long-lived process doesn't hold on to every report
+    _deferred_keys.discard(key)
+    if future in _deferred:
+        _deferred.remove(future)
+
+
+def wait_for_deferred(timeout: Optional[float] = None) -> List[dict]:
+    """Waits for the background analyses still pending (see _run_deferred) and returns their reports."""
+    return [future.result(timeout=timeout) for future in list(_deferred)]
+
+
+def finish_deferred():
+    """
+    Call once a run is over: the background worker is not a daemon thread, so the interpreter
+    would otherwise wait for pending analyses silently at exit. Waits for them with a message,
+    or cancels the queued ones when DEFERRED_AT_EXIT is "cancel" (also on Ctrl+C while waiting).
+    """
+    pending = list(_deferred)
+    if not pending:
+        return
+    if DEFERRED_AT_EXIT != "cancel":
+        print(f"⏳ Waiting for {len(pending)} deferred static analyses to finish "
+              f"(set STATIC_ANALYSIS_DEFERRED_AT_EXIT=cancel to skip them)...")
+        try:
+            wait_for_deferred()
+            return
+        except KeyboardInterrupt:
+            pass
+    print("⏭️ Cancelling deferred static analyses; waiting for the running one to stop...")
+    _deferred_pool.shutdown(wait=True, cancel_futures=True)
+
+
+def _run_deferred(owner: str, repo_name: str, pr_number: int, sparse_paths: Optional[List[str]],
+                  jobs: List[Tuple[str, List[str], List[str]]], changed_lines: int, sha: Optional[str] = None) -> dict:
+    """
+    Runs the analyzers the planner deferred, in a checkout of its own (of commit `sha` when
+    given, else the PR's current head), each with the full ANALYZER_TIMEOUT. Per-file results are stored in analysis_cache, so the next review of
+    these files gets them as cache hits.
+    """
+    report = findings.new_report()
+    try:
+        with repo_cache.pr_worktree(owner, repo_name, pr_number, sparse_paths=sparse_paths, sha=sha) as temp_dir:
+            for name, base_cmd, files in jobs:
+                found, note = _run_analyzer(name, base_cmd, files, temp_dir, time.monotonic() + ANALYZER_TIMEOUT, changed_lines=changed_lines)
+                report["findings"].extend(found)
+                if note:
+                    report["notes"].append(note)
+    except Exception as e:
+        report["notes"].append(f"❌ Deferred analysis failed: {e}")
+    report["findings"] = findings.dedup(report["findings"])
+    print(f"  Deferred analysis of PR #{pr_number} finished: {len(report['findings'])} findings from {', '.join(findings.tool_name(n) for n, _, _ in jobs)}")
+    return report
+
+
+def _run_analyzers(changed_files_map: Dict[str, List[str]], temp_dir: str, report: dict,
+                   hunks: Optional[diff_hunks.HunkIndex] = None, changed_lines: int = 0) -> List[Tuple[str, List[str], List[str]]]:
+    """
+    Runs the configured analyzers over the changed files inside a checkout and adds the
+    de-duplicated findings to `report`. analysis_planner decides which analyzers fit the
+    latency budget (decisions go to report["plan"]); the rest only contribute cached findings
+    and are returned as (name, command, files) jobs for a background run.
+    Analyzers for all languages run concurrently (ANALYZER_WORKERS at a time) under one
+    ANALYSIS_BUDGET deadline; findings and notes keep the language/analyzer order of ANALYZERS.
+    With a hunk index, only findings near the changed lines are kept. Changed Python files
+    first get the in-process fast_checks pass.
+    """
+    # 5. Now that files *exist locally*, run analysis
+    jobs = []  # (analyzer name, command, files, language)
+    collected: List[Finding] = []
+    for lang, files in changed_files_map.items():
+        analyzer_list = ANALYZERS.get(lang, [])
+        fast = FAST_CHECKS and lang == "python"
+        names = ([fast_checks.TOOL] if fast else []) + [findings.tool_name(name) for name, _ in analyzer_list]
+        report["sections"].append({"language": lang, "files": len(files), "analyzers": names})
+        if fast:
+            # Tier 0: milliseconds, no tools needed; the external analyzers below add to it
+            collected.extend(fast_checks.check_files(temp_dir, files))
+        if not analyzer_list:
+            report["notes"].append(f"No analyzer configured for {lang}")
+            continue
+
+        for name, base_cmd in analyzer_list:
+            # We analyze *only* the files changed in the PR
+            jobs.append((name, base_cmd, files, lang))
+
+    decisions = analysis_planner.plan(
+        [(findings.tool_name(name), lang, len(files)) for name, _, files, lang in jobs], changed_lines, workers=ANALYZER_WORKERS
+    )
+    report["plan"].extend(decisions)
+    for decision in decisions:
+        print(f"  Plan: {decision['tool']} ({decision['language']}, est. {decision['estimate']:.1f}s) -> {decision['action']}: {decision['reason']}")
+
+    deadline = time.monotonic() + ANALYSIS_BUDGET
+    with ThreadPoolExecutor(max_workers=max(1, ANALYZER_WORKERS)) as pool:
+        futures = [
+            pool.submit(_run_analyzer, name, base_cmd, files, temp_dir, deadline,
+                        cache_only=decision["action"] == "defer", changed_lines=changed_lines)
+            for (name, base_cmd, files, _), decision in zip(jobs, decisions)
+        ]
+        outcomes = [future.result() for future in futures]
+
+    # Deferred analyzers with every file already cached have nothing left to run
+    deferred = [
+        (name, base_cmd, files)
+        for (name, base_cmd, files, _), decision, (_, note) in zip(jobs, decisions, outcomes)
+        if decision["action"] == "defer" and note
+    ]
+
+    for (name, _, _, _), (found, note) in zip(jobs, outcomes):
+        collected.extend(found)
+        if note:
+            report["notes"].append(note)
+        else:
+            report["completed"].append(findings.tool_name(name))
+    collected = findings.dedup(collected)
+    if hunks is not None:
+        collected, hidden = diff_hunks.filter_findings(collected, hunks)
+        report["hidden"] += hidden
+    report["findings"].extend(collected)
+    return deferred
+
+
+def _run_analyzer(name: str, base_cmd: List[str], files: List[str], temp_dir: str, deadline: float,
+                  cache_only: bool = False, changed_lines: int = 0) -> Tuple[List[Finding], Optional[str]]:
+    """
+    Runs one analyzer over the changed files.
+    Returns (findings in file order, note about a tool problem or None).
+    Files with cached findings (same analyzer version, config and contents) are not re-linted;
+    with `cache_only` (analyzer deferred by the planner) only those cached findings are returned.
+    """
+    tool = findings.tool_name(name)
+    keys = {}
+    if analysis_cache.ENABLED and name not in PROJECT_WIDE_ANALYZERS:
+        cross_module = findings.tool_name(name) in CROSS_MODULE_ANALYZERS
+        keys = {path: key for path, key in analysis_cache.file_keys(name, base_cmd, temp_dir, files, cross_module).items() if key}
+    found: Dict[str, List[Finding]] = {}
+    for path, key in keys.items():
+        rows = analysis_cache.lookup(*key)
+        if rows is not None:
+            found[path] = findings.from_rows(rows, path, tool)
+    to_run = [path for path in files if path not in found]
+    if not to_run:
+        return _in_file_order(files, found), None
+    if cache_only:
+        cached = f"{len(found)} of {len(files)} files from cache" if found else "no cached results yet"
+        return _in_file_order(files, found), f"| {name}: ⏭️ Deferred to a background run after the review ({cached})."
+
+    timeout = min(ANALYZER_TIMEOUT, deadline - time.monotonic())
+    if timeout <= 0:
+        return _in_file_order(files, found), f"| {name}: ⏱️ Skipped, static analysis time budget ({ANALYSIS_BUDGET:.0f}s) used up."
+
+    started = time.monotonic()
+    try:
+        # Run the command *inside* the PR checkout, on the changed files that are not cached
+        # Daemons only serve the resident worktree; temporary checkouts would leave them orphaned
+        if DAEMON_MODE and tool in analyzer_daemons.RESIDENT_TOOLS and repo_cache.is_resident(temp_dir):
+            process = analyzer_daemons.run(tool, base_cmd, to_run, temp_dir, timeout)
+        else:
+            process = subprocess.run(
+                base_cmd + to_run,
+                cwd=temp_dir, # <-- This is the crucial part
+                capture_output=True,
+                text=True,
+                check=False,
+                timeout=timeout,
+                encoding='utf-8'
+            )
+    except FileNotFoundError:
+        return _in_file_order(files, found), f"| {name}: ❌ Command not found. Is the tool installed locally and in PATH?"
+    except subprocess.TimeoutExpired:
+        analysis_planner.observe(tool, len(to_run), changed_lines * len(to_run) // max(1, len(files)), time.monotonic() - started)
+        return _in_file_order(files, found), f"| {name}: ⏱️ Timed out after {timeout:.0f}s and was stopped."
+    except Exception as e:
+        return _in_file_order(files, found), f"| {name}: ❌ Error running analyzer: {e}"
+
+    analysis_planner.observe(tool, len(to_run), changed_lines * len(to_run) // max(1, len(files)), time.monotonic() - started)
+
+    parsed = findings.parse_output(name, process.stdout, process.returncode, temp_dir)
+    if parsed is None:
+        # Not a report (crash, bad config...): show the tool's own message, cache nothing
+        raw = process.stderr.strip() or process.stdout.strip()
+        return _in_file_order(files, found), f"| {name}: ❌ Analyzer failed:\n```\n{raw[:1000]}\n```"
+
+    by_file: Dict[str, List[Finding]] = {path: [] for path in to_run}
+    for f in parsed:
+        if f.file in by_file:  # e.g. mypy also reports on imported, unchanged modules
+            by_file[f.file].append(f)
+    for path in to_run:
+        if path in keys:
+            analysis_cache.store(*keys[path], findings.to_rows(by_file[path]))
+    found.update(by_file)
+    return _in_file_order(files, found), None
+
+
+def _in_file_order(files: List[str], found: Dict[str, List[Finding]]) -> List[Finding]:
+    return [f for path in files for f in found.get(path, [])]
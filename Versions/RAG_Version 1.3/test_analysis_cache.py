@@ -0,0 +1,96 @@
+"""
+Pytest tests for analysis_cache.py
+
+Covers:
+- blob_sha: matches `git hash-object`
+- config_hash: changes with config files in parent folders and with the command line
+- file_keys: cross-module keys change when any file analyzed together changes; per-file ones don't
+- lookup/store: miss then hit, keyed by analyzer/version/config/blob, counters updated
+- store: least-recently-used rows evicted past MAX_BYTES
+
+Each test points CACHE_PATH at a pytest tmp_path.
+"""
+
+import sys
+import subprocess
+import pytest
+import analysis_cache
+
+
+@pytest.fixture(autouse=True)
+def isolated_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(analysis_cache, "CACHE_PATH", str(tmp_path / "cache.sqlite"))
+    analysis_cache.reset_stats()
+    yield tmp_path
+
+
+def test_blob_sha_matches_git_hash_object(tmp_path):
+    # Arrange
+    path = tmp_path / "a.py"
+    path.write_bytes(b"x = 1\n")
+    # Act
+    sha = analysis_cache.blob_sha(str(path))
+    # Assert
+    expected = subprocess.run(["git", "hash-object", str(path)], capture_output=True, text=True).stdout.strip()
+    assert sha == expected
+    assert analysis_cache.blob_sha(str(tmp_path / "missing.py")) is None
+
+
+def test_config_hash_tracks_parent_configs_and_command(tmp_path):
+    # Arrange
+    (tmp_path / "pkg").mkdir()
+    before = analysis_cache.config_hash(str(tmp_path), "pkg/a.py", ["flake8"])
+    # Act
+    (tmp_path / "setup.cfg").write_text("[flake8]\nmax-line-length = 100\n")
+    after = analysis_cache.config_hash(str(tmp_path), "pkg/a.py", ["flake8"])
+    # Assert
+    assert before != after
+    assert after != analysis_cache.config_hash(str(tmp_path), "pkg/a.py", ["flake8", "--select=E"])
+    assert after == analysis_cache.config_hash(str(tmp_path), "pkg/a.py", ["flake8"])
+
+
+def test_cross_module_keys_cover_the_files_analyzed_together(tmp_path):
+    # Arrange: the tool is "installed" (its version is what the key records)
+    (tmp_path / "a.py").write_text("import b\n")
+    (tmp_path / "b.py").write_text("X = 1\n")
+    cmd = [sys.executable]
+    before = analysis_cache.file_keys("Mypy", cmd, str(tmp_path), ["a.py", "b.py"], cross_module=True)
+    per_file_before = analysis_cache.file_keys("Flake8", cmd, str(tmp_path), ["a.py", "b.py"])
+    # Act: only b.py changes
+    (tmp_path / "b.py").write_text("X = 'one'\n")
+    after = analysis_cache.file_keys("Mypy", cmd, str(tmp_path), ["a.py", "b.py"], cross_module=True)
+    per_file_after = analysis_cache.file_keys("Flake8", cmd, str(tmp_path), ["a.py", "b.py"])
+    # Assert
+    assert before["a.py"] != after["a.py"]
+    assert per_file_before["a.py"] == per_file_after["a.py"]
+    assert per_file_before["b.py"] != per_file_after["b.py"]
+    assert after == analysis_cache.file_keys("Mypy", cmd, str(tmp_path), ["b.py", "a.py"], cross_module=True)
+
+
+def test_lookup_misses_then_hits_after_store():
+    # Arrange
+    key = ("Flake8", "7.0.0", "cfg", "blob1")
+    # Act
+    first = analysis_cache.lookup(*key)
+    analysis_cache.store(*key, ["a.py:1:1: F401 unused"])
+    second = analysis_cache.lookup(*key)
+    # Assert
+    assert first is None
+    assert second == ["a.py:1:1: F401 unused"]
+    assert analysis_cache.lookup("Flake8", "7.1.0", "cfg", "blob1") is None  # new tool version
+    assert analysis_cache.stats() == {"hits": 1, "misses": 2}
+
+
+def test_store_evicts_least_recently_used(monkeypatch):
+    # Arrange: room for roughly two entries
+    monkeypatch.setattr(analysis_cache, "MAX_BYTES", 250)
+    analysis_cache.store("A", "1", "c", "old", ["x" * 100])
+    analysis_cache.store("A", "1", "c", "used", ["y" * 100])
+    analysis_cache.lookup("A", "1", "c", "used")  # refreshes last_used
+    # Act
+    analysis_cache.store("A", "1", "c", "new", ["z" * 100])
+    # Assert
+    assert analysis_cache.lookup("A", "1", "c", "old") is None
+    assert analysis_cache.lookup("A", "1", "c", "used") is not None
+    assert analysis_cache.size() <= 250
+
@@ -0,0 +1,74 @@
+"""
+Pytest tests for analysis_planner.py
+
+Covers:
+- plan: fast analyzers always run, deep ones are deferred, standard ones run cheapest-first while they fit
+- plan: parallel workers let more standard analyzers fit the same budget
+- estimate/observe: measured run times correct later estimates
+- diff_size: counts added/removed lines, not the ---/+++ headers
+"""
+
+import pytest
+import analysis_planner
+
+
+@pytest.fixture(autouse=True)
+def fresh_estimates():
+    analysis_planner.reset()
+    yield
+    analysis_planner.reset()
+
+
+def _actions(decisions):
+    return [(d["tool"], d["action"]) for d in decisions]
+
+
+def test_small_pr_runs_everything_but_deep_scans():
+    # Act
+    decisions = analysis_planner.plan(
+        [("Flake8", "python", 1), ("Mypy", "python", 1), ("Bandit", "python", 1), ("Staticcheck", "go", 1)], 20, budget=30
+    )
+    # Assert
+    assert _actions(decisions) == [("Flake8", "run"), ("Mypy", "run"), ("Bandit", "run"), ("Staticcheck", "defer")]
+    assert decisions[3]["reason"] == "whole-project scan, run after the review"
+
+
+def test_huge_pr_keeps_fast_linters_and_cheapest_standard_ones():
+    # Arrange: 200 files, 20k changed lines; Bandit is the cheapest standard analyzer
+    jobs = [("Pylint", "python", 200), ("Flake8", "python", 200), ("Bandit", "python", 200), ("Mypy", "python", 200)]
+    # Act
+    decisions = analysis_planner.plan(jobs, 20000, budget=30)
+    # Assert
+    assert _actions(decisions) == [("Pylint", "defer"), ("Flake8", "run"), ("Bandit", "run"), ("Mypy", "defer")]
+    assert decisions[0]["reason"].startswith("over budget")
+    assert all(d["estimate"] > 0 for d in decisions)
+
+
+def test_parallel_workers_fit_more_analyzers():
+    # Arrange: Bandit 1.7s and Pylint 8.5s on 10 files / 2000 lines (10.2s one after the other)
+    jobs = [("Bandit", "python", 10), ("Pylint", "python", 10)]
+    # Act
+    sequential = analysis_planner.plan(jobs, 2000, budget=9, workers=1)
+    parallel = analysis_planner.plan(jobs, 2000, budget=9, workers=2)
+    # Assert
+    assert _actions(sequential) == [("Bandit", "run"), ("Pylint", "defer")]
+    assert _actions(parallel) == [("Bandit", "run"), ("Pylint", "run")]
+
+
+def test_observed_run_times_correct_estimates():
+    # Arrange
+    before = analysis_planner.estimate("Mypy", 1, 0)
+    # Act: mypy keeps taking about a tenth of the estimate (e.g. a warm dmypy daemon)
+    for _ in range(10):
+        analysis_planner.observe("Mypy", 1, 0, before / 10)
+    after = analysis_planner.estimate("Mypy", 1, 0)
+    # Assert
+    assert after < before / 5
+    assert analysis_planner.estimate("Pylint", 1, 0) == pytest.approx(1.8)
+
+
+def test_diff_size_counts_changed_lines():
+    # Arrange
+    diff = "--- a/x.py\n+++ b/x.py\n@@ -1,2 +1,3 @@\n-old\n+new\n same\n+added\n"
+    # Act / Assert
+    assert analysis_planner.diff_size(diff) == 3
@@ -0,0 +1,93 @@
+"""
+Pytest tests for analyzer_daemons.py
+
+Covers:
+- PylintWorker: one long-lived process serves several requests, replies become CompletedProcess
+- PylintWorker: a request past its timeout kills the worker; run_pylint starts a fresh one
+- run_mypy: `dmypy run` with a per-worktree status file and the mypy flags after `--`
+- helpers: dmypy found next to mypy, console-script interpreter read from the #! line
+
+The worker script is replaced with a tiny echo server, so pylint/mypy need not be installed.
+"""
+
+import os
+import sys
+import json
+import subprocess
+import pytest
+import analyzer_daemons
+
+FAKE_WORKER = (
+    "import json, os, sys, time\n"
+    "for line in sys.stdin:\n"
+    "    request = json.loads(line)\n"
+    "    if 'slow.py' in request['args']: time.sleep(30)\n"
+    "    out = json.dumps({'pid': os.getpid(), 'cwd': request['cwd'], 'args': request['args']})\n"
+    "    print(json.dumps({'stdout': out, 'returncode': 0}), flush=True)\n"
+)
+
+
+@pytest.fixture
+def fake_worker(tmp_path, monkeypatch):
+    script = tmp_path / "fake_worker.py"
+    script.write_text(FAKE_WORKER)
+    monkeypatch.setattr(analyzer_daemons, "WORKER_SCRIPT", str(script))
+    monkeypatch.setattr(analyzer_daemons, "_interpreter_for", lambda executable: sys.executable)
+    yield
+    analyzer_daemons.shutdown(stop_mypy=False)
+
+
+def test_pylint_worker_serves_requests_from_one_process(fake_worker, tmp_path):
+    # Act
+    first = analyzer_daemons.run("Pylint", ["pylint", "--output-format=json"], ["a.py"], str(tmp_path), 10)
+    second = analyzer_daemons.run("Pylint", ["pylint", "--output-format=json"], ["b.py"], str(tmp_path), 10)
+    # Assert
+    first_reply, second_reply = json.loads(first.stdout), json.loads(second.stdout)
+    assert first.returncode == 0
+    assert first_reply["args"] == ["--output-format=json", "a.py"]
+    assert first_reply["cwd"] == str(tmp_path)
+    assert first_reply["pid"] == second_reply["pid"]
+
+
+def test_pylint_worker_timeout_kills_and_restarts(fake_worker, tmp_path):
+    # Arrange
+    first = analyzer_daemons.run("Pylint", ["pylint"], ["a.py"], str(tmp_path), 10)
+    # Act
+    with pytest.raises(subprocess.TimeoutExpired):
+        analyzer_daemons.run("Pylint", ["pylint"], ["slow.py"], str(tmp_path), 0.5)
+    after = analyzer_daemons.run("Pylint", ["pylint"], ["a.py"], str(tmp_path), 10)
+    # Assert
+    assert '"pid"' in after.stdout and after.stdout != first.stdout  # new worker, new pid
+
+
+def test_run_mypy_uses_per_worktree_dmypy_daemon(tmp_path, monkeypatch):
+    # Arrange
+    monkeypatch.setattr(analyzer_daemons, "DAEMON_DIR", str(tmp_path / "daemons"))
+    seen = {}
+
+    def fake_run(cmd, **kwargs):
+        seen.update(cmd=cmd, cwd=kwargs["cwd"])
+        return subprocess.CompletedProcess(cmd, 0, "Success: no issues found in 1 source file\n", "")
+
+    monkeypatch.setattr(analyzer_daemons.subprocess, "run", fake_run)
+    # Act
+    process = analyzer_daemons.run("Mypy", ["/venv/bin/mypy", "--ignore-missing-imports"], ["a.py"], str(tmp_path / "wt"), 10)
+    # Assert
+    status = analyzer_daemons.status_file(str(tmp_path / "wt"))
+    assert seen["cmd"] == [os.path.join("/venv/bin", "dmypy"), "--status-file", status, "run",
+                           "--timeout", str(analyzer_daemons.DAEMON_IDLE_TIMEOUT), "--", "--ignore-missing-imports", "a.py"]
+    assert seen["cwd"] == str(tmp_path / "wt")
+    assert process.returncode == 0
+    assert status != analyzer_daemons.status_file(str(tmp_path / "other"))
+
+
+def test_interpreter_for_reads_console_script_shebang(tmp_path, monkeypatch):
+    # Arrange
+    script = tmp_path / "pylint"
+    script.write_text(f"#!{sys.executable}\nfrom pylint import run_pylint\n")
+    script.chmod(0o755)
+    monkeypatch.setenv("PATH", str(tmp_path) + os.pathsep + os.environ.get("PATH", ""))
+    # Act / Assert
+    assert analyzer_daemons._interpreter_for("pylint") == sys.executable
+    with pytest.raises(FileNotFoundError):
+        analyzer_daemons._interpreter_for("no-such-linter")
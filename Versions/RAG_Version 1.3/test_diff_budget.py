@@ -0,0 +1,143 @@
+"""
+Pytest tests for diff_budget.py
+
+Covers:
+- file_kind: source, test, docs, config, lockfile and generated/vendored paths
+- rank_hunks: findings, risk keywords and source files outrank plain, test and lockfile hunks
+- pack_diff: a diff that fits is returned unchanged
+- pack_diff: the best hunks are kept in diff order under their file headers, within the budget
+- pack_diff: the manifest names the files whose hunks were left out
+- pack_diff: a single hunk bigger than the budget is cut instead of dropped, and reported as truncated
+"""
+
+import pytest
+import diff_budget
+import diff_parser
+from findings import Finding
+
+
+def file_diff(path: str, hunks: int = 1, lines: int = 3, word: str = "value") -> str:
+    text = f"diff --git a/{path} b/{path}\nindex 1111111..2222222 100644\n--- a/{path}\n+++ b/{path}\n"
+    for h in range(hunks):
+        start = 1 + h * 100
+        text += f"@@ -{start},{lines} +{start},{lines} @@\n"
+        text += "".join(f"-    old_{word}_{h}_{i} = compute({i})\n+    new_{word}_{h}_{i} = compute({i})\n" for i in range(lines))
+    return text
+
+
+@pytest.mark.parametrize("path, kind", [
+    ("src/app.py", "source"),
+    ("tests/test_app.py", "test"),
+    ("pkg/app_test.go", "test"),
+    ("README.md", "docs"),
+    ("settings.yaml", "config"),
+    ("package-lock.json", "lockfile"),
+    ("deps/Cargo.lock", "lockfile"),
+    ("web/vendor/jquery.js", "generated"),
+    ("static/app.min.js", "generated"),
+])
+def test_file_kind(path, kind):
+    # Arrange / Act / Assert
+    assert diff_budget.file_kind(path) == kind
+
+
+def test_hunks_with_findings_rank_first():
+    # Arrange
+    diff = file_diff("a.py") + file_diff("b.py")
+    findings = [Finding("b.py", 2, "E0602", "error", "undefined name", "Pylint")]
+
+    # Act
+    ranking = diff_budget.rank_hunks(diff, findings)
+
+    # Assert
+    assert [fi for _, fi, _ in ranking] == [1, 0]
+
+
+def test_risk_keywords_raise_the_score():
+    # Arrange
+    diff = file_diff("plain.py") + file_diff("risky.py", word="password")
+
+    # Act
+    ranking = diff_budget.rank_hunks(diff)
+
+    # Assert
+    assert [fi for _, fi, _ in ranking] == [1, 0]
+
+
+def test_source_outranks_tests_and_lockfiles():
+    # Arrange: the lockfile and test changes are much bigger
+    diff = file_diff("poetry.lock", lines=50) + file_diff("tests/test_app.py", lines=20) + file_diff("app.py")
+
+    # Act
+    ranking = diff_budget.rank_hunks(diff)
+
+    # Assert
+    assert [fi for _, fi, _ in ranking] == [2, 1, 0]
+
+
+def test_diff_that_fits_is_unchanged():
+    # Arrange
+    diff = file_diff("a.py")
+
+    # Act / Assert
+    assert diff_budget.pack_diff(diff, max_chars=10_000) == diff
+
+
+def test_best_hunks_are_kept_in_diff_order_with_headers():
+    # Arrange
+    diff = file_diff("poetry.lock", lines=40) + file_diff("app.py", hunks=3) + file_diff("README.md", lines=10)
+    findings = [Finding("app.py", 201, "W0612", "warning", "unused variable", "Pylint")]
+
+    # Act
+    packed = diff_budget.pack_diff(diff, max_chars=1200, findings=findings)
+
+    # Assert
+    assert len(packed) <= 1200
+    body, manifest = packed.split("\n... (", 1)
+    kept = diff_parser.parse(body + "\n")
+    assert kept.files[0].path == "app.py"
+    assert [h.new_start for h in kept.files[0].hunks] == sorted(h.new_start for h in kept.files[0].hunks)
+    assert 201 in [h.new_start for h in kept.files[0].hunks]
+    assert "poetry.lock" not in body
+    assert "- poetry.lock [lockfile]: 1 hunk omitted (+40/-40)" in manifest
+
+
+def test_manifest_lists_files_without_hunks():
+    # Arrange
+    binary = "diff --git a/logo.png b/logo.png\nBinary files a/logo.png and b/logo.png differ\n"
+    diff = file_diff("app.py", hunks=2, lines=20) + binary
+
+    # Act
+    packed = diff_budget.pack_diff(diff, max_chars=1500)
+
+    # Assert
+    assert len(packed) <= 1500
+    assert "- logo.png [binary]" in packed
+    assert "- app.py [source]: 1 of 2 hunks omitted (+20/-20)" in packed
+
+
+def test_oversized_single_hunk_is_cut():
+    # Arrange
+    diff = file_diff("app.py", lines=200)
+
+    # Act
+    packed = diff_budget.pack_diff(diff, max_chars=800)
+
+    # Assert
+    assert len(packed) <= 800
+    assert packed.startswith("diff --git a/app.py b/app.py\n")
+    assert "@@ -1,200 +1,200 @@\n-    old_value_0_0" in packed
+    assert "... (0 of 1 hunks omitted, 1 truncated to fit the prompt" in packed
+    assert "- app.py [source]: 1 hunk truncated (+200/-200 in full)" in packed
+
+
+def test_truncated_hunk_is_reported_next_to_omitted_ones():
+    # Arrange
+    diff = file_diff("app.py", hunks=2, lines=200)
+
+    # Act
+    packed = diff_budget.pack_diff(diff, max_chars=900)
+
+    # Assert
+    assert len(packed) <= 900
+    assert "- app.py [source]: 1 of 2 hunks omitted (+200/-200), 1 hunk truncated (+200/-200 in full)" in packed
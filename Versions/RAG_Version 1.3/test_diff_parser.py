@@ -0,0 +1,105 @@
+"""
+Pytest tests for diff_parser.py
+
+Covers:
+- parse: files with status (modified/added/deleted/renamed/binary), language, per-file and total counters
+- parse: hunk line numbers for added/removed lines and deletion points; text offsets slice back exactly
+- parse: lines inside a hunk that look like headers ("--- x", "+++ y", "diff --git") stay hunk content
+- parse: plain unified diffs without "diff --git", quoted paths, "\\ No newline at end of file"
+- parse: the same string is parsed once; a ParsedDiff passes through unchanged
+"""
+
+import diff_parser
+
+DIFF = """diff --git a/app.py b/app.py
+index 1111111..2222222 100644
+--- a/app.py
++++ b/app.py
+@@ -10,3 +10,4 @@ def main():
+     a = 1
+-    b = 2
++    b = 3
++    c = 4
+     d = 5
+@@ -40,2 +41,1 @@ def other():
+-    y = 2
+     z = 3
+diff --git a/old.sql b/old.sql
+deleted file mode 100644
+--- a/old.sql
++++ /dev/null
+@@ -1,2 +0,0 @@
+--- a comment that looks like a header
+-++ b/not_a_file.py
+diff --git a/web/new.ts b/web/new.ts
+new file mode 100644
+--- /dev/null
++++ b/web/new.ts
+@@ -0,0 +1,2 @@
++const a = 1;
++diff --git a/fake b/fake
+\\ No newline at end of file
+diff --git a/src/a b.go b/src/c.go
+similarity index 90%
+rename from src/a b.go
+rename to src/c.go
+diff --git a/logo.png b/logo.png
+Binary files a/logo.png and b/logo.png differ
+"""
+
+
+def test_files_statuses_and_counters():
+    # Act
+    parsed = diff_parser.parse(DIFF)
+    # Assert
+    assert [(f.path, f.old_path, f.status, f.language, f.binary) for f in parsed.files] == [
+        ("app.py", "app.py", "modified", "python", False),
+        ("old.sql", "old.sql", "deleted", None, False),
+        ("web/new.ts", None, "added", "javascript", False),
+        ("src/c.go", "src/a b.go", "renamed", "go", False),
+        ("logo.png", "logo.png", "modified", None, True),
+    ]
+    assert [(f.additions, f.deletions) for f in parsed.files] == [(2, 2), (0, 2), (2, 0), (0, 0), (0, 0)]
+    assert (parsed.additions, parsed.deletions, parsed.changed_lines) == (4, 4, 8)
+    assert parsed.num_lines == len(DIFF.splitlines())
+    assert parsed.changed_paths() == ["app.py", "web/new.ts", "src/c.go", "logo.png"]
+
+
+def test_hunk_line_numbers_and_offsets():
+    # Act
+    parsed = diff_parser.parse(DIFF)
+    app = parsed.files[0]
+    # Assert
+    first, second = app.hunks
+    assert (first.old_start, first.old_count, first.new_start, first.new_count) == (10, 3, 10, 4)
+    assert (first.added, first.removed, first.deleted_at) == ((11, 12), (11,), (11,))
+    assert (second.added, second.removed, second.deleted_at) == ((), (40,), (41,))
+    assert parsed.hunk_text(first).startswith("@@ -10,3 +10,4 @@ def main():\n") and parsed.hunk_text(first).endswith("     d = 5\n")
+    assert parsed.header_text(app).endswith("+++ b/app.py\n")
+    assert "".join(parsed.file_text(f) for f in parsed.files) == DIFF
+    assert parsed.hunk_index() == {"app.py": [(11, 12), (41, 41)], "web/new.ts": [(1, 2)]}
+
+
+def test_plain_unified_diff_and_quoted_paths():
+    # Arrange: `diff -u` output (no "diff --git" lines) and a git-quoted non-ASCII path
+    diff = (
+        "--- a/one.py\t2024-01-01\n+++ b/one.py\t2024-01-02\n@@ -1 +1 @@\n-x\n+y\n"
+        "--- a/two.java\n+++ b/two.java\n@@ -1,0 +2 @@\n+z\n"
+        '--- "a/caf\\303\\251.py"\n+++ "b/caf\\303\\251.py"\n@@ -1 +1 @@\n-p\n+q\n'
+    )
+    # Act
+    parsed = diff_parser.parse(diff)
+    # Assert
+    assert [(f.path, f.language, f.hunks[0].added) for f in parsed.files] == [
+        ("one.py", "python", (1,)), ("two.java", "java", (2,)), ("café.py", "python", (1,)),
+    ]
+
+
+def test_parse_is_memoized_per_string():
+    # Arrange
+    text = DIFF + "\n"
+    # Act
+    first = diff_parser.parse(text)
+    # Assert
+    assert diff_parser.parse(text) is first
+    assert diff_parser.parse(first) is first
@@ -0,0 +1,142 @@
+"""
+Pytest tests for doc_stream.py
+
+Covers:
+- path_rejection: pruned folders, binary extensions, lockfiles, minified/vendored paths, worktree .git links
+- content_rejection: magic numbers, NUL bytes, generated-code headers, minified lines; plain text passes
+- walk: prunes folders without entering them, rejects oversized files without reading them, counts reasons
+- load: one Document per accepted file (BOM stripped, latin-1 fallback); [] for rejected contents
+- stream_documents/split_stream: documents are produced and chunked lazily, one file at a time
+- describe: summary of the skipped files
+"""
+
+import os
+import builtins
+import pytest
+import doc_stream
+
+
+def write(root, rel, data):
+    path = os.path.join(root, rel)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(data if isinstance(data, bytes) else data.encode("utf-8"))
+    return path
+
+
+@pytest.mark.parametrize("rel_path, reason", [
+    ("src/app.py", None),
+    ("docs/guide.md", None),
+    ("node_modules/lib/index.js", "skipped folder"),
+    ("pkg/__pycache__/mod.cpython-311.pyc", "skipped folder"),
+    ("assets/Logo.PNG", "binary extension"),
+    ("release.tar.gz", "binary extension"),
+    ("poetry.lock", "lockfile"),
+    ("static/app.min.js", "generated"),
+    ("third_party/zlib/zlib.h", "generated"),
+    ("worktree/.git", "git link"),
+])
+def test_path_rejection(rel_path, reason):
+    # Arrange / Act / Assert
+    assert doc_stream.path_rejection(rel_path) == reason
+
+
+@pytest.mark.parametrize("head, reason", [
+    (b"def f():\n    return 1\n", None),
+    (b"# Title\n\nSome prose mentioning auto-generated ids much later.\n" + b"text\n" * 10, None),
+    (b"\x89PNG\r\n\x1a\n....", "binary (png)"),
+    (b"PK\x03\x04rest-of-zip", "binary (zip)"),
+    (b"text\x00with a NUL", "binary"),
+    (b"// Code generated by protoc-gen-go. DO NOT EDIT.\npackage pb\n", "generated"),
+    (b"# @generated by a tool\nx = 1\n", "generated"),
+    (b'"""\nThis file is auto-generated from schema.json.\n"""\n', "generated"),
+    (b"var a=1;" * 2048, "minified"),
+])
+def test_content_rejection(head, reason):
+    # Arrange / Act / Assert
+    assert doc_stream.content_rejection(head[:doc_stream.HEAD_BYTES]) == reason
+
+
+def test_walk_prunes_and_rejects_before_reading(tmp_path, monkeypatch):
+    # Arrange
+    write(tmp_path, "app.py", "x = 1\n")
+    write(tmp_path, "docs/readme.md", "# Docs\n")
+    write(tmp_path, "node_modules/big/index.js", "module.exports = 1\n")
+    write(tmp_path, "images/logo.png", b"\x89PNG\r\n\x1a\n")
+    write(tmp_path, "data/dump", b"\x00\x01\x02")
+    huge = write(tmp_path, "huge.py", "y = 2\n" * 100)
+    monkeypatch.setattr(doc_stream, "MAX_FILE_BYTES", 100)
+    opened = []
+    real_open = builtins.open
+
+    def tracking_open(path, *args, **kwargs):
+        opened.append(os.path.relpath(path, tmp_path).replace(os.sep, "/"))
+        return real_open(path, *args, **kwargs)
+
+    monkeypatch.setattr(builtins, "open", tracking_open)
+    entered = []
+    real_walk = os.walk
+
+    def tracking_walk(root):
+        for folder, dirs, files in real_walk(root):
+            entered.append(os.path.relpath(folder, tmp_path).replace(os.sep, "/"))
+            yield folder, dirs, files
+
+    monkeypatch.setattr(doc_stream.os, "walk", tracking_walk)
+    rejected = {}
+
+    # Act
+    paths = [os.path.relpath(p, tmp_path).replace(os.sep, "/") for p in doc_stream.walk(str(tmp_path), rejected)]
+
+    # Assert
+    assert paths == ["app.py", "docs/readme.md"]
+    assert rejected == {"too large": 1, "binary": 1, "binary extension": 1}
+    assert "node_modules" not in entered
+    assert os.path.relpath(huge, tmp_path) not in opened and "images/logo.png" not in opened
+
+
+def test_load_decodes_text_and_rejects_binary(tmp_path):
+    # Arrange
+    bom = write(tmp_path, "bom.md", b"\xef\xbb\xbfhello")
+    latin = write(tmp_path, "latin.txt", "café".encode("latin-1"))
+    binary = write(tmp_path, "blob.py", b"\x7fELF\x02\x01")
+
+    # Act
+    docs = doc_stream.load(bom, "repo/bom.md") + doc_stream.load(latin)
+
+    # Assert
+    assert [(d.page_content, d.metadata["source"]) for d in docs] == [("hello", "repo/bom.md"), ("café", latin)]
+    assert doc_stream.load(binary) == []
+    assert doc_stream.load(str(tmp_path / "missing.py")) == []
+
+
+def test_documents_are_streamed_one_file_at_a_time(tmp_path):
+    # Arrange
+    for i in range(3):
+        write(tmp_path, f"f{i}.md", f"line {i}\nmore {i}\n")
+
+    class LineSplitter:
+        def __init__(self):
+            self.calls = []
+
+        def split_documents(self, documents):
+            self.calls.append([d.metadata["source"] for d in documents])
+            return [line for d in documents for line in d.page_content.splitlines()]
+
+    splitter = LineSplitter()
+
+    # Act
+    chunks = doc_stream.split_stream(doc_stream.stream_documents(str(tmp_path)), splitter)
+    first = next(chunks)
+
+    # Assert: only the first file has been loaded and split so far
+    assert first == "line 0"
+    assert len(splitter.calls) == 1 and len(splitter.calls[0]) == 1
+    assert list(chunks) == ["more 0", "line 1", "more 1", "line 2", "more 2"]
+    assert len(splitter.calls) == 3
+
+
+def test_describe():
+    # Arrange / Act / Assert
+    assert doc_stream.describe({"too large": 3, "binary extension": 9}) == "12 files skipped (binary extension: 9, too large: 3)"
+    assert doc_stream.describe({}) == "no files skipped"
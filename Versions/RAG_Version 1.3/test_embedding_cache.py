@@ -0,0 +1,106 @@
+"""
+Pytest tests for embedding_cache.py
+
+Covers:
+- lookup/store: vectors round-trip per (model, normalized text); other models miss
+- model_key/normalize: the "sentence-transformers/" prefix and whitespace differences share entries
+- CachedEmbeddings: only misses reach the wrapped model, each distinct text once; queries pass through
+- CachedEmbeddings: a disabled cache always calls the model
+- eviction: least recently used vectors go first once MAX_BYTES is exceeded
+"""
+
+import pytest
+import embedding_cache
+from embedding_cache import CachedEmbeddings
+
+MODEL = "all-MiniLM-L6-v2"
+
+
+class CountingEmbeddings:
+    def __init__(self):
+        self.calls = []
+
+    def embed_documents(self, texts):
+        self.calls.append(list(texts))
+        return [[float(len(t)), 0.5, -1.25] for t in texts]
+
+    def embed_query(self, text):
+        return [0.0, 0.0, 0.0]
+
+
+@pytest.fixture(autouse=True)
+def cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(embedding_cache, "CACHE_PATH", str(tmp_path / "embeddings.sqlite"))
+    monkeypatch.setattr(embedding_cache, "ENABLED", True)
+    embedding_cache.reset_stats()
+
+
+def test_store_then_lookup_round_trips():
+    # Arrange
+    embedding_cache.store(MODEL, ["a b"], [[0.25, -2.0, 3.5]])
+
+    # Act
+    vectors = embedding_cache.lookup(MODEL, ["a b", "other", "a b"])
+    other_model = embedding_cache.lookup("other-model", ["a b"])
+
+    # Assert
+    assert vectors == [[0.25, -2.0, 3.5], None, [0.25, -2.0, 3.5]]
+    assert other_model == [None]
+    assert embedding_cache.stats() == {"hits": 2, "misses": 2}
+
+
+def test_model_prefix_and_whitespace_share_entries():
+    # Arrange
+    embedding_cache.store("sentence-transformers/all-MiniLM-L6-v2", ["def f():\n    return 1\n"], [[1.0, 2.0]])
+
+    # Act / Assert
+    assert embedding_cache.lookup(MODEL, ["def f(): return 1"]) == [[1.0, 2.0]]
+
+
+def test_only_misses_reach_the_model():
+    # Arrange
+    inner = CountingEmbeddings()
+    embeddings = CachedEmbeddings(inner, MODEL)
+    embeddings.embed_documents(["license header", "x = 1"])
+
+    # Act: the header repeats (twice, once with other line breaks) in the next repo
+    vectors = embeddings.embed_documents(["license header", "y = 2", "license\nheader", "y = 2"])
+
+    # Assert
+    assert inner.calls == [["license header", "x = 1"], ["y = 2"]]
+    assert vectors == [[14.0, 0.5, -1.25], [5.0, 0.5, -1.25], [14.0, 0.5, -1.25], [5.0, 0.5, -1.25]]
+    assert embeddings.embed_query("q") == [0.0, 0.0, 0.0]
+
+
+def test_disabled_cache_always_embeds(monkeypatch):
+    # Arrange
+    monkeypatch.setattr(embedding_cache, "ENABLED", False)
+    inner = CountingEmbeddings()
+    embeddings = CachedEmbeddings(inner, MODEL)
+
+    # Act
+    embeddings.embed_documents(["a"])
+    embeddings.embed_documents(["a"])
+
+    # Assert
+    assert inner.calls == [["a"], ["a"]]
+    assert embedding_cache.size() == 0
+
+
+def test_least_recently_used_vectors_are_evicted(monkeypatch):
+    # Arrange: each 3-float vector takes 12 bytes; a ticking clock orders the uses
+    ticks = iter(range(1000))
+    monkeypatch.setattr(embedding_cache.time, "time", lambda: next(ticks))
+    monkeypatch.setattr(embedding_cache, "MAX_BYTES", 36)
+    for text in ("old", "used", "middle"):
+        embedding_cache.store(MODEL, [text], [[1.0, 2.0, 3.0]])
+    embedding_cache.lookup(MODEL, ["used"])  # "used" becomes the most recent
+
+    # Act
+    embedding_cache.store(MODEL, ["new"], [[4.0, 5.0, 6.0]])
+
+    # Assert: trimmed to 90% of the limit, oldest first
+    assert embedding_cache.size() == 24
+    assert embedding_cache.lookup(MODEL, ["old", "middle", "used", "new"]) == [
+        None, None, [1.0, 2.0, 3.0], [4.0, 5.0, 6.0],
+    ]
@@ -0,0 +1,126 @@
+"""
+Pytest tests for findings.py
+
+Covers:
+- parse_output: pylint/bandit/eslint JSON, flake8/mypy text, generic `path:line: severity: msg [rule]`
+- parse_output: None for output that is not a report (crash message, failing text tool)
+- dedup: same line + equivalent rule from two tools merged, highest severity kept
+- render_report: errors first, budget cuts lowest-ranked findings and summarizes them
+- render_report: "No issues found." only when the analyzers completed; otherwise the analysis is called incomplete
+- report_to_json/report_from_json: compact round trip
+"""
+
+import json
+import findings
+from findings import Finding
+
+
+def test_parse_pylint_json():
+    # Arrange
+    out = json.dumps([{"type": "warning", "path": "pkg/a.py", "line": 3, "symbol": "unused-import", "message": "Unused import os"}])
+    # Act
+    parsed = findings.parse_output("🧩 Pylint", out, 0, "/repo")
+    # Assert
+    assert parsed == [Finding("pkg/a.py", 3, "unused-import", "warning", "Unused import os", "Pylint")]
+
+
+def test_parse_bandit_and_eslint_json():
+    # Arrange
+    bandit = json.dumps({"results": [{"filename": "./a.py", "line_number": 7, "test_id": "B602", "issue_severity": "HIGH", "issue_text": "shell=True"}]})
+    eslint = json.dumps([{"filePath": "/repo/web/ui.js", "messages": [{"ruleId": "no-undef", "severity": 2, "message": "'x' is not defined", "line": 4}]}])
+    # Act / Assert
+    assert findings.parse_output("🔒 Bandit", bandit, 1, "/repo") == [Finding("a.py", 7, "B602", "error", "shell=True", "Bandit")]
+    assert findings.parse_output("ESLint", eslint, 1, "/repo") == [Finding("web/ui.js", 4, "no-undef", "error", "'x' is not defined", "ESLint")]
+
+
+def test_parse_flake8_mypy_and_generic_text():
+    # Act
+    flake8 = findings.parse_output("🎯 Flake8", "a.py:1:1: F401 'os' imported but unused\na.py:9:80: E501 line too long", 0, ".")
+    mypy = findings.parse_output("🧠 Mypy", 'a.py:5: error: Incompatible types  [assignment]\na.py:5: note: See docs', 1, ".")
+    cpp = findings.parse_output("Cppcheck", "src/m.cpp:12:3: style: Variable 'x' is assigned a value that is never used. [unreadVariable]", 0, ".")
+    # Assert
+    assert [(f.rule, f.severity) for f in flake8] == [("F401", "warning"), ("E501", "info")]
+    assert mypy[0] == Finding("a.py", 5, "assignment", "error", "Incompatible types", "Mypy")
+    assert mypy[1].severity == "info"
+    assert cpp == [Finding("src/m.cpp", 12, "unreadVariable", "info", "Variable 'x' is assigned a value that is never used.", "Cppcheck")]
+
+
+def test_parse_output_returns_none_when_tool_failed():
+    # Act / Assert
+    assert findings.parse_output("🧩 Pylint", "Traceback (most recent call last): ...", 1, ".") is None
+    assert findings.parse_output("🎯 Flake8", "There was a critical error", 1, ".") is None
+    assert findings.parse_output("🎯 Flake8", "", 0, ".") == []
+
+
+def test_dedup_merges_equivalent_rules_across_tools():
+    # Arrange
+    found = [
+        Finding("a.py", 1, "F401", "warning", "'os' imported but unused", "Flake8"),
+        Finding("a.py", 1, "unused-import", "info", "Unused import os", "Pylint"),
+        Finding("a.py", 2, "F401", "warning", "'sys' imported but unused", "Flake8"),
+    ]
+    # Act
+    merged = findings.dedup(found)
+    # Assert
+    assert merged == [
+        Finding("a.py", 1, "F401", "warning", "'os' imported but unused", "Flake8+Pylint"),
+        Finding("a.py", 2, "F401", "warning", "'sys' imported but unused", "Flake8"),
+    ]
+
+
+def _report(found):
+    report = findings.new_report()
+    report["sections"].append({"language": "python", "files": 1, "analyzers": ["Pylint"]})
+    report["findings"] = found
+    report["completed"] = ["Pylint"]
+    return report
+
+
+def test_render_report_ranks_by_severity_and_respects_budget():
+    # Arrange
+    found = [Finding("a.py", i, "C0103", "info", "x" * 40, "Pylint") for i in range(1, 20)]
+    found.append(Finding("a.py", 50, "E1101", "error", "no member", "Pylint"))
+    # Act
+    full = findings.render_report(_report(found))
+    cut = findings.render_report(_report(found), max_chars=400)
+    # Assert
+    assert full.splitlines()[2] == "a.py:50 [error] E1101: no member (Pylint)"
+    assert len(cut) <= 400
+    assert "a.py:50 [error]" in cut
+    assert cut.splitlines()[-1].startswith("... ") and "0 errors" in cut.splitlines()[-1]
+
+
+def test_render_report_without_findings():
+    # Arrange
+    report = _report([])
+    report["hidden"] = 2
+    # Act / Assert
+    assert findings.render_report(_report([])).endswith("No issues found.")
+    assert "2 findings elsewhere" in findings.render_report(report)
+
+
+def test_render_report_without_findings_from_failed_analyzers():
+    # Arrange
+    failed = _report([])
+    failed["completed"] = []
+    failed["notes"] = ["| 🧩 Pylint: ⏱️ Timed out after 120s and was stopped."]
+    partial = _report([])
+    partial["sections"][0]["analyzers"].append("Mypy")
+    partial["notes"] = ["| 🧠 Mypy: ❌ Command not found. Is the tool installed locally and in PATH?"]
+    # Act
+    failed_text = findings.render_report(failed)
+    partial_text = findings.render_report(partial)
+    # Assert
+    assert "No issues found" not in failed_text
+    assert failed_text.endswith("no analyzer ran to completion, so the absence of findings proves nothing.")
+    assert partial_text.endswith("No issues found by Pylint; static analysis was incomplete (see the notes above).")
+
+
+def test_report_json_round_trip():
+    # Arrange
+    report = _report([Finding("a.py", 1, "F401", "warning", "unused", "Flake8")])
+    # Act
+    text = findings.report_to_json(report)
+    # Assert
+    assert '"findings":[["a.py",1,"F401","warning","unused","Flake8"]]' in text
+    assert findings.report_from_json(text) == report
@@ -0,0 +1,148 @@
+"""
+Pytest tests for index_refresh.py
+
+Covers:
+- plan_repo_sync: with no indexed commit, the whole repo is checked out and scanned
+- plan_repo_sync: after a merge only the changed paths are checked out; edits are re-embedded,
+  deleted files removed, everything else left alone
+- plan_repo_sync: nothing is checked out when the index is already at HEAD
+- plan_repo_sync: an indexed commit the mirror doesn't know falls back to a full scan
+
+Uses a local git repository as the "GitHub" origin, so no network access is needed.
+"""
+
+import os
+import pytest
+from git import Repo
+import index_refresh
+import ingest_manifest
+import repo_cache
+
+INDEX = "test-index"
+MODEL = "test-model"
+SCOPE = index_refresh.repo_scope("o", "r")
+
+
+class FakeStore:
+    def __init__(self):
+        self.vectors = {}
+
+    def add_documents(self, documents, ids):
+        self.vectors.update(zip(ids, documents))
+
+    def delete(self, ids):
+        for i in ids:
+            self.vectors.pop(i, None)
+
+
+@pytest.fixture
+def origin(tmp_path, monkeypatch):
+    # Arrange: an origin repo with one commit on main, an isolated cache dir and manifest
+    origin_dir = tmp_path / "origin"
+    repo = Repo.init(origin_dir, initial_branch="main")
+    with repo.config_writer() as cw:
+        cw.set_value("user", "name", "test")
+        cw.set_value("user", "email", "test@example.com")
+        cw.set_value("uploadpack", "allowfilter", "true")
+        cw.set_value("uploadpack", "allowanysha1inwant", "true")
+    (origin_dir / "pkg").mkdir()
+    (origin_dir / "app.py").write_text("x = 1\n")
+    (origin_dir / "README.md").write_text("docs\n")
+    (origin_dir / "pkg" / "mod.py").write_text("y = 1\n")
+    repo.index.add(["app.py", "README.md", "pkg/mod.py"])
+    repo.index.commit("initial")
+
+    monkeypatch.setattr(repo_cache, "REPO_CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setattr(repo_cache, "repo_url", lambda owner, name: f"file://{origin_dir}")
+    monkeypatch.setattr(ingest_manifest, "MANIFEST_PATH", str(tmp_path / "manifest.sqlite"))
+    monkeypatch.chdir(tmp_path)
+    return repo
+
+
+def load(source):
+    with open(source, encoding="utf-8") as f:
+        return [f.read()]
+
+
+def sync(store):
+    """One ingest run: plan, apply, record the commit, drop the checkout."""
+    mirror = repo_cache.ensure_mirror("o", "r")
+    head, changes = index_refresh.plan_repo_sync(mirror, INDEX, SCOPE, MODEL, "checkout")
+    checked_out = sorted(
+        os.path.relpath(os.path.join(root, f), "checkout").replace(os.sep, "/")
+        for root, dirs, files in os.walk("checkout") for f in files if f != ".git"
+    )
+    ingest_manifest.apply(store, changes, load, lambda docs: docs)
+    ingest_manifest.set_indexed_commit(INDEX, SCOPE, head)
+    if os.path.exists("checkout"):
+        repo_cache.remove_worktree(mirror, "checkout")
+    return changes, checked_out
+
+
+def commit(origin, edits=None, removed=()):
+    for rel, text in (edits or {}).items():
+        with open(os.path.join(origin.working_dir, rel), "w") as f:
+            f.write(text)
+        origin.git.add(rel)
+    for rel in removed:
+        origin.git.rm(rel)
+    origin.index.commit("change")
+
+
+def test_first_sync_scans_the_whole_repo(origin):
+    # Arrange
+    store = FakeStore()
+
+    # Act
+    changes, checked_out = sync(store)
+
+    # Assert
+    assert checked_out == ["README.md", "app.py", "pkg/mod.py"]
+    assert sorted(changes.changed) == ["checkout/README.md", "checkout/app.py", "checkout/pkg/mod.py"]
+    assert sorted(store.vectors.values()) == ["docs\n", "x = 1\n", "y = 1\n"]
+
+
+def test_sync_after_merge_touches_only_changed_paths(origin):
+    # Arrange
+    store = FakeStore()
+    sync(store)
+    commit(origin, edits={"app.py": "x = 2\n"}, removed=["README.md"])
+
+    # Act
+    changes, checked_out = sync(store)
+
+    # Assert
+    assert checked_out == ["app.py"]
+    assert list(changes.changed) == ["checkout/app.py"]
+    assert list(changes.removed) == ["checkout/README.md"]
+    assert changes.unchanged == 1
+    assert sorted(store.vectors.values()) == ["x = 2\n", "y = 1\n"]
+
+
+def test_sync_at_indexed_commit_checks_out_nothing(origin):
+    # Arrange
+    store = FakeStore()
+    sync(store)
+
+    # Act
+    changes, checked_out = sync(store)
+
+    # Assert
+    assert checked_out == []
+    assert changes.changed == {} and changes.removed == {} and changes.unchanged == 3
+
+
+def test_unknown_indexed_commit_falls_back_to_full_scan(origin):
+    # Arrange: the recorded commit no longer exists (e.g. after a force-push)
+    store = FakeStore()
+    sync(store)
+    ingest_manifest.set_indexed_commit(INDEX, SCOPE, "0" * 40)
+    commit(origin, edits={"app.py": "x = 2\n"})
+
+    # Act
+    changes, checked_out = sync(store)
+
+    # Assert
+    assert checked_out == ["README.md", "app.py", "pkg/mod.py"]
+    assert list(changes.changed) == ["checkout/app.py"]
+    assert changes.unchanged == 2
@@ -0,0 +1,109 @@
+"""
+Pytest tests for pr_features.py
+
+Covers:
+- extract_pr_features: same values as the original regex implementation (benchmark_pr_features)
+  on a realistic diff, on edge cases of the old patterns, and on non-ASCII text
+- extract_pr_features: matches that would straddle a block boundary ("/*" ... "*/", "def\\n name")
+- extract_pr_features: "$"-anchored flags only look at the last line of the diff
+"""
+
+import pytest
+import pr_features
+from benchmark_pr_features import extract_pr_features_regex, synthetic_diff
+
+DIFF = """diff --git a/src/app.py b/src/app.py
+index 1111111..2222222 100644
+--- a/src/app.py
++++ b/src/app.py
+@@ -1,4 +1,5 @@
+ import os
+-def load(path):
++def load(path, mode="r"):
++    # open with an explicit mode
+     return open(path)
+diff --git a/README.md b/README.md
+--- a/README.md
++++ b/README.md
+@@ -1 +1 @@
+-Old docs
++New documentation
+"""
+
+EDGE_CASES = [
+    "",
+    "\n",
+    "+",
+    "-\n-\n+",
+    "import os\nfrom x import y\n#include <a.h>\n",
+    "+import os\n+from x import y\n",
+    "import",                        # "^import\\s" needs the whitespace
+    "import\n",
+    "x = 1 /* open\n+still open */\n",
+    "glob('build/*')\n",             # "/*" without a closing "*/"
+    "/*/\n",
+    "+undef\n    name\n",             # "def\\s+\\w+" across lines
+    "+def\n+name\n",
+    "functional funcs FUNC\n",
+    "Function\n",
+    "settings.CONF\n",
+    "config.yaml\nmain.py",
+    "config.yaml\n",
+    "config.yaml\n\n",
+    "main.PY\n",
+    "app.ts",
+    "App.java\n",
+    "résumé test\n",
+    "teſt\n",                         # IGNORECASE folds the long s; str.lower() does not
+    "diff --git a/x b/x\ndiff --gitx\n",
+]
+
+
+def test_matches_regex_implementation_on_a_realistic_diff():
+    # Arrange / Act
+    features = pr_features.extract_pr_features(DIFF)
+
+    # Assert
+    assert features == extract_pr_features_regex(DIFF)
+    assert features["num_files"] == 2
+    assert features["has_comments"] == features["has_functions"] == features["has_docs"] == 1
+    assert list(features) == pr_features.FEATURE_ORDER
+
+
+@pytest.mark.parametrize("diff", EDGE_CASES)
+def test_matches_regex_implementation_on_edge_cases(diff):
+    # Arrange / Act / Assert
+    assert pr_features.extract_pr_features(diff) == extract_pr_features_regex(diff)
+
+
+@pytest.mark.parametrize("diff", EDGE_CASES + [DIFF, synthetic_diff(200), synthetic_diff(200, "glob-paths")])
+def test_block_boundaries_do_not_change_the_result(monkeypatch, diff):
+    # Arrange: cut the diff into many tiny blocks
+    monkeypatch.setattr(pr_features, "BLOCK_SIZE", 8)
+
+    # Act / Assert
+    assert pr_features.extract_pr_features(diff) == extract_pr_features_regex(diff)
+
+
+def test_block_comment_closed_in_a_later_block(monkeypatch):
+    # Arrange
+    monkeypatch.setattr(pr_features, "BLOCK_SIZE", 4)
+    diff = "+a /* start\n+b\n+c\n+end */\n"
+
+    # Act
+    features = pr_features.extract_pr_features(diff)
+
+    # Assert
+    assert features["has_comments"] == 1
+
+
+def test_anchored_flags_use_only_the_last_line():
+    # Arrange
+    diff = "+++ b/app.py\n+++ b/notes.txt\n"
+
+    # Act
+    features = pr_features.extract_pr_features(diff)
+
+    # Assert
+    assert features["is_python"] == 0
+    assert pr_features.extract_pr_features("+++ b/notes.txt\n+++ b/app.py\n")["is_python"] == 1
@@ -0,0 +1,216 @@
+"""
+Pytest tests for repo_cache.py
+
+Covers:
+- ensure_mirror: first call creates a bare clone, later calls fetch new commits incrementally
+- pr_worktree: checks out the PR head commit and removes the worktree on exit
+- add_worktree/remove_worktree: relative paths resolved against the caller's cwd, not the mirror
+- sparse checkouts: blobless mirror, only changed files + their config files materialized
+- sparse_patterns: config files in every parent folder, duplicates dropped
+- resident_worktree: one folder per repo reused across PRs, file set switched in place
+- resident_worktree: while the folder is busy, a temporary checkout of the same commit is used (no waiting)
+- pr_worktree: `sha` pins the checkout to that commit even after the PR head moved
+- changed_paths: name-status between two commits (renames as delete + add); None for unknown commits
+
+Uses a local git repository as the "GitHub" origin, so no network access is needed.
+"""
+
+import os
+import pytest
+from git import Repo
+import repo_cache
+
+
+@pytest.fixture
+def origin(tmp_path, monkeypatch):
+    # Arrange: an origin repo with one commit on main and a PR ref, plus an isolated cache dir
+    origin_dir = tmp_path / "origin"
+    repo = Repo.init(origin_dir, initial_branch="main")
+    with repo.config_writer() as cw:
+        cw.set_value("user", "name", "test")
+        cw.set_value("user", "email", "test@example.com")
+        # let `--filter=blob:none` clones and lazy blob fetches work against a local origin
+        cw.set_value("uploadpack", "allowfilter", "true")
+        cw.set_value("uploadpack", "allowanysha1inwant", "true")
+    (origin_dir / "app.py").write_text("x = 1\n")
+    (origin_dir / "pyproject.toml").write_text("[tool.pylint]\n")
+    (origin_dir / "README.md").write_text("docs\n")
+    (origin_dir / "pkg" / "sub").mkdir(parents=True)
+    (origin_dir / "pkg" / "setup.cfg").write_text("[flake8]\n")
+    (origin_dir / "pkg" / "sub" / "mod.py").write_text("y = 1\n")
+    (origin_dir / "pkg" / "sub" / "other.py").write_text("z = 1\n")
+    repo.index.add(["app.py", "pyproject.toml", "README.md", "pkg/setup.cfg", "pkg/sub/mod.py", "pkg/sub/other.py"])
+    repo.index.commit("initial")
+
+    repo.git.checkout("-b", "feature")
+    (origin_dir / "app.py").write_text("x = 2\n")
+    repo.index.add(["app.py"])
+    pr_commit = repo.index.commit("pr change")
+    repo.git.update_ref("refs/pull/7/head", pr_commit.hexsha)
+    repo.git.checkout("main")
+
+    monkeypatch.setattr(repo_cache, "REPO_CACHE_DIR", str(tmp_path / "cache"))
+    # file:// so git uses the real transport (a plain local path ignores --filter)
+    monkeypatch.setattr(repo_cache, "repo_url", lambda owner, name: f"file://{origin_dir}")
+    return repo
+
+
+def test_ensure_mirror_creates_bare_clone_then_fetches_incrementally(origin):
+    # Act
+    mirror = repo_cache.ensure_mirror("o", "r")
+    first_head = mirror.git.rev_parse("HEAD")
+    with open(os.path.join(origin.working_dir, "new.py"), "w") as f:
+        f.write("y = 1\n")
+    origin.index.add(["new.py"])
+    new_commit = origin.index.commit("second")
+    mirror_again = repo_cache.ensure_mirror("o", "r")
+    # Assert
+    assert mirror.bare
+    assert mirror_again.git.rev_parse("HEAD") == new_commit.hexsha != first_head
+
+
+def test_pr_worktree_checks_out_pr_head_and_cleans_up(origin):
+    # Act
+    with repo_cache.pr_worktree("o", "r", 7) as path:
+        content = open(os.path.join(path, "app.py")).read()
+        existed = os.path.isdir(path)
+    # Assert
+    assert existed
+    assert content == "x = 2\n"
+    assert not os.path.exists(path)
+    mirror = Repo(repo_cache.mirror_path("o", "r"))
+    assert len(mirror.git.worktree("list").splitlines()) == 1  # only the bare mirror itself
+
+
+def test_relative_worktree_path_resolves_against_cwd(origin, tmp_path, monkeypatch):
+    # Arrange
+    monkeypatch.chdir(tmp_path)
+    mirror = repo_cache.ensure_mirror("o", "r")
+    # Act
+    path = repo_cache.add_worktree(mirror, "HEAD", "temp_client_repo")
+    # Assert
+    assert path == str(tmp_path / "temp_client_repo")
+    assert (tmp_path / "temp_client_repo" / "app.py").read_text() == "x = 1\n"
+    repo_cache.remove_worktree(mirror, "temp_client_repo")
+    assert not (tmp_path / "temp_client_repo").exists()
+
+
+def _checked_out_files(path):
+    found = []
+    for root, dirs, files in os.walk(path):
+        dirs[:] = [d for d in dirs if d != ".git"]
+        found.extend(os.path.relpath(os.path.join(root, f), path).replace(os.sep, "/") for f in files if f != ".git")
+    return sorted(found)
+
+
+def test_sparse_pr_worktree_materializes_only_changed_files_and_configs(origin):
+    # Act
+    with repo_cache.pr_worktree("o", "r", 7, sparse_paths=["pkg/sub/mod.py"]) as path:
+        files = _checked_out_files(path)
+    # Assert
+    assert files == ["pkg/setup.cfg", "pkg/sub/mod.py", "pyproject.toml"]
+    mirror = Repo(repo_cache.mirror_path("o", "r"))
+    assert mirror.git.config("remote.origin.partialclonefilter") == "blob:none"
+    assert mirror.bare  # shared config untouched by the sparse checkout
+
+
+def test_full_worktree_still_available_on_partial_mirror(origin, tmp_path):
+    # Arrange
+    mirror = repo_cache.ensure_mirror("o", "r")
+    # Act
+    path = repo_cache.add_worktree(mirror, "HEAD", str(tmp_path / "full"))
+    # Assert: missing blobs are fetched on demand
+    assert "pkg/sub/other.py" in _checked_out_files(path)
+    repo_cache.remove_worktree(mirror, path)
+
+
+def test_sparse_patterns_include_configs_from_every_parent_folder(monkeypatch):
+    # Arrange
+    monkeypatch.setattr(repo_cache, "ANALYZER_CONFIG_FILES", ("setup.cfg",))
+    # Act
+    patterns = repo_cache.sparse_patterns(["a/b/c.py", "a/d.py"])
+    # Assert
+    assert patterns == ["/a/b/c.py", "/a/b/setup.cfg", "/a/setup.cfg", "/setup.cfg", "/a/d.py"]
+
+
+def test_resident_worktree_is_reused_and_switched_between_prs(origin):
+    # Arrange: a second PR that edits another file
+    origin.git.checkout("-b", "other")
+    with open(os.path.join(origin.working_dir, "pkg", "sub", "other.py"), "w") as f:
+        f.write("z = 2\n")
+    origin.index.add(["pkg/sub/other.py"])
+    origin.git.update_ref("refs/pull/8/head", origin.index.commit("second pr").hexsha)
+    # Act
+    with repo_cache.resident_worktree("o", "r", 7, sparse_paths=["app.py"]) as first:
+        first_files = _checked_out_files(first)
+        with open(os.path.join(first, "analyzer.cache"), "w") as f:
+            f.write("warm\n")  # untracked analyzer state
+    with repo_cache.resident_worktree("o", "r", 8, sparse_paths=["pkg/sub/other.py"]) as second:
+        second_files = _checked_out_files(second)
+        content = open(os.path.join(second, "pkg", "sub", "other.py")).read()
+    with repo_cache.resident_worktree("o", "r", 7) as third:
+        third_files = _checked_out_files(third)
+    # Assert
+    assert first == second == third
+    assert first_files == ["app.py", "pyproject.toml"]
+    assert second_files == ["analyzer.cache", "pkg/setup.cfg", "pkg/sub/other.py", "pyproject.toml"]
+    assert content == "z = 2\n"
+    assert "README.md" in third_files and "pkg/sub/mod.py" in third_files
+    mirror = Repo(repo_cache.mirror_path("o", "r"))
+    assert Repo(third).head.commit.hexsha == mirror.git.rev_parse("refs/pull/7/head")
+    assert len(mirror.git.worktree("list").splitlines()) == 2
+
+
+def test_busy_resident_worktree_falls_back_to_a_temporary_checkout(origin):
+    # Act: a nested call, as a second analysis of the same repo would make
+    with repo_cache.resident_worktree("o", "r", 7) as outer:
+        with repo_cache.resident_worktree("o", "r", 7, sparse_paths=["app.py"]) as inner:
+            inner_files = _checked_out_files(inner)
+            inner_sha = Repo(inner).head.commit.hexsha
+        outer_sha = Repo(outer).head.commit.hexsha
+    # Assert
+    assert inner != outer and repo_cache.is_resident(outer) and not repo_cache.is_resident(inner)
+    assert inner_files == ["app.py", "pyproject.toml"]
+    assert inner_sha == outer_sha
+    assert not os.path.exists(inner)
+    with repo_cache.resident_worktree("o", "r", 7) as again:  # the lock was released
+        assert again == outer
+
+
+def test_pr_worktree_pinned_to_sha_ignores_a_moved_pr_head(origin):
+    # Arrange: the PR gets a new commit after the first checkout
+    with repo_cache.pr_worktree("o", "r", 7) as path:
+        reviewed = Repo(path).head.commit.hexsha
+    origin.git.checkout("feature")
+    with open(os.path.join(origin.working_dir, "app.py"), "w") as f:
+        f.write("x = 3\n")
+    origin.index.add(["app.py"])
+    origin.git.update_ref("refs/pull/7/head", origin.index.commit("pushed later").hexsha)
+    origin.git.checkout("main")
+    repo_cache.fetch_pr_head(repo_cache.ensure_mirror("o", "r", update=False), 7)
+    # Act
+    with repo_cache.pr_worktree("o", "r", 7, sha=reviewed) as path:
+        pinned = Repo(path).head.commit.hexsha
+        content = open(os.path.join(path, "app.py")).read()
+    # Assert
+    assert pinned == reviewed
+    assert content == "x = 2\n"
+
+
+def test_changed_paths_between_commits(origin):
+    # Arrange: edit, delete and rename on main
+    mirror = repo_cache.ensure_mirror("o", "r")
+    old = mirror.git.rev_parse("HEAD")
+    with open(os.path.join(origin.working_dir, "app.py"), "w") as f:
+        f.write("x = 3\n")
+    origin.git.rm("README.md")
+    origin.git.mv("pkg/sub/other.py", "pkg/sub/renamed.py")
+    origin.git.add("app.py")
+    origin.index.commit("edit, delete, rename")
+    new = repo_cache.ensure_mirror("o", "r").git.rev_parse("HEAD")
+    # Act
+    changes = repo_cache.changed_paths(mirror, old, new)
+    # Assert
+    assert changes == {"README.md": "D", "app.py": "M", "pkg/sub/other.py": "D", "pkg/sub/renamed.py": "A"}
+    assert repo_cache.changed_paths(mirror, new, new) == {}
+    assert repo_cache.changed_paths(mirror, "0" * 40, new) is None
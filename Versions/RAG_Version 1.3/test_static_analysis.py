@@ -0,0 +1,306 @@
+"""
+Pytest tests for static_analysis.py
+
+Covers:
+- get_changed_files_and_languages: groups changed paths by language, skips unknown extensions
+- _run_analyzers: analyzers run concurrently, findings/notes keep the ANALYZERS order, duplicates merged
+- _run_analyzers: overall time budget stops slow analyzers; missing tools are reported as notes
+- _run_analyzer: unchanged files are served from analysis_cache, only edited files are re-linted
+- _run_analyzer: for cross-module analyzers (Mypy, Pylint) editing one file re-checks all of them
+- _run_analyzers: with a hunk index, findings away from the changed lines are omitted and counted
+- _run_analyzers: the in-process AST tier reports even when no external tool is installed
+- _run_analyzers: analyzers over the latency budget are deferred (cached findings only) and their
+  background run fills the cache for the next review; every plan decision is recorded
+- _run_analyzer: in DAEMON_MODE, Mypy/Pylint in the resident worktree go through analyzer_daemons;
+  other tools, and any tool in a temporary checkout, still run one-shot
+- _queue_deferred: one background run per job; finished jobs are pruned
+- finish_deferred: waits for pending jobs with a message, or cancels the queued ones
+
+Analyzers are replaced with small `python -c` commands, so no linters need to be installed.
+"""
+
+import sys
+import time
+import threading
+import subprocess
+from contextlib import contextmanager
+import pytest
+import analysis_cache
+import analysis_planner
+import analyzer_daemons
+import repo_cache
+import findings
+import static_analysis
+from findings import Finding
+
+
+@pytest.fixture(autouse=True)
+def isolated_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(analysis_cache, "CACHE_PATH", str(tmp_path / "analysis_cache.sqlite"))
+    analysis_cache.reset_stats()
+    analysis_planner.reset()
+
+
+def _reporter(seconds, *lines, code=0):
+    """Fake analyzer: waits, prints `lines`, exits with `code`."""
+    return [sys.executable, "-c", f"import sys, time; time.sleep({seconds}); print({chr(10).join(lines)!r}); sys.exit({code})"]
+
+
+def test_get_changed_files_and_languages_groups_by_language():
+    # Arrange
+    diff = "+++ b/app/main.py\n+++ b/web/ui.tsx\n+++ b/README.md\n+++ b/app/util.py\n"
+    # Act
+    files = static_analysis.get_changed_files_and_languages(diff)
+    # Assert
+    assert files == {"python": ["app/main.py", "app/util.py"], "javascript": ["web/ui.tsx"]}
+
+
+def test_run_analyzers_runs_concurrently_in_deterministic_order(tmp_path, monkeypatch):
+    # Arrange: the first-listed analyzer finishes last; A and B report the same unused import
+    for name in ("a.py", "b.js"):
+        (tmp_path / name).write_text("x\n")
+    monkeypatch.setattr(static_analysis, "ANALYZERS", {
+        "python": [("🎯 Flake8", _reporter(0.6, "a.py:1:1: F401 'os' imported but unused")),
+                   ("🧩 B", _reporter(0.5, "a.py:1:1: warning: unused import os [W0611]", "a.py:2:1: error: bad [E0001]"))],
+        "javascript": [("C", _reporter(0.4, "b.js:3:1: warning: c"))],
+    })
+    monkeypatch.setattr(static_analysis, "ANALYZER_WORKERS", 3)
+    report = findings.new_report()
+    # Act
+    start = time.monotonic()
+    static_analysis._run_analyzers({"python": ["a.py"], "javascript": ["b.js"]}, str(tmp_path), report)
+    elapsed = time.monotonic() - start
+    # Assert
+    assert elapsed < 1.2  # sequential would take 1.5s
+    assert report["sections"] == [
+        {"language": "python", "files": 1, "analyzers": ["AST", "Flake8", "B"]},
+        {"language": "javascript", "files": 1, "analyzers": ["C"]},
+    ]
+    assert [(f.file, f.line, f.tool) for f in report["findings"]] == [("a.py", 1, "Flake8+B"), ("a.py", 2, "B"), ("b.js", 3, "C")]
+
+
+def test_run_analyzers_stops_analyzers_past_the_budget(tmp_path, monkeypatch):
+    # Arrange
+    (tmp_path / "a.py").write_text("x\n")
+    monkeypatch.setattr(static_analysis, "ANALYZERS", {
+        "python": [("Fast", _reporter(0, "a.py:1: error: ok")), ("Slow", _reporter(30, "never")), ("Missing", ["no-such-analyzer-xyz"])],
+    })
+    monkeypatch.setattr(static_analysis, "ANALYZER_WORKERS", 3)
+    monkeypatch.setattr(static_analysis, "ANALYSIS_BUDGET", 1)
+    report = findings.new_report()
+    # Act
+    start = time.monotonic()
+    static_analysis._run_analyzers({"python": ["a.py"]}, str(tmp_path), report)
+    # Assert
+    assert time.monotonic() - start < 10
+    assert [f.message for f in report["findings"]] == ["ok"]
+    assert "Timed out" in report["notes"][0]
+    assert "Command not found" in report["notes"][1]
+
+
+def test_run_analyzers_skips_analyzers_queued_past_the_deadline(tmp_path, monkeypatch):
+    # Arrange: one worker, so the second analyzer only starts after the budget is spent
+    (tmp_path / "a.py").write_text("x\n")
+    monkeypatch.setattr(static_analysis, "ANALYZERS", {
+        "python": [("Slow", _reporter(30, "never")), ("Queued", _reporter(0, "late"))],
+    })
+    monkeypatch.setattr(static_analysis, "ANALYZER_WORKERS", 1)
+    monkeypatch.setattr(static_analysis, "ANALYSIS_BUDGET", 0.5)
+    report = findings.new_report()
+    # Act
+    static_analysis._run_analyzers({"python": ["a.py"]}, str(tmp_path), report)
+    # Assert
+    assert "Timed out" in report["notes"][0]
+    assert "Skipped" in report["notes"][1]
+
+
+def test_language_without_analyzer_is_reported(tmp_path):
+    # Arrange
+    report = findings.new_report()
+    # Act
+    static_analysis._run_analyzers({"kotlin": ["A.kt"]}, str(tmp_path), report)
+    # Assert
+    assert report["sections"] == [{"language": "kotlin", "files": 1, "analyzers": []}]
+    assert report["notes"] == ["No analyzer configured for kotlin"]
+
+
+# Fake linter: logs which files it was given, reports one finding per file plus a summary line
+FAKE_LINTER = (
+    "import sys\n"
+    "with open('calls.log', 'a') as log: log.write(' '.join(sys.argv[1:]) + '\\n')\n"
+    "for path in sys.argv[1:]: print(f'{path}:1: error: {open(path).read().strip()}')\n"
+    "print('Checked', len(sys.argv) - 1, 'files')\n"
+)
+
+
+def test_run_analyzer_reuses_cached_findings_for_unchanged_files(tmp_path):
+    # Arrange
+    (tmp_path / "a.py").write_text("alpha\n")
+    (tmp_path / "b.py").write_text("beta\n")
+    cmd = [sys.executable, "-c", FAKE_LINTER]
+    first = static_analysis._run_analyzer("Fake", cmd, ["a.py", "b.py"], str(tmp_path), time.monotonic() + 30)
+    # Act: same contents again, then only b.py edited
+    second = static_analysis._run_analyzer("Fake", cmd, ["a.py", "b.py"], str(tmp_path), time.monotonic() + 30)
+    (tmp_path / "b.py").write_text("beta v2\n")
+    third = static_analysis._run_analyzer("Fake", cmd, ["a.py", "b.py"], str(tmp_path), time.monotonic() + 30)
+    # Assert
+    assert (tmp_path / "calls.log").read_text().splitlines() == ["a.py b.py", "b.py"]
+    assert first == second == ([Finding("a.py", 1, "", "error", "alpha", "Fake"), Finding("b.py", 1, "", "error", "beta", "Fake")], None)
+    assert [f.message for f in third[0]] == ["alpha", "beta v2"]
+
+
+def test_cross_module_analyzer_rechecks_every_file_when_one_changes(tmp_path):
+    # Arrange
+    (tmp_path / "a.py").write_text("alpha\n")
+    (tmp_path / "b.py").write_text("beta\n")
+    cmd = [sys.executable, "-c", FAKE_LINTER]
+    static_analysis._run_analyzer("🧠 Mypy", cmd, ["a.py", "b.py"], str(tmp_path), time.monotonic() + 30)
+    static_analysis._run_analyzer("🧠 Mypy", cmd, ["a.py", "b.py"], str(tmp_path), time.monotonic() + 30)
+    # Act: b.py's new contents could change what Mypy reports for a.py
+    (tmp_path / "b.py").write_text("beta v2\n")
+    static_analysis._run_analyzer("🧠 Mypy", cmd, ["a.py", "b.py"], str(tmp_path), time.monotonic() + 30)
+    # Assert
+    assert (tmp_path / "calls.log").read_text().splitlines() == ["a.py b.py", "a.py b.py"]
+
+
+def test_run_analyzer_does_not_cache_tool_errors(tmp_path):
+    # Arrange: the tool fails without reporting on any file
+    (tmp_path / "a.py").write_text("x\n")
+    cmd = [sys.executable, "-c", "import sys; print('config error'); sys.exit(2)"]
+    # Act
+    first = static_analysis._run_analyzer("Broken", cmd, ["a.py"], str(tmp_path), time.monotonic() + 30)
+    static_analysis._run_analyzer("Broken", cmd, ["a.py"], str(tmp_path), time.monotonic() + 30)
+    # Assert
+    assert first == ([], "| Broken: ❌ Analyzer failed:\n```\nconfig error\n```")
+    assert analysis_cache.stats() == {"hits": 0, "misses": 2}
+
+
+def test_run_analyzers_scopes_findings_to_changed_lines(tmp_path, monkeypatch):
+    # Arrange: one finding on line 1 of each file; only a.py line 2 changed, b.py line 50
+    (tmp_path / "a.py").write_text("alpha\n")
+    (tmp_path / "b.py").write_text("beta\n")
+    monkeypatch.setattr(static_analysis, "ANALYZERS", {"python": [("Fake", [sys.executable, "-c", FAKE_LINTER])]})
+    report = findings.new_report()
+    # Act
+    static_analysis._run_analyzers({"python": ["a.py", "b.py"]}, str(tmp_path), report, {"a.py": [(2, 2)], "b.py": [(50, 50)]})
+    # Assert
+    assert [f.file for f in report["findings"]] == ["a.py"]
+    assert report["hidden"] == 1
+
+
+def test_daemon_mode_routes_resident_tools_through_analyzer_daemons(tmp_path, monkeypatch):
+    # Arrange: a resident worktree and a temporary checkout of the same files
+    resident_dir, temp_dir = tmp_path / "resident" / "o__r", tmp_path / "worktrees" / "r-1"
+    for folder in (resident_dir, temp_dir):
+        folder.mkdir(parents=True)
+        (folder / "a.py").write_text("alpha\n")
+    monkeypatch.setattr(repo_cache, "REPO_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(static_analysis, "DAEMON_MODE", True)
+    calls = []
+
+    def fake_run(tool, base_cmd, files, cwd, timeout):
+        calls.append((tool, files, cwd))
+        return subprocess.CompletedProcess(base_cmd + files, 1, "a.py:1: error: Bad type  [assignment]\n", "")
+
+    monkeypatch.setattr(analyzer_daemons, "run", fake_run)
+    # Act
+    resident = static_analysis._run_analyzer("🧠 Mypy", ["mypy"], ["a.py"], str(resident_dir), time.monotonic() + 30)
+    one_shot = static_analysis._run_analyzer("Fake", [sys.executable, "-c", FAKE_LINTER], ["a.py"], str(resident_dir), time.monotonic() + 30)
+    temporary = static_analysis._run_analyzer("🧠 Mypy", [sys.executable, "-c", FAKE_LINTER], ["a.py"], str(temp_dir), time.monotonic() + 30)
+    # Assert
+    assert calls == [("Mypy", ["a.py"], str(resident_dir))]
+    assert resident == ([Finding("a.py", 1, "assignment", "error", "Bad type", "Mypy")], None)
+    assert one_shot[0][0].message == "alpha"
+    assert temporary[0][0].message == "alpha"
+
+
+def test_fast_checks_report_without_external_tools(tmp_path, monkeypatch):
+    # Arrange: a bare except on a changed line, no analyzer installed
+    (tmp_path / "a.py").write_text("try:\n    pass\nexcept:\n    pass\n")
+    monkeypatch.setattr(static_analysis, "ANALYZERS", {"python": [("Missing", ["no-such-linter-xyz"])]})
+    report = findings.new_report()
+    # Act
+    static_analysis._run_analyzers({"python": ["a.py"]}, str(tmp_path), report, {"a.py": [(3, 3)]})
+    # Assert
+    assert report["sections"][0]["analyzers"] == ["AST", "Missing"]
+    assert report["findings"] == [Finding("a.py", 3, "bare-except", "warning", "No exception type(s) specified", "AST")]
+    assert "Command not found" in report["notes"][0]
+    assert report["completed"] == []  # a missing tool never counts as a clean run
+
+
+def test_over_budget_analyzer_is_deferred_and_warms_the_cache(tmp_path, monkeypatch):
+    # Arrange: a tiny budget leaves room for the fast Flake8 only
+    (tmp_path / "a.py").write_text("alpha\n")
+    monkeypatch.setattr(static_analysis, "ANALYZERS", {"python": [
+        ("Flake8", _reporter(0, "a.py:1:1: F401 'os' imported but unused")),
+        ("🧠 Mypy", [sys.executable, "-c", FAKE_LINTER]),
+    ]})
+    monkeypatch.setattr(analysis_planner, "LATENCY_BUDGET", 1)
+    monkeypatch.setattr(repo_cache, "pr_worktree", contextmanager(lambda *args, **kwargs: iter([str(tmp_path)])))
+    first = findings.new_report()
+    # Act: review, background run, then a second review of the same file
+    deferred = static_analysis._run_analyzers({"python": ["a.py"]}, str(tmp_path), first)
+    future = static_analysis._deferred_pool.submit(static_analysis._run_deferred, "o", "r", 1, None, deferred, 0)
+    background = future.result(timeout=30)
+    second = findings.new_report()
+    static_analysis._run_analyzers({"python": ["a.py"]}, str(tmp_path), second)
+    # Assert
+    assert [(d["tool"], d["action"]) for d in first["plan"]] == [("Flake8", "run"), ("Mypy", "defer")]
+    assert [f.tool for f in first["findings"] if f.tool != "AST"] == ["Flake8"]
+    assert first["notes"] == ["| 🧠 Mypy: ⏭️ Deferred to a background run after the review (no cached results yet)."]
+    assert [f.message for f in background["findings"]] == ["alpha"]
+    assert "Mypy" in [f.tool for f in second["findings"]]
+    assert second["notes"] == []
+
+
+@pytest.fixture
+def deferred_worker(monkeypatch):
+    """A fresh background worker whose jobs record their args once `gate` is set."""
+    gate, ran = threading.Event(), []
+
+    def fake_run_deferred(*args):
+        gate.wait(5)
+        ran.append(args)
+        return {"args": args}
+
+    monkeypatch.setattr(static_analysis, "_run_deferred", fake_run_deferred)
+    monkeypatch.setattr(static_analysis, "_deferred_pool", static_analysis.ThreadPoolExecutor(max_workers=1))
+    monkeypatch.setattr(static_analysis, "_deferred", [])
+    monkeypatch.setattr(static_analysis, "_deferred_keys", set())
+    return gate, ran
+
+
+def test_deferred_jobs_run_once_and_are_pruned_when_done(deferred_worker, capsys):
+    # Arrange
+    gate, ran = deferred_worker
+    static_analysis._queue_deferred(("k",), 1)
+    static_analysis._queue_deferred(("k",), 1)  # same job from a second review
+    queued = len(static_analysis._deferred)
+    # Act
+    gate.set()
+    static_analysis.finish_deferred()
+    for _ in range(100):  # done-callbacks run just after the result is set
+        if not static_analysis._deferred:
+            break
+        time.sleep(0.01)
+    # Assert
+    assert queued == 1 and ran == [(1,)]
+    assert "Waiting for 1 deferred static analyses" in capsys.readouterr().out
+    assert static_analysis._deferred == [] and static_analysis._deferred_keys == set()
+    static_analysis.finish_deferred()  # nothing pending: returns at once
+
+
+def test_finish_deferred_cancels_queued_jobs(deferred_worker, monkeypatch, capsys):
+    # Arrange
+    gate, ran = deferred_worker
+    monkeypatch.setattr(static_analysis, "DEFERRED_AT_EXIT", "cancel")
+    static_analysis._queue_deferred(("a",), 1)
+    static_analysis._queue_deferred(("b",), 2)
+    queued = list(static_analysis._deferred)
+    threading.Timer(0.1, gate.set).start()
+    # Act
+    static_analysis.finish_deferred()
+    # Assert: the running job finished, the queued one never started
+    assert ran == [(1,)]
+    assert queued[1].cancelled()
+    assert "Cancelling deferred static analyses" in capsys.readouterr().out
@@ -0,0 +1,111 @@
+# analysis_planner.py
+# Picks which static analyzers run for a PR from its size and a latency budget:
+#  - "fast" analyzers always run
+#  - "standard" analyzers (type checkers, security scanners) run only while the estimate fits the budget
+#  - "deep" analyzers (whole-project scans) and standard ones that don't fit are deferred to a
+#    background run after the review; their findings land in analysis_cache for the next review
+# Every decision is recorded with its estimate and reason.
+
+import os
+import threading
+from typing import Dict, List, Tuple, Union
+import diff_parser
+from diff_parser import ParsedDiff
+
+# ------------------------------
+# Configuration (overridable from .env)
+# ------------------------------
+# Target wall-clock seconds for the analyzers run before the review
+LATENCY_BUDGET = float(os.getenv("STATIC_ANALYSIS_SLO", "30"))
+
+# tool -> (tier, start-up seconds, seconds per file, seconds per 1000 changed lines)
+ANALYZER_PROFILES = {
+    "Flake8": ("fast", 0.3, 0.02, 0.1),
+    "ESLint": ("fast", 1.0, 0.05, 0.2),
+    "Cppcheck": ("fast", 0.5, 0.1, 0.5),
+    "Bandit": ("standard", 0.6, 0.05, 0.3),
+    "Pylint": ("standard", 1.5, 0.3, 2.0),
+    "Checkstyle": ("standard", 1.5, 0.05, 0.2),
+    "Mypy": ("standard", 3.0, 0.3, 2.0),
+    "Staticcheck": ("deep", 5.0, 0.0, 1.0),
+    "Clippy": ("deep", 30.0, 0.0, 2.0),
+}
+DEFAULT_PROFILE = ("standard", 2.0, 0.2, 1.0)
+
+# Weight of the newest measurement when correcting estimates from observed run times
+LEARNING_RATE = 0.3
+
+# --- Cached Globals ---
+_corrections: Dict[str, float] = {}  # tool -> observed / estimated seconds
+_lock = threading.Lock()
+
+
+def diff_size(diff: Union[str, ParsedDiff]) -> int:
+    """Number of added + removed lines in a unified diff."""
+    return diff_parser.parse(diff).changed_lines
+
+
+def estimate(tool: str, files: int, changed_lines: int) -> float:
+    """Expected seconds for one analyzer run, corrected by what earlier runs actually took."""
+    _, startup, per_file, per_kline = ANALYZER_PROFILES.get(tool, DEFAULT_PROFILE)
+    with _lock:
+        correction = _corrections.get(tool, 1.0)
+    return (startup + per_file * files + per_kline * changed_lines / 1000) * correction
+
+
+def observe(tool: str, files: int, changed_lines: int, seconds: float):
+    """Feeds one measured run back into the estimates (exponential moving average of the error)."""
+    _, startup, per_file, per_kline = ANALYZER_PROFILES.get(tool, DEFAULT_PROFILE)
+    base = startup + per_file * files + per_kline * changed_lines / 1000
+    if base <= 0:
+        return
+    with _lock:
+        old = _corrections.get(tool, 1.0)
+        _corrections[tool] = (1 - LEARNING_RATE) * old + LEARNING_RATE * (seconds / base)
+
+
+def reset():
+    with _lock:
+        _corrections.clear()
+
+
+def plan(jobs: List[Tuple[str, str, int]], changed_lines: int, budget: float = None, workers: int = 1) -> List[dict]:
+    """
+    Decides what to do with each (tool, language, number of files) job.
+    Returns one record per job, in job order:
+      {"tool", "language", "tier", "estimate", "action": "run" | "defer", "reason"}
+    Analyzers run `workers` at a time, so the predicted wall time of a set of jobs is
+    max(longest job, total / workers).
+    """
+    budget = LATENCY_BUDGET if budget is None else budget
+    workers = max(1, workers)
+    decisions = []
+    for tool, language, files in jobs:
+        tier = ANALYZER_PROFILES.get(tool, DEFAULT_PROFILE)[0]
+        decisions.append({
+            "tool": tool, "language": language, "tier": tier,
+            "estimate": round(estimate(tool, files, changed_lines), 2),
+            "action": None, "reason": "",
+        })
+
+    def wall_time(selected):
+        costs = [d["estimate"] for d in selected]
+        return max(max(costs, default=0.0), sum(costs) / workers)
+
+    chosen = []
+    for d in decisions:
+        if d["tier"] == "fast":
+            d["action"], d["reason"] = "run", "fast analyzer, always run"
+            chosen.append(d)
+        elif d["tier"] == "deep":
+            d["action"], d["reason"] = "defer", "whole-project scan, run after the review"
+
+    # Cheapest standard analyzers first, so as many as possible fit
+    for d in sorted((d for d in decisions if d["tier"] == "standard"), key=lambda d: d["estimate"]):
+        predicted = wall_time(chosen + [d])
+        if predicted <= budget:
+            d["action"], d["reason"] = "run", f"fits budget ({predicted:.1f}s of {budget:.0f}s)"
+            chosen.append(d)
+        else:
+            d["action"], d["reason"] = "defer", f"over budget ({predicted:.1f}s > {budget:.0f}s)"
+    return decisions
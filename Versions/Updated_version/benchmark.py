@@ -8,11 +8,12 @@ from core import fetch_pr_diff, run_prompt, save_text_to_file
 from prompts import get_prompts
 from evaluation import heuristic_metrics, meta_evaluate, combine_final_score, heuristics_to_score
 from config import OWNER, REPO, GITHUB_TOKEN
+import diff_cache
 
 def benchmark_all_prompts(pr_number: int, post_to_github: bool = False):
     prompts = get_prompts()
     diff = fetch_pr_diff(OWNER, REPO, pr_number, GITHUB_TOKEN)
-    print(f"Fetched diff ({len(diff)} chars). Running {len(prompts)} prompts...")
+    print(f"Fetched diff ({len(diff)} chars, cache {diff_cache.stats()}). Running {len(prompts)} prompts...")
 
     results = []
     for name, prompt in prompts.items():
@@ -0,0 +1,104 @@
+# benchmark_github_client.py
+# Compares per-PR fetch latency: bare requests.get (old helpers) vs the pooled github_client session.
+# Runs entirely against a local stand-in for the GitHub API, so no token or network is needed.
+#
+# Usage: python benchmark_github_client.py [num_prs]
+
+import sys
+import json
+import time
+import statistics
+import threading
+import requests
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import github_client
+
+FAKE_DIFF = "diff --git a/app.py b/app.py\n--- a/app.py\n+++ b/app.py\n@@ -1,2 +1,2 @@\n-x = 1\n+x = 2\n" * 50
+
+
+class FakeGitHubHandler(BaseHTTPRequestHandler):
+    """Serves /repos/<owner>/<repo>/pulls/<n> (JSON) and /diff/<n> (text) over keep-alive HTTP/1.1."""
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True  # like real API frontends; avoids 40ms delayed-ACK stalls on reused sockets
+
+    def do_GET(self):
+        host = f"http://{self.headers['Host']}"
+        if self.path.startswith("/diff/"):
+            body = FAKE_DIFF.encode("utf-8")
+            content_type = "text/plain"
+        else:
+            pr_number = self.path.rstrip("/").split("/")[-1]
+            body = json.dumps({"number": int(pr_number), "diff_url": f"{host}/diff/{pr_number}"}).encode("utf-8")
+            content_type = "application/json"
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # keep benchmark output clean
+
+
+# ------------------------------
+# The two fetch strategies under test
+# ------------------------------
+def fetch_pr_diff_bare(base_url: str, pr_number: int, token: str) -> str:
+    """The pre-github_client helper: two bare requests.get calls, a fresh connection each."""
+    headers = {"Authorization": f"token {token}"}
+    resp = requests.get(f"{base_url}/repos/o/r/pulls/{pr_number}", headers=headers)
+    diff_resp = requests.get(resp.json()["diff_url"], headers=headers)
+    return diff_resp.text
+
+
+def fetch_pr_diff_pooled(base_url: str, pr_number: int, token: str) -> str:
+    """Same two calls through the shared keep-alive session."""
+    resp = github_client.get(f"{base_url}/repos/o/r/pulls/{pr_number}", token=token)
+    diff_resp = github_client.get(resp.json()["diff_url"], token=token)
+    return diff_resp.text
+
+
+def time_fetches(fetch_fn, base_url: str, num_prs: int):
+    timings = []
+    for pr in range(1, num_prs + 1):
+        start = time.perf_counter()
+        fetch_fn(base_url, pr, "test-token")
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def summarize(name: str, timings) -> dict:
+    ordered = sorted(timings)
+    p95 = ordered[max(0, int(len(ordered) * 0.95) - 1)]
+    row = {
+        "strategy": name,
+        "mean_ms": round(statistics.mean(timings), 3),
+        "p50_ms": round(statistics.median(timings), 3),
+        "p95_ms": round(p95, 3),
+    }
+    print(f"{name:<10} mean={row['mean_ms']:.3f}ms  p50={row['p50_ms']:.3f}ms  p95={row['p95_ms']:.3f}ms")
+    return row
+
+
+def run_benchmark(num_prs: int = 200):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeGitHubHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    try:
+        print(f"Fetching {num_prs} PRs from local stand-in server {base_url}...\n")
+        bare = summarize("bare", time_fetches(fetch_pr_diff_bare, base_url, num_prs))
+        pooled = summarize("pooled", time_fetches(fetch_pr_diff_pooled, base_url, num_prs))
+        if pooled["mean_ms"] > 0:
+            print(f"\nSpeedup (mean): {bare['mean_ms'] / pooled['mean_ms']:.2f}x")
+        return [bare, pooled]
+    finally:
+        github_client.close()
+        server.shutdown()
+        server.server_close()
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    run_benchmark(count)
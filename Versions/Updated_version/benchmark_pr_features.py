@@ -0,0 +1,113 @@
+# benchmark_pr_features.py
+# Compares PR feature extraction: the original 14 regex scans vs the one-sweep pr_features
+# scanner, on synthetic 10k / 100k / 1M-line diffs. No GitHub access or LLM needed.
+#
+# Two diff profiles:
+#  - "typical":   code with "#" comments, so the old comment regex stops at the first match
+#  - "glob-paths": no line comments, but "/*" in glob strings without a closing "*/"; the old
+#                  DOTALL "/\*.*?\*/" then rescans to the end of the diff from every "/*"
+# Old-implementation runs that exceed the timeout are stopped and reported as such.
+#
+# Usage: python benchmark_pr_features.py [--sizes 10000,100000,1000000] [--timeout 120]
+
+import re
+import time
+import queue
+import argparse
+import multiprocessing
+import pr_features
+
+
+# ------------------------------
+# The implementation being replaced (IterativePromptSelector.extract_pr_features before pr_features)
+# ------------------------------
+def extract_pr_features_regex(diff_text: str):
+    features = {}
+    features['num_lines'] = len(diff_text.splitlines())
+    features['num_files'] = len(re.findall(r'^diff --git', diff_text, re.MULTILINE))
+    features['additions'] = len(re.findall(r'^\+', diff_text, re.MULTILINE))
+    features['deletions'] = len(re.findall(r'^-', diff_text, re.MULTILINE))
+    features['net_changes'] = features['additions'] - features['deletions']
+    features['has_comments'] = int(bool(re.search(r'#.*|//.*|/\*.*?\*/', diff_text, re.DOTALL)))
+    features['has_functions'] = int(bool(re.search(r'\bdef\s+\w+|\bfunction\b|\bfunc\b', diff_text, re.IGNORECASE)))
+    features['has_imports'] = int(bool(re.search(r'^\s*import\s|^\s*from\s|#include', diff_text, re.MULTILINE)))
+    features['has_test'] = int(bool(re.search(r'\btest\b|\bspec\b|\bunittest\b', diff_text, re.IGNORECASE)))
+    features['has_docs'] = int(bool(re.search(r'\breadme\b|\bdoc\b|\bdocumentation\b', diff_text, re.IGNORECASE)))
+    features['has_config'] = int(bool(re.search(r'\.json\b|\.yml\b|\.yaml\b|\.xml\b|\.conf\b', diff_text, re.IGNORECASE)))
+    features['is_python'] = int(bool(re.search(r'\.py\b', diff_text, re.IGNORECASE)))
+    features['is_js'] = int(bool(re.search(r'\.js\b|\.ts\b', diff_text, re.IGNORECASE)))
+    features['is_java'] = int(bool(re.search(r'\.java\b', diff_text, re.IGNORECASE)))
+    return features
+
+
+# ------------------------------
+# Synthetic diffs
+# ------------------------------
+def synthetic_diff(num_lines: int, profile: str = "typical") -> str:
+    """A multi-file unified diff of about `num_lines` lines (20-line hunks, one per file)."""
+    lines = []
+    i = 0
+    while len(lines) < num_lines:
+        path = f"pkg/module_{i}.py"
+        lines += [f"diff --git a/{path} b/{path}", "index 1111111..2222222 100644",
+                  f"--- a/{path}", f"+++ b/{path}", "@@ -1,14 +1,14 @@"]
+        for j in range(20):
+            if j % 5 == 0:
+                line = f'    paths = glob.glob("build/{i}/*")' if profile == "glob-paths" else f"    # step {j} of module {i}"
+            else:
+                line = f"    value_{j} = compute(value_{j - 1}, {j})"
+            lines.append(("+", "-", " ")[j % 3] + line)
+        i += 1
+    return "\n".join(lines[:num_lines]) + "\n"
+
+
+def _timed(fn, text: str, results):
+    start = time.perf_counter()
+    result = fn(text)
+    results.put((time.perf_counter() - start, result))
+
+
+def time_call(fn, text: str, timeout: float):
+    """(seconds, result) of fn(text) in a child process, or (None, None) after `timeout` seconds."""
+    results = multiprocessing.Queue()
+    child = multiprocessing.Process(target=_timed, args=(fn, text, results))
+    child.start()
+    try:
+        return results.get(timeout=timeout)
+    except queue.Empty:
+        return None, None
+    finally:
+        child.terminate()
+        child.join()
+
+
+def run_benchmark(sizes, timeout: float = 120.0):
+    rows = []
+    for profile in ("typical", "glob-paths"):
+        print(f"\nProfile: {profile}")
+        print(f"{'lines':>10} {'MB':>7} {'regex (old)':>14} {'one-sweep':>11} {'speedup':>9}  same features")
+        for n in sizes:
+            text = synthetic_diff(n, profile)
+            old_s, old = time_call(extract_pr_features_regex, text, timeout)
+            new_s, new = time_call(pr_features.extract_pr_features, text, timeout)
+            old_col = f"{old_s:.3f}s" if old_s is not None else f">{timeout:.0f}s (stopped)"
+            new_col = f"{new_s:.3f}s" if new_s is not None else f">{timeout:.0f}s"
+            speedup = f"{old_s / new_s:.1f}x" if old_s and new_s else "-"
+            same = "-" if old is None or new is None else ("yes" if old == new else "NO")
+            print(f"{n:>10} {len(text) / 1e6:>7.1f} {old_col:>14} {new_col:>11} {speedup:>9}  {same}")
+            rows.append({"profile": profile, "lines": n, "old_s": old_s, "new_s": new_s, "same": same})
+
+        # Linear scaling: time per line should stay flat as the diff grows
+        timed = [r for r in rows if r["profile"] == profile and r["new_s"]]
+        if len(timed) > 1:
+            per_line = ", ".join(f"{r['new_s'] / r['lines'] * 1e6:.2f}" for r in timed)
+            print(f"one-sweep µs/line: {per_line}")
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark PR feature extraction")
+    parser.add_argument("--sizes", default="10000,100000,1000000", help="comma-separated diff sizes in lines")
+    parser.add_argument("--timeout", type=float, default=120.0, help="seconds before a run is stopped")
+    args = parser.parse_args()
+    run_benchmark([int(s) for s in args.sizes.split(",")], args.timeout)
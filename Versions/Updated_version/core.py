@@ -1,103 +1,180 @@
-# core.py
-# GitHub helpers, LLM init, prompt runner, file I/O
-
-import requests
-import re
-import subprocess 
-from langchain_core.output_parsers import StrOutputParser
-from langchain_groq import ChatGroq
-from typing import Optional, Tuple
-from config import GITHUB_TOKEN, GROQ_API_KEY
-from static_analysis import run_static_analysis 
-from utils import safe_truncate 
-# --- NEW RAG IMPORT ---
-from rag_core import get_retriever
-# ----------------------
-
-# ------------------------------
-# GitHub helpers (UNCHANGED)
-# ------------------------------
-def fetch_pr_diff(owner: str, repo: str, pr_number: int, token: Optional[str] = None) -> str:
-    token = token or GITHUB_TOKEN
-    url = f"https://api.github.com/repos/{owner}/{repo}/pulls/{pr_number}"
-    headers = {"Authorization": f"token {token}"}
-    resp = requests.get(url, headers=headers)
-    if resp.status_code != 200:
-        raise RuntimeError(f"GitHub API Error fetching PR: {resp.status_code} {resp.text}")
-    pr_data = resp.json()
-    diff_url = pr_data.get("diff_url")
-    if not diff_url:
-        raise RuntimeError("No diff_url found in PR data.")
-    diff_resp = requests.get(diff_url, headers=headers)
-    if diff_resp.status_code != 200:
-        raise RuntimeError(f"Failed to fetch diff: {diff_resp.status_code} {diff_resp.text}")
-    return diff_resp.text
-
-def post_review_comment(owner: str, repo: str, pr_number: int, review_body: str, token: Optional[str] = None) -> dict:
-    token = token or GITHUB_TOKEN
-    url = f"https://api.github.com/repos/{owner}/{repo}/issues/{pr_number}/comments"
-    headers = {"Authorization": f"token {token}", "Accept": "application/vnd.github+json"}
-    payload = {"body": review_body}
-    resp = requests.post(url, headers=headers, json=payload)
-    if resp.status_code not in (200, 201):
-        raise RuntimeError(f"Failed to post comment: {resp.status_code} {resp.text}")
-    return resp.json()
-
-# ------------------------------
-# LLM initialization & parser (UNCHANGED)
-# ------------------------------
-llm = ChatGroq(
-    model="llama-3.3-70b-versatile",
-    temperature=0.25,
-    api_key=GROQ_API_KEY,
-)
-
-# simple parser that returns string output (used for prompt outputs)
-default_parser = StrOutputParser()
-
-# ------------------------------
-# Prompt runner (MODIFIED FOR RAG)
-# ------------------------------
-def run_prompt(prompt, diff: str, llm_instance=llm, parser=default_parser, diff_truncate: int = 4000, static_output_truncate: int = 4000) -> Tuple[str, str, str]:
-    """
-    Run a ChatPromptTemplate (langchain) against the llm+parser.
-    Also runs static analysis and RAG, including both in the prompt context.
-    
-    Returns:
-        (review_text, static_analysis_output, retrieved_context)
-    """
-    # 1. Run Static Analysis
-    static_output = run_static_analysis(diff)
-    
-    # 2. Truncate inputs for the LLM
-    truncated_diff = safe_truncate(diff, diff_truncate)
-    truncated_static = safe_truncate(static_output, static_output_truncate)
-    
-    # --- 3. NEW RAG STEP ---
-    print("Running RAG retrieval...")
-    retriever = get_retriever()
-    # Create a query for the retriever based on the diff and static analysis
-    retrieval_query = f"How to review this code? Diff: {truncated_diff}\nStatic Analysis: {truncated_static}"
-    retrieved_docs = retriever.invoke(retrieval_query)
-    retrieved_context = "\n---\n".join([doc.page_content for doc in retrieved_docs])
-    truncated_context = safe_truncate(retrieved_context, 2000) # Truncate context
-    # -----------------------
-    
-    # 4. Invoke LLM Chain
-    chain = prompt | llm_instance | parser
-    
-    # --- MODIFIED: Pass 'context' into the prompt variables ---
-    review = chain.invoke({
-        "diff": truncated_diff, 
-        "static": truncated_static,
-        "context": truncated_context 
-    })
-
-    return review, static_output, retrieved_context # Return all 3 for evaluation
-
-# ------------------------------
-# Utilities: file I/O (UNCHANGED)
-# ------------------------------
-def save_text_to_file(path: str, text: str):
-    with open(path, "w", encoding="utf-8") as f:
-        f.write(text)
+# core.py
+# GitHub helpers, LLM init, prompt runner, file I/O
+
+import asyncio
+import threading
+from concurrent.futures import Future
+from langchain_core.output_parsers import StrOutputParser
+from langchain_groq import ChatGroq
+from typing import Dict, Iterable, Optional, Tuple
+from config import GITHUB_TOKEN, GROQ_API_KEY, GITHUB_FETCH_CONCURRENCY
+from static_analysis import analyze_static
+from findings import render_report
+from utils import safe_truncate 
+import github_client
+import diff_cache
+import diff_budget
+# --- NEW RAG IMPORT ---
+from rag_core import get_retriever
+# ----------------------
+
+# ------------------------------
+# GitHub helpers (routed through the pooled github_client session)
+# ------------------------------
+def fetch_pr_diff(owner: str, repo: str, pr_number: int, token: Optional[str] = None, head_sha: Optional[str] = None, priority: int = github_client.PRIORITY_INTERACTIVE) -> str:
+    """
+    Fetches the PR diff in a single request (diff media type on the pulls endpoint).
+    Diffs are cached on disk: a known head SHA is served without any request,
+    otherwise the cached ETag is sent and a 304 reuses the local copy.
+    """
+    token = token or GITHUB_TOKEN
+    cached = diff_cache.lookup(owner, repo, pr_number)
+    if cached and head_sha and cached["head_sha"] == head_sha:
+        diff_cache.record("hits")
+        return cached["diff"]
+
+    headers = {"If-None-Match": cached["etag"]} if cached and cached["etag"] else None
+    url = f"https://api.github.com/repos/{owner}/{repo}/pulls/{pr_number}"
+    resp = github_client.get(url, token=token, accept="application/vnd.github.v3.diff", headers=headers, priority=priority)
+    if resp.status_code == 304 and cached:
+        diff_cache.record("revalidated")
+        if head_sha and cached["head_sha"] != head_sha:
+            # Same diff under a new head SHA (e.g. a rebase): remember it, so the next lookup is a hit
+            diff_cache.store(owner, repo, pr_number, cached["diff"], cached["etag"], head_sha)
+        return cached["diff"]
+    if resp.status_code != 200:
+        raise RuntimeError(f"GitHub API Error fetching PR diff: {resp.status_code} {resp.text}")
+    diff_cache.store(owner, repo, pr_number, resp.text, resp.headers.get("ETag"), head_sha)
+    diff_cache.record("misses")
+    return resp.text
+
+async def fetch_many_pr_diffs(owner: str, repo: str, pr_numbers: Iterable[int], token: Optional[str] = None, max_concurrency: int = GITHUB_FETCH_CONCURRENCY, on_result=None, priority: int = github_client.PRIORITY_BULK) -> dict:
+    """
+    Fetches the diffs of many PRs concurrently, at most `max_concurrency` in flight.
+    Head SHAs for all PRs come from one batched GraphQL query first, so diffs already
+    in the cache need no request at all. Each fetch runs fetch_pr_diff on a worker thread,
+    sharing the pooled session and the diff cache.
+    Returns {pr_number: diff}; a failed fetch maps to its exception.
+    `on_result(pr_number, diff_or_exception)` is called as soon as each PR finishes.
+    """
+    token = token or GITHUB_TOKEN
+    pr_numbers = list(dict.fromkeys(pr_numbers))
+    try:
+        metadata = await asyncio.to_thread(github_client.fetch_pr_metadata_batch, owner, repo, pr_numbers, token, None, priority)
+    except Exception as e:
+        print(f"⚠️ Batched PR metadata unavailable, fetching diffs without head SHAs: {e}")
+        metadata = {}
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def fetch_one(pr_number):
+        async with semaphore:
+            if pr_number in metadata and metadata[pr_number] is None:
+                result = RuntimeError(f"PR #{pr_number} not found or inaccessible.")
+            else:
+                head_sha = (metadata.get(pr_number) or {}).get("head_sha")
+                try:
+                    result = await asyncio.to_thread(fetch_pr_diff, owner, repo, pr_number, token, head_sha, priority)
+                except Exception as e:
+                    result = e
+        if on_result:
+            on_result(pr_number, result)
+        return pr_number, result
+
+    pairs = await asyncio.gather(*(fetch_one(pr) for pr in pr_numbers))
+    return dict(pairs)
+
+def prefetch_pr_diffs(owner: str, repo: str, pr_numbers: Iterable[int], token: Optional[str] = None, max_concurrency: int = GITHUB_FETCH_CONCURRENCY, priority: int = github_client.PRIORITY_BULK) -> Dict[int, Future]:
+    """
+    Starts fetch_many_pr_diffs on a background event loop and returns one Future per PR,
+    so a caller can review PR #1 while the remaining diffs are still downloading.
+    """
+    pr_numbers = list(dict.fromkeys(pr_numbers))
+    futures = {pr: Future() for pr in pr_numbers}
+
+    def on_result(pr_number, result):
+        if isinstance(result, Exception):
+            futures[pr_number].set_exception(result)
+        else:
+            futures[pr_number].set_result(result)
+
+    def run():
+        try:
+            asyncio.run(fetch_many_pr_diffs(owner, repo, pr_numbers, token, max_concurrency, on_result, priority))
+        except Exception as e:
+            for future in futures.values():
+                if not future.done():
+                    future.set_exception(e)
+
+    threading.Thread(target=run, daemon=True).start()
+    return futures
+
+def post_review_comment(owner: str, repo: str, pr_number: int, review_body: str, token: Optional[str] = None) -> dict:
+    token = token or GITHUB_TOKEN
+    url = f"https://api.github.com/repos/{owner}/{repo}/issues/{pr_number}/comments"
+    payload = {"body": review_body}
+    resp = github_client.post(url, token=token, accept="application/vnd.github+json", json=payload)
+    if resp.status_code not in (200, 201):
+        raise RuntimeError(f"Failed to post comment: {resp.status_code} {resp.text}")
+    return resp.json()
+
+# ------------------------------
+# LLM initialization & parser (UNCHANGED)
+# ------------------------------
+llm = ChatGroq(
+    model="llama-3.3-70b-versatile",
+    temperature=0.25,
+    api_key=GROQ_API_KEY,
+)
+
+# simple parser that returns string output (used for prompt outputs)
+default_parser = StrOutputParser()
+
+# ------------------------------
+# Prompt runner (MODIFIED FOR RAG)
+# ------------------------------
+def run_prompt(prompt, diff: str, llm_instance=llm, parser=default_parser, diff_truncate: int = 4000, static_output_truncate: int = 4000) -> Tuple[str, str, str]:
+    """
+    Run a ChatPromptTemplate (langchain) against the llm+parser.
+    Also runs static analysis and RAG, including both in the prompt context.
+    
+    Returns:
+        (review_text, static_analysis_output, retrieved_context)
+    """
+    # 1. Run Static Analysis (structured findings, rendered to text only here)
+    static_report = analyze_static(diff)
+    static_output = render_report(static_report)
+    
+    # 2. Truncate inputs for the LLM
+    # highest-value hunks (findings, source files, risky code) instead of the first characters
+    truncated_diff = diff_budget.pack_diff(diff, diff_truncate, static_report["findings"])
+    # most severe findings first; lowest-ranked ones are cut to fit the budget
+    truncated_static = render_report(static_report, static_output_truncate)
+    
+    # --- 3. NEW RAG STEP ---
+    print("Running RAG retrieval...")
+    retriever = get_retriever()
+    # Create a query for the retriever based on the diff and static analysis
+    retrieval_query = f"How to review this code? Diff: {truncated_diff}\nStatic Analysis: {truncated_static}"
+    retrieved_docs = retriever.invoke(retrieval_query)
+    retrieved_context = "\n---\n".join([doc.page_content for doc in retrieved_docs])
+    truncated_context = safe_truncate(retrieved_context, 2000) # Truncate context
+    # -----------------------
+    
+    # 4. Invoke LLM Chain
+    chain = prompt | llm_instance | parser
+    
+    # --- MODIFIED: Pass 'context' into the prompt variables ---
+    review = chain.invoke({
+        "diff": truncated_diff, 
+        "static": truncated_static,
+        "context": truncated_context 
+    })
+
+    return review, static_output, retrieved_context # Return all 3 for evaluation
+
+# ------------------------------
+# Utilities: file I/O (UNCHANGED)
+# ------------------------------
+def save_text_to_file(path: str, text: str):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
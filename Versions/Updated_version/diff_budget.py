@@ -0,0 +1,179 @@
+# diff_budget.py
+# Fits a diff into a prompt budget by value instead of keeping only its first characters.
+# Every hunk is scored:
+#  - static-analysis findings on its lines (errors weigh most)
+#  - the kind of file: source > tests > docs > lockfiles / generated / vendored files
+#  - the size of the change (diminishing: log2 of the changed lines)
+#  - risk keywords on its added/removed lines (eval, subprocess, password, SQL, locks, ...)
+# The best hunks are kept, shown in diff order under their file headers, followed by a short
+# manifest of what was left out so the model knows the diff is incomplete.
+
+import re
+import math
+import posixpath
+from typing import Dict, Iterable, List, Tuple, Union
+import diff_parser
+from diff_parser import DiffFile, Hunk, ParsedDiff
+from findings import Finding
+
+# Points per finding on a hunk's lines
+FINDING_WEIGHTS = {"error": 8.0, "warning": 4.0, "info": 1.0}
+# Points per distinct risk keyword on a hunk's changed lines (capped)
+RISK_WEIGHT = 2.0
+MAX_RISK_HITS = 5
+
+# Whole words or identifier parts ("user_password", "api_token"), not substrings ("blocked")
+RISK_KEYWORDS = re.compile(
+    r"(?<![a-z0-9])(eval|exec|subprocess|os\.system|shell\s*=\s*True|pickle|yaml\.load|marshal|"
+    r"password|passwd|secret|token|api[_-]?key|credential|auth[a-z]*|permission|chmod|"
+    r"crypt[a-z]*|hash[a-z]*|random|verify\s*=\s*False|ssl|"
+    r"sql|execute|cursor|query|"
+    r"lock|thread[a-z]*|mutex|async|await|"
+    r"delete|drop|truncate|rmtree|unlink)(?![a-z0-9])",
+    re.IGNORECASE,
+)
+
+# File kind -> multiplier on a hunk's score
+KIND_WEIGHTS = {"source": 1.0, "test": 0.5, "docs": 0.4, "config": 0.6, "lockfile": 0.05, "generated": 0.05}
+LOCKFILES = {
+    "package-lock.json", "yarn.lock", "pnpm-lock.yaml", "poetry.lock", "pipfile.lock", "cargo.lock",
+    "go.sum", "composer.lock", "gemfile.lock", "uv.lock",
+}
+GENERATED_DIRS = ("vendor/", "node_modules/", "dist/", "build/", "third_party/", "__snapshots__/")
+GENERATED_SUFFIXES = (".min.js", ".min.css", ".map", ".snap", ".pb.go", "_pb2.py")
+DOC_SUFFIXES = (".md", ".rst", ".txt", ".adoc")
+CONFIG_SUFFIXES = (".json", ".yml", ".yaml", ".toml", ".ini", ".cfg", ".xml", ".conf")
+
+# Most files the omitted-hunks manifest names one by one
+MANIFEST_MAX_FILES = 15
+
+
+def file_kind(path: str) -> str:
+    lower = path.lower()
+    name = posixpath.basename(lower)
+    if name in LOCKFILES or name.endswith(".lock"):
+        return "lockfile"
+    if lower.startswith(GENERATED_DIRS) or any(f"/{d}" in lower for d in GENERATED_DIRS) or name.endswith(GENERATED_SUFFIXES):
+        return "generated"
+    if (name.startswith("test_") or name.endswith(("_test.py", "_test.go", ".test.js", ".test.ts", ".spec.js", ".spec.ts"))
+            or "/tests/" in f"/{lower}" or "/test/" in f"/{lower}" or "/__tests__/" in f"/{lower}"):
+        return "test"
+    if name.endswith(DOC_SUFFIXES) or lower.startswith("docs/"):
+        return "docs"
+    if name.endswith(CONFIG_SUFFIXES):
+        return "config"
+    return "source"
+
+
+def _findings_by_file(findings: Iterable[Finding]) -> Dict[str, List[Finding]]:
+    by_file: Dict[str, List[Finding]] = {}
+    for f in findings:
+        by_file.setdefault(f.file, []).append(f)
+    return by_file
+
+
+def score_hunk(parsed: ParsedDiff, f: DiffFile, h: Hunk, file_findings: List[Finding]) -> float:
+    last = h.new_start + max(h.new_count, 1) - 1
+    hits = sum(FINDING_WEIGHTS.get(x.severity, 1.0) for x in file_findings if h.new_start <= x.line <= last)
+    changed = [line[1:] for line in parsed.hunk_text(h).split("\n")[1:] if line[:1] in ("+", "-")]
+    risks = {m.group(1).lower() for line in changed for m in RISK_KEYWORDS.finditer(line)}
+    size = math.log2(1 + len(h.added) + len(h.removed))
+    return (hits + RISK_WEIGHT * min(len(risks), MAX_RISK_HITS) + size) * KIND_WEIGHTS[file_kind(f.path)]
+
+
+def rank_hunks(diff: Union[str, ParsedDiff], findings: Iterable[Finding] = ()) -> List[Tuple[float, int, int]]:
+    """(score, file index, hunk index) for every hunk, best first (ties keep diff order)."""
+    parsed = diff_parser.parse(diff)
+    by_file = _findings_by_file(findings)
+    scored = [
+        (score_hunk(parsed, f, h, by_file.get(f.path, [])), fi, hi)
+        for fi, f in enumerate(parsed.files)
+        for hi, h in enumerate(f.hunks)
+    ]
+    return sorted(scored, key=lambda s: (-s[0], s[1], s[2]))
+
+
+def _manifest(parsed: ParsedDiff, kept: set, max_chars: int, truncated: frozenset = frozenset()) -> str:
+    """Lists what the packed diff leaves out: omitted hunks, and `truncated` ones shown only in part."""
+    omitted_files = []
+    total = omitted = 0
+    for fi, f in enumerate(parsed.files):
+        total += len(f.hunks)
+        left_out = [h for hi, h in enumerate(f.hunks) if (fi, hi) not in kept and (fi, hi) not in truncated]
+        cut = [h for hi, h in enumerate(f.hunks) if (fi, hi) in truncated]
+        omitted += len(left_out)
+        if not f.hunks:
+            omitted_files.append(f"- {f.path} [{'binary' if f.binary else f.status}]")
+        elif left_out or cut:
+            notes = []
+            if left_out:
+                plus, minus = sum(len(h.added) for h in left_out), sum(len(h.removed) for h in left_out)
+                count = f"{len(left_out)} of {len(f.hunks)}" if len(left_out) < len(f.hunks) else str(len(left_out))
+                count += " hunk" if len(f.hunks) == 1 else " hunks"
+                notes.append(f"{count} omitted (+{plus}/-{minus})")
+            if cut:
+                plus, minus = sum(len(h.added) for h in cut), sum(len(h.removed) for h in cut)
+                notes.append(f"{len(cut)} {'hunk' if len(cut) == 1 else 'hunks'} truncated (+{plus}/-{minus} in full)")
+            omitted_files.append(f"- {f.path} [{file_kind(f.path)}]: {', '.join(notes)}")
+    if not omitted_files:
+        return ""
+    cut_note = f", {len(truncated)} truncated" if truncated else ""
+    lines = [f"... ({omitted} of {total} hunks omitted{cut_note} to fit the prompt; kept the highest-value ones)"]
+    for i, entry in enumerate(omitted_files):
+        rest = len(omitted_files) - i
+        if i == MANIFEST_MAX_FILES or len("\n".join(lines + [entry])) + 30 > max_chars:
+            lines.append(f"- ... and {rest} more files")
+            break
+        lines.append(entry)
+    return "\n".join(lines)
+
+
+def _cut(text: str, max_chars: int) -> str:
+    """Head of `text` ending at a line break (like utils.safe_truncate, without its note)."""
+    head = text[:max_chars]
+    newline = head.rfind("\n")
+    return head[:newline + 1] if newline > 0 else head
+
+
+def pack_diff(diff: Union[str, ParsedDiff], max_chars: int = 4000, findings: Iterable[Finding] = ()) -> str:
+    """
+    The diff if it fits in `max_chars`; otherwise its highest-value hunks (in diff order,
+    under their file headers) plus a manifest of the omitted ones, within `max_chars`.
+    """
+    parsed = diff_parser.parse(diff)
+    text = parsed.text
+    if len(text) <= max_chars:
+        return text
+    ranking = rank_hunks(parsed, findings)
+    if not ranking:  # not a diff, or only binary/rename sections
+        return _cut(text, max_chars)
+
+    manifest_room = min(max_chars // 4, 80 * (MANIFEST_MAX_FILES + 2))
+    room = max_chars - manifest_room
+    kept, truncated = set(), frozenset()
+    used = 0
+    open_files = set()
+    for _, fi, hi in ranking:
+        f = parsed.files[fi]
+        h = f.hunks[hi]
+        cost = (h.end - h.start) + (0 if fi in open_files else f.header_end - f.start)
+        if used + cost <= room:
+            kept.add((fi, hi))
+            open_files.add(fi)
+            used += cost
+
+    parts = []
+    for fi, f in enumerate(parsed.files):
+        if fi in open_files:
+            parts.append(parsed.header_text(f))
+            parts.extend(parsed.hunk_text(h) for hi, h in enumerate(f.hunks) if (fi, hi) in kept)
+    if not parts:
+        # Not even the best hunk fits: show as much of it as possible
+        _, fi, hi = ranking[0]
+        f = parsed.files[fi]
+        parts = [_cut(parsed.header_text(f) + parsed.hunk_text(f.hunks[hi]), room)]
+        truncated = frozenset({(fi, hi)})  # shown in part, so the manifest says so
+    body = "".join(parts)
+    if not body.endswith("\n"):
+        body += "\n"
+    return body + _manifest(parsed, kept, max_chars - len(body), truncated)
@@ -0,0 +1,163 @@
+# diff_cache.py
+# Persistent PR diff cache keyed by (owner, repo, PR, head SHA) and revalidated with ETags
+
+import os
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+# ------------------------------
+# Configuration (overridable from .env)
+# ------------------------------
+CACHE_DIR = os.getenv("DIFF_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".diff_cache"))
+INDEX_FILE = "index.json"
+# Diff text kept in memory across lookups (least recently used dropped first; evicted diffs are read from disk again)
+MEMORY_MAX_CHARS = int(os.getenv("DIFF_CACHE_MEMORY_CHARS", "20000000"))
+
+# --- Cached Globals ---
+_index: Optional[dict] = None
+_memory: "OrderedDict[str, str]" = OrderedDict()  # file name -> diff text, LRU order, so repeat lookups skip the disk read
+_memory_chars = 0
+_lock = threading.Lock()
+_stats = {"hits": 0, "revalidated": 0, "misses": 0}
+
+
+# ------------------------------
+# Index helpers
+# ------------------------------
+def _pr_key(owner: str, repo: str, pr_number: int) -> str:
+    return f"{owner}/{repo}#{pr_number}"
+
+
+def _diff_filename(owner: str, repo: str, pr_number: int, head_sha: Optional[str], etag: Optional[str]) -> str:
+    # Unknown head SHA: name the file after the ETag so a changed diff never reuses a stale file
+    version = head_sha or "etag-" + hashlib.sha1((etag or "").encode("utf-8")).hexdigest()[:16]
+    safe = f"{owner}_{repo}_{pr_number}_{version}".replace("/", "_")
+    return f"{safe}.diff"
+
+
+def _remember(name: str, diff: str):
+    """Keeps a diff in memory, evicting the least recently used ones beyond MEMORY_MAX_CHARS."""
+    global _memory_chars
+    _forget(name)
+    if len(diff) > MEMORY_MAX_CHARS:
+        return
+    _memory[name] = diff
+    _memory_chars += len(diff)
+    while _memory_chars > MEMORY_MAX_CHARS:
+        _, evicted = _memory.popitem(last=False)
+        _memory_chars -= len(evicted)
+
+
+def _forget(name: str):
+    global _memory_chars
+    diff = _memory.pop(name, None)
+    if diff is not None:
+        _memory_chars -= len(diff)
+
+
+def _load_index() -> dict:
+    global _index
+    if _index is None:
+        path = os.path.join(CACHE_DIR, INDEX_FILE)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                _index = json.load(f)
+        except (OSError, ValueError):
+            _index = {}
+    return _index
+
+
+def _save_index():
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    path = os.path.join(CACHE_DIR, INDEX_FILE)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(_index, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+# ------------------------------
+# Public API
+# ------------------------------
+def lookup(owner: str, repo: str, pr_number: int) -> Optional[dict]:
+    """
+    Returns the cached entry for a PR as {"diff", "etag", "head_sha"},
+    or None if nothing usable is on disk.
+    """
+    with _lock:
+        entry = _load_index().get(_pr_key(owner, repo, pr_number))
+        if not entry:
+            return None
+        name = entry["file"]
+        diff = _memory.get(name)
+        if diff is None:
+            try:
+                with open(os.path.join(CACHE_DIR, name), "r", encoding="utf-8") as f:
+                    diff = f.read()
+            except OSError:
+                return None
+            _remember(name, diff)
+        else:
+            _memory.move_to_end(name)
+        return {"diff": diff, "etag": entry.get("etag"), "head_sha": entry.get("head_sha")}
+
+
+def store(owner: str, repo: str, pr_number: int, diff: str, etag: Optional[str] = None, head_sha: Optional[str] = None):
+    """Writes a freshly downloaded diff and replaces any older version of the same PR."""
+    with _lock:
+        index = _load_index()
+        key = _pr_key(owner, repo, pr_number)
+        name = _diff_filename(owner, repo, pr_number, head_sha, etag)
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        with open(os.path.join(CACHE_DIR, name), "w", encoding="utf-8") as f:
+            f.write(diff)
+
+        old = index.get(key)
+        if old and old["file"] != name:
+            _forget(old["file"])
+            try:
+                os.remove(os.path.join(CACHE_DIR, old["file"]))
+            except OSError:
+                pass
+
+        index[key] = {"file": name, "etag": etag, "head_sha": head_sha}
+        _remember(name, diff)
+        _save_index()
+
+
+def record(outcome: str):
+    """Counts one lookup outcome: 'hits' (no request), 'revalidated' (304) or 'misses' (downloaded)."""
+    with _lock:
+        _stats[outcome] += 1
+
+
+def stats() -> dict:
+    """Returns a copy of the hit/revalidated/miss counters for this process."""
+    with _lock:
+        return dict(_stats)
+
+
+def reset_stats():
+    with _lock:
+        for k in _stats:
+            _stats[k] = 0
+
+
+def clear():
+    """Drops every cached diff (memory and disk) and resets the counters."""
+    global _index, _memory_chars
+    with _lock:
+        index = _load_index()
+        for entry in index.values():
+            try:
+                os.remove(os.path.join(CACHE_DIR, entry["file"]))
+            except OSError:
+                pass
+        _index = {}
+        _memory.clear()
+        _memory_chars = 0
+        _save_index()
+    reset_stats()
@@ -0,0 +1,235 @@
+# diff_chunker.py
+# Splits a PR diff into chunks for chunked LLM reviews, sized in model tokens (not characters):
+#  - whole files are packed together, in diff order, while they fit
+#  - a file that does not fit is split between its hunks
+#  - only a hunk bigger than a whole chunk is cut, into smaller hunks with recomputed "@@" headers
+#  - every chunk carries the file header (diff --git / --- / +++) of each file it contains
+# Token counts come from tiktoken when it is installed and its encoding loads; otherwise they
+# are estimated from the text.
+
+import os
+import re
+from typing import List, NamedTuple, Optional, Tuple, Union
+import diff_parser
+from diff_parser import Hunk, ParsedDiff
+
+# ------------------------------
+# Configuration (overridable from .env)
+# ------------------------------
+CHUNK_MAX_TOKENS = int(os.getenv("CHUNK_MAX_TOKENS", "2000"))
+TOKENIZER_ENCODING = os.getenv("CHUNK_TOKENIZER", "cl100k_base")
+
+TRUNCATION_NOTE = " ... (line truncated)"
+
+# --- Cached Globals ---
+_encoder = None
+_encoder_loaded = False
+
+# Word, punctuation and whitespace runs, roughly how BPE tokenizers pre-split text
+_PIECES = re.compile(r"\w+|[^\w\s]+|\s+")
+
+
+class Chunk(NamedTuple):
+    text: str
+    tokens: int
+    paths: Tuple[str, ...]   # files (or parts of files) in this chunk, in diff order
+
+
+class _Unit(NamedTuple):
+    file: int                # index in ParsedDiff.files (-1 for text outside any file)
+    header: str              # file header, repeated in every chunk the file appears in
+    header_tokens: int
+    body: str
+    tokens: int
+
+
+# ------------------------------
+# Token counting
+# ------------------------------
+def _load_encoder():
+    global _encoder, _encoder_loaded
+    if not _encoder_loaded:
+        _encoder_loaded = True
+        try:
+            import tiktoken
+            _encoder = tiktoken.get_encoding(TOKENIZER_ENCODING)
+        except ImportError:
+            _encoder = None
+        except Exception as e:  # installed, but the encoding file could not be loaded (e.g. offline)
+            print(f"⚠️ tiktoken encoding '{TOKENIZER_ENCODING}' unavailable ({e}); estimating token counts")
+            _encoder = None
+    return _encoder
+
+
+def estimate_tokens(text: str) -> int:
+    """Tokenizer-free estimate: one token per word/punctuation/space run, plus one per 6 more characters."""
+    return sum(1 + (len(piece) - 1) // 6 for piece in _PIECES.findall(text))
+
+
+def count_tokens(text: str) -> int:
+    encoder = _load_encoder()
+    if encoder is not None:
+        return len(encoder.encode(text, disallowed_special=()))
+    return estimate_tokens(text)
+
+
+# ------------------------------
+# Oversized hunks
+# ------------------------------
+def _lines(text: str) -> List[str]:
+    """Lines with their "\\n" (unlike splitlines(), other control characters don't end a line)."""
+    lines = [line + "\n" for line in text.split("\n")]
+    lines[-1] = lines[-1][:-1]
+    return lines if lines[-1] else lines[:-1]
+
+
+def _fit_line(line: str, budget: int) -> str:
+    """
+    Shortens one line (keeping its newline) until it fits `budget` tokens. The first character
+    is always kept: in a hunk it is the "+"/"-"/" " tag the recomputed "@@" counts rely on.
+    """
+    body = line.rstrip("\n")
+    tag, rest = body[:1], body[1:]
+    while rest and count_tokens(tag + rest + TRUNCATION_NOTE + "\n") > budget:
+        rest = rest[:len(rest) * 3 // 4]
+    return tag + rest + TRUNCATION_NOTE + "\n"
+
+
+def _split_hunk(hunk_text: str, hunk: Hunk, budget: int) -> List[Tuple[str, int]]:
+    """
+    Cuts one hunk into consecutive smaller hunks of at most `budget` tokens each, every one
+    with its own "@@ -a,b +c,d @@" header so each piece is still a valid diff.
+    """
+    first_eol = hunk_text.find("\n") + 1 or len(hunk_text)
+    header, lines = hunk_text[:first_eol], _lines(hunk_text[first_eol:])
+    closing = header.find("@@", 2)
+    section = header[closing + 2:].rstrip("\n") if closing >= 0 else ""
+    reserve = count_tokens(f"@@ -{hunk.old_start},{hunk.old_count} +{hunk.new_start},{hunk.new_count} @@{section}\n")
+    room = max(1, budget - reserve)
+
+    pieces: List[Tuple[str, int]] = []
+    current: List[str] = []
+    tokens = 0
+    # A side with no lines is numbered from the line before it ("@@ -0,0 +1,3 @@")
+    old_line = hunk.old_start if hunk.old_count else hunk.old_start + 1
+    new_line = hunk.new_start if hunk.new_count else hunk.new_start + 1
+    start_old, start_new = old_line, new_line
+    old_count = new_count = 0
+
+    def flush():
+        old_at = start_old if old_count else start_old - 1
+        new_at = start_new if new_count else start_new - 1
+        piece_header = f"@@ -{old_at},{old_count} +{new_at},{new_count} @@{section}\n"
+        pieces.append((piece_header + "".join(current), tokens + reserve))
+
+    for line in lines:
+        line_tokens = count_tokens(line)
+        if line_tokens > room:
+            line = _fit_line(line, room)
+            line_tokens = count_tokens(line)
+        if current and tokens + line_tokens > room:
+            flush()
+            current, tokens = [], 0
+            start_old, start_new = old_line, new_line
+            old_count = new_count = 0
+        current.append(line)
+        tokens += line_tokens
+        tag = line[:1]
+        if tag == "+":
+            new_line += 1
+            new_count += 1
+        elif tag == "-":
+            old_line += 1
+            old_count += 1
+        elif tag != "\\":
+            old_line += 1
+            new_line += 1
+            old_count += 1
+            new_count += 1
+    if current:
+        flush()
+    return pieces
+
+
+# ------------------------------
+# Units: whole files, single hunks, or pieces of hunks
+# ------------------------------
+def _text_units(text: str, budget: int) -> List[_Unit]:
+    """Line units for text that is not part of any file (a preamble, or input that isn't a diff)."""
+    units = []
+    for line in _lines(text):
+        tokens = count_tokens(line)
+        if tokens > budget:
+            line = _fit_line(line, budget)
+            tokens = count_tokens(line)
+        units.append(_Unit(-1, "", 0, line, tokens))
+    return units
+
+
+def _units(parsed: ParsedDiff, budget: int) -> List[_Unit]:
+    text = parsed.text
+    if not parsed.files:
+        return _text_units(text, budget)
+
+    units = _text_units(text[:parsed.files[0].start], budget)
+    for index, f in enumerate(parsed.files):
+        header = parsed.header_text(f)
+        if not f.hunks:  # binary, mode-only or pure-rename sections have no hunks
+            units.append(_Unit(index, "", 0, header, count_tokens(header)))
+            continue
+        header_tokens = count_tokens(header)
+        # Text between hunks (rare) rides along with the hunk before it; text after the last
+        # hunk (e.g. the next commit's message in `git log -p` output) is not part of the file
+        ends = [h.start for h in f.hunks[1:]] + [f.hunks[-1].end]
+        bodies = [text[h.start:end] for h, end in zip(f.hunks, ends)]
+        sizes = [count_tokens(body) for body in bodies]
+        if header_tokens + sum(sizes) <= budget:
+            units.append(_Unit(index, header, header_tokens, "".join(bodies), sum(sizes)))
+        else:
+            room = max(1, budget - header_tokens)
+            for hunk, body, size in zip(f.hunks, bodies, sizes):
+                if size <= room:
+                    units.append(_Unit(index, header, header_tokens, body, size))
+                    continue
+                pieces = _split_hunk(text[hunk.start:hunk.end], hunk, room)
+                extra = body[hunk.end - hunk.start:]
+                if extra:
+                    pieces[-1] = (pieces[-1][0] + extra, pieces[-1][1] + count_tokens(extra))
+                units.extend(_Unit(index, header, header_tokens, piece, tokens) for piece, tokens in pieces)
+        units.extend(_text_units(text[f.hunks[-1].end:f.end], budget))
+    return units
+
+
+# ------------------------------
+# Public API
+# ------------------------------
+def chunk_diff(diff: Union[str, ParsedDiff], max_tokens: Optional[int] = None) -> List[Chunk]:
+    """
+    Packs a diff into as few chunks of at most `max_tokens` tokens (CHUNK_MAX_TOKENS by default)
+    as diff order allows. Files and hunks are never cut unless a single hunk is too big.
+    """
+    parsed = diff_parser.parse(diff)
+    budget = max_tokens or CHUNK_MAX_TOKENS
+    chunks: List[Chunk] = []
+    parts: List[str] = []
+    paths: List[str] = []
+    tokens = 0
+    open_file = None  # file whose header is already in the current chunk
+
+    for unit in _units(parsed, budget):
+        cost = unit.tokens + (unit.header_tokens if unit.file != open_file else 0)
+        if parts and tokens + cost > budget:
+            chunks.append(Chunk("".join(parts), tokens, tuple(paths)))
+            parts, paths, tokens, open_file = [], [], 0, None
+            cost = unit.tokens + unit.header_tokens
+        if unit.file != open_file:
+            parts.append(unit.header)
+            open_file = unit.file
+        if unit.file >= 0 and (not paths or paths[-1] != parsed.files[unit.file].path):
+            paths.append(parsed.files[unit.file].path)
+        parts.append(unit.body)
+        tokens += cost
+
+    if parts:
+        chunks.append(Chunk("".join(parts), tokens, tuple(paths)))
+    return chunks
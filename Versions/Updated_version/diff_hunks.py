@@ -0,0 +1,53 @@
+# diff_hunks.py
+# Unified-diff hunk index: the new-file lines each changed file touches,
+# used to keep only analyzer findings on (or near) the lines a PR changed
+
+import os
+from bisect import bisect_right
+from typing import Dict, Iterable, List, Tuple, Union
+import diff_parser
+from diff_parser import ParsedDiff
+
+# ------------------------------
+# Configuration (overridable from .env)
+# ------------------------------
+# Findings this many lines away from a changed line are still reported
+CONTEXT_LINES = int(os.getenv("FINDINGS_CONTEXT_LINES", "3"))
+
+HunkIndex = Dict[str, List[Tuple[int, int]]]
+
+
+# ------------------------------
+# Index
+# ------------------------------
+def build_hunk_index(diff: Union[str, ParsedDiff]) -> HunkIndex:
+    """
+    Maps every file the diff adds/modifies to sorted, merged (first, last) ranges of
+    new-file line numbers that were added, plus the position of each deletion.
+    """
+    return diff_parser.parse(diff).hunk_index()
+
+
+def is_near_change(ranges: List[Tuple[int, int]], line_no: int, context: int = CONTEXT_LINES) -> bool:
+    """True if `line_no` is inside a changed range or within `context` lines of one."""
+    i = bisect_right(ranges, (line_no + context, float("inf")))
+    return i > 0 and ranges[i - 1][1] + context >= line_no
+
+
+# ------------------------------
+# Findings filter
+# ------------------------------
+def filter_findings(found: Iterable, index: HunkIndex, context: int = CONTEXT_LINES) -> Tuple[list, int]:
+    """
+    Keeps findings (anything with .file and .line) on or near changed lines.
+    Whole-file findings (line 0) and files the index doesn't cover are kept.
+    Returns (kept findings, number hidden).
+    """
+    kept, hidden = [], 0
+    for f in found:
+        ranges = index.get(f.file)
+        if ranges is None or not f.line or is_near_change(ranges, f.line, context):
+            kept.append(f)
+        else:
+            hidden += 1
+    return kept, hidden
@@ -0,0 +1,285 @@
+# diff_parser.py
+# One-pass unified-diff parser. Every stage (language detection, hunk index, features,
+# chunking, prompt packing) reads the same ParsedDiff instead of re-scanning the raw text.
+#
+# The parser walks the text once: header lines are sliced out, hunk body lines are only
+# classified by their first character. Files and hunks keep character offsets into the
+# original string, so their text is a slice away and never copied up front.
+
+import posixpath
+from functools import lru_cache
+from typing import Dict, List, NamedTuple, Optional, Tuple, Union
+
+# Extension -> language (same families the static analyzers are configured for)
+LANGUAGES = {
+    "py": "python",
+    "js": "javascript", "jsx": "javascript", "ts": "javascript", "tsx": "javascript",
+    "java": "java",
+    "cpp": "cpp", "cc": "cpp", "cxx": "cpp", "h": "cpp", "hpp": "cpp",
+    "go": "go",
+    "kt": "kotlin",
+    "rs": "rust",
+}
+
+
+class Hunk(NamedTuple):
+    header: str                   # the "@@ -a,b +c,d @@ ..." line
+    old_start: int
+    old_count: int
+    new_start: int
+    new_count: int
+    start: int                    # character offsets of the hunk (header included) in the diff text
+    end: int
+    added: Tuple[int, ...]        # new-file line numbers of "+" lines
+    removed: Tuple[int, ...]      # old-file line numbers of "-" lines
+    deleted_at: Tuple[int, ...]   # new-file line each "-" line sat in front of
+
+
+class DiffFile(NamedTuple):
+    path: str                     # new path; the old path for deleted files
+    old_path: Optional[str]       # None for added files
+    status: str                   # "added" | "deleted" | "renamed" | "modified"
+    language: Optional[str]
+    binary: bool
+    start: int                    # character offsets of the whole file section
+    end: int
+    header_end: int               # where the first hunk starts (end of the diff --git/---/+++ header)
+    hunks: Tuple[Hunk, ...]
+    additions: int
+    deletions: int
+
+
+def language_of(path: str) -> Optional[str]:
+    return LANGUAGES.get(posixpath.splitext(path)[1][1:].lower())
+
+
+class ParsedDiff:
+    """A parsed unified diff: files in diff order plus whole-diff counters."""
+
+    __slots__ = ("text", "files", "num_lines", "additions", "deletions")
+
+    def __init__(self, text: str, files: Tuple[DiffFile, ...], num_lines: int):
+        self.text = text
+        self.files = files
+        self.num_lines = num_lines
+        self.additions = sum(f.additions for f in files)
+        self.deletions = sum(f.deletions for f in files)
+
+    @property
+    def changed_lines(self) -> int:
+        return self.additions + self.deletions
+
+    def changed_paths(self) -> List[str]:
+        """Paths that exist after the change (deleted files left out), in diff order."""
+        return [f.path for f in self.files if f.status != "deleted"]
+
+    def file_text(self, f: DiffFile) -> str:
+        return self.text[f.start:f.end]
+
+    def header_text(self, f: DiffFile) -> str:
+        return self.text[f.start:f.header_end]
+
+    def hunk_text(self, h: Hunk) -> str:
+        return self.text[h.start:h.end]
+
+    def hunk_index(self) -> Dict[str, List[Tuple[int, int]]]:
+        """
+        Merged (first, last) ranges of new-file lines each surviving file's hunks touch:
+        added lines plus the position of every deletion (see diff_hunks).
+        """
+        touched: Dict[str, set] = {}
+        for f in self.files:
+            if f.status == "deleted" or not f.hunks:
+                continue
+            lines = touched.setdefault(f.path, set())
+            for h in f.hunks:
+                lines.update(h.added)
+                lines.update(h.deleted_at)
+        index = {}
+        for path, numbers in touched.items():
+            ranges: List[Tuple[int, int]] = []
+            for n in sorted(numbers):
+                if ranges and n == ranges[-1][1] + 1:
+                    ranges[-1] = (ranges[-1][0], n)
+                else:
+                    ranges.append((n, n))
+            index[path] = ranges
+        return index
+
+
+# ------------------------------
+# Parser
+# ------------------------------
+def _strip_prefix(path: str) -> Optional[str]:
+    """'a/x.py' -> 'x.py', '/dev/null' -> None (handles git's "quoted" paths and trailing tabs)."""
+    path = path.split("\t")[0].rstrip()
+    if path.startswith('"') and path.endswith('"'):
+        path = path[1:-1].encode("latin-1", "backslashreplace").decode("unicode_escape").encode("latin-1").decode("utf-8", "replace")
+    if path == "/dev/null":
+        return None
+    return path[2:] if path[:2] in ("a/", "b/") else path
+
+
+def _git_header_paths(rest: str) -> Tuple[Optional[str], Optional[str]]:
+    """Paths from 'a/<old> b/<new>' (used for binary files and pure renames without ---/+++)."""
+    if rest.startswith("a/"):
+        half = (len(rest) - 3) // 2
+        if rest[half:half + 3] == " b/" and rest[2:half] == rest[half + 3:]:
+            return rest[2:half], rest[half + 3:]  # same path on both sides, spaces allowed
+        split = rest.rfind(" b/")
+        if split > 0:
+            return rest[2:split], rest[split + 3:]
+    return None, None
+
+
+def _hunk_numbers(header: str) -> Optional[Tuple[int, int, int, int]]:
+    # "@@ -old_start[,old_count] +new_start[,new_count] @@"
+    try:
+        ranges = header[3:header.index(" @@", 3)].split(" ")
+        old, new = ranges[0][1:].split(","), ranges[1][1:].split(",")
+        return int(old[0]), int(old[1]) if len(old) > 1 else 1, int(new[0]), int(new[1]) if len(new) > 1 else 1
+    except (ValueError, IndexError):
+        return None
+
+
+class _FileBuilder:
+    def __init__(self, start: int):
+        self.start = start
+        self.old_path = self.new_path = None
+        self.git_old = self.git_new = None
+        self.seen_old = self.seen_new = False
+        self.status = None
+        self.binary = False
+        self.header_end = None
+        self.hunks: List[Hunk] = []
+        self.additions = self.deletions = 0
+
+    def build(self, end: int) -> DiffFile:
+        old_path = self.old_path if self.seen_old else self.git_old
+        new_path = self.new_path if self.seen_new else self.git_new
+        status = self.status
+        if status is None:
+            if self.seen_old and old_path is None:
+                status = "added"
+            elif self.seen_new and new_path is None:
+                status = "deleted"
+            elif old_path and new_path and old_path != new_path:
+                status = "renamed"
+            else:
+                status = "modified"
+        if status == "added":
+            old_path = None
+        path = (old_path if status == "deleted" else new_path) or old_path or ""
+        return DiffFile(path, old_path, status, language_of(path), self.binary, self.start, end,
+                        self.header_end if self.header_end is not None else end,
+                        tuple(self.hunks), self.additions, self.deletions)
+
+
+def _parse(text: str) -> ParsedDiff:
+    files: List[DiffFile] = []
+    current: Optional[_FileBuilder] = None
+    size = len(text)
+    pos = 0
+
+    while pos < size:
+        eol = text.find("\n", pos)
+        nxt = size if eol == -1 else eol + 1
+        first = text[pos]
+
+        if first == "d" and text.startswith("diff --git ", pos):
+            if current is not None:
+                files.append(current.build(pos))
+            current = _FileBuilder(pos)
+            current.git_old, current.git_new = _git_header_paths(text[pos + 11:nxt].rstrip("\r\n"))
+        elif first == "-" and text.startswith("--- ", pos) and (current is None or current.hunks or current.seen_old):
+            # Plain unified diff (no "diff --git" lines): every ---/+++ pair starts a file
+            if current is not None:
+                files.append(current.build(pos))
+            current = _FileBuilder(pos)
+            current.old_path, current.seen_old = _strip_prefix(text[pos + 4:nxt]), True
+        elif first == "+" and text.startswith("+++ ", pos) and (current is None or current.hunks or current.seen_new):
+            # "+++" without its "---" (hand-made or cut-off diffs) still starts a file
+            if current is not None:
+                files.append(current.build(pos))
+            current = _FileBuilder(pos)
+            current.new_path, current.seen_new = _strip_prefix(text[pos + 4:nxt]), True
+        elif current is None:
+            pass  # preamble (e.g. commit message of a format-patch mail)
+        elif first == "@" and text.startswith("@@ ", pos):
+            header = text[pos:nxt].rstrip("\r\n")
+            numbers = _hunk_numbers(header)
+            if numbers is not None:
+                if current.header_end is None:
+                    current.header_end = pos
+                pos = _parse_hunk(text, pos, nxt, header, numbers, current)
+                continue
+        elif first == "-" and text.startswith("--- ", pos):
+            current.old_path, current.seen_old = _strip_prefix(text[pos + 4:nxt]), True
+        elif first == "+" and text.startswith("+++ ", pos):
+            current.new_path, current.seen_new = _strip_prefix(text[pos + 4:nxt]), True
+        elif text.startswith("new file mode", pos):
+            current.status = "added"
+        elif text.startswith("deleted file mode", pos):
+            current.status = "deleted"
+        elif text.startswith("rename from ", pos) or text.startswith("copy from ", pos):
+            current.status = "renamed"
+        elif text.startswith("Binary files ", pos) or text.startswith("GIT binary patch", pos):
+            current.binary = True
+        pos = nxt
+
+    if current is not None:
+        files.append(current.build(size))
+    num_lines = text.count("\n") + (1 if text and not text.endswith("\n") else 0)
+    return ParsedDiff(text, tuple(files), num_lines)
+
+
+def _parse_hunk(text: str, pos: int, nxt: int, header: str, numbers: Tuple[int, int, int, int], current: _FileBuilder) -> int:
+    """Consumes one hunk (its line counts say where it ends); returns the offset after it."""
+    old_start, old_left, new_start, new_left = numbers
+    old_count, new_count = old_left, new_left
+    start = pos
+    added, removed, deleted_at = [], [], []
+    old_line, new_line = old_start, new_start
+    size = len(text)
+    pos = nxt
+    while pos < size and (old_left > 0 or new_left > 0 or text[pos] == "\\"):
+        eol = text.find("\n", pos)
+        nxt = size if eol == -1 else eol + 1
+        tag = text[pos]
+        if tag == "+":
+            added.append(new_line)
+            new_line += 1
+            new_left -= 1
+        elif tag == "-":
+            removed.append(old_line)
+            deleted_at.append(new_line)  # a deletion touches the line that now sits in its place
+            old_line += 1
+            old_left -= 1
+        elif tag == "\\":
+            pass  # "\ No newline at end of file"
+        else:
+            old_line += 1
+            new_line += 1
+            old_left -= 1
+            new_left -= 1
+        pos = nxt
+    current.hunks.append(Hunk(header, old_start, old_count, new_start, new_count, start, pos,
+                              tuple(added), tuple(removed), tuple(deleted_at)))
+    current.additions += len(added)
+    current.deletions += len(removed)
+    return pos
+
+
+@lru_cache(maxsize=8)
+def _parse_cached(text: str) -> ParsedDiff:
+    return _parse(text)
+
+
+def parse(diff: Union[str, ParsedDiff]) -> ParsedDiff:
+    """
+    Parses a diff (a ParsedDiff is returned as is). Recent texts are memoized, so stages
+    handed the same string share one parse.
+    """
+    if isinstance(diff, ParsedDiff):
+        return diff
+    return _parse_cached(diff)
@@ -0,0 +1,148 @@
+# fast_checks.py
+# In-process Python checks on the standard-library AST: one parse and one tree walk per file,
+# no subprocesses. Runs in milliseconds as the first analysis tier and still reports when
+# pylint/flake8 are not installed. Rule names match pylint so findings.dedup merges duplicates.
+
+import os
+import ast
+from typing import List, Set, Tuple
+from findings import Finding
+
+TOOL = "AST"
+
+# Default values evaluated once and shared between calls
+MUTABLE_LITERALS = (ast.List, ast.Dict, ast.Set, ast.ListComp, ast.DictComp, ast.SetComp)
+MUTABLE_CALLS = {"list", "dict", "set", "bytearray", "defaultdict", "OrderedDict", "deque"}
+BROAD_EXCEPTIONS = {"Exception", "BaseException"}
+
+
+class _Checker(ast.NodeVisitor):
+    """Collects findings for one module in a single pass."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.found: List[Finding] = []
+        self.imports: List[Tuple[str, int, str]] = []  # (bound name, line, description)
+        self.used: Set[str] = set()
+        self.exported: Set[str] = set()
+
+    def add(self, line: int, rule: str, severity: str, message: str):
+        self.found.append(Finding(self.path, line, rule, severity, message, TOOL))
+
+    # --- imports and names ---
+    def visit_Import(self, node: ast.Import):
+        for alias in node.names:
+            bound = alias.asname or alias.name.split(".")[0]
+            self.imports.append((bound, node.lineno, f"{alias.name} as {alias.asname}" if alias.asname else alias.name))
+
+    def visit_ImportFrom(self, node: ast.ImportFrom):
+        if node.module == "__future__":
+            return
+        for alias in node.names:
+            if alias.name != "*":
+                shown = f"{alias.name} as {alias.asname}" if alias.asname else alias.name
+                self.imports.append((alias.asname or alias.name, node.lineno, f"{shown} imported from {'.' * node.level}{node.module or ''}"))
+
+    def visit_Name(self, node: ast.Name):
+        self.used.add(node.id)
+
+    def visit_Assign(self, node: ast.Assign):
+        # __all__ = ["name", ...] re-exports count as uses
+        if any(isinstance(t, ast.Name) and t.id == "__all__" for t in node.targets) and isinstance(node.value, (ast.List, ast.Tuple)):
+            self.exported.update(e.value for e in node.value.elts if isinstance(e, ast.Constant) and isinstance(e.value, str))
+        self.generic_visit(node)
+
+    def _visit_annotation(self, annotation):
+        # Names inside "quoted" annotations (forward refs, TYPE_CHECKING imports) are uses too
+        if isinstance(annotation, ast.Constant) and isinstance(annotation.value, str):
+            try:
+                self.used.update(n.id for n in ast.walk(ast.parse(annotation.value, mode="eval")) if isinstance(n, ast.Name))
+            except SyntaxError:
+                pass
+        elif annotation is not None:
+            self.visit(annotation)
+
+    def visit_AnnAssign(self, node: ast.AnnAssign):
+        self._visit_annotation(node.annotation)
+        self.visit(node.target)
+        if node.value is not None:
+            self.visit(node.value)
+
+    # --- functions ---
+    def visit_FunctionDef(self, node):
+        args = node.args
+        positional = args.posonlyargs + args.args
+
+        # Mutable defaults
+        defaults = list(zip(positional[len(positional) - len(args.defaults):], args.defaults))
+        defaults += [(a, d) for a, d in zip(args.kwonlyargs, args.kw_defaults) if d is not None]
+        for arg, default in defaults:
+            if isinstance(default, MUTABLE_LITERALS) or (
+                isinstance(default, ast.Call) and isinstance(default.func, ast.Name) and default.func.id in MUTABLE_CALLS
+            ):
+                self.add(default.lineno, "dangerous-default-value", "warning",
+                         f"Mutable default value for argument '{arg.arg}' is shared between calls")
+
+        # Type hints (coding standards: "All functions must have type hints")
+        every = positional + args.kwonlyargs + [a for a in (args.vararg, args.kwarg) if a]
+        if positional and positional[0].arg in ("self", "cls"):
+            every = [a for a in every if a is not positional[0]]
+        missing = [a.arg for a in every if a.annotation is None]
+        if node.returns is None and node.name != "__init__":
+            missing.append("return")
+        if missing:
+            self.add(node.lineno, "missing-type-hints", "info",
+                     f"Function '{node.name}' is missing type hints for: {', '.join(missing)}")
+
+        for a in every:
+            self._visit_annotation(a.annotation)
+        self._visit_annotation(node.returns)
+        for child in node.decorator_list + args.defaults + [d for d in args.kw_defaults if d is not None] + node.body:
+            self.visit(child)
+
+    visit_AsyncFunctionDef = visit_FunctionDef
+
+    # --- exception handling ---
+    def visit_ExceptHandler(self, node: ast.ExceptHandler):
+        if node.type is None:
+            self.add(node.lineno, "bare-except", "warning", "No exception type(s) specified")
+        else:
+            caught = node.type.elts if isinstance(node.type, ast.Tuple) else [node.type]
+            for c in caught:
+                if isinstance(c, ast.Name) and c.id in BROAD_EXCEPTIONS:
+                    self.add(node.lineno, "broad-exception-caught", "warning", f"Catching too general exception {c.id}")
+        self.generic_visit(node)
+
+    def finish(self) -> List[Finding]:
+        if os.path.basename(self.path) != "__init__.py":  # package __init__ files import to re-export
+            for bound, line, shown in self.imports:
+                if bound not in self.used and bound not in self.exported:
+                    self.add(line, "unused-import", "warning", f"Unused import {shown}")
+        return sorted(self.found, key=lambda f: f.line)
+
+
+# ------------------------------
+# Public API
+# ------------------------------
+def check_source(source, path: str) -> List[Finding]:
+    """Runs every check on one file's contents (str or bytes; bytes honour the coding cookie)."""
+    try:
+        tree = ast.parse(source, filename=path)
+    except (SyntaxError, ValueError) as e:
+        return [Finding(path, getattr(e, "lineno", None) or 0, "syntax-error", "error", str(getattr(e, "msg", e)), TOOL)]
+    checker = _Checker(path)
+    checker.visit(tree)
+    return checker.finish()
+
+
+def check_files(root: str, files: List[str]) -> List[Finding]:
+    """Checks the given repo-relative .py files under `root`; unreadable files are skipped."""
+    found: List[Finding] = []
+    for path in files:
+        try:
+            with open(os.path.join(root, path), "rb") as f:
+                source = f.read()
+        except OSError:
+            continue
+        found.extend(check_source(source, path))
+    return found
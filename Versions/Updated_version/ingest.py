@@ -1,10 +1,12 @@
 import os
-from langchain_community.document_loaders import DirectoryLoader, TextLoader
 from langchain_text_splitters import RecursiveCharacterTextSplitter
-from langchain_huggingface import HuggingFaceEmbeddings
 from langchain_pinecone import PineconeVectorStore # <-- NEW
 from pinecone import Pinecone, ServerlessSpec      # <-- NEW
 from config import PINECONE_API_KEY, PINECONE_INDEX_NAME # <-- NEW
+import ingest_manifest
+import embed_pool
+import embedding_cache
+import doc_stream
 
 # --- Configuration ---
 KNOWLEDGE_BASE_DIR = "knowledge_base"
@@ -12,37 +14,22 @@ EMBEDDING_MODEL = "all-MiniLM-L6-v2"
 # The dimension of the 'all-MiniLM-L6-v2' model. This is critical.
 EMBEDDING_DIMENSION = 384 
 
+def load_file(source):
+    return doc_stream.load(source)  # [] for binary, generated, oversized or unreadable files
+
+
 def ingest_data():
     """
-    Load data, split, embed, and upload to a Pinecone index.
+    Sync the Pinecone index with the knowledge base: only files added or changed since the
+    last run are split, embedded and uploaded; vectors of deleted files are removed
+    (see ingest_manifest.py).
     """
-    print(f"Loading documents from {KNOWLEDGE_BASE_DIR}...")
-    loader = DirectoryLoader(
-        KNOWLEDGE_BASE_DIR,
-        glob="**/*",
-        loader_cls=TextLoader,
-        show_progress=True,
-        use_multithreading=True
-    )
-    documents = loader.load()
-    
-    if not documents:
-        print("No documents found to ingest. Exiting.")
-        return
-
-    print(f"Loaded {len(documents)} documents.")
-
-    # Split documents into chunks
-    print("Splitting documents...")
-    text_splitter = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=100)
-    texts = text_splitter.split_documents(documents)
-    print(f"Split into {len(texts)} chunks.")
-
-    # Load embedding model
-    print(f"Loading embedding model: {EMBEDDING_MODEL}...")
-    embeddings = HuggingFaceEmbeddings(model_name=EMBEDDING_MODEL)
+    print(f"Scanning documents in {KNOWLEDGE_BASE_DIR}...")
+    rejected = {}
+    files = ingest_manifest.scan(KNOWLEDGE_BASE_DIR, rejected)
+    print(f"Found {len(files)} documents; {doc_stream.describe(rejected)}.")
 
-    # --- NEW: Pinecone Initialization ---
+    # --- Pinecone Initialization ---
     print(f"Initializing Pinecone client...")
     pc = Pinecone(api_key=PINECONE_API_KEY)
     
@@ -57,20 +44,36 @@ def ingest_data():
                 region='us-east-1' # Use a free-tier compatible region
             )
         )
+        ingest_manifest.forget(PINECONE_INDEX_NAME)  # nothing recorded is in the new index
         print(f"Index created. Waiting for it to be ready...")
         # Note: In a real app, you might wait in a loop, but adding docs will wait.
     else:
         print(f"Found existing index '{PINECONE_INDEX_NAME}'.")
+        if ingest_manifest.clear_unrecorded(PINECONE_INDEX_NAME, pc.Index(PINECONE_INDEX_NAME)):
+            print("Cleared vectors ingested before the manifest existed; re-ingesting everything once.")
+
+    # Compare with what the index already holds
+    changes = ingest_manifest.plan(PINECONE_INDEX_NAME, "knowledge_base", files, EMBEDDING_MODEL)
+    print(f"{len(changes.changed)} new or changed, {len(changes.removed)} removed, {changes.unchanged} unchanged documents.")
+    if not changes.changed and not changes.removed:
+        print("\nIndex is already up to date. Nothing to embed.")
+        return
+
+    # Load embedding model
+    print(f"Loading embedding model: {EMBEDDING_MODEL}...")
+    text_splitter = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=100)
+    with embed_pool.EmbeddingPool(EMBEDDING_MODEL) as pool:
+        # Chunks embedded before (by any ingest, for any repo) come from the cache
+        embeddings = embedding_cache.CachedEmbeddings(pool, EMBEDDING_MODEL)
+        vector_store = PineconeVectorStore(index_name=PINECONE_INDEX_NAME, embedding=embeddings)
 
-    # Upload documents to Pinecone
-    print(f"Uploading {len(texts)} chunks to Pinecone index...")
-    PineconeVectorStore.from_documents(
-        texts, 
-        embeddings, 
-        index_name=PINECONE_INDEX_NAME
-    )
-    # ------------------------------------
+        # Split, embed (across all cores) and upload the changed documents; delete vectors of removed ones
+        upsert_batch = max(ingest_manifest.UPSERT_BATCH, pool.workers * pool.batch_size * 4)
+        counts = ingest_manifest.apply(vector_store, changes, load_file, text_splitter.split_documents, upsert_batch)
+    print(f"Uploaded {counts['chunks']} chunks from {counts['embedded_files']} documents; "
+          f"deleted {counts['deleted_vectors']} old vectors ({counts['deleted_files']} removed documents).")
     
+    embeddings.report()
     print("\nIngestion complete!")
     print(f"Vector store is ready in Pinecone index '{PINECONE_INDEX_NAME}'.")
 
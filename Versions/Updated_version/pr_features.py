@@ -0,0 +1,97 @@
+# pr_features.py
+# PR features for the prompt selector (selector.py), computed in one sweep over the diff.
+#
+# The diff is read once, in line-aligned blocks of about BLOCK_SIZE characters. Per block the
+# line counters are C-level str.count calls, and each flag that is still unset is first
+# looked up by its literal words in the lowercased block; its regex only runs on blocks that
+# contain one of them. A flag is never searched again once found. Nothing can match across
+# two blocks (see _next_cut), and "/* ... */" is tracked with a flag instead of a DOTALL
+# regex, so the cost stays linear in the diff size.
+#
+# The values are exactly those of the original per-feature regexes (kept in
+# benchmark_pr_features.py), because the saved selector state was trained on them.
+
+import re
+from typing import Dict
+
+BLOCK_SIZE = 1 << 16
+
+# flag -> (pattern searched anywhere in the diff, literals every match contains, lowercase)
+STREAMED_FLAGS = {
+    "has_comments": (re.compile(r"#|//"), ("#", "//")),  # "/* ... */" is matched across blocks below
+    "has_functions": (re.compile(r"\bdef\s+\w+|\bfunction\b|\bfunc\b", re.IGNORECASE), ("def", "func")),
+    "has_imports": (re.compile(r"^\s*import\s|^\s*from\s|#include", re.MULTILINE), ("import", "from", "#include")),
+    "has_test": (re.compile(r"\btest\b|\bspec\b|\bunittest\b", re.IGNORECASE), ("test", "spec")),
+    "has_docs": (re.compile(r"\breadme\b|\bdoc\b|\bdocumentation\b", re.IGNORECASE), ("readme", "doc")),
+    "has_config": (re.compile(r"\.json\b|\.yml\b|\.yaml\b|\.xml\b|\.conf\b", re.IGNORECASE), (".json", ".yml", ".yaml", ".xml", ".conf")),
+    "is_python": (re.compile(r"\.py\b", re.IGNORECASE), (".py",)),
+    "is_js": (re.compile(r"\.js\b|\.ts\b", re.IGNORECASE), (".js", ".ts")),
+    "is_java": (re.compile(r"\.java\b", re.IGNORECASE), (".java",)),
+}
+
+# Line boundaries str.splitlines() knows besides "\n"
+_OTHER_BREAKS = re.compile("[\r\v\f\x1c\x1d\x1e\x85\u2028\u2029]")
+
+FEATURE_ORDER = [
+    'num_lines', 'num_files', 'additions', 'deletions', 'net_changes',
+    'has_comments', 'has_functions', 'has_imports', 'has_test',
+    'has_docs', 'has_config', 'is_python', 'is_js', 'is_java'
+]
+
+# A block may only end before a line starting with one of these: neither whitespace nor a word
+# character, so no pattern above (e.g. "def\n    name") can match across the cut
+_CUT = re.compile(r"\n(?=[-+@\\])")
+
+
+def _next_cut(text: str, pos: int) -> int:
+    if pos + BLOCK_SIZE >= len(text):
+        return len(text)
+    m = _CUT.search(text, pos + BLOCK_SIZE)
+    return m.start() + 1 if m else len(text)
+
+
+def extract_pr_features(diff_text: str) -> Dict[str, int]:
+    """Extract features from PR diff for model prediction"""
+    features = dict.fromkeys(FEATURE_ORDER, 0)
+    pending = set(STREAMED_FLAGS)
+    comment_open = False  # a "/*" was seen and no "*/" after it yet
+    size = len(diff_text)
+    pos = 0
+
+    while pos < size:
+        end = _next_cut(diff_text, pos)
+        block = diff_text[pos:end]
+        pos = end
+
+        # Line-start counters ("^" = block start or after a newline)
+        if _OTHER_BREAKS.search(block):
+            features['num_lines'] += len(block.splitlines())
+        else:
+            features['num_lines'] += block.count("\n") + (not block.endswith("\n"))
+        features['num_files'] += block.count("\ndiff --git") + block.startswith("diff --git")
+        features['additions'] += block.count("\n+") + block.startswith("+")
+        features['deletions'] += block.count("\n-") + block.startswith("-")
+
+        if "has_comments" in pending:
+            if comment_open:
+                found = "*/" in block
+            else:
+                start = block.find("/*")
+                comment_open = start >= 0
+                found = comment_open and block.find("*/", start + 2) >= 0
+            if found:
+                features['has_comments'] = 1
+                pending.discard("has_comments")
+
+        # Literal prefilter; lower() only equals IGNORECASE matching for ASCII text
+        lowered = block.lower() if pending and block.isascii() else None
+        for name in list(pending):
+            pattern, literals = STREAMED_FLAGS[name]
+            if lowered is not None and not any(literal in lowered for literal in literals):
+                continue
+            if pattern.search(block):
+                features[name] = 1
+                pending.discard(name)
+
+    features['net_changes'] = features['additions'] - features['deletions']
+    return features
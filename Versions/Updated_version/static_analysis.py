@@ -1,118 +1,319 @@
-# static_analysis.py
-
-import os
-import re
-import subprocess
-from typing import Dict, List
-
-# =====================================================
-# 1. Static Analysis Configuration
-# =====================================================
-
-# Language-to-File-Extension Map
-FILE_LANG_MAP = {
-    "py": "python",
-    "js": "javascript", "jsx": "javascript", "ts": "javascript", "tsx": "javascript",
-    "java": "java",
-    "cpp": "cpp", "cc": "cpp", "cxx": "cpp", "h": "cpp", "hpp": "cpp",
-    "go": "go",
-    "kt": "kotlin",
-    "rs": "rust"
-}
-
-# Static Analyzer Commands Map (Tool Name, Base Command List)
-# NOTE: Tools must be installed locally and in PATH for this to work.
-# The file paths will be appended to the base command list before execution.
-ANALYZERS = {
-    "python": [
-        ("🧩 Pylint", ["pylint", "--exit-zero"]),
-        ("🎯 Flake8", ["flake8", "--exit-zero"]),
-        ("🔒 Bandit", ["bandit", "-r"]),
-        ("🧠 Mypy", ["mypy", "--ignore-missing-imports"]),
-    ],
-    "javascript": [
-        ("ESLint", ["eslint", "--max-warnings=0"]),
-        # Add TypeScript analysis here if needed
-    ],
-    "java": [("Checkstyle", ["checkstyle", "-c", "/google_checks.xml"])],
-    "cpp": [("Cppcheck", ["cppcheck", "--enable=all", "--quiet"])],
-    "go": [("Staticcheck", ["staticcheck"])],
-    "rust": [("Clippy", ["cargo", "clippy", "--", "-D", "warnings"])]
-}
-
-# =====================================================
-# 2. Optimized Static Analysis Functions
-# =====================================================
-
-def get_changed_files_and_languages(diff_text: str) -> Dict[str, List[str]]:
-    """
-    Infers file types/languages and gets paths from the PR diff.
-    Returns a dict: { 'language': [list of file paths] }
-    """
-    # Finds lines that start with '+++ b/' and captures the file path
-    file_paths = re.findall(r'\+\+\+ b/(.*)', diff_text)
-    
-    changed_files: Dict[str, List[str]] = {}
-    
-    for path in file_paths:
-        ext = path.split('.')[-1].lower()
-        lang = FILE_LANG_MAP.get(ext)
-        if lang:
-            # Add file path to the list for its detected language
-            changed_files.setdefault(lang, []).append(path)
-
-    return changed_files
-
-def run_static_analysis(diff_text: str) -> str:
-    """
-    Runs appropriate static analyzers on ONLY the changed files and compiles results.
-    Returns a single string containing all analyzer outputs.
-    """
-    changed_files_map = get_changed_files_and_languages(diff_text)
-    
-    if not changed_files_map:
-        return "⚠️ No recognizable programming language files found in PR diff to analyze."
-
-    results: List[str] = []
-    
-    # Loop through each detected language and its files
-    for lang, files in changed_files_map.items():
-        results.append(f"=== 🔍 Targeted Static Analysis for {lang.upper()} ({len(files)} files changed) ===")
-        
-        analyzer_list = ANALYZERS.get(lang, [])
-
-        if not analyzer_list:
-            results.append(f"No analyzer configured for {lang}")
-            continue
-            
-        for name, base_cmd in analyzer_list:
-            # Concatenate base command with file list
-            full_cmd = base_cmd + files
-            
-            try:
-                # Run the command
-                process = subprocess.run(
-                    full_cmd,
-                    capture_output=True,
-                    text=True,
-                    check=False, # Do not raise exception on non-zero exit code
-                    timeout=120 # Increased timeout for safety
-                )
-                
-                output = process.stdout.strip()
-                error_output = process.stderr.strip()
-                
-                # Check for output or errors
-                if output or error_output:
-                    results.append(f"| {name}:\n```\n{output if output else error_output}\n```")
-                else:
-                    results.append(f"| {name}: No issues found.")
-
-            except FileNotFoundError:
-                results.append(f"| {name}: ❌ Command not found. Is the tool installed locally and in PATH?")
-            except subprocess.TimeoutExpired:
-                results.append(f"| {name}: ❌ Execution timed out after 120 seconds.")
-            except Exception as e:
-                results.append(f"| {name}: ❌ Error running analyzer: {e}")
-
-    return "\n\n".join(results)
\ No newline at end of file
+# static_analysis.py
+
+import os
+import time
+import subprocess
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple, Union
+import analysis_cache
+import analysis_planner
+import diff_hunks
+import diff_parser
+import fast_checks
+import findings
+from diff_parser import ParsedDiff
+from findings import Finding
+
+# =====================================================
+# 1. Static Analysis Configuration
+# =====================================================
+
+# Language-to-File-Extension Map
+FILE_LANG_MAP = {
+    "py": "python",
+    "js": "javascript", "jsx": "javascript", "ts": "javascript", "tsx": "javascript",
+    "java": "java",
+    "cpp": "cpp", "cc": "cpp", "cxx": "cpp", "h": "cpp", "hpp": "cpp",
+    "go": "go",
+    "kt": "kotlin",
+    "rs": "rust"
+}
+
+# Static Analyzer Commands Map (Tool Name, Base Command List)
+# NOTE: Tools must be installed locally and in PATH for this to work.
+# The file paths will be appended to the base command list before execution.
+ANALYZERS = {
+    "python": [
+        ("🧩 Pylint", ["pylint", "--exit-zero", "--output-format=json"]),
+        ("🎯 Flake8", ["flake8", "--exit-zero"]),
+        ("🔒 Bandit", ["bandit", "-q", "-f", "json"]),
+        ("🧠 Mypy", ["mypy", "--ignore-missing-imports", "--show-error-codes", "--no-error-summary"]),
+    ],
+    "javascript": [
+        ("ESLint", ["eslint", "--max-warnings=0", "--format", "json"]),
+        # Add TypeScript analysis here if needed
+    ],
+    "java": [("Checkstyle", ["checkstyle", "-c", "/google_checks.xml"])],
+    "cpp": [("Cppcheck", ["cppcheck", "--enable=all", "--quiet", "--template={file}:{line}:{column}: {severity}: {message} [{id}]"])],
+    "go": [("Staticcheck", ["staticcheck"])],
+    "rust": [("Clippy", ["cargo", "clippy", "--", "-D", "warnings"])]
+}
+
+# Analyzers run side by side, each in its own child process:
+#  ANALYZER_WORKERS - max analyzer processes alive at once
+#  ANALYZER_TIMEOUT - per-analyzer limit (seconds)
+#  ANALYSIS_BUDGET  - wall-clock limit for the whole stage; analyzers still running are killed
+ANALYZER_WORKERS = int(os.getenv("STATIC_ANALYSIS_WORKERS", str(min(8, os.cpu_count() or 4))))
+ANALYZER_TIMEOUT = float(os.getenv("STATIC_ANALYSIS_TIMEOUT", "120"))
+ANALYSIS_BUDGET = float(os.getenv("STATIC_ANALYSIS_BUDGET", "150"))
+
+# In-process AST checks (fast_checks) on changed Python files, run before the external tools
+FAST_CHECKS = os.getenv("STATIC_ANALYSIS_FAST_CHECKS", "1") == "1"
+
+# Analyzers whose findings depend on the whole package/crate, not just the file passed in;
+# their results are never cached per file
+PROJECT_WIDE_ANALYZERS = {"Staticcheck", "Clippy"}
+
+# Analyzers that follow imports between the files they are given: editing one changed file can
+# change another's findings, so their cached results are keyed on every file of the run
+CROSS_MODULE_ANALYZERS = {"Mypy", "Pylint"}
+
+# Which findings reach the prompt:
+#  "hunks" - only those on/near lines the PR changed (diff_hunks.CONTEXT_LINES around each change)
+#  "files" - everything reported for the changed files
+FINDINGS_SCOPE = os.getenv("STATIC_ANALYSIS_SCOPE", "hunks")
+
+# --- Cached Globals ---
+# Analyzers the planner deferred run here after the review, one diff at a time
+_deferred_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="deferred-analysis")
+_deferred: List[Future] = []
+_deferred_keys = set()  # jobs queued or running, so repeated reviews don't queue them twice
+
+# What finish_deferred() does with background analyses still pending when a run ends:
+#  "wait"   - let them finish (their results warm analysis_cache for the next review)
+#  "cancel" - drop the queued ones; only the one already running is finished
+DEFERRED_AT_EXIT = os.getenv("STATIC_ANALYSIS_DEFERRED_AT_EXIT", "wait")
+
+# =====================================================
+# 2. Optimized Static Analysis Functions
+# =====================================================
+
+def get_changed_files_and_languages(diff_text: Union[str, ParsedDiff]) -> Dict[str, List[str]]:
+    """
+    Infers file types/languages and gets paths from the PR diff.
+    Returns a dict: { 'language': [list of file paths] }
+    """
+    # Files that still exist after the change, from the shared diff_parser parse
+    changed_files: Dict[str, List[str]] = {}
+    
+    for path in diff_parser.parse(diff_text).changed_paths():
+        ext = path.split('.')[-1].lower()
+        lang = FILE_LANG_MAP.get(ext)
+        if lang:
+            # Add file path to the list for its detected language
+            changed_files.setdefault(lang, []).append(path)
+
+    return changed_files
+
+def analyze_static(diff_text: Union[str, ParsedDiff]) -> dict:
+    """
+    Runs appropriate static analyzers on ONLY the changed files.
+    Analyzers for all languages run concurrently (ANALYZER_WORKERS at a time) under one
+    ANALYSIS_BUDGET deadline; findings and notes keep the language/analyzer order of ANALYZERS.
+    Returns a structured report (see findings.new_report); render it with findings.render_report.
+    """
+    report = findings.new_report()
+    parsed = diff_parser.parse(diff_text)  # parsed once; every step below reads it
+    changed_files_map = get_changed_files_and_languages(parsed)
+    
+    if not changed_files_map:
+        report["notes"].append("⚠️ No recognizable programming language files found in PR diff to analyze.")
+        return report
+
+    collected: List[Finding] = []
+    jobs = []  # (analyzer name, command, files, language)
+    
+    # Loop through each detected language and its files
+    for lang, files in changed_files_map.items():
+        analyzer_list = ANALYZERS.get(lang, [])
+        fast = FAST_CHECKS and lang == "python"
+        names = ([fast_checks.TOOL] if fast else []) + [findings.tool_name(name) for name, _ in analyzer_list]
+        report["sections"].append({"language": lang, "files": len(files), "analyzers": names})
+
+        if fast:
+            # Tier 0: milliseconds, no tools needed; the external analyzers below add to it
+            collected.extend(fast_checks.check_files(".", files))
+
+        if not analyzer_list:
+            report["notes"].append(f"No analyzer configured for {lang}")
+            continue
+            
+        for name, base_cmd in analyzer_list:
+            jobs.append((name, base_cmd, files, lang))
+
+    changed_lines = parsed.changed_lines
+    decisions = analysis_planner.plan(
+        [(findings.tool_name(name), lang, len(files)) for name, _, files, lang in jobs], changed_lines, workers=ANALYZER_WORKERS
+    )
+    report["plan"].extend(decisions)
+    for decision in decisions:
+        print(f"  Plan: {decision['tool']} ({decision['language']}, est. {decision['estimate']:.1f}s) -> {decision['action']}: {decision['reason']}")
+
+    deadline = time.monotonic() + ANALYSIS_BUDGET
+    with ThreadPoolExecutor(max_workers=max(1, ANALYZER_WORKERS)) as pool:
+        futures = [
+            pool.submit(_run_analyzer, name, base_cmd, files, deadline=deadline,
+                        cache_only=decision["action"] == "defer", changed_lines=changed_lines)
+            for (name, base_cmd, files, _), decision in zip(jobs, decisions)
+        ]
+        outcomes = [future.result() for future in futures]
+
+    # Deferred analyzers with every file already cached have nothing left to run
+    deferred = [
+        (name, base_cmd, files)
+        for (name, base_cmd, files, _), decision, (_, note) in zip(jobs, decisions, outcomes)
+        if decision["action"] == "defer" and note
+    ]
+    for (name, _, _, _), (found, note) in zip(jobs, outcomes):
+        collected.extend(found)
+        if note:
+            report["notes"].append(note)
+        else:
+            report["completed"].append(findings.tool_name(name))
+    if deferred:
+        # Reviews that re-run on the same diff (one per prompt) share one background run
+        key = tuple((name, tuple(files)) for name, _, files in deferred)
+        _queue_deferred(key, deferred, changed_lines)
+
+    collected = findings.dedup(collected)
+    if FINDINGS_SCOPE == "hunks":
+        collected, report["hidden"] = diff_hunks.filter_findings(collected, parsed.hunk_index())
+    report["findings"] = collected
+    return report
+
+
+def run_static_analysis(diff_text: Union[str, ParsedDiff]) -> str:
+    """Full static-analysis report as text (see analyze_static for the structured form)."""
+    return findings.render_report(analyze_static(diff_text))
+
+
+def _queue_deferred(key: tuple, *args):
+    """Queues _run_deferred(*args) in the background unless the same job is already queued or running."""
+    if key in _deferred_keys:
+        return
+    _deferred_keys.add(key)
+    future = _deferred_pool.submit(_run_deferred, *args)
+    _deferred.append(future)
+    future.add_done_callback(lambda done, key=key: _forget_deferred(done, key))
+
+
+def _forget_deferred(future: Future, key: tuple):
+    # Finished jobs are dropped, so a long-lived process doesn't hold on to every report
+    _deferred_keys.discard(key)
+    if future in _deferred:
+        _deferred.remove(future)
+
+
+def wait_for_deferred(timeout: Optional[float] = None) -> List[dict]:
+    """Waits for the background analyses still pending (see _run_deferred) and returns their reports."""
+    return [future.result(timeout=timeout) for future in list(_deferred)]
+
+
+def finish_deferred():
+    """
+    Call once a run is over: the background worker is not a daemon thread, so the interpreter
+    would otherwise wait for pending analyses silently at exit. Waits for them with a message,
+    or cancels the queued ones when DEFERRED_AT_EXIT is "cancel" (also on Ctrl+C while waiting).
+    """
+    pending = list(_deferred)
+    if not pending:
+        return
+    if DEFERRED_AT_EXIT != "cancel":
+        print(f"⏳ Waiting for {len(pending)} deferred static analyses to finish "
+              f"(set STATIC_ANALYSIS_DEFERRED_AT_EXIT=cancel to skip them)...")
+        try:
+            wait_for_deferred()
+            return
+        except KeyboardInterrupt:
+            pass
+    print("⏭️ Cancelling deferred static analyses; waiting for the running one to stop...")
+    _deferred_pool.shutdown(wait=True, cancel_futures=True)
+
+
+def _run_deferred(jobs: List[Tuple[str, List[str], List[str]]], changed_lines: int, root: str = ".") -> dict:
+    """
+    Runs the analyzers the planner deferred, each with the full ANALYZER_TIMEOUT. Per-file
+    results are stored in analysis_cache, so the next review of these files gets them as cache hits.
+    """
+    report = findings.new_report()
+    for name, base_cmd, files in jobs:
+        found, note = _run_analyzer(name, base_cmd, files, root, changed_lines=changed_lines)
+        report["findings"].extend(found)
+        if note:
+            report["notes"].append(note)
+    report["findings"] = findings.dedup(report["findings"])
+    print(f"  Deferred analysis finished: {len(report['findings'])} findings from {', '.join(findings.tool_name(n) for n, _, _ in jobs)}")
+    return report
+
+
+def _run_analyzer(name: str, base_cmd: List[str], files: List[str], root: str = ".", deadline: Optional[float] = None,
+                  cache_only: bool = False, changed_lines: int = 0) -> Tuple[List[Finding], Optional[str]]:
+    """
+    Runs one analyzer over the changed files, stopping it at `deadline` (monotonic time;
+    default: ANALYZER_TIMEOUT from now) or after ANALYZER_TIMEOUT, whichever comes first.
+    Returns (findings in file order, note about a tool problem or None).
+    Files with cached findings (same analyzer version, config and contents) are not re-linted,
+    so repeated runs over one diff (e.g. once per prompt in benchmark_all_prompts) are free;
+    with `cache_only` (analyzer deferred by the planner) only those cached findings are returned.
+    """
+    tool = findings.tool_name(name)
+    keys = {}
+    if analysis_cache.ENABLED and name not in PROJECT_WIDE_ANALYZERS:
+        cross_module = findings.tool_name(name) in CROSS_MODULE_ANALYZERS
+        keys = {path: key for path, key in analysis_cache.file_keys(name, base_cmd, root, files, cross_module).items() if key}
+    found: Dict[str, List[Finding]] = {}
+    for path, key in keys.items():
+        rows = analysis_cache.lookup(*key)
+        if rows is not None:
+            found[path] = findings.from_rows(rows, path, tool)
+    to_run = [path for path in files if path not in found]
+    if not to_run:
+        return _in_file_order(files, found), None
+    if cache_only:
+        cached = f"{len(found)} of {len(files)} files from cache" if found else "no cached results yet"
+        return _in_file_order(files, found), f"| {name}: ⏭️ Deferred to a background run after the review ({cached})."
+
+    started = time.monotonic()
+    timeout = ANALYZER_TIMEOUT if deadline is None else min(ANALYZER_TIMEOUT, deadline - started)
+    if timeout <= 0:
+        return _in_file_order(files, found), f"| {name}: ⏱️ Skipped, static analysis time budget ({ANALYSIS_BUDGET:.0f}s) used up."
+
+    try:
+        # Concatenate base command with the changed files that are not cached
+        process = subprocess.run(
+            base_cmd + to_run,
+            cwd=root,
+            capture_output=True,
+            text=True,
+            check=False, # Do not raise exception on non-zero exit code
+            timeout=timeout
+        )
+    except FileNotFoundError:
+        return _in_file_order(files, found), f"| {name}: ❌ Command not found. Is the tool installed locally and in PATH?"
+    except subprocess.TimeoutExpired:
+        analysis_planner.observe(tool, len(to_run), changed_lines * len(to_run) // max(1, len(files)), time.monotonic() - started)
+        return _in_file_order(files, found), f"| {name}: ⏱️ Timed out after {timeout:.0f}s and was stopped."
+    except Exception as e:
+        return _in_file_order(files, found), f"| {name}: ❌ Error running analyzer: {e}"
+
+    analysis_planner.observe(tool, len(to_run), changed_lines * len(to_run) // max(1, len(files)), time.monotonic() - started)
+
+    parsed = findings.parse_output(name, process.stdout, process.returncode, root)
+    if parsed is None:
+        # Not a report (crash, bad config...): show the tool's own message, cache nothing
+        raw = process.stderr.strip() or process.stdout.strip()
+        return _in_file_order(files, found), f"| {name}: ❌ Analyzer failed:\n```\n{raw[:1000]}\n```"
+
+    by_file: Dict[str, List[Finding]] = {path: [] for path in to_run}
+    for f in parsed:
+        if f.file in by_file:  # e.g. mypy also reports on imported, unchanged modules
+            by_file[f.file].append(f)
+    for path in to_run:
+        if path in keys:
+            analysis_cache.store(*keys[path], findings.to_rows(by_file[path]))
+    found.update(by_file)
+    return _in_file_order(files, found), None
+
+
+def _in_file_order(files: List[str], found: Dict[str, List[Finding]]) -> List[Finding]:
+    return [f for path in files for f in found.get(path, [])]
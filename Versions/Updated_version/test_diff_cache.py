@@ -0,0 +1,115 @@
+"""
+Pytest tests for diff_cache.py
+
+Covers:
+- lookup: miss on an empty cache, hit after store (served from memory, then from disk)
+- store: newer head SHA replaces the older diff file for the same PR
+- record/stats/reset_stats: hit/revalidated/miss counters
+- lookup/store: memory is capped at MEMORY_MAX_CHARS, least recently used diffs re-read from disk
+- clear: removes diffs from disk and memory
+
+Each test points CACHE_DIR at a pytest tmp_path.
+"""
+
+import os
+from collections import OrderedDict
+import pytest
+import diff_cache
+
+
+@pytest.fixture(autouse=True)
+def isolated_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(diff_cache, "CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(diff_cache, "_index", None)
+    monkeypatch.setattr(diff_cache, "_memory", OrderedDict())
+    monkeypatch.setattr(diff_cache, "_memory_chars", 0)
+    diff_cache.reset_stats()
+    yield tmp_path
+
+
+def test_lookup_returns_none_for_unknown_pr():
+    # Act / Assert
+    assert diff_cache.lookup("o", "r", 1) is None
+
+
+def test_store_then_lookup_returns_diff_etag_and_sha():
+    # Arrange
+    diff_cache.store("o", "r", 1, "diff-text", etag='"abc"', head_sha="sha1")
+    # Act
+    entry = diff_cache.lookup("o", "r", 1)
+    # Assert
+    assert entry == {"diff": "diff-text", "etag": '"abc"', "head_sha": "sha1"}
+
+
+def test_lookup_survives_process_restart(monkeypatch):
+    # Arrange
+    diff_cache.store("o", "r", 2, "on-disk", etag='"e"')
+    # simulate a fresh process: nothing held in memory
+    monkeypatch.setattr(diff_cache, "_index", None)
+    monkeypatch.setattr(diff_cache, "_memory", OrderedDict())
+    monkeypatch.setattr(diff_cache, "_memory_chars", 0)
+    # Act
+    entry = diff_cache.lookup("o", "r", 2)
+    # Assert
+    assert entry["diff"] == "on-disk"
+    assert entry["head_sha"] is None
+
+
+def test_store_new_head_sha_replaces_old_file(isolated_cache):
+    # Arrange
+    diff_cache.store("o", "r", 3, "old", etag='"1"', head_sha="aaa")
+    # Act
+    diff_cache.store("o", "r", 3, "new", etag='"2"', head_sha="bbb")
+    # Assert
+    diff_files = [f for f in os.listdir(isolated_cache) if f.endswith(".diff")]
+    assert diff_files == ["o_r_3_bbb.diff"]
+    assert diff_cache.lookup("o", "r", 3)["diff"] == "new"
+
+
+def test_lookup_returns_none_when_diff_file_is_missing(isolated_cache, monkeypatch):
+    # Arrange
+    diff_cache.store("o", "r", 4, "gone", head_sha="ccc")
+    os.remove(os.path.join(isolated_cache, "o_r_4_ccc.diff"))
+    monkeypatch.setattr(diff_cache, "_memory", OrderedDict())
+    monkeypatch.setattr(diff_cache, "_memory_chars", 0)
+    # Act / Assert
+    assert diff_cache.lookup("o", "r", 4) is None
+
+
+def test_memory_is_capped_and_evicts_least_recently_used(isolated_cache, monkeypatch):
+    # Arrange: room for two 10-character diffs
+    monkeypatch.setattr(diff_cache, "MEMORY_MAX_CHARS", 25)
+    diff_cache.store("o", "r", 1, "a" * 10, head_sha="s1")
+    diff_cache.store("o", "r", 2, "b" * 10, head_sha="s2")
+    diff_cache.lookup("o", "r", 1)  # PR 1 is now the most recently used
+    # Act
+    diff_cache.store("o", "r", 3, "c" * 10, head_sha="s3")
+    diff_cache.store("o", "r", 4, "d" * 30, head_sha="s4")  # bigger than the cap: disk only
+    # Assert
+    assert list(diff_cache._memory) == ["o_r_1_s1.diff", "o_r_3_s3.diff"]
+    assert diff_cache._memory_chars == 20
+    assert diff_cache.lookup("o", "r", 2)["diff"] == "b" * 10  # evicted, read back from disk
+    assert diff_cache.lookup("o", "r", 4)["diff"] == "d" * 30
+    assert list(diff_cache._memory) == ["o_r_3_s3.diff", "o_r_2_s2.diff"]
+
+
+def test_record_and_reset_stats():
+    # Act
+    diff_cache.record("hits")
+    diff_cache.record("hits")
+    diff_cache.record("revalidated")
+    diff_cache.record("misses")
+    # Assert
+    assert diff_cache.stats() == {"hits": 2, "revalidated": 1, "misses": 1}
+    diff_cache.reset_stats()
+    assert diff_cache.stats() == {"hits": 0, "revalidated": 0, "misses": 0}
+
+
+def test_clear_removes_cached_diffs(isolated_cache):
+    # Arrange
+    diff_cache.store("o", "r", 5, "x", head_sha="ddd")
+    # Act
+    diff_cache.clear()
+    # Assert
+    assert diff_cache.lookup("o", "r", 5) is None
+    assert not [f for f in os.listdir(isolated_cache) if f.endswith(".diff")]
@@ -0,0 +1,170 @@
+"""
+Pytest tests for diff_chunker.py
+
+Covers:
+- chunk_diff: a diff that fits comes back as one chunk, unchanged
+- chunk_diff: whole files are packed together and never split while they fit
+- chunk_diff: a file too big for one chunk is split between hunks, its header repeated in each chunk
+- chunk_diff: an oversized hunk is cut into valid smaller hunks with recomputed "@@" headers
+- chunk_diff: a line truncated to fit a tiny budget keeps its "+"/"-"/" " tag, so the "@@" counts stay right
+- chunk_diff: text that is not a diff is packed line by line; over-long lines are truncated
+- count_tokens: uses the tiktoken encoder when one is loaded, the estimate otherwise
+- utils.chunk_text: returns the chunk texts
+"""
+
+import pytest
+import diff_chunker
+import diff_parser
+import utils
+
+
+@pytest.fixture(autouse=True)
+def estimated_tokens(monkeypatch):
+    # Deterministic counts: no tiktoken encoder
+    monkeypatch.setattr(diff_chunker, "_encoder", None)
+    monkeypatch.setattr(diff_chunker, "_encoder_loaded", True)
+
+
+def file_diff(path: str, hunks: int = 1, lines: int = 3) -> str:
+    text = f"diff --git a/{path} b/{path}\nindex 1111111..2222222 100644\n--- a/{path}\n+++ b/{path}\n"
+    for h in range(hunks):
+        start = 1 + h * 100
+        text += f"@@ -{start},{lines} +{start},{lines} @@ def f{h}():\n"
+        text += "".join(f"-    old_value_{h}_{i} = compute({i})\n+    new_value_{h}_{i} = compute({i})\n" for i in range(lines))
+    return text
+
+
+def test_small_diff_is_one_unchanged_chunk():
+    # Arrange
+    diff = file_diff("a.py") + file_diff("b.py")
+
+    # Act
+    chunks = diff_chunker.chunk_diff(diff, max_tokens=10_000)
+
+    # Assert
+    assert len(chunks) == 1
+    assert chunks[0].text == diff
+    assert chunks[0].paths == ("a.py", "b.py")
+    assert chunks[0].tokens == diff_chunker.count_tokens(diff)
+
+
+def test_whole_files_are_packed_without_splitting():
+    # Arrange: each file is a bit under half the budget
+    files = [file_diff(f"mod{i}.py") for i in range(5)]
+    size = max(diff_chunker.count_tokens(f) for f in files)
+
+    # Act
+    chunks = diff_chunker.chunk_diff("".join(files), max_tokens=size * 2 + 5)
+
+    # Assert
+    assert [c.paths for c in chunks] == [("mod0.py", "mod1.py"), ("mod2.py", "mod3.py"), ("mod4.py",)]
+    assert "".join(c.text for c in chunks) == "".join(files)
+
+
+def test_big_file_is_split_between_hunks_with_its_header_repeated():
+    # Arrange
+    diff = file_diff("big.py", hunks=4)
+    one_hunk = diff_chunker.count_tokens(file_diff("x.py"))
+
+    # Act
+    chunks = diff_chunker.chunk_diff(diff, max_tokens=one_hunk * 2)
+
+    # Assert
+    assert len(chunks) == 2
+    for chunk in chunks:
+        assert chunk.text.startswith("diff --git a/big.py b/big.py\n")
+        assert chunk.tokens <= one_hunk * 2
+        assert chunk.text.count("\n@@ ") == 2  # whole hunks only
+    assert sum(diff_parser.parse(c.text).additions for c in chunks) == 12
+
+
+def test_oversized_hunk_becomes_valid_smaller_hunks():
+    # Arrange
+    diff = file_diff("huge.py", lines=40)
+    original = diff_parser.parse(diff).files[0].hunks[0]
+
+    # Act
+    chunks = diff_chunker.chunk_diff(diff, max_tokens=150)
+
+    # Assert
+    assert len(chunks) > 1
+    pieces = [h for c in chunks for f in diff_parser.parse(c.text).files for h in f.hunks]
+    assert all(c.tokens <= 150 for c in chunks)
+    assert all(h.header.endswith("@@ def f0():") for h in pieces)
+    assert [n for h in pieces for n in h.added] == list(original.added)
+    assert [n for h in pieces for n in h.removed] == list(original.removed)
+    assert all(len(h.added) == h.new_count and len(h.removed) == h.old_count for h in pieces)
+
+
+def test_truncated_lines_keep_their_diff_tag():
+    # Arrange: every line is far bigger than the room left after the "@@" header
+    long = "x" * 400
+    diff = (
+        "diff --git a/wide.py b/wide.py\n--- a/wide.py\n+++ b/wide.py\n@@ -1,3 +1,3 @@\n"
+        f" {long}\n-{long}\n+{long}\n"
+    )
+
+    # Act
+    chunks = diff_chunker.chunk_diff(diff, max_tokens=20)
+
+    # Assert
+    pieces = [h for c in chunks for f in diff_parser.parse(c.text).files for h in f.hunks]
+    body = [line for c in chunks for line in c.text.splitlines() if line.endswith(diff_chunker.TRUNCATION_NOTE)]
+    assert [line[:1] for line in body] == [" ", "-", "+"]
+    assert sum(h.old_count for h in pieces) == 2 and sum(h.new_count for h in pieces) == 2
+    assert [n for h in pieces for n in h.removed] == [2]
+    assert [n for h in pieces for n in h.added] == [2]
+
+
+def test_added_file_hunk_pieces_keep_empty_old_side():
+    # Arrange
+    body = "".join(f"+line number {i} of the new file\n" for i in range(60))
+    diff = f"diff --git a/new.py b/new.py\nnew file mode 100644\n--- /dev/null\n+++ b/new.py\n@@ -0,0 +1,60 @@\n{body}"
+
+    # Act
+    chunks = diff_chunker.chunk_diff(diff, max_tokens=120)
+
+    # Assert
+    headers = [h.header for c in chunks for f in diff_parser.parse(c.text).files for h in f.hunks]
+    assert len(headers) > 1
+    assert all(h.startswith("@@ -0,0 +") for h in headers)
+    assert headers[1].startswith(f"@@ -0,0 +{diff_parser.parse(chunks[0].text).files[0].hunks[0].new_count + 1},")
+
+
+def test_plain_text_is_packed_by_lines_and_long_lines_truncated():
+    # Arrange
+    text = "short line\n" * 5 + "word " * 500 + "\n"
+
+    # Act
+    chunks = diff_chunker.chunk_diff(text, max_tokens=60)
+
+    # Assert
+    assert all(c.tokens <= 60 for c in chunks)
+    assert chunks[0].text.startswith("short line\n")
+    assert chunks[-1].text.endswith(diff_chunker.TRUNCATION_NOTE + "\n")
+
+
+def test_count_tokens_uses_loaded_encoder(monkeypatch):
+    # Arrange
+    class FakeEncoder:
+        def encode(self, text, disallowed_special=()):
+            return list(text)
+
+    monkeypatch.setattr(diff_chunker, "_encoder", FakeEncoder())
+
+    # Act / Assert
+    assert diff_chunker.count_tokens("abc def") == 7
+
+
+def test_estimate_counts_runs_and_long_words():
+    # Arrange / Act / Assert
+    assert diff_chunker.estimate_tokens("a = b") == 5
+    assert diff_chunker.estimate_tokens("extraordinarily") == 3
+
+
+def test_utils_chunk_text_returns_chunk_texts():
+    # Arrange
+    diff = file_diff("a.py")
+
+    # Act / Assert
+    assert utils.chunk_text(diff, max_tokens=10_000) == [diff]
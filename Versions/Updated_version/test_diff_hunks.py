@@ -0,0 +1,86 @@
+"""
+Pytest tests for diff_hunks.py
+
+Covers:
+- build_hunk_index: added lines and deletion points per file, merged into ranges; deleted files skipped
+- is_near_change: inside a range, within the context window, outside it
+- filter_findings: keeps findings near changes, counts hidden ones, keeps whole-file findings
+"""
+
+import diff_hunks
+from findings import Finding
+
+DIFF = """diff --git a/app.py b/app.py
+--- a/app.py
++++ b/app.py
+@@ -10,6 +10,7 @@ def main():
+     a = 1
+     b = 2
+-    c = 3
++    c = 4
++    d = 5
+     e = 6
+     f = 7
+     g = 8
+@@ -40,3 +41,2 @@ def other():
+     x = 1
+-    y = 2
+     z = 3
+diff --git a/old.py b/old.py
+--- a/old.py
++++ /dev/null
+@@ -1,2 +0,0 @@
+-gone = True
+-also = True
+diff --git a/new.js b/new.js
+--- /dev/null
++++ b/new.js
+@@ -0,0 +1,2 @@
++const a = 1;
++const b = 2;
+\\ No newline at end of file
+"""
+
+
+def test_build_hunk_index_records_added_lines_and_deletion_points():
+    # Act
+    index = diff_hunks.build_hunk_index(DIFF)
+    # Assert
+    assert index == {"app.py": [(12, 13), (42, 42)], "new.js": [(1, 2)]}
+
+
+def test_is_near_change_uses_context_window():
+    # Arrange
+    ranges = [(12, 13), (42, 42)]
+    # Act / Assert
+    assert diff_hunks.is_near_change(ranges, 13, context=0)
+    assert diff_hunks.is_near_change(ranges, 16, context=3)
+    assert not diff_hunks.is_near_change(ranges, 17, context=3)
+    assert diff_hunks.is_near_change(ranges, 39, context=3)
+    assert not diff_hunks.is_near_change(ranges, 1, context=3)
+
+
+
+def test_filter_findings_keeps_findings_near_changed_lines():
+    # Arrange
+    index = {"app.py": [(12, 13)]}
+    found = [
+        Finding("app.py", 1, "missing-module-docstring", "info", "Missing module docstring", "Pylint"),
+        Finding("app.py", 12, "unused-variable", "warning", "Unused variable 'c'", "Pylint"),
+        Finding("app.py", 80, "B101", "info", "assert used", "Bandit"),
+        Finding("app.py", 0, "import-error", "error", "Cannot import", "Pylint"),
+    ]
+    # Act
+    kept, hidden = diff_hunks.filter_findings(found, index, context=3)
+    # Assert
+    assert [f.line for f in kept] == [12, 0]
+    assert hidden == 2
+
+
+def test_filter_findings_leaves_files_outside_the_index_untouched():
+    # Arrange
+    found = [Finding("b.py", 900, "E501", "info", "line too long", "Flake8")]
+    # Act
+    kept, hidden = diff_hunks.filter_findings(found, {}, context=3)
+    # Assert
+    assert (kept, hidden) == (found, 0)
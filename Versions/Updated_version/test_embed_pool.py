@@ -0,0 +1,86 @@
+"""
+Pytest tests for embed_pool.py
+
+Covers:
+- length_sorted_batches: every position once, batches of similar length, longest first
+- embed_stream: vectors come back in input order across windows and batches
+- EmbeddingPool: batches are encoded in worker processes that each load the model once
+- EmbeddingPool: a single batch (or workers=1) is encoded in this process; newlines are flattened
+- report: prints the chunks/sec reached
+
+The model is a fake whose "vector" describes the text, the batch and the process that encoded it.
+"""
+
+import os
+import numpy as np
+import embed_pool
+
+LOADS = []
+
+
+class FakeModel:
+    def encode(self, texts, batch_size, show_progress_bar):
+        return np.array([[len(text), len(texts), os.getpid(), len(LOADS), "\n" in text] for text in texts])
+
+
+def fake_loader(model_name, threads):
+    LOADS.append((model_name, threads))
+    return FakeModel()
+
+
+def make_pool(**kwargs):
+    return embed_pool.EmbeddingPool("fake-model", loader=fake_loader, **kwargs)
+
+
+def test_length_sorted_batches():
+    # Arrange
+    texts = ["a" * n for n in (5, 1, 9, 3, 7)]
+
+    # Act
+    batches = embed_pool.length_sorted_batches(texts, 2)
+
+    # Assert
+    assert batches == [[2, 4], [0, 3], [1]]
+
+
+def test_stream_vectors_keep_input_order_and_workers_load_once():
+    # Arrange: lengths shuffled so sorting moves every chunk
+    texts = ["x" * n for n in (7, 2, 30, 11, 1, 19, 4, 25, 13, 8)]
+
+    # Act
+    with make_pool(workers=2, batch_size=2, window=6) as pool:
+        vectors = list(pool.embed_stream(iter(texts)))
+
+    # Assert
+    assert [int(v[0]) for v in vectors] == [len(t) for t in texts]
+    assert all(v[1] <= 2 for v in vectors)
+    assert all(v[2] != os.getpid() for v in vectors)  # encoded by the workers
+    assert all(v[3] == 1 for v in vectors)  # one model load per worker process
+    assert pool.chunks == len(texts)
+
+
+def test_single_batch_is_encoded_in_process_with_newlines_flattened():
+    # Arrange
+    pool = make_pool(workers=4, batch_size=8)
+
+    # Act
+    vectors = pool.embed_documents(["def f():\n    return 1", "x = 2"])
+    query = pool.embed_query("what does\nf return?")
+
+    # Assert
+    assert {v[2] for v in vectors + [query]} == {os.getpid()}
+    assert not any(v[4] for v in vectors + [query])
+    assert pool._pool is None  # no worker processes were needed
+
+
+def test_report_prints_throughput(capsys):
+    # Arrange
+    with make_pool(workers=1) as pool:
+        pool.embed_documents(["a", "b", "c"])
+
+    # Act
+    out = capsys.readouterr().out
+
+    # Assert
+    assert pool.throughput() > 0
+    assert "Embedded 3 chunks" in out and "chunks/sec on 1 process)" in out
@@ -0,0 +1,93 @@
+"""
+Pytest tests for fast_checks.py
+
+Covers:
+- unused imports: plain, aliased, relative; names used in code, quoted annotations and __all__ count as uses
+- bare except and broad `except Exception` (also inside a tuple)
+- mutable defaults: literals, comprehensions and list()/dict() calls, keyword-only arguments
+- missing type hints: self/cls and __init__ return exempt
+- syntax errors reported as a single error finding; check_files skips unreadable files
+- dedup: an AST finding merges with the same pylint finding
+"""
+
+import fast_checks
+import findings
+from findings import Finding
+
+
+def _rules(source, path="m.py"):
+    return [(f.line, f.rule) for f in fast_checks.check_source(source, path)]
+
+
+def test_unused_imports():
+    # Arrange
+    source = (
+        "import os, sys\n"
+        "import os.path as osp\n"
+        "from typing import List, TYPE_CHECKING\n"
+        "from . import sibling\n"
+        "from __future__ import annotations\n"
+        "if TYPE_CHECKING:\n"
+        "    from x import Thing\n"
+        "__all__ = ['sibling']\n"
+        "x: 'Thing' = osp.join(List)\n"
+    )
+    # Act
+    found = fast_checks.check_source(source, "m.py")
+    # Assert
+    assert [(f.line, f.message) for f in found] == [(1, "Unused import os"), (1, "Unused import sys")]
+
+
+def test_unused_imports_not_reported_in_package_init():
+    # Act / Assert
+    assert _rules("from .core import run\n", "pkg/__init__.py") == []
+
+
+def test_exception_handlers():
+    # Arrange
+    source = (
+        "try:\n    pass\nexcept:\n    pass\n"
+        "try:\n    pass\nexcept (ValueError, Exception):\n    pass\n"
+        "try:\n    pass\nexcept ValueError:\n    pass\n"
+    )
+    # Act / Assert
+    assert _rules(source) == [(3, "bare-except"), (7, "broad-exception-caught")]
+
+
+def test_mutable_defaults_and_type_hints():
+    # Arrange
+    source = (
+        "def f(a, b: int = [], *, c: dict = {i: i for i in ()}, d: list = list()) -> None:\n    pass\n"
+        "class K:\n"
+        "    def __init__(self, x: int):\n        pass\n"
+        "    def m(self, y=None):\n        pass\n"
+    )
+    # Act
+    found = fast_checks.check_source(source, "m.py")
+    # Assert
+    assert [(f.line, f.rule, f.message) for f in found] == [
+        (1, "dangerous-default-value", "Mutable default value for argument 'b' is shared between calls"),
+        (1, "dangerous-default-value", "Mutable default value for argument 'c' is shared between calls"),
+        (1, "dangerous-default-value", "Mutable default value for argument 'd' is shared between calls"),
+        (1, "missing-type-hints", "Function 'f' is missing type hints for: a"),
+        (6, "missing-type-hints", "Function 'm' is missing type hints for: y, return"),
+    ]
+
+
+def test_syntax_error_and_unreadable_files(tmp_path):
+    # Arrange
+    (tmp_path / "bad.py").write_text("def (:\n")
+    # Act
+    found = fast_checks.check_files(str(tmp_path), ["bad.py", "missing.py"])
+    # Assert
+    assert [(f.file, f.line, f.rule, f.severity) for f in found] == [("bad.py", 1, "syntax-error", "error")]
+
+
+def test_ast_findings_merge_with_pylint():
+    # Arrange
+    ast_found = fast_checks.check_source("import os\n", "a.py")
+    pylint = Finding("a.py", 1, "W0611", "warning", "Unused import os", "Pylint")
+    # Act
+    merged = findings.dedup(ast_found + [pylint])
+    # Assert
+    assert [(f.rule, f.tool) for f in merged] == [("unused-import", "AST+Pylint")]
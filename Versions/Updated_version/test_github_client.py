@@ -0,0 +1,230 @@
+"""
+Pytest tests for github_client.py
+
+Covers:
+- get_session: one shared Session reused across calls, pool size applied to the adapter
+- configure: closes the current Session and rebuilds with new settings
+- request: relative paths resolved against the API root, auth/accept headers merged, default timeout
+- request: throttled API responses (429 / Retry-After) are retried, non-API URLs bypass the limiter
+- RateLimiter: header tracking, interactive reserve, permission 403s not mistaken for throttling
+- RateLimiter: core, graphql and search quotas are tracked and paced separately (X-RateLimit-Resource)
+- fetch_pr_metadata_batch: aliased GraphQL query per 100 PRs, REST-style keys, missing PRs -> None
+
+No network access: the Session's request method is replaced with a recorder.
+"""
+
+import time
+import pytest
+import github_client
+
+
+class FakeResponse:
+    def __init__(self, status_code=200, headers=None, text="", body=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.text = text
+        self.body = body
+
+    def json(self):
+        return self.body
+
+
+@pytest.fixture(autouse=True)
+def fresh_client():
+    github_client.close()
+    github_client.configure(pool_size=github_client.POOL_SIZE,
+                            connect_timeout=github_client.CONNECT_TIMEOUT,
+                            read_timeout=github_client.READ_TIMEOUT)
+    github_client.limiter = github_client.RateLimiter()
+    yield
+    github_client.close()
+
+
+def _record_requests(monkeypatch, responses=None):
+    calls = []
+    responses = list(responses or [])
+    session = github_client.get_session()
+
+    def fake_request(method, url, **kw):
+        calls.append((method, url, kw))
+        return responses.pop(0) if responses else FakeResponse()
+
+    monkeypatch.setattr(session, "request", fake_request)
+    return calls
+
+
+def test_get_session_returns_same_session_on_every_call():
+    # Act
+    first = github_client.get_session()
+    second = github_client.get_session()
+    # Assert
+    assert first is second
+
+
+def test_configure_rebuilds_session_with_new_pool_size():
+    # Arrange
+    old = github_client.get_session()
+    # Act
+    github_client.configure(pool_size=3)
+    new = github_client.get_session()
+    # Assert
+    assert new is not old
+    assert new.get_adapter("https://api.github.com")._pool_maxsize == 3
+
+
+def test_request_resolves_relative_path_and_merges_headers(monkeypatch):
+    # Arrange
+    calls = _record_requests(monkeypatch)
+    # Act
+    github_client.get("/repos/o/r/pulls/1", token="abc", accept="application/vnd.github.v3.diff", headers={"X-Extra": "1"})
+    # Assert
+    method, url, kw = calls[0]
+    assert method == "GET"
+    assert url == "https://api.github.com/repos/o/r/pulls/1"
+    assert kw["headers"] == {
+        "Authorization": "token abc",
+        "Accept": "application/vnd.github.v3.diff",
+        "X-Extra": "1",
+    }
+    assert kw["timeout"] == (github_client.CONNECT_TIMEOUT, github_client.READ_TIMEOUT)
+
+
+def test_post_passes_json_body_and_keeps_absolute_url(monkeypatch):
+    # Arrange
+    calls = _record_requests(monkeypatch)
+    # Act
+    github_client.post("https://example.test/comments", json={"body": "hi"}, timeout=1)
+    # Assert
+    method, url, kw = calls[0]
+    assert (method, url) == ("POST", "https://example.test/comments")
+    assert kw["json"] == {"body": "hi"}
+    assert kw["timeout"] == 1
+    assert kw["headers"] == {}
+
+
+def test_request_retries_after_retry_after_header(monkeypatch):
+    # Arrange
+    calls = _record_requests(monkeypatch, [FakeResponse(429, {"Retry-After": "0.01"}), FakeResponse(200)])
+    # Act
+    resp = github_client.get("/repos/o/r/pulls/1")
+    # Assert
+    assert resp.status_code == 200
+    assert len(calls) == 2
+
+
+def test_request_does_not_retry_permission_403(monkeypatch):
+    # Arrange
+    calls = _record_requests(monkeypatch, [FakeResponse(403, {"X-RateLimit-Remaining": "4000"}, "Resource not accessible")])
+    # Act
+    resp = github_client.get("/repos/o/r/pulls/1")
+    # Assert
+    assert resp.status_code == 403
+    assert len(calls) == 1
+
+
+def test_limiter_tracks_primary_quota_from_headers():
+    # Arrange
+    limiter = github_client.RateLimiter()
+    # Act
+    backoff = limiter.update(FakeResponse(200, {"X-RateLimit-Remaining": "42", "X-RateLimit-Reset": "1700000000"}))
+    # Assert
+    assert backoff == 0
+    assert limiter.status()["remaining"] == 42
+    assert limiter.status()["reset_at"] == 1700000000
+
+
+def test_limiter_keeps_reserve_for_interactive_callers():
+    # Arrange: quota is down to the reserve and resets an hour from now
+    limiter = github_client.RateLimiter(reserve=10)
+    limiter.update(FakeResponse(200, {"X-RateLimit-Remaining": "10", "X-RateLimit-Reset": str(time.time() + 3600)}))
+    now = time.monotonic()
+    # Act / Assert
+    assert limiter._delay(github_client.PRIORITY_BULK, now) > 3000
+    assert limiter._delay(github_client.PRIORITY_INTERACTIVE, now) == 0
+
+
+def test_limiter_paces_each_resource_against_its_own_quota(monkeypatch):
+    # Arrange: the GraphQL points bucket is spent; REST still has plenty
+    limiter = github_client.RateLimiter(reserve=10)
+    reset = str(time.time() + 3600)
+    limiter.update(FakeResponse(200, {"X-RateLimit-Remaining": "4000", "X-RateLimit-Reset": reset}))
+    backoff = limiter.update(FakeResponse(403, {"X-RateLimit-Resource": "graphql", "X-RateLimit-Remaining": "0",
+                                                "X-RateLimit-Reset": reset}), resource="graphql")
+    now = time.monotonic()
+    # Act / Assert
+    assert backoff > 3000
+    assert limiter._delay(github_client.PRIORITY_BULK, now, "core") == 0
+    assert limiter._delay(github_client.PRIORITY_INTERACTIVE, now, "graphql") > 3000
+    assert limiter.status()["remaining"] == 4000 and limiter.status("graphql")["remaining"] == 0
+
+
+@pytest.mark.parametrize("url, resource", [
+    ("https://api.github.com/repos/o/r/pulls/1", "core"),
+    ("https://api.github.com/graphql", "graphql"),
+    ("https://api.github.com/search/issues?q=x", "search"),
+    ("https://api.github.com/search/code?q=x", "code_search"),
+])
+def test_resource_for(url, resource):
+    # Arrange / Act / Assert
+    assert github_client.resource_for(url) == resource
+
+
+def test_request_reads_quota_into_the_responding_bucket(monkeypatch):
+    # Arrange
+    _record_requests(monkeypatch, [FakeResponse(200, {"X-RateLimit-Resource": "graphql", "X-RateLimit-Remaining": "7"}),
+                                   FakeResponse(200, {"X-RateLimit-Resource": "core", "X-RateLimit-Remaining": "4999"})])
+    # Act
+    github_client.post("graphql", json={})
+    github_client.get("/repos/o/r")
+    # Assert
+    assert github_client.limiter.status("graphql")["remaining"] == 7
+    assert github_client.limiter.status("core")["remaining"] == 4999
+
+
+def test_limiter_token_bucket_paces_bursts():
+    # Arrange
+    limiter = github_client.RateLimiter(rate=1000, burst=2)
+    # Act
+    start = time.monotonic()
+    for _ in range(4):
+        limiter.acquire(github_client.PRIORITY_BULK)
+    # Assert: two calls had to wait ~1ms each for a refill
+    assert time.monotonic() - start >= 0.001
+    assert limiter.tokens < 1
+
+
+def _pr_node(number, state="OPEN"):
+    return {"number": number, "title": f"PR {number}", "state": state, "url": f"https://github.com/o/r/pull/{number}",
+            "headRefOid": f"sha{number}", "changedFiles": 1, "additions": 2, "deletions": 3}
+
+
+def test_fetch_pr_metadata_batch_splits_into_graphql_batches(monkeypatch):
+    # Arrange: 150 PRs -> two GraphQL requests; PR 7 does not exist
+    monkeypatch.setattr(github_client, "GRAPHQL_BATCH_SIZE", 100)
+    queries = []
+
+    def fake_post(url, **kw):
+        queries.append(kw["json"])
+        numbers = [int(line.split(":")[0].strip()[2:]) for line in kw["json"]["query"].splitlines() if "pullRequest(" in line]
+        return FakeResponse(body={"data": {"repository": {f"pr{n}": (None if n == 7 else _pr_node(n, "MERGED")) for n in numbers}}})
+
+    monkeypatch.setattr(github_client, "post", fake_post)
+    # Act
+    result = github_client.fetch_pr_metadata_batch("o", "r", range(1, 151), token="t")
+    # Assert
+    assert len(queries) == 2
+    assert queries[0]["variables"] == {"owner": "o", "repo": "r"}
+    assert result[7] is None
+    assert result[150] == {
+        "number": 150, "title": "PR 150", "state": "closed", "merged": True,
+        "html_url": "https://github.com/o/r/pull/150", "head_sha": "sha150",
+        "changed_files": 1, "additions": 2, "deletions": 3,
+    }
+
+
+def test_graphql_raises_on_http_error(monkeypatch):
+    # Arrange
+    monkeypatch.setattr(github_client, "post", lambda url, **kw: FakeResponse(502, text="bad gateway"))
+    # Act / Assert
+    with pytest.raises(RuntimeError):
+        github_client.graphql("query { viewer { login } }")
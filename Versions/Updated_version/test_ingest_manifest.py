@@ -0,0 +1,311 @@
+"""
+Pytest tests for ingest_manifest.py
+
+Covers:
+- scan: git blob SHAs for every file, skipping .git
+- plan/apply: the first run embeds every file; an unchanged re-run embeds nothing
+- plan/apply: a changed file is re-embedded and its old vectors deleted; other files are untouched
+- plan/apply: vectors of removed files are deleted and the files forgotten
+- plan: a different embedding model re-embeds everything
+- scan: binary files are rejected before they are read, counted per reason
+- apply: files that fail to load keep their old vectors and entry, and are retried next run
+- apply: batches are upserted as they fill
+- apply(batch_size=...): overrides UPSERT_BATCH (e.g. to keep every embedding process busy)
+- plan(touched=...): only the touched sources are compared; touched ones without a hash are removed
+- indexed_commit/set_indexed_commit: per index and scope; forget() drops them too
+- scopes are independent; forget() drops everything recorded for an index; is_empty()
+- clear_unrecorded: empties an index filled before the manifest existed, and only then
+"""
+
+import os
+from types import SimpleNamespace
+import pytest
+import ingest_manifest
+
+INDEX = "test-index"
+MODEL = "test-model"
+
+
+class FakeStore:
+    def __init__(self):
+        self.vectors = {}
+        self.upserts = []
+
+    def add_documents(self, documents, ids):
+        self.upserts.append(list(ids))
+        self.vectors.update(zip(ids, documents))
+
+    def delete(self, ids):
+        for i in ids:
+            self.vectors.pop(i, None)
+
+
+@pytest.fixture(autouse=True)
+def manifest(tmp_path_factory, monkeypatch):
+    path = tmp_path_factory.mktemp("manifest") / "manifest.sqlite"
+    monkeypatch.setattr(ingest_manifest, "MANIFEST_PATH", str(path))
+
+
+def load(source):
+    with open(source, encoding="utf-8") as f:
+        return [f.read()]
+
+
+def split(documents):
+    return [line for doc in documents for line in doc.splitlines() if line]
+
+
+def write(root, rel, text):
+    path = os.path.join(root, rel)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+
+
+def sync(store, root, scope="kb", model=MODEL):
+    changes = ingest_manifest.plan(INDEX, scope, ingest_manifest.scan(root), model)
+    return changes, ingest_manifest.apply(store, changes, load, split)
+
+
+def test_scan_hashes_files_and_skips_git(tmp_path):
+    # Arrange
+    write(tmp_path, "docs/a.md", "hello\n")
+    write(tmp_path, ".git/config", "[core]\n")
+    write(tmp_path, "worktree/.git", "gitdir: elsewhere\n")  # a worktree's link file
+
+    # Act
+    hashes = ingest_manifest.scan(str(tmp_path))
+
+    # Assert
+    assert list(hashes) == [f"{tmp_path}/docs/a.md".replace(os.sep, "/")]
+    assert list(hashes.values()) == ["ce013625030ba8dba906f756967f9e9ca394464a"]  # `git hash-object`
+    assert ingest_manifest.text_hash("hello\n") == "ce013625030ba8dba906f756967f9e9ca394464a"
+
+
+def test_first_run_embeds_everything_and_rerun_nothing(tmp_path):
+    # Arrange
+    write(tmp_path, "a.md", "one\ntwo\n")
+    write(tmp_path, "b.md", "three\n")
+    store = FakeStore()
+
+    # Act
+    _, first = sync(store, str(tmp_path))
+    changes, second = sync(store, str(tmp_path))
+
+    # Assert
+    assert first["embedded_files"] == 2 and first["chunks"] == 3
+    assert sorted(store.vectors.values()) == ["one", "three", "two"]
+    assert changes.changed == {} and changes.removed == {} and changes.unchanged == 2
+    assert second["chunks"] == 0 and len(store.upserts) == 1
+
+
+def test_changed_file_replaces_its_vectors_only(tmp_path):
+    # Arrange
+    write(tmp_path, "a.md", "one\ntwo\n")
+    write(tmp_path, "b.md", "three\n")
+    store = FakeStore()
+    sync(store, str(tmp_path))
+    b_ids = [i for i, text in store.vectors.items() if text == "three"]
+
+    # Act
+    write(tmp_path, "a.md", "one\nTWO\n")
+    changes, counts = sync(store, str(tmp_path))
+
+    # Assert
+    assert list(changes.changed) == [f"{tmp_path}/a.md".replace(os.sep, "/")]
+    assert counts == {"embedded_files": 1, "chunks": 2, "deleted_files": 0, "deleted_vectors": 2, "failed_files": 0}
+    assert sorted(store.vectors.values()) == ["TWO", "one", "three"]
+    assert [i for i, text in store.vectors.items() if text == "three"] == b_ids
+
+
+def test_removed_file_vectors_are_deleted(tmp_path):
+    # Arrange
+    write(tmp_path, "a.md", "one\n")
+    write(tmp_path, "b.md", "two\nthree\n")
+    store = FakeStore()
+    sync(store, str(tmp_path))
+
+    # Act
+    os.remove(os.path.join(tmp_path, "b.md"))
+    _, counts = sync(store, str(tmp_path))
+
+    # Assert
+    assert counts["deleted_files"] == 1 and counts["deleted_vectors"] == 2
+    assert list(store.vectors.values()) == ["one"]
+    assert list(ingest_manifest.entries(INDEX, "kb")) == [f"{tmp_path}/a.md".replace(os.sep, "/")]
+
+
+def test_new_model_reembeds_under_the_same_ids(tmp_path):
+    # Arrange
+    write(tmp_path, "a.md", "one\n")
+    store = FakeStore()
+    sync(store, str(tmp_path))
+    ids = list(store.vectors)
+
+    # Act
+    changes, counts = sync(store, str(tmp_path), model="other-model")
+
+    # Assert
+    assert len(changes.changed) == 1
+    assert counts["deleted_vectors"] == 0
+    assert list(store.vectors) == ids
+
+
+def test_binary_file_is_never_scanned(tmp_path):
+    # Arrange
+    with open(tmp_path / "image.bin", "wb") as f:
+        f.write(b"\xff\xfe\x00binary")
+    with open(tmp_path / "logo", "wb") as f:
+        f.write(b"\x89PNG\r\n\x1a\n")
+    write(tmp_path, "a.md", "one\n")
+    rejected = {}
+
+    # Act
+    hashes = ingest_manifest.scan(str(tmp_path), rejected)
+
+    # Assert
+    assert list(hashes) == [f"{tmp_path}/a.md".replace(os.sep, "/")]
+    assert rejected == {"binary extension": 1, "binary (png)": 1}
+
+
+def test_unloadable_file_keeps_its_vectors_and_is_retried(tmp_path):
+    # Arrange
+    write(tmp_path, "a.md", "one\n")
+    write(tmp_path, "b.md", "two\n")
+    store = FakeStore()
+    sync(store, str(tmp_path))
+    write(tmp_path, "a.md", "ONE\n")
+    write(tmp_path, "b.md", "TWO\n")
+
+    def failing_load(source):
+        if source.endswith("a.md"):
+            raise UnicodeDecodeError("utf-8", b"", 0, 1, "bad")
+        return load(source)
+
+    # Act
+    changes = ingest_manifest.plan(INDEX, "kb", ingest_manifest.scan(str(tmp_path)), MODEL)
+    failed = ingest_manifest.apply(store, changes, failing_load, split)
+    retry, counts = sync(store, str(tmp_path))
+
+    # Assert: a.md's old vector survived the failure; the retry replaced it
+    assert failed["failed_files"] == 1 and failed["embedded_files"] == 1
+    assert list(retry.changed) == [f"{tmp_path}/a.md".replace(os.sep, "/")]
+    assert counts["deleted_vectors"] == 1 and counts["failed_files"] == 0
+    assert sorted(store.vectors.values()) == ["ONE", "TWO"]
+
+
+def test_chunks_are_upserted_in_batches(tmp_path, monkeypatch):
+    # Arrange
+    monkeypatch.setattr(ingest_manifest, "UPSERT_BATCH", 2)
+    for i in range(5):
+        write(tmp_path, f"f{i}.md", f"line {i}\n")
+    store = FakeStore()
+
+    # Act
+    sync(store, str(tmp_path))
+
+    # Assert
+    assert [len(batch) for batch in store.upserts] == [2, 2, 1]
+
+
+def test_batch_size_overrides_the_default(tmp_path):
+    # Arrange
+    for i in range(5):
+        write(tmp_path, f"f{i}.md", f"line {i}\n")
+    store = FakeStore()
+    changes = ingest_manifest.plan(INDEX, "kb", ingest_manifest.scan(str(tmp_path)), MODEL)
+
+    # Act
+    ingest_manifest.apply(store, changes, load, split, batch_size=4)
+
+    # Assert
+    assert [len(batch) for batch in store.upserts] == [4, 1]
+
+
+def test_scopes_are_independent_and_forget_drops_the_index(tmp_path):
+    # Arrange
+    write(tmp_path, "kb/a.md", "one\n")
+    write(tmp_path, "repo/b.py", "two\n")
+    store = FakeStore()
+    sync(store, str(tmp_path / "kb"), scope="kb")
+    sync(store, str(tmp_path / "repo"), scope="repo")
+
+    # Act: the "kb" scope knows nothing about the repo's files, so they are not "removed"
+    changes = ingest_manifest.plan(INDEX, "kb", ingest_manifest.scan(str(tmp_path / "kb")), MODEL)
+    was_empty = ingest_manifest.is_empty(INDEX)
+    ingest_manifest.forget(INDEX)
+
+    # Assert
+    assert changes.removed == {} and changes.unchanged == 1
+    assert not was_empty and ingest_manifest.is_empty(INDEX)
+    assert ingest_manifest.entries(INDEX, "kb") == {} and ingest_manifest.entries(INDEX, "repo") == {}
+
+
+class FakeIndex:
+    def __init__(self, namespaces):
+        self.namespaces = namespaces
+        self.deleted = []
+
+    def describe_index_stats(self):
+        return SimpleNamespace(total_vector_count=sum(self.namespaces.values()), namespaces=dict(self.namespaces))
+
+    def delete(self, delete_all, namespace):
+        self.deleted.append(namespace)
+        self.namespaces.pop(namespace)
+
+
+def test_index_filled_before_the_manifest_is_cleared_once(tmp_path):
+    # Arrange: vectors from an old from_documents() ingest, nothing in the manifest
+    write(tmp_path, "a.md", "one\n")
+    index = FakeIndex({"": 40, "other": 2})
+    ingest_manifest.set_indexed_commit(INDEX, "repo", "a" * 40)
+
+    # Act
+    cleared = ingest_manifest.clear_unrecorded(INDEX, index)
+    sync(FakeStore(), str(tmp_path))
+    index.namespaces[""] = 1
+    cleared_again = ingest_manifest.clear_unrecorded(INDEX, index)
+
+    # Assert
+    assert cleared and not cleared_again
+    assert index.deleted == ["", "other"]
+    assert ingest_manifest.indexed_commit(INDEX, "repo") is None
+
+
+def test_empty_index_is_not_cleared():
+    # Arrange
+    index = FakeIndex({})
+
+    # Act / Assert
+    assert not ingest_manifest.clear_unrecorded(INDEX, index)
+    assert index.deleted == []
+
+
+def test_plan_limited_to_touched_sources(tmp_path):
+    # Arrange
+    write(tmp_path, "a.md", "one\n")
+    write(tmp_path, "b.md", "two\n")
+    write(tmp_path, "c.md", "three\n")
+    store = FakeStore()
+    sync(store, str(tmp_path))
+    a, b = (f"{tmp_path}/{name}".replace(os.sep, "/") for name in ("a.md", "b.md"))
+
+    # Act: a diff says a.md changed and b.md was deleted; c.md is not looked at
+    changes = ingest_manifest.plan(INDEX, "kb", {a: ingest_manifest.text_hash("ONE\n")}, MODEL, touched=[a, b])
+
+    # Assert
+    assert list(changes.changed) == [a]
+    assert list(changes.removed) == [b]
+    assert changes.unchanged == 1
+
+
+def test_indexed_commit_per_scope_and_forgotten_with_the_index():
+    # Arrange
+    ingest_manifest.set_indexed_commit(INDEX, "repo", "a" * 40)
+    ingest_manifest.set_indexed_commit(INDEX, "repo", "b" * 40)
+
+    # Act / Assert
+    assert ingest_manifest.indexed_commit(INDEX, "repo") == "b" * 40
+    assert ingest_manifest.indexed_commit(INDEX, "kb") is None
+    ingest_manifest.forget(INDEX)
+    assert ingest_manifest.indexed_commit(INDEX, "repo") is None
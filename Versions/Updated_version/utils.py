@@ -1,39 +1,25 @@
-# utils.py
-
-import os
-from typing import List
-
-def safe_truncate(text: str, max_len: int = 4000) -> str:
-    """
-    Truncates text to a max length, ensuring it breaks cleanly at a newline
-    and adds an ellipsis for clarity.
-    """
-    if len(text) <= max_len:
-        return text
-    truncated = text[:max_len]
-    last_newline = truncated.rfind('\n')
-    if last_newline != -1:
-        return truncated[:last_newline] + "\n\n... (Output truncated)"
-    return truncated + " ... (Output truncated)"
-
-def chunk_text(text: str, max_chars: int = 3500) -> List[str]:
-    """
-    Splits text (like a PR diff) into chunks based on lines, ensuring each
-    chunk does not exceed max_chars.
-    """
-    lines = text.splitlines()
-    chunks, current = [], []
-    length = 0
-
-    for line in lines:
-        # +1 for the newline character
-        if length + len(line) + 1 > max_chars: 
-            chunks.append("\n".join(current))
-            current, length = [], 0
-        current.append(line)
-        length += len(line) + 1
-        
-    if current:
-        chunks.append("\n".join(current))
-        
-    return chunks
\ No newline at end of file
+# utils.py
+
+import os
+from typing import List
+import diff_chunker
+
+def safe_truncate(text: str, max_len: int = 4000) -> str:
+    """
+    Truncates text to a max length, ensuring it breaks cleanly at a newline
+    and adds an ellipsis for clarity.
+    """
+    if len(text) <= max_len:
+        return text
+    truncated = text[:max_len]
+    last_newline = truncated.rfind('\n')
+    if last_newline != -1:
+        return truncated[:last_newline] + "\n\n... (Output truncated)"
+    return truncated + " ... (Output truncated)"
+
+def chunk_text(text: str, max_tokens: int = None) -> List[str]:
+    """
+    Splits text (like a PR diff) into chunks of at most max_tokens model tokens,
+    keeping files and hunks whole where possible (see diff_chunker).
+    """
+    return [chunk.text for chunk in diff_chunker.chunk_diff(text, max_tokens)]
@@ -1,7 +1,7 @@
-import requests
+import github_client
+import diff_parser
 import os
 import subprocess
-import re
 from dotenv import load_dotenv
 from langchain.prompts import ChatPromptTemplate
 from langchain.schema.output_parser import StrOutputParser
@@ -61,12 +61,11 @@ ANALYZERS = {
 # =====================================================
 def fetch_pr_diff(owner, repo, pr_number, token):
     url = f"https://api.github.com/repos/{owner}/{repo}/pulls/{pr_number}"
-    headers = {"Authorization": f"token {token}"}
-    response = requests.get(url, headers=headers)
+    response = github_client.get(url, token=token)
     if response.status_code != 200:
         raise Exception(f"GitHub API Error: {response.json()}")
     diff_url = response.json()["diff_url"]
-    diff = requests.get(diff_url, headers=headers).text
+    diff = github_client.get(diff_url, token=token).text
     return diff
 
 
@@ -76,13 +75,11 @@ def fetch_pr_diff(owner, repo, pr_number, token):
 
 def get_changed_files_and_languages(diff_text: str) -> Dict[str, List[str]]:
     """Infer file types/languages and get paths from PR diff."""
-    # Finds lines that start with '+++ b/' and captures the file path
+    # Files that still exist after the change, from the shared diff_parser parse
     # Ignores files in .git, node_modules, etc. by common practice, but not explicitly filtered here.
-    file_paths = re.findall(r'\+\+\+ b/(.*)', diff_text)
-    
     changed_files: Dict[str, List[str]] = {}
     
-    for path in file_paths:
+    for path in diff_parser.parse(diff_text).changed_paths():
         ext = path.split('.')[-1].lower()
         lang = FILE_LANG_MAP.get(ext)
         if lang:
@@ -149,13 +146,9 @@ def run_static_analysis(diff_text: str) -> str:
 # =====================================================
 def post_review_comment(owner, repo, pr_number, token, review_body):
     url = f"https://api.github.com/repos/{owner}/{repo}/issues/{pr_number}/comments"
-    headers = {
-        "Authorization": f"token {token}",
-        "Accept": "application/vnd.github+json",
-        "User-Agent": "AI-PR-Reviewer-Script"
-    }
+    headers = {"User-Agent": "AI-PR-Reviewer-Script"}
     payload = {"body": review_body}
-    response = requests.post(url, headers=headers, json=payload)
+    response = github_client.post(url, token=token, accept="application/vnd.github+json", headers=headers, json=payload)
     if response.status_code not in [200, 201]:
         raise Exception(f"❌ Failed to post comment: {response.json()}")
     return response.json()
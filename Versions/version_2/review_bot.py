@@ -1,6 +1,10 @@
 import os
-import requests
-from groq import Groq  # 👈 use groq client instead of openai
+import time
+import github_client
+import diff_chunker
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, NamedTuple, Optional
+from groq import Groq, RateLimitError  # 👈 use groq client instead of openai
 
 # === Environment setup ===
 repo = os.getenv("GITHUB_REPOSITORY")
@@ -11,6 +15,18 @@ groq_key = os.getenv("GROQ_API_KEY")  # 👈 change variable name
 if not all([repo, pr_number, token, groq_key]):
     raise SystemExit("❌ Missing required environment variables")
 
+# "map-reduce": review chunks concurrently, merge them, post one comment
+# "per-chunk":  post every chunk's review as its own comment (previous behaviour)
+REVIEW_MODE = os.getenv("REVIEW_MODE", "map-reduce")
+# Chunk reviews in flight at once; raise it for API keys with generous request-per-minute limits
+REVIEW_CONCURRENCY = int(os.getenv("REVIEW_CONCURRENCY", "4"))
+# Retries of a rate-limited (429) LLM call before its part is marked as failed
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "4"))
+LLM_MAX_RETRY_WAIT = 60.0  # longest single wait, whatever Retry-After asks for
+MERGE_MAX_TOKENS = int(os.getenv("MERGE_MAX_TOKENS", "6000"))  # partial reviews per merge call
+MODEL = "llama-3.1-8b-instant"
+COMMENT_MAX_CHARS = 65000  # GitHub rejects comment bodies over 65536 characters
+
 headers = {
     "Authorization": f"token {token}",
     "Accept": "application/vnd.github.v3+json",
@@ -24,43 +40,51 @@ client = Groq(api_key=groq_key)
 def fetch_diff():
     """Fetch PR diff text"""
     url = f"https://api.github.com/repos/{repo}/pulls/{pr_number}"
-    r = requests.get(url, headers=headers)
+    r = github_client.get(url, headers=headers)
     r.raise_for_status()
     diff_url = r.json()["diff_url"]
 
-    r2 = requests.get(diff_url, headers=headers)
+    r2 = github_client.get(diff_url, headers=headers)
     r2.raise_for_status()
     return r2.text
 
 def post_comment(body: str):
     """Post a comment on the PR"""
     url = f"https://api.github.com/repos/{repo}/issues/{pr_number}/comments"
-    r = requests.post(url, headers=headers, json={"body": body})
+    r = github_client.post(url, headers=headers, json={"body": body})
     r.raise_for_status()
     print("✅ Comment posted successfully")
 
 # === Review logic ===
-def chunk_text(text, max_chars=3500):
-    """Split text into safe chunks"""
-    lines = text.splitlines()
-    chunks, current = [], []
-    length = 0
-
-    for line in lines:
-        if length + len(line) > max_chars:
-            chunks.append("\n".join(current))
-            current, length = [], 0
-        current.append(line)
-        length += len(line)
-    if current:
-        chunks.append("\n".join(current))
-    return chunks
-
-def generate_review(diff_chunk: str) -> str:
+def _retry_after(error: RateLimitError) -> Optional[float]:
+    try:
+        return float(error.response.headers.get("retry-after"))
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+def ask_llm(prompt: str, max_tokens: int) -> str:
+    """One completion; rate-limited calls wait (Retry-After, else exponential backoff) and retry."""
+    for attempt in range(LLM_MAX_RETRIES + 1):
+        try:
+            response = client.chat.completions.create(
+                model=MODEL,  # 👈 Groq’s most powerful free model
+                messages=[{"role": "user", "content": prompt}],
+                temperature=0.3,
+                max_tokens=max_tokens
+            )
+            return response.choices[0].message.content
+        except RateLimitError as e:
+            if attempt == LLM_MAX_RETRIES:
+                raise
+            wait = min(_retry_after(e) or 2.0 ** (attempt + 1), LLM_MAX_RETRY_WAIT)
+            print(f"⏳ Groq rate limit hit, retrying in {wait:.0f}s...")
+            time.sleep(wait)
+
+def generate_review(diff_chunk: str, part: str = "") -> str:
     """Send one chunk to Groq LLM for review"""
     prompt = f"""
 You are an AI pull request reviewer.
-Here is a code diff chunk from a PR:
+Here is a code diff chunk from a PR{part}:
 
 {diff_chunk}
 
@@ -70,24 +94,125 @@ Write a structured review:
 - Note any risks (bugs, performance, security)
 Respond in markdown format.
 """
-    response = client.chat.completions.create(
-        model="llama-3.1-8b-instant",  # 👈 Groq’s most powerful free model
-        messages=[{"role": "user", "content": prompt}],
-        temperature=0.3,
-        max_tokens=500
-    )
-    return response.choices[0].message.content
+    return ask_llm(prompt, 500)
+
+class PartReview(NamedTuple):
+    title: str              # "Part i/N (files)"
+    text: Optional[str]     # the review, None when the LLM call failed
+    error: Optional[str]    # why it failed
+
+    def markdown(self) -> str:
+        return f"#### {self.title}\n\n{self.text}"
+
+def review_chunks(chunks) -> List[PartReview]:
+    """Map step: reviews every chunk, REVIEW_CONCURRENCY at a time; results keep chunk order."""
+    def review_part(numbered):
+        i, chunk = numbered
+        files = ", ".join(chunk.paths) or "no file headers"
+        title = f"Part {i}/{len(chunks)} ({files})"
+        start = time.perf_counter()
+        try:
+            text = generate_review(chunk.text, f" (part {i}/{len(chunks)}: {files})")
+        except Exception as e:  # one failed part shouldn't lose the others
+            print(f"  ❌ {title} failed: {e}")
+            return PartReview(title, None, str(e)[:200])
+        print(f"  ✅ Part {i}/{len(chunks)} reviewed in {time.perf_counter() - start:.1f}s ({chunk.tokens} tokens)")
+        return PartReview(title, text, None)
+
+    with ThreadPoolExecutor(max_workers=max(1, REVIEW_CONCURRENCY)) as pool:
+        return list(pool.map(review_part, enumerate(chunks, start=1)))
+
+def failure_note(parts: List[PartReview]) -> str:
+    """Markdown listing the parts that could not be reviewed ("" when none failed)."""
+    failed = [part for part in parts if part.error is not None]
+    if not failed:
+        return ""
+    lines = "\n".join(f"> - {part.title}: {part.error}" for part in failed)
+    return f"\n\n> ⚠️ **{len(failed)} of {len(parts)} part(s) could not be reviewed** and are not covered above:\n{lines}"
+
+def merge_reviews(reviews: List[str]) -> str:
+    """
+    Reduce step: one LLM call merges the partial reviews (successful ones only) into a single review. When they
+    don't fit MERGE_MAX_TOKENS together, groups are merged first (concurrently) and the
+    group results merged again.
+    """
+    groups, current, size = [], [], 0
+    for review in reviews:
+        tokens = diff_chunker.count_tokens(review)
+        if current and size + tokens > MERGE_MAX_TOKENS:
+            groups.append(current)
+            current, size = [], 0
+        current.append(review)
+        size += tokens
+    groups.append(current)
+
+    def merge(group):
+        joined = "\n\n---\n\n".join(group)
+        prompt = f"""
+You are an AI pull request reviewer.
+These are reviews of consecutive parts of one PR diff:
+
+{joined}
+
+Merge them into ONE structured review of the whole PR:
+- Summarize what the PR changes overall
+- List the most important improvement suggestions, without duplicates, naming the files
+- Note the risks (bugs, performance, security)
+Respond in markdown format.
+"""
+        return ask_llm(prompt, 900)
+
+    if len(groups) == 1:
+        return merge(groups[0])
+    with ThreadPoolExecutor(max_workers=max(1, REVIEW_CONCURRENCY)) as pool:
+        merged = list(pool.map(merge, groups))
+    if len(merged) == len(reviews):  # a single review is bigger than MERGE_MAX_TOKENS
+        return merge(merged)
+    return merge_reviews(merged)
 
 def main():
     print(f"🔍 Reviewing PR #{pr_number} in {repo} ...")
     diff = fetch_diff()
 
-    chunks = chunk_text(diff)
-    print(f"📦 Split diff into {len(chunks)} chunks")
-
-    for i, chunk in enumerate(chunks, start=1):
-        review = generate_review(chunk)
-        post_comment(f"### 🤖 AI Review (Part {i}/{len(chunks)})\n\n{review}")
+    chunks = diff_chunker.chunk_diff(diff)
+    if not chunks:
+        print("ℹ️ The PR diff is empty; nothing to review.")
+        return
+    print(f"📦 Split diff into {len(chunks)} chunks (≤{diff_chunker.CHUNK_MAX_TOKENS} tokens each)")
+
+    start = time.perf_counter()
+    parts = review_chunks(chunks)
+    print(f"🗺️ Reviewed {len(chunks)} chunks in {time.perf_counter() - start:.1f}s ({REVIEW_CONCURRENCY} at a time)")
+
+    if REVIEW_MODE == "per-chunk":
+        for i, part in enumerate(parts, start=1):
+            body = part.text if part.error is None else f"⚠️ This part could not be reviewed: {part.error}"
+            post_comment(f"### 🤖 AI Review (Part {i}/{len(chunks)})\n\n{body}")
+        print("🎉 Review completed!")
+        return
+
+    # Failed parts stay out of the merge prompt (the LLM would hide or paraphrase them) and are listed below it
+    reviewed = [part for part in parts if part.error is None]
+    if not reviewed:
+        body = "⚠️ The review could not be generated."
+    elif len(parts) == 1:
+        body = reviewed[0].text
+    elif len(reviewed) == 1:
+        body = reviewed[0].markdown()
+    else:
+        merge_start = time.perf_counter()
+        try:
+            body = merge_reviews([part.markdown() for part in reviewed])
+            print(f"🧩 Merged {len(reviewed)} part reviews in {time.perf_counter() - merge_start:.1f}s")
+        except Exception as e:
+            print(f"⚠️ Merge failed ({e}); posting the part reviews together")
+            body = "\n\n".join(part.markdown() for part in reviewed)
+
+    footer = failure_note(parts) + f"\n\n_Reviewed in {len(chunks)} part(s) in {time.perf_counter() - start:.0f}s._"
+    comment = f"### 🤖 AI Review\n\n{body}"
+    if len(comment) + len(footer) > COMMENT_MAX_CHARS:
+        comment = comment[:COMMENT_MAX_CHARS - len(footer) - 30] + "\n\n... (review truncated)"
+    post_comment(comment + footer)
 
     print("🎉 Review completed!")
 